@@ -0,0 +1,136 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+
+from api_ranking.analysis.registro import DIMENSOES, PARAMETROS, REGISTRO, atende, linha_na, verificacoes
+
+#############################################################################
+####  Execução das verificações registradas  ####
+#############################################################################
+#
+# Recebe os frames já preparados (calculados uma única vez) e executa as
+# verificações aplicáveis num pool de threads: cada verificação é submetida
+# assim que as verificações de que depende (entradas 'codigo.nome') terminam.
+# Os argumentos de cada verificação são montados na própria thread do pool,
+# logo antes da chamada (nada fica copiado na fila do executor). As
+# verificações registradas com `altera=True` escrevem nos frames recebidos e
+# recebem cópias profundas (sem Copy-on-Write, uma cópia rasa compartilha os
+# arrays com os frames que as outras threads estão lendo); as demais recebem
+# cópias rasas. Os frames compartilhados (e os retornos usados por outras
+# verificações) nunca são alterados.
+#
+# Threads e não processos: os frames são grandes e o trabalho pesado é feito
+# pelo pandas/NumPy, que liberam o GIL; copiar os frames para outros processos
+# custaria mais do que as próprias verificações.
+
+# Threads por execução; 1 executa tudo em sequência na thread chamadora
+WORKERS = int(os.environ.get("RANKING_VERIFICACOES_WORKERS", str(min(8, os.cpu_count() or 1))))
+
+
+def _copia(valor, profunda):
+    return valor.copy(deep=profunda) if isinstance(valor, pd.DataFrame) else valor
+
+
+def _argumentos(v, frames, parametros, resultados):
+    argumentos = []
+    for nome in v.entradas:
+        if '.' in nome:
+            codigo, retorno = nome.split('.', 1)
+            argumentos.append(_copia(REGISTRO[codigo].retorno(resultados[codigo], retorno), v.altera))
+        elif nome in parametros:
+            argumentos.append(parametros[nome])
+        else:
+            argumentos.append(_copia(frames[nome], v.altera))
+    return argumentos
+
+
+def _executar(v, frames, parametros, resultados):
+    """Monta os argumentos (cópias) e chama a verificação, na thread que a executa."""
+    return v.funcao(*_argumentos(v, frames, parametros, resultados))
+
+
+def _validar(selecionadas, frames):
+    for v in selecionadas.values():
+        for nome in v.entradas:
+            if '.' in nome:
+                codigo, retorno = nome.split('.', 1)
+                if codigo not in selecionadas:
+                    raise ValueError(f"{v.codigo}: depende de {codigo}, que não é aplicável nesta execução")
+                if retorno not in REGISTRO[codigo].retornos:
+                    raise ValueError(f"{v.codigo}: {codigo} não retorna '{retorno}'")
+            elif nome not in PARAMETROS and nome not in frames:
+                raise KeyError(f"{v.codigo}: frame '{nome}' não foi preparado")
+
+
+def selecionar(ano, tipo_ente, disponibilidade):
+    """Verificações aplicáveis (código -> Verificacao), em ordem de código."""
+    return {v.codigo: v for v in verificacoes() if v.aplicavel(ano, tipo_ente, disponibilidade)}
+
+
+def executar_verificacoes(frames, ano, tipo_ente, disponibilidade, workers=None):
+    """
+    Executa as verificações aplicáveis ao ente/exercício.
+
+    Args:
+        frames: dict retornado por `api_ranking.pipeline.preparar_frames`
+        ano, tipo_ente, disponibilidade: parâmetros da execução
+        workers: threads do pool (padrão: WORKERS)
+
+    Returns:
+        Tupla (resultados, partes): retorno de cada função por código e lista de
+        resumos na ordem da tabela final (D1..D4, por código; linha "Dn_NA" para
+        a dimensão sem os demonstrativos exigidos).
+    """
+    workers = WORKERS if workers is None else workers
+    parametros = dict(ano=ano, tipo_ente=tipo_ente, disponibilidade=disponibilidade)
+    selecionadas = selecionar(ano, tipo_ente, disponibilidade)
+    _validar(selecionadas, frames)
+
+    resultados = {}
+    pendentes = {codigo: set(v.dependencias) for codigo, v in selecionadas.items()}
+
+    def prontas():
+        lista = [codigo for codigo, deps in pendentes.items() if not deps]
+        for codigo in lista:
+            del pendentes[codigo]
+        return lista
+
+    def concluir(codigo, resultado):
+        resultados[codigo] = resultado
+        for deps in pendentes.values():
+            deps.discard(codigo)
+
+    if workers <= 1:
+        while pendentes:
+            lote = prontas()
+            if not lote:
+                raise ValueError(f"Dependência circular entre verificações: {sorted(pendentes)}")
+            for codigo in lote:
+                v = selecionadas[codigo]
+                concluir(codigo, _executar(v, frames, parametros, resultados))
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ranking") as pool:
+            em_execucao = {}
+            try:
+                while pendentes or em_execucao:
+                    for codigo in prontas():
+                        v = selecionadas[codigo]
+                        em_execucao[pool.submit(_executar, v, frames, parametros, resultados)] = codigo
+                    if not em_execucao:
+                        raise ValueError(f"Dependência circular entre verificações: {sorted(pendentes)}")
+                    feitas, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+                    for futuro in feitas:
+                        concluir(em_execucao.pop(futuro), futuro.result())
+            except BaseException:
+                for futuro in em_execucao:
+                    futuro.cancel()
+                raise
+
+    partes = []
+    for dimensao, config in DIMENSOES.items():
+        if not atende(config["requer"], disponibilidade):
+            partes.append(linha_na(dimensao))
+            continue
+        partes.extend(resultados[codigo][0] for codigo, v in selecionadas.items() if v.dimensao == dimensao)
+    return resultados, partes
@@ -1,6 +1,12 @@
 import pandas as pd
 
+from api_ranking.analysis.registro import verificacao
+from api_ranking.services.layout_stn import LayoutSTN
+from api_ranking.services.msc_view import MscView
+from core.normalizacao_sinal import inverter_sinal, REGRAS_D1_00018
 
+
+@verificacao('D1', entradas=('msc_orig_consolidada',), ano_max=2023)
 def d1_00017(msc_orig_consolidada):
     d1_00017_t = msc_orig_consolidada.query('valor < 0')
 
@@ -25,41 +31,23 @@ def d1_00017(msc_orig_consolidada):
     return d1_00017, d1_00017_t
 
 
+@verificacao('D1', entradas=('msc_orig_consolidada',), ano_max=2023)
 def d1_00018(msc_orig_consolidada):
-    msc_base = msc_orig_consolidada.groupby(['tipo_matriz', 'conta_contabil', 'mes_referencia', 'tipo_valor', 'natureza_conta'])['valor'].sum().reset_index()
+    msc_base = msc_orig_consolidada.groupby(['tipo_matriz', 'conta_contabil', 'mes_referencia', 'tipo_valor', 'natureza_conta'], observed=True)['valor'].sum().reset_index()
     msc_base['conta_contabil'] = msc_base['conta_contabil'].astype(str)
     msc_base["Grupo_Contas"] = msc_base["conta_contabil"].str[0]
 
-    msc_base['valor'] = msc_base.apply(lambda x: x['valor'] * -1
-    if (x['Grupo_Contas'] == '1' and x['natureza_conta'] == 'C' and not x['tipo_valor'] == 'period_change')
-    or (x['Grupo_Contas'] == '2' and x['natureza_conta'] == 'D' and not x['tipo_valor'] == 'period_change')
-    or (x['Grupo_Contas'] == '4' and x['natureza_conta'] == 'D' and not x['tipo_valor'] == 'period_change')
-    or (x['Grupo_Contas'] == '5' and x['natureza_conta'] == 'C' and not x['tipo_valor'] == 'period_change')
-    or (x['Grupo_Contas'] == '6' and x['natureza_conta'] == 'D' and not x['tipo_valor'] == 'period_change')
-    or (x['Grupo_Contas'] == '7' and x['natureza_conta'] == 'C' and not x['tipo_valor'] == 'period_change')
-    or (x['Grupo_Contas'] == '8' and x['natureza_conta'] == 'D' and not x['tipo_valor'] == 'period_change')
-    else x['valor'], axis=1)
-
-    msc_base['valor'] = msc_base.apply(lambda x: x['valor'] * -1
-    if (x['Grupo_Contas'] == '1' and x['natureza_conta'] == 'C' and x['tipo_valor'] == 'period_change')
-    or (x['Grupo_Contas'] == '2' and x['natureza_conta'] == 'D' and x['tipo_valor'] == 'period_change')
-    or (x['Grupo_Contas'] == '3' and x['natureza_conta'] == 'C' and x['tipo_valor'] == 'period_change')
-    or (x['Grupo_Contas'] == '4' and x['natureza_conta'] == 'D' and x['tipo_valor'] == 'period_change')
-    or (x['Grupo_Contas'] == '5' and x['natureza_conta'] == 'C' and x['tipo_valor'] == 'period_change')
-    or (x['Grupo_Contas'] == '6' and x['natureza_conta'] == 'D' and x['tipo_valor'] == 'period_change')
-    or (x['Grupo_Contas'] == '7' and x['natureza_conta'] == 'C' and x['tipo_valor'] == 'period_change')
-    or (x['Grupo_Contas'] == '8' and x['natureza_conta'] == 'D' and x['tipo_valor'] == 'period_change')
-    else x['valor'], axis=1)
+    msc_base = inverter_sinal(msc_base, REGRAS_D1_00018)
 
     analise_b = msc_base.query('tipo_valor != "ending_balance"')
-    analise_b = analise_b.groupby(['tipo_matriz', 'mes_referencia', 'conta_contabil'])['valor'].sum().reset_index()
+    analise_b = analise_b.groupby(['tipo_matriz', 'mes_referencia', 'conta_contabil'], observed=True)['valor'].sum().reset_index()
     analise_b['mes_referencia'] = analise_b['mes_referencia'].astype(str)
-    analise_b['chave'] = analise_b['tipo_matriz'] + analise_b['mes_referencia'] + analise_b['conta_contabil']
+    analise_b['chave'] = analise_b['tipo_matriz'].astype(str) + analise_b['mes_referencia'] + analise_b['conta_contabil']
 
     analise_e = msc_base.query('tipo_valor == "ending_balance"')
-    analise_e = analise_e.groupby(['tipo_matriz', 'mes_referencia', 'conta_contabil'])['valor'].sum().reset_index()
+    analise_e = analise_e.groupby(['tipo_matriz', 'mes_referencia', 'conta_contabil'], observed=True)['valor'].sum().reset_index()
     analise_e['mes_referencia'] = analise_e['mes_referencia'].astype(str)
-    analise_e['chave'] = analise_e['tipo_matriz'] + analise_e['mes_referencia'] + analise_e['conta_contabil']
+    analise_e['chave'] = analise_e['tipo_matriz'].astype(str) + analise_e['mes_referencia'] + analise_e['conta_contabil']
 
     analise = analise_b.merge(analise_e, on="chave")
     analise['DIF'] = analise['valor_x'] - analise['valor_y']
@@ -89,15 +77,12 @@ def d1_00018(msc_orig_consolidada):
     return d1_00018, d1_00018_t
 
 
+@verificacao('D1', entradas=('msc_orig_consolidada', 'ano', 'tipo_ente'))
 def d1_00019(msc_orig_consolidada, ano, tipo_ente):
-    po_stn = pd.read_excel(f'api_ranking/bases_layout_stn/{ano}_Anexo_II_Portaria_STN_642_Leiaute_MSC.xlsx', sheet_name="PO", header=4)
-    po_stn['Código'] = po_stn['Código'].astype(int)
-    po_stn = po_stn.rename(columns={'Código': 'poder_orgao'})
-
-    codigos_na_msc = msc_orig_consolidada.groupby(['poder_orgao'])['valor'].sum().reset_index()
+    codigos_na_msc = msc_orig_consolidada.groupby(['poder_orgao'], observed=True)['valor'].sum().reset_index()
     codigos_na_msc['poder_orgao'] = codigos_na_msc['poder_orgao'].astype(int)
 
-    d1_00019_ta = msc_orig_consolidada.groupby(['mes_referencia', 'poder_orgao'])['valor'].sum().reset_index()
+    d1_00019_ta = msc_orig_consolidada.groupby(['mes_referencia', 'poder_orgao'], observed=True)['valor'].sum().reset_index()
 
     if tipo_ente == "M":
         lista_poderes = ["10131", "10132", "20231", "20232"]
@@ -146,9 +131,10 @@ def d1_00019(msc_orig_consolidada, ano, tipo_ente):
     return d1_00019, d1_00019_t
 
 
+@verificacao('D1', entradas=('msc_orig_consolidada',))
 def d1_00020(msc_orig_consolidada):
     msc_consolidada_dif = msc_orig_consolidada.sort_values(by=["conta_contabil", "mes_referencia", "tipo_matriz", "tipo_valor"])
-    msc_consolidada_dif = msc_consolidada_dif.groupby(["conta_contabil", "mes_referencia", "tipo_matriz", "tipo_valor"])['valor'].sum().reset_index()
+    msc_consolidada_dif = msc_consolidada_dif.groupby(["conta_contabil", "mes_referencia", "tipo_matriz", "tipo_valor"], observed=True)['valor'].sum().reset_index()
 
     tolerancia = 1e-3
     lista_divergencias = []
@@ -246,23 +232,20 @@ def d1_00020(msc_orig_consolidada):
     return d1_00020, d1_00020_t
 
 
+@verificacao('D1', entradas=('msc_consolidada_view', 'ano'), retornos=('_t', 'pc_estendido'))
 def d1_00021(msc_consolidada, ano):
-    pc_estendido = pd.read_excel(f'api_ranking/bases_layout_stn/{ano}_Anexo_II_Portaria_STN_642_Leiaute_MSC.xlsx', sheet_name=f'PcaspEstendido{ano}', header=3)
-    pc_estendido['CONTA'] = pc_estendido['CONTA'].astype(str)
-    pc_estendido['conta_4'] = pc_estendido['CONTA'].str.slice(stop=4)
+    layout = LayoutSTN.do_ano(ano)
+    pc_estendido = layout.pcasp()
 
-    ativo_pcasp = pc_estendido.query('conta_4 == "1111" or conta_4 == "1121" or conta_4 == "1125" or conta_4 == "1231" or conta_4 == "1232"')
+    ativo_pcasp = layout.pcasp_conta_4("1111", "1121", "1125", "1231", "1232")
     ativo_pcasp = ativo_pcasp.groupby(['conta_4', 'CONTA', 'TÍTULO.1', 'NATUREZA DO SALDO', 'STATUS']).sum().reset_index()
     ativo_pcasp = ativo_pcasp.rename(columns={"CONTA": "conta_contabil"})
 
-    msc_consolidada['conta_contabil'] = msc_consolidada['conta_contabil'].astype(str)
-
-    ativo_msc = msc_consolidada[msc_consolidada['tipo_valor'] != 'period_change']
-
-    ativo_msc = ativo_msc[(ativo_msc['conta_contabil'].str.startswith('1111')) | (ativo_msc['conta_contabil'].str.startswith('1121')) | (ativo_msc['conta_contabil'].str.startswith('1125'))\
-                        | (ativo_msc['conta_contabil'].str.startswith('1231')) | (ativo_msc['conta_contabil'].str.startswith('1232'))]
-
-    ativo_msc = ativo_msc.groupby(['mes_referencia', 'tipo_matriz', 'conta_contabil'], as_index=False)['valor'].sum()
+    visao = MscView.de(msc_consolidada)
+    saldos = [t for t in visao.valores('tipo_valor') if t != 'period_change']
+    ativo_msc = visao.somas_por(['mes_referencia', 'tipo_matriz', 'conta_contabil'], tipo_valor=saldos,
+                                prefixos=("1111", "1121", "1125", "1231", "1232"))
+    ativo_msc['conta_contabil'] = ativo_msc['conta_contabil'].astype(str)
     ativo_msc['natureza_conta'] = ativo_msc['valor'].apply(lambda x: 'D' if x >= 0 else 'C')
 
     erro_ativo = ativo_msc.merge(ativo_pcasp, on='conta_contabil', how="left")
@@ -271,7 +254,7 @@ def d1_00021(msc_consolidada, ano):
     erro_ativo = erro_ativo[['mes_referencia', 'tipo_matriz', 'conta_contabil', 'natureza_conta', 'NATUREZA DO SALDO', 'valor']]
     erro_ativo['chave'] = erro_ativo['natureza_conta'] + erro_ativo['NATUREZA DO SALDO']
 
-    d1_00021_ta = erro_ativo.groupby(['mes_referencia', 'tipo_matriz', 'chave'])['valor'].sum().reset_index()
+    d1_00021_ta = erro_ativo.groupby(['mes_referencia', 'tipo_matriz', 'chave'], observed=True)['valor'].sum().reset_index()
 
     d1_00021_t = d1_00021_ta.query('chave == "CDevedora" or chave == "DCredora"')
 
@@ -298,6 +281,7 @@ def d1_00021(msc_consolidada, ano):
     return d1_00021, d1_00021_t, pc_estendido
 
 
+@verificacao('D1', entradas=('msc_consolidada',), altera=True)
 def d1_00022(msc_consolidada):
     if msc_consolidada['poder_orgao'].isna().any() or (msc_consolidada['poder_orgao'] == '').any():
         resposta_d1_00022 = 'ERRO'
@@ -308,7 +292,7 @@ def d1_00022(msc_consolidada):
     d1_00022_t = msc_consolidada.query('msc_consolidada_null_or_empty == True')
     d1_00022_t = d1_00022_t.drop(columns=['msc_consolidada_null_or_empty'])
 
-    d1_00022_ta = msc_consolidada.groupby(['mes_referencia', 'tipo_matriz'])['valor'].sum().reset_index()
+    d1_00022_ta = msc_consolidada.groupby(['mes_referencia', 'tipo_matriz'], observed=True)['valor'].sum().reset_index()
 
     contagem = d1_00022_t.mes_referencia.unique()
     erros = len(contagem)
@@ -326,6 +310,7 @@ def d1_00022(msc_consolidada):
     return d1_00022, d1_00022_t
 
 
+@verificacao('D1', entradas=('msc_consolidada', 'tipo_ente'))
 def d1_00023(msc_consolidada, tipo_ente):
     if tipo_ente == "M":
         codigos_executivo = ['10131', '10132']
@@ -333,7 +318,7 @@ def d1_00023(msc_consolidada, tipo_ente):
         codigos_executivo = ['10111', '10112']
 
     msc_consolidada_anual_e = msc_consolidada[msc_consolidada['poder_orgao'].isin(codigos_executivo)]
-    d1_00023_ta = msc_consolidada_anual_e.groupby(['mes_referencia', 'tipo_matriz'])['valor'].sum().reset_index()
+    d1_00023_ta = msc_consolidada_anual_e.groupby(['mes_referencia', 'tipo_matriz'], observed=True)['valor'].sum().reset_index()
     d1_00023_ta['diferenca'] = d1_00023_ta['valor'].diff()
 
     d1_00023_t = d1_00023_ta.query('diferenca == 0')
@@ -360,6 +345,7 @@ def d1_00023(msc_consolidada, tipo_ente):
     return d1_00023, d1_00023_t
 
 
+@verificacao('D1', entradas=('msc_consolidada', 'tipo_ente'))
 def d1_00024(msc_consolidada, tipo_ente):
     if tipo_ente == "M":
         codigos_legislativo = ['20231', '20232']
@@ -367,7 +353,7 @@ def d1_00024(msc_consolidada, tipo_ente):
         codigos_legislativo = ['20211', '20212']
 
     msc_consolidada_anual_l = msc_consolidada[msc_consolidada['poder_orgao'].isin(codigos_legislativo)]
-    d1_00024_ta = msc_consolidada_anual_l.groupby(['mes_referencia', 'tipo_matriz'])['valor'].sum().reset_index()
+    d1_00024_ta = msc_consolidada_anual_l.groupby(['mes_referencia', 'tipo_matriz'], observed=True)['valor'].sum().reset_index()
     d1_00024_ta['diferenca'] = d1_00024_ta['valor'].diff()
 
     d1_00024_t = d1_00024_ta.query('diferenca == 0')
@@ -394,6 +380,8 @@ def d1_00024(msc_consolidada, tipo_ente):
     return d1_00024, d1_00024_t
 
 
+@verificacao('D1', entradas=('msc_consolidada', 'd1_00021.pc_estendido'), retornos=('_t', 'pc_estendido'),
+             altera=True)
 def d1_00025(msc_consolidada, pc_estendido):
     filtro_1 = pc_estendido[pc_estendido['CONTA'].str.match(r"^(2111|2112|2113|2114|2121|2122|2123|2124|2125|2126|213|214|215|221|222|223)")]
     pass_pcasp = filtro_1.groupby(['CONTA', 'TÍTULO.1', 'NATUREZA DO SALDO', 'STATUS']).sum().reset_index()
@@ -402,7 +390,7 @@ def d1_00025(msc_consolidada, pc_estendido):
     msc_base_e = msc_consolidada.query('tipo_valor == "ending_balance"')
     pass_msc = msc_base_e[msc_base_e['conta_contabil'].str.match(r"^(2111|2112|2113|2114|2121|2122|2123|2124|2125|2126|213|214|215|221|222|223)")]
 
-    pass_msc = pass_msc.groupby(['mes_referencia', 'tipo_matriz', 'conta_contabil'], as_index=False)['valor'].sum()
+    pass_msc = pass_msc.groupby(['mes_referencia', 'tipo_matriz', 'conta_contabil'], as_index=False, observed=True)['valor'].sum()
     pass_msc['natureza_conta'] = pass_msc['valor'].apply(lambda x: 'C' if x >= 0 else 'D')
 
     erro_pass = pass_msc.merge(pass_pcasp, on='conta_contabil', how="left")
@@ -438,6 +426,7 @@ def d1_00025(msc_consolidada, pc_estendido):
     return d1_00025, d1_00025_t, pc_estendido
 
 
+@verificacao('D1', entradas=('msc_consolidada', 'd1_00025.pc_estendido'))
 def d1_00026(msc_consolidada, pc_estendido):
     pl_pcasp1 = pc_estendido.query('conta_4 == "2311" or conta_4 == "2321"')
     pl_pcasp2 = pc_estendido.query('conta_3 == "232" or conta_3 == "233" or conta_3 == "234" or conta_3 == "235" or conta_3 == "236"')
@@ -451,13 +440,13 @@ def d1_00026(msc_consolidada, pc_estendido):
                         | (pl_msc['conta_contabil'].str.startswith('233')) | (pl_msc['conta_contabil'].str.startswith('234')) | (pl_msc['conta_contabil'].str.startswith('235'))
                         | (pl_msc['conta_contabil'].str.startswith('236'))]
 
-    pl_msc = pl_msc.groupby(['tipo_matriz', 'conta_contabil', 'natureza_conta', 'mes_referencia'])['valor'].sum().reset_index()
+    pl_msc = pl_msc.groupby(['tipo_matriz', 'conta_contabil', 'natureza_conta', 'mes_referencia'], observed=True)['valor'].sum().reset_index()
 
     erro_pl = pl_msc.merge(pl_pcasp, on='conta_contabil', how="left")
     erro_pl = erro_pl[(erro_pl['valor'] != 0)]
     erro_pl = erro_pl[['tipo_matriz', 'conta_contabil', 'natureza_conta', 'NATUREZA DO SALDO', 'TÍTULO.1', 'mes_referencia',  'valor']]
-    erro_pl['chave'] = erro_pl['natureza_conta'] + erro_pl['NATUREZA DO SALDO']
-    d1_00026_ta = erro_pl.groupby(['chave', 'mes_referencia', 'tipo_matriz'])['valor'].sum().reset_index()
+    erro_pl['chave'] = erro_pl['natureza_conta'].astype(str) + erro_pl['NATUREZA DO SALDO']
+    d1_00026_ta = erro_pl.groupby(['chave', 'mes_referencia', 'tipo_matriz'], observed=True)['valor'].sum().reset_index()
 
     d1_00026_t = d1_00026_ta.query('chave == "CDevedora" or chave == "DCredora"')
 
@@ -484,11 +473,12 @@ def d1_00026(msc_consolidada, pc_estendido):
     return d1_00026, d1_00026_t
 
 
+@verificacao('D1', entradas=('msc_consolidada',))
 def d1_00027(msc_consolidada):
     condicao = (msc_consolidada['financeiro_permanente'] == 1.0) & (msc_consolidada['fonte_recursos'].isnull())
 
     d1_00027_t = msc_consolidada.query('financeiro_permanente == 1.0 and fonte_recursos.isnull()', engine='python')
-    d1_00027_t = d1_00027_t.groupby(['tipo_matriz', 'cod_ibge', 'mes_referencia'])['valor'].sum().reset_index()
+    d1_00027_t = d1_00027_t.groupby(['tipo_matriz', 'cod_ibge', 'mes_referencia'], observed=True)['valor'].sum().reset_index()
 
     contagem = d1_00027_t.mes_referencia.unique()
     erros = len(contagem)
@@ -511,8 +501,9 @@ def d1_00027(msc_consolidada):
     return d1_00027, d1_00027_t
 
 
+@verificacao('D1', entradas=('msc_consolidada',))
 def d1_00028(msc_consolidada):
-    d1_00028_t = msc_consolidada.groupby(['Grupo_Contas', 'mes_referencia', 'tipo_valor', 'tipo_matriz'])['valor'].sum().reset_index()
+    d1_00028_t = msc_consolidada.groupby(['Grupo_Contas', 'mes_referencia', 'tipo_valor', 'tipo_matriz'], observed=True)['valor'].sum().reset_index()
     d1_00028_t = d1_00028_t.query('(tipo_valor == "ending_balance" and mes_referencia == 1) or \
                       (tipo_valor == "beginning_balance" and mes_referencia != 1)')
 
@@ -558,6 +549,7 @@ def d1_00028(msc_consolidada):
     return d1_00028, d1_00028_t
 
 
+@verificacao('D1', entradas=('msc_consolidada',))
 def d1_00029(msc_consolidada):
     msc_consolidada_d1_29 = msc_consolidada[(msc_consolidada['valor'] != 0)]
 
@@ -567,7 +559,7 @@ def d1_00029(msc_consolidada):
                (msc_consolidada_d1_29['fonte_recursos'].isnull())
 
     d1_00029_t = msc_consolidada_d1_29.query('(conta_contabil.str.startswith("6211") or conta_contabil.str.startswith("6212") or conta_contabil.str.startswith("6213")) and fonte_recursos.isnull()', engine='python')
-    d1_00029_t = d1_00029_t.groupby(['tipo_matriz', 'cod_ibge', 'mes_referencia'])['valor'].sum().reset_index()
+    d1_00029_t = d1_00029_t.groupby(['tipo_matriz', 'cod_ibge', 'mes_referencia'], observed=True)['valor'].sum().reset_index()
 
     contagem = d1_00029_t.mes_referencia.unique()
     erros = len(contagem)
@@ -590,6 +582,7 @@ def d1_00029(msc_consolidada):
     return d1_00029, d1_00029_t
 
 
+@verificacao('D1', entradas=('msc_consolidada',))
 def d1_00030(msc_consolidada):
     condicao = (msc_consolidada['conta_contabil'].str.startswith('6211') |
                 msc_consolidada['conta_contabil'].str.startswith('6212') |
@@ -598,7 +591,7 @@ def d1_00030(msc_consolidada):
 
     d1_00030_t = msc_consolidada.query('(conta_contabil.str.startswith("6211") or conta_contabil.str.startswith("6212") or conta_contabil.str.startswith("6213")) and natureza_receita.isnull()', engine='python')
     d1_00030_t = d1_00030_t.query('valor != 0').copy()
-    d1_00030_t = d1_00030_t.groupby(['tipo_matriz', 'mes_referencia'])['valor'].sum().reset_index()
+    d1_00030_t = d1_00030_t.groupby(['tipo_matriz', 'mes_referencia'], observed=True)['valor'].sum().reset_index()
 
     contagem = d1_00030_t.mes_referencia.unique()
     erros = len(contagem)
@@ -621,12 +614,13 @@ def d1_00030(msc_consolidada):
     return d1_00030, d1_00030_t
 
 
+@verificacao('D1', entradas=('msc_consolidada',))
 def d1_00031(msc_consolidada):
     condicao = (msc_consolidada['conta_contabil'].str.startswith('62213')) & \
                (msc_consolidada['natureza_despesa'].isnull())
 
     d1_00031_t = msc_consolidada.query('conta_contabil.str.startswith("62213") and natureza_despesa.isnull()', engine='python')
-    d1_00031_t = d1_00031_t.groupby(['tipo_matriz', 'mes_referencia'])['valor'].sum().reset_index()
+    d1_00031_t = d1_00031_t.groupby(['tipo_matriz', 'mes_referencia'], observed=True)['valor'].sum().reset_index()
 
     contagem = d1_00031_t.mes_referencia.unique()
     erros = len(contagem)
@@ -649,6 +643,7 @@ def d1_00031(msc_consolidada):
     return d1_00031, d1_00031_t
 
 
+@verificacao('D1', entradas=('msc_consolidada',), altera=True)
 def d1_00032(msc_consolidada):
     msc_consolidada['funcao_subfuncao'] = msc_consolidada['funcao'].astype(str) + msc_consolidada['subfuncao'].astype(str)
 
@@ -656,7 +651,7 @@ def d1_00032(msc_consolidada):
                (msc_consolidada['funcao_subfuncao'].isnull())
 
     d1_00032_t = msc_consolidada.query('conta_contabil.str.startswith("62213") and funcao_subfuncao.isnull()', engine='python')
-    d1_00032_t = d1_00032_t.groupby(['tipo_matriz', 'mes_referencia'])['valor'].sum().reset_index()
+    d1_00032_t = d1_00032_t.groupby(['tipo_matriz', 'mes_referencia'], observed=True)['valor'].sum().reset_index()
 
     contagem = d1_00032_t.mes_referencia.unique()
     erros = len(contagem)
@@ -679,12 +674,13 @@ def d1_00032(msc_consolidada):
     return d1_00032, d1_00032_t
 
 
+@verificacao('D1', entradas=('msc_consolidada',))
 def d1_00033(msc_consolidada):
     condicao = (msc_consolidada['conta_contabil'].str.startswith('62213')) & \
                (msc_consolidada['fonte_recursos'].isnull())
 
     d1_00033_t = msc_consolidada.query('conta_contabil.str.startswith("62213") and fonte_recursos.isnull()', engine='python')
-    d1_00033_t = d1_00033_t.groupby(['tipo_matriz', 'mes_referencia'])['valor'].sum().reset_index()
+    d1_00033_t = d1_00033_t.groupby(['tipo_matriz', 'mes_referencia'], observed=True)['valor'].sum().reset_index()
 
     contagem = d1_00033_t.mes_referencia.unique()
     erros = len(contagem)
@@ -707,18 +703,19 @@ def d1_00033(msc_consolidada):
     return d1_00033, d1_00033_t
 
 
+@verificacao('D1', entradas=('msc_consolidada_e', 'd1_00025.pc_estendido'))
 def d1_00034(msc_consolidada_e, pc_estendido):
     filtro_1 = pc_estendido[pc_estendido['CONTA'].str.match(r"^(311|312|313|321|322|323|331|332|333|351|352|353|361|362|363)")]
     vpd_pcasp = filtro_1.groupby(['CONTA', 'TÍTULO.1', 'NATUREZA DO SALDO', 'STATUS']).sum().reset_index()
 
     vpd_msc = msc_consolidada_e[msc_consolidada_e['conta_contabil'].str.match(r"^(311|312|313|321|322|323|331|332|333|351|352|353|361|362|363)")]
-    vpd_msc = vpd_msc.groupby(['conta_contabil', 'natureza_conta', 'mes_referencia'])['valor'].sum().reset_index()
+    vpd_msc = vpd_msc.groupby(['conta_contabil', 'natureza_conta', 'mes_referencia'], observed=True)['valor'].sum().reset_index()
     vpd_msc.rename(columns={'conta_contabil': 'CONTA', 'natureza_conta': 'NATUREZA_VALOR', 'valor': 'VALOR'}, inplace=True)
 
     erro_vpd = vpd_msc.merge(vpd_pcasp, on='CONTA', how="left")
     erro_vpd = erro_vpd[(erro_vpd['VALOR'] != 0)]
     erro_vpd = erro_vpd[['CONTA', 'NATUREZA_VALOR', 'NATUREZA DO SALDO', 'TÍTULO.1', 'mes_referencia', 'VALOR']]
-    erro_vpd['chave'] = erro_vpd['NATUREZA_VALOR'] + erro_vpd['NATUREZA DO SALDO']
+    erro_vpd['chave'] = erro_vpd['NATUREZA_VALOR'].astype(str) + erro_vpd['NATUREZA DO SALDO']
 
     condicao = erro_vpd.query('chave == "CDevedora" or chave == "DCredora"').value_counts().sum()
 
@@ -746,18 +743,19 @@ def d1_00034(msc_consolidada_e, pc_estendido):
     return d1_00034, d1_00034_t
 
 
+@verificacao('D1', entradas=('msc_consolidada_e', 'd1_00025.pc_estendido'))
 def d1_00035(msc_consolidada_e, pc_estendido):
     filtro_1 = pc_estendido[pc_estendido['CONTA'].str.match(r"^(411|412|413|421|422|423|424)")]
     vpa_pcasp = filtro_1.groupby(['CONTA', 'TÍTULO.1', 'NATUREZA DO SALDO', 'STATUS']).sum().reset_index()
 
     vpa_msc = msc_consolidada_e[msc_consolidada_e['conta_contabil'].str.match(r"^(411|412|413|421|422|423|424)")]
-    vpa_msc = vpa_msc.groupby(['conta_contabil', 'natureza_conta', 'mes_referencia'])['valor'].sum().reset_index()
+    vpa_msc = vpa_msc.groupby(['conta_contabil', 'natureza_conta', 'mes_referencia'], observed=True)['valor'].sum().reset_index()
     vpa_msc.rename(columns={'conta_contabil': 'CONTA', 'natureza_conta': 'NATUREZA_VALOR', 'valor': 'VALOR'}, inplace=True)
 
     erro_vpa = vpa_msc.merge(vpa_pcasp, on='CONTA', how="left")
     erro_vpa = erro_vpa[(erro_vpa['VALOR'] != 0)]
     erro_vpa = erro_vpa[['CONTA', 'NATUREZA_VALOR', 'NATUREZA DO SALDO', 'TÍTULO.1', 'mes_referencia', 'VALOR']]
-    erro_vpa['chave'] = erro_vpa['NATUREZA_VALOR'] + erro_vpa['NATUREZA DO SALDO']
+    erro_vpa['chave'] = erro_vpa['NATUREZA_VALOR'].astype(str) + erro_vpa['NATUREZA DO SALDO']
 
     condicao = erro_vpa.query('chave == "CDevedora" or chave == "DCredora"').value_counts().sum()
 
@@ -785,6 +783,7 @@ def d1_00035(msc_consolidada_e, pc_estendido):
     return d1_00035, d1_00035_t
 
 
+@verificacao('D1', entradas=('msc_encerr', 'disponibilidade'))
 def d1_00036(msc_encerr, disponibilidade):
     msce_disponivel = disponibilidade.get('msc_encerramento', {}).get('disponivel', False)
 
@@ -828,6 +827,7 @@ def d1_00036(msc_encerr, disponibilidade):
     return d1_00036, d1_00036_t
 
 
+@verificacao('D1', entradas=('msc_consolidada_e',), ano_min=2024, altera=True)
 def d1_00037(msc_consolidada_e):
     msc_consolidada_e['fonte'] = msc_consolidada_e['fonte_recursos'].str[-3:]
     msc_consolidada_e['fonte'] = pd.to_numeric(msc_consolidada_e['fonte'], errors='coerce')
@@ -857,6 +857,7 @@ def d1_00037(msc_consolidada_e):
     return d1_00037, d1_00037_t
 
 
+@verificacao('D1', entradas=('msc_orig_e', 'd1_00025.pc_estendido'), retornos=('_ta', '_det'), ano_min=2024)
 def d1_00038(msc_orig_e, pc_estendido):
     comeca_com_5 = msc_orig_e['conta_contabil'].str.startswith('5')
     c_5_msc = msc_orig_e[comeca_com_5]
@@ -883,8 +884,8 @@ def d1_00038(msc_orig_e, pc_estendido):
     erro_5 = erro_5[['CONTA', 'NATUREZA_VALOR', 'NATUREZA DO SALDO', 'TÍTULO.1', 'mes_referencia', 'tipo_matriz', 'VALOR']]
     erro_6 = erro_6[['CONTA', 'NATUREZA_VALOR', 'NATUREZA DO SALDO', 'TÍTULO.1', 'mes_referencia', 'tipo_matriz', 'VALOR']]
 
-    erro_5['chave'] = erro_5['NATUREZA_VALOR'] + erro_5['NATUREZA DO SALDO']
-    erro_6['chave'] = erro_6['NATUREZA_VALOR'] + erro_6['NATUREZA DO SALDO']
+    erro_5['chave'] = erro_5['NATUREZA_VALOR'].astype(str) + erro_5['NATUREZA DO SALDO']
+    erro_6['chave'] = erro_6['NATUREZA_VALOR'].astype(str) + erro_6['NATUREZA DO SALDO']
 
     erro_5_det = erro_5.query('chave == "CDevedora" or chave == "DCredora"').copy()
     erro_6_det = erro_6.query('chave == "CDevedora" or chave == "DCredora"').copy()
@@ -903,8 +904,8 @@ def d1_00038(msc_orig_e, pc_estendido):
     condicao_5 = len(erro_5_det)
     condicao_6 = len(erro_6_det)
 
-    d1_00038_t_5 = erro_5.groupby(['chave', 'mes_referencia', 'tipo_matriz'])['VALOR'].sum().reset_index()
-    d1_00038_t_6 = erro_6.groupby(['chave', 'mes_referencia', 'tipo_matriz'])['VALOR'].sum().reset_index()
+    d1_00038_t_5 = erro_5.groupby(['chave', 'mes_referencia', 'tipo_matriz'], observed=True)['VALOR'].sum().reset_index()
+    d1_00038_t_6 = erro_6.groupby(['chave', 'mes_referencia', 'tipo_matriz'], observed=True)['VALOR'].sum().reset_index()
 
     d1_00038_ta_5 = d1_00038_t_5.query('chave == "CDevedora" or chave == "DCredora"')
     d1_00038_ta_6 = d1_00038_t_6.query('chave == "CDevedora" or chave == "DCredora"')
@@ -1,7 +1,10 @@
 import numpy as np
 import pandas as pd
 
+from api_ranking.analysis.registro import verificacao
 
+
+@verificacao('D2', entradas=('df_dca_hi',))
 def d2_00002(df_dca_hi):
     vpd_fundeb = df_dca_hi.query('cod_conta == "P3.5.2.2.4.00.00"')
     vpd_fundeb = vpd_fundeb.copy()
@@ -28,6 +31,7 @@ def d2_00002(df_dca_hi):
     return d2_00002, d2_00002_t
 
 
+@verificacao('D2', entradas=('df_dca_c',))
 def d2_00003(df_dca_c):
     dedu_fundeb = df_dca_c.query('coluna == "Deduções - FUNDEB" & cod_conta == "TotalReceitas"')
     dedu_fundeb = dedu_fundeb.copy()
@@ -54,6 +58,7 @@ def d2_00003(df_dca_c):
     return d2_00003, d2_00003_t
 
 
+@verificacao('D2', entradas=('df_dca_c', 'ano'))
 def d2_00004(df_dca_c, ano):
     if ano <= 2021:
         rec_fundeb = df_dca_c.query('coluna == "Receitas Brutas Realizadas" & cod_conta == "RO1.7.5.8.01.0.0"')
@@ -84,6 +89,7 @@ def d2_00004(df_dca_c, ano):
     return d2_00004, d2_00004_t
 
 
+@verificacao('D2', entradas=('df_dca_d',))
 def d2_00005(df_dca_d):
     obrig_patr_emp = df_dca_d.query('coluna == "Despesas Empenhadas" and cod_conta == "DO3.1.90.13.00.00"').copy()
     obrig_patr_emp['dimensao'] = 'D2_00005_Despesas Empenhadas com Obrigações Patronais'
@@ -132,6 +138,7 @@ def d2_00005(df_dca_d):
     return d2_00005, d2_00005_t
 
 
+@verificacao('D2', entradas=('df_dca_d',))
 def d2_00006(df_dca_d):
     dps_pess_emp = df_dca_d.query('coluna == "Despesas Empenhadas" and cod_conta == "DO3.1.00.00.00.00"').copy()
     dps_pess_emp['dimensao'] = 'D2_00006_Despesas Empenhadas com Pessoal'
@@ -167,6 +174,7 @@ def d2_00006(df_dca_d):
     return d2_00006, d2_00006_t
 
 
+@verificacao('D2', entradas=('df_dca_d',))
 def d2_00007(df_dca_d):
     dps_juros_emp = df_dca_d.query('coluna == "Despesas Empenhadas" and cod_conta == "DO3.2.00.00.00.00"').copy()
     dps_juros_emp['dimensao'] = 'D2_00007_Despesas Empenhadas com Juros e Encargos da Dívida'
@@ -215,6 +223,7 @@ def d2_00007(df_dca_d):
     return d2_00007, d2_00007_t
 
 
+@verificacao('D2', entradas=('df_dca_e',))
 def d2_00008(df_dca_e):
     dps_funcao = df_dca_e.query('cod_conta == "TotalDespesas" and coluna == "Despesas Empenhadas"').copy()
     dps_funcao['Funcao'] = dps_funcao['conta'].str[:2]
@@ -244,6 +253,7 @@ def d2_00008(df_dca_e):
     return d2_00008, d2_00008_t
 
 
+@verificacao('D2', entradas=('df_dca_c',))
 def d2_00010(df_dca_c):
     rec_transf = df_dca_c.query('cod_conta == "RO1.7.1.0.00.0.0" or cod_conta == "RO1.7.2.0.00.0.0" or cod_conta == "RO1.7.3.0.00.0.0"').copy()
     rec_transf = rec_transf.groupby(['coluna', 'conta']).sum(numeric_only=True).reset_index()
@@ -272,6 +282,7 @@ def d2_00010(df_dca_c):
     return d2_00010, d2_00010_t
 
 
+@verificacao('D2', entradas=('df_dca_c',))
 def d2_00011(df_dca_c):
     rec_trib = df_dca_c.query('cod_conta == "RO1.1.0.0.00.0.0"').copy()
     rec_trib = rec_trib.groupby(['coluna', 'conta']).sum(numeric_only=True).reset_index()
@@ -300,6 +311,7 @@ def d2_00011(df_dca_c):
     return d2_00011, d2_00011_t
 
 
+@verificacao('D2', entradas=('df_dca_c',), retornos=('_t', '_ta'))
 def d2_00012(df_dca_c):
     d2_00012_t = df_dca_c.groupby(['cod_conta'])['valor'].sum().reset_index()
     d2_00012_t = d2_00012_t[~d2_00012_t['cod_conta'].str.startswith('RO1.3.2')]
@@ -325,6 +337,7 @@ def d2_00012(df_dca_c):
     return d2_00012, d2_00012_t, d2_00012_ta
 
 
+@verificacao('D2', entradas=('df_dca_ab',), retornos=('_t', 'condicao_negativa_cp', 'condicao_negativa_lp', 'diferencas_cp'))
 def d2_00013(df_dca_ab):
     cred_cp_1of = df_dca_ab[df_dca_ab['cod_conta'].str.contains(r"P1\.1\.2\.[1-9]\.1\.00\.00", regex=True)]
     cred_cp_1of = cred_cp_1of.groupby(['cod_conta'])['valor'].sum().reset_index()
@@ -377,6 +390,7 @@ def d2_00013(df_dca_ab):
     return d2_00013, d2_00013_t, condicao_negativa_cp, condicao_negativa_lp, diferencas_cp
 
 
+@verificacao('D2', entradas=('df_dca_ab',), retornos=('_t', 'condicao_negativa'))
 def d2_00014(df_dca_ab):
     demais_cred_cp = df_dca_ab.query('cod_conta == "P1.1.3.0.0.00.00"').copy()
 
@@ -405,6 +419,7 @@ def d2_00014(df_dca_ab):
     return d2_00014, d2_00014_t, condicao_negativa
 
 
+@verificacao('D2', entradas=('df_dca_ab',))
 def d2_00015(df_dca_ab):
     bens_moveis = df_dca_ab.query('cod_conta == "P1.2.3.1.1.00.00"')
     bens_moveis['dimensao'] = 'D2_00015_Bens Móveis'
@@ -429,6 +444,7 @@ def d2_00015(df_dca_ab):
     return d2_00015, d2_00015_t
 
 
+@verificacao('D2', entradas=('df_dca_ab',))
 def d2_00016(df_dca_ab):
     depr_bens_moveis = df_dca_ab.query('cod_conta == "P1.2.3.8.1.01.00"')
     depr_bens_moveis['dimensao'] = 'D2_00016_Depreciação de Bens Móveis'
@@ -453,6 +469,7 @@ def d2_00016(df_dca_ab):
     return d2_00016, d2_00016_t
 
 
+@verificacao('D2', entradas=('df_dca_hi',))
 def d2_00017(df_dca_hi):
     vpd_depr_bens_moveis = df_dca_hi.query('cod_conta == "P3.3.3.1.1.00.00"').reset_index()
     vpd_depr_bens_moveis['dimensao'] = 'D2_00017_VPD de Depreciação de Bens Móveis e Imóveis'
@@ -476,6 +493,7 @@ def d2_00017(df_dca_hi):
     return d2_00017, d2_00017_t
 
 
+@verificacao('D2', entradas=('df_dca_ab',))
 def d2_00018(df_dca_ab):
     bens_moveis = df_dca_ab.query('cod_conta == "P1.2.3.1.1.00.00"')
     bens_moveis['dimensao'] = 'D2_00015_Bens Móveis'
@@ -514,6 +532,7 @@ def d2_00018(df_dca_ab):
     return d2_00018, d2_00018_t
 
 
+@verificacao('D2', entradas=('df_dca_ab',))
 def d2_00019(df_dca_ab):
     bens_imoveis = df_dca_ab.query('cod_conta == "P1.2.3.2.1.00.00"')
     bens_imoveis['dimensao'] = 'D2_00019_Bens Imóveis'
@@ -538,6 +557,7 @@ def d2_00019(df_dca_ab):
     return d2_00019, d2_00019_t
 
 
+@verificacao('D2', entradas=('df_dca_ab',))
 def d2_00020(df_dca_ab):
     depr_bens_imoveis = df_dca_ab.query('cod_conta == "P1.2.3.8.1.02.00"')
     depr_bens_imoveis['dimensao'] = 'D2_00020_Depreciação de Bens Imóveis'
@@ -562,6 +582,7 @@ def d2_00020(df_dca_ab):
     return d2_00020, d2_00020_t
 
 
+@verificacao('D2', entradas=('df_dca_ab',))
 def d2_00021(df_dca_ab):
     bens_imoveis = df_dca_ab.query('cod_conta == "P1.2.3.2.1.00.00"')
     bens_imoveis['dimensao'] = 'D2_00019_Bens Imóveis'
@@ -600,6 +621,7 @@ def d2_00021(df_dca_ab):
     return d2_00021, d2_00021_t
 
 
+@verificacao('D2', entradas=('df_dca_d',))
 def d2_00023(df_dca_d):
     dif_rpnp = df_dca_d.query('cod_conta == "TotalDespesas" and (coluna == "Despesas Empenhadas" or coluna == "Despesas Liquidadas" or coluna == "Inscrição de Restos a Pagar Não Processados")')
 
@@ -639,6 +661,7 @@ def d2_00023(df_dca_d):
     return d2_00023, d2_00023_t
 
 
+@verificacao('D2', entradas=('df_dca_d',))
 def d2_00024(df_dca_d):
     dif_rpp = df_dca_d.query('cod_conta == "TotalDespesas" and (coluna == "Despesas Liquidadas" or coluna == "Despesas Pagas" or coluna == "Inscrição de Restos a Pagar Processados")')
 
@@ -678,6 +701,7 @@ def d2_00024(df_dca_d):
     return d2_00024, d2_00024_t
 
 
+@verificacao('D2', entradas=('df_dca_ab',), retornos=('_t', 'valor_pass_circ', 'valor_pass_circ_fin', 'diferenca_passivo'))
 def d2_00028(df_dca_ab):
     pass_circ = df_dca_ab.query('cod_conta == "P2.1.0.0.0.00.00"')
     pass_circ_financ = df_dca_ab.query('cod_conta == "P2.1.0.0.0.00.00F"')
@@ -713,6 +737,7 @@ def d2_00028(df_dca_ab):
     return d2_00028, d2_00028_t, valor_pass_circ, valor_pass_circ_fin, diferenca_passivo
 
 
+@verificacao('D2', entradas=('df_dca_hi', 'df_dca_ab'), retornos=('_t', 'vpd_juros', 'emprest'))
 def d2_00029(df_dca_hi, df_dca_ab):
     vpd_juros = df_dca_hi.query('cod_conta == "P3.4.1.0.0.00.00"')
     emprest = df_dca_ab.query('cod_conta == "P2.1.2.0.0.00.00" or cod_conta == "P2.2.2.0.0.00.00"')
@@ -743,6 +768,7 @@ def d2_00029(df_dca_hi, df_dca_ab):
     return d2_00029, d2_00029_t, vpd_juros, emprest
 
 
+@verificacao('D2', entradas=('df_dca_ab',))
 def d2_00030(df_dca_ab):
     df_dca_ab_temp = df_dca_ab.copy()
     df_dca_ab_temp['q1'] = df_dca_ab_temp['cod_conta'].astype(str).str[:5]
@@ -771,6 +797,7 @@ def d2_00030(df_dca_ab):
     return d2_00030, d2_00030_t
 
 
+@verificacao('D2', entradas=('df_dca_hi',))
 def d2_00031(df_dca_hi):
     df_dca_hi_temp = df_dca_hi.copy()
     df_dca_hi_temp['q1'] = df_dca_hi_temp['cod_conta'].astype(str).str[:5]
@@ -798,6 +825,7 @@ def d2_00031(df_dca_hi):
     return d2_00031, d2_00031_t
 
 
+@verificacao('D2', entradas=('df_dca_ab',))
 def d2_00032(df_dca_ab):
     divida_ativa_cp = df_dca_ab.query('cod_conta == "P1.1.2.5.0.00.00" or cod_conta == "P1.1.2.6.0.00.00"')
     divida_ativa_cp['dimensao'] = 'D2_00032_Dívida Ativa CP'
@@ -840,6 +868,7 @@ def d2_00032(df_dca_ab):
     return d2_00032, d2_00032_t
 
 
+@verificacao('D2', entradas=('df_dca_c', 'tipo_ente'))
 def d2_00033(df_dca_c, tipo_ente):
     cod_conta_str = df_dca_c['cod_conta'].astype(str)
 
@@ -882,6 +911,7 @@ def d2_00033(df_dca_c, tipo_ente):
     return d2_00033, d2_00033_t
 
 
+@verificacao('D2', entradas=('df_dca_hi',))
 def d2_00034(df_dca_hi):
     df_dca_hi_temp2 = df_dca_hi.copy()
     df_dca_hi_temp2['q1'] = df_dca_hi_temp2['cod_conta'].astype(str).str[:9]
@@ -909,6 +939,7 @@ def d2_00034(df_dca_hi):
     return d2_00034, d2_00034_t
 
 
+@verificacao('D2', entradas=('df_dca_c_orig',))
 def d2_00035(df_dca_c_orig):
     d2_00035_t = df_dca_c_orig.query(
         'coluna == "Deduções - Transferências Constitucionais" or '
@@ -933,6 +964,7 @@ def d2_00035(df_dca_c_orig):
     return d2_00035, d2_00035_t
 
 
+@verificacao('D2', entradas=('df_dca_ab', 'df_dca_hi'))
 def d2_00036(df_dca_ab, df_dca_hi):
     cred_trib = df_dca_ab.query(
         'cod_conta == "P1.1.2.1.0.00.00" or cod_conta == "P1.2.1.1.1.01.00" or '
@@ -970,6 +1002,7 @@ def d2_00036(df_dca_ab, df_dca_hi):
     return d2_00036, d2_00036_t
 
 
+@verificacao('D2', entradas=('df_dca_hi',))
 def d2_00037(df_dca_hi):
     d2_00037_t = df_dca_hi.query('cod_conta == "P4.1.0.0.0.00.00"')
     d2_00037_t = d2_00037_t.groupby('conta').agg({'valor': 'sum'}).reset_index()
@@ -992,6 +1025,7 @@ def d2_00037(df_dca_hi):
     return d2_00037, d2_00037_t
 
 
+@verificacao('D2', entradas=('df_dca_ab', 'ano'), ano_min=2023, ano_max=2023)
 def d2_00038(df_dca_ab, ano):
     if ano != 2023:
         return None, None
@@ -1019,6 +1053,7 @@ def d2_00038(df_dca_ab, ano):
     return d2_00038, d2_00038_t
 
 
+@verificacao('D2', entradas=('df_dca_ab', 'df_dca_hi'))
 def d2_00039(df_dca_ab, df_dca_hi):
     prov = df_dca_ab.query(
         'cod_conta == "P2.1.7.1.0.00.00" or cod_conta == "P2.1.7.2.0.00.00" or '
@@ -1080,6 +1115,7 @@ def d2_00039(df_dca_ab, df_dca_hi):
     return d2_00039, d2_00039_t
 
 
+@verificacao('D2', entradas=('df_dca_ab_orig',))
 def d2_00040(df_dca_ab_orig):
     df_dca_ab_temp2 = df_dca_ab_orig.copy()
 
@@ -1112,6 +1148,7 @@ def d2_00040(df_dca_ab_orig):
     return d2_00040, d2_00040_t
 
 
+@verificacao('D2', entradas=('msc_encerr', 'df_dca_c'))
 def d2_00044(msc_encerr, df_dca_c):
     rec_total = msc_encerr.query(
         'tipo_valor == "beginning_balance" and (conta_contabil == "621200000" or conta_contabil == "621310100" or '
@@ -1151,6 +1188,7 @@ def d2_00044(msc_encerr, df_dca_c):
     return d2_00044, d2_00044_t
 
 
+@verificacao('D2', entradas=('msc_encerr', 'df_dca_c'), tipo_ente='E')
 def d2_00045(msc_encerr, df_dca_c):
     rec_base = msc_encerr[msc_encerr['tipo_valor'] == 'beginning_balance'].copy()
 
@@ -1211,6 +1249,7 @@ def d2_00045(msc_encerr, df_dca_c):
     return d2_00045, d2_00045_t
 
 
+@verificacao('D2', entradas=('msc_encerr', 'df_dca_c'), tipo_ente='M')
 def d2_00046(msc_encerr, df_dca_c):
     rec_base = msc_encerr[msc_encerr['tipo_valor'] == 'beginning_balance'].copy()
 
@@ -1271,6 +1310,7 @@ def d2_00046(msc_encerr, df_dca_c):
     return d2_00046, d2_00046_t
 
 
+@verificacao('D2', entradas=('msc_encerr', 'df_dca_c'), tipo_ente='E')
 def d2_00047(msc_encerr, df_dca_c):
     rec_total = msc_encerr.query('tipo_valor == "beginning_balance" and conta_contabil == "621200000"').copy()
 
@@ -1323,6 +1363,7 @@ def d2_00047(msc_encerr, df_dca_c):
     return d2_00047, d2_00047_t
 
 
+@verificacao('D2', entradas=('msc_encerr', 'df_dca_c'), tipo_ente='M')
 def d2_00048(msc_encerr, df_dca_c):
     rec_total = msc_encerr.query('tipo_valor == "beginning_balance" and conta_contabil == "621200000"').copy()
 
@@ -1380,6 +1421,7 @@ def d2_00048(msc_encerr, df_dca_c):
     return d2_00048, d2_00048_t
 
 
+@verificacao('D2', entradas=('msc_encerr', 'df_dca_d'))
 def d2_00049(msc_encerr, df_dca_d):
     """
     Verifica a igualdade das Despesas Orçamentárias empenhadas, liquidadas e pagas
@@ -1469,6 +1511,7 @@ def d2_00049(msc_encerr, df_dca_d):
     return d2_00049, d2_00049_t
 
 
+@verificacao('D2', entradas=('msc_encerr', 'df_dca_d'))
 def d2_00050(msc_encerr, df_dca_d):
     """
     Verifica a igualdade dos Restos a Pagar processados e não processados
@@ -1543,6 +1586,7 @@ def d2_00050(msc_encerr, df_dca_d):
     return d2_00050, d2_00050_t
 
 
+@verificacao('D2', entradas=('df_dca_ab',))
 def d2_00051(df_dca_ab):
     """
     Verifica se o total do Ajuste para perdas em Estoques
@@ -1571,6 +1615,7 @@ def d2_00051(df_dca_ab):
     return d2_00051, d2_00051_t
 
 
+@verificacao('D2', entradas=('df_dca_ab', 'df_dca_hi'))
 def d2_00052(df_dca_ab, df_dca_hi):
     """
     Verifica a existência de Equivalência Patrimonial no Anexo I-AB
@@ -1610,6 +1655,7 @@ def d2_00052(df_dca_ab, df_dca_hi):
     return d2_00052, d2_00052_t
 
 
+@verificacao('D2', entradas=('msc_encerr',))
 def d2_00053(msc_encerr):
     """
     Verifica se o total do Ajuste para perdas em Estoques é inferior
@@ -1617,7 +1663,7 @@ def d2_00053(msc_encerr):
     """
     filtrado = msc_encerr.query('tipo_valor == "ending_balance"').copy()
     d2_00053_t = filtrado[filtrado['conta_contabil'].str.startswith('115')].copy()
-    d2_00053_t = d2_00053_t.groupby(['poder_orgao'])['valor'].sum().reset_index()
+    d2_00053_t = d2_00053_t.groupby(['poder_orgao'], observed=True)['valor'].sum().reset_index()
 
     condicao = d2_00053_t['valor'] >= 0
 
@@ -1639,6 +1685,7 @@ def d2_00053(msc_encerr):
     return d2_00053, d2_00053_t
 
 
+@verificacao('D2', entradas=('msc_encerr',))
 def d2_00054(msc_encerr):
     """
     Verifica se o ente está registrando investimentos permanentes
@@ -1677,6 +1724,7 @@ def d2_00054(msc_encerr):
     return d2_00054, d2_00054_t
 
 
+@verificacao('D2', entradas=('msc_encerr',))
 def d2_00055(msc_encerr):
     """
     Verifica (por grupo de ativos) se a amortização acumulada
@@ -1688,13 +1736,13 @@ def d2_00055(msc_encerr):
         (filtrado['conta_contabil'].str.startswith('1241')) |
         (filtrado['conta_contabil'].str.startswith('1248101'))
     ].copy()
-    software = software.groupby(['poder_orgao'])['valor'].sum().reset_index()
+    software = software.groupby(['poder_orgao'], observed=True)['valor'].sum().reset_index()
 
     marca = filtrado[
         (filtrado['conta_contabil'].str.startswith('1242')) |
         (filtrado['conta_contabil'].str.startswith('1248102'))
     ].copy()
-    marca = marca.groupby(['poder_orgao'])['valor'].sum().reset_index()
+    marca = marca.groupby(['poder_orgao'], observed=True)['valor'].sum().reset_index()
 
     d2_00055_t = pd.concat([software, marca])
 
@@ -1718,6 +1766,7 @@ def d2_00055(msc_encerr):
     return d2_00055, d2_00055_t
 
 
+@verificacao('D2', entradas=('msc_encerr', 'df_dca_hi'))
 def d2_00058(msc_encerr, df_dca_hi):
     """
     Verifica a igualdade entre os valores informados de VPA do FUNDEB (União e Estados)
@@ -1778,6 +1827,7 @@ def d2_00058(msc_encerr, df_dca_hi):
     return d2_00058, d2_00058_ta
 
 
+@verificacao('D2', entradas=('msc_encerr',))
 def d2_00059(msc_encerr):
     """
     Verifica a relação entre o valor de ajuste para perdas dos
@@ -1786,10 +1836,10 @@ def d2_00059(msc_encerr):
     filtrado = msc_encerr.query('tipo_valor == "ending_balance"').copy()
 
     cred_cp_msc = filtrado[filtrado['conta_contabil'].str.startswith('112')].copy()
-    cred_cp_msc = cred_cp_msc.groupby(['poder_orgao'])['valor'].sum().reset_index()
+    cred_cp_msc = cred_cp_msc.groupby(['poder_orgao'], observed=True)['valor'].sum().reset_index()
 
     cred_lp_msc = filtrado[filtrado['conta_contabil'].str.startswith('1211')].copy()
-    cred_lp_msc = cred_lp_msc.groupby(['poder_orgao'])['valor'].sum().reset_index()
+    cred_lp_msc = cred_lp_msc.groupby(['poder_orgao'], observed=True)['valor'].sum().reset_index()
 
     d2_00059_t = pd.concat([cred_cp_msc, cred_lp_msc])
 
@@ -1813,6 +1863,7 @@ def d2_00059(msc_encerr):
     return d2_00059, d2_00059_t
 
 
+@verificacao('D2', entradas=('msc_encerr',))
 def d2_00060(msc_encerr):
     """
     Verifica a relação entre o valor de ajuste para perdas dos
@@ -1821,10 +1872,10 @@ def d2_00060(msc_encerr):
     filtrado = msc_encerr.query('tipo_valor == "ending_balance"').copy()
 
     outros_cred_cp_msc = filtrado[filtrado['conta_contabil'].str.startswith('113')].copy()
-    outros_cred_cp_msc = outros_cred_cp_msc.groupby(['poder_orgao'])['valor'].sum().reset_index()
+    outros_cred_cp_msc = outros_cred_cp_msc.groupby(['poder_orgao'], observed=True)['valor'].sum().reset_index()
 
     outros_cred_lp_msc = filtrado[filtrado['conta_contabil'].str.startswith('1212')].copy()
-    outros_cred_lp_msc = outros_cred_lp_msc.groupby(['poder_orgao'])['valor'].sum().reset_index()
+    outros_cred_lp_msc = outros_cred_lp_msc.groupby(['poder_orgao'], observed=True)['valor'].sum().reset_index()
 
     d2_00060_t = pd.concat([outros_cred_cp_msc, outros_cred_lp_msc])
 
@@ -1848,6 +1899,7 @@ def d2_00060(msc_encerr):
     return d2_00060, d2_00060_t
 
 
+@verificacao('D2', entradas=('df_dca_hi',))
 def d2_00061(df_dca_hi):
     """
     Verifica se foi informada Variação Patrimonial Aumentativa com o FUNDEB.
@@ -1875,6 +1927,7 @@ def d2_00061(df_dca_hi):
     return d2_00061, d2_00061_t
 
 
+@verificacao('D2', entradas=('df_dca_ab',))
 def d2_00066(df_dca_ab):
     """
     Verifica (por grupo de ativos) se a amortização acumulada de ativos
@@ -1910,6 +1963,7 @@ def d2_00066(df_dca_ab):
     return d2_00066, d2_00066_t
 
 
+@verificacao('D2', entradas=('msc_encerr',))
 def d2_00067(msc_encerr):
     """
     Verifica se os valores de depreciação de bens móveis são inferiores
@@ -1921,7 +1975,7 @@ def d2_00067(msc_encerr):
     d_bm = filtrado[filtrado['conta_contabil'].str.startswith('1238101')].copy()
 
     d2_00067_t = pd.concat([bm, d_bm])
-    d2_00067_t = d2_00067_t.groupby(['poder_orgao'])['valor'].sum().reset_index()
+    d2_00067_t = d2_00067_t.groupby(['poder_orgao'], observed=True)['valor'].sum().reset_index()
 
     condicao = d2_00067_t['valor'] >= 0
 
@@ -1943,6 +1997,7 @@ def d2_00067(msc_encerr):
     return d2_00067, d2_00067_t
 
 
+@verificacao('D2', entradas=('msc_encerr',))
 def d2_00068(msc_encerr):
     """
     Verifica se os valores de depreciação de bens imóveis são inferiores
@@ -1954,7 +2009,7 @@ def d2_00068(msc_encerr):
     d_bi = filtrado[filtrado['conta_contabil'].str.startswith('1238102')].copy()
 
     d2_00068_t = pd.concat([bi, d_bi])
-    d2_00068_t = d2_00068_t.groupby(['poder_orgao'])['valor'].sum().reset_index()
+    d2_00068_t = d2_00068_t.groupby(['poder_orgao'], observed=True)['valor'].sum().reset_index()
 
     condicao = d2_00068_t['valor'] >= 0
 
@@ -1976,6 +2031,7 @@ def d2_00068(msc_encerr):
     return d2_00068, d2_00068_t
 
 
+@verificacao('D2', entradas=('emp_msc_encerr', 'df_dca_e'))
 def d2_00069(emp_msc_encerr, df_dca_e):
     """
     Avalia se o valor de despesas exceto-intra na função 09 (Previdência Social)
@@ -2014,6 +2070,7 @@ def d2_00069(emp_msc_encerr, df_dca_e):
     return d2_00069, d2_00069_ta
 
 
+@verificacao('D2', entradas=('emp_msc_encerr', 'df_dca_e'))
 def d2_00070(emp_msc_encerr, df_dca_e):
     """
     Avalia se o valor de despesas exceto-intra na função 10 (Saúde)
@@ -2052,6 +2109,7 @@ def d2_00070(emp_msc_encerr, df_dca_e):
     return d2_00070, d2_00070_ta
 
 
+@verificacao('D2', entradas=('emp_msc_encerr', 'df_dca_e'))
 def d2_00071(emp_msc_encerr, df_dca_e):
     """
     Avalia se o valor de despesas exceto-intra na função 12 (Educação)
@@ -2090,6 +2148,7 @@ def d2_00071(emp_msc_encerr, df_dca_e):
     return d2_00071, d2_00071_ta
 
 
+@verificacao('D2', entradas=('emp_msc_encerr', 'df_dca_e'))
 def d2_00072(emp_msc_encerr, df_dca_e):
     """
     Avalia se o valor de despesas exceto-intra nas Demais Funções
@@ -2133,6 +2192,7 @@ def d2_00072(emp_msc_encerr, df_dca_e):
     return d2_00072, d2_00072_ta
 
 
+@verificacao('D2', entradas=('emp_msc_encerr', 'df_dca_e'))
 def d2_00073(emp_msc_encerr, df_dca_e):
     """
     Avalia se o valor de despesas com Funções Intraorçamentárias
@@ -2171,6 +2231,7 @@ def d2_00073(emp_msc_encerr, df_dca_e):
     return d2_00073, d2_00073_ta
 
 
+@verificacao('D2', entradas=('msc_encerr', 'df_dca_f'))
 def d2_00074(msc_encerr, df_dca_f):
     """
     Compara o saldo final de RPPP e RPNPP Pagos
@@ -2236,6 +2297,7 @@ def d2_00074(msc_encerr, df_dca_f):
     return d2_00074, d2_00074_t
 
 # A partir daqui resolvi usar a MSC PATRIMONIAL
+@verificacao('D2', entradas=('msc_consolidada',), ano_max=2023)
 def d2_00077(msc_patrimonial):
     """
     Comparativo do saldo das contas começadas por 227 e 228
@@ -2290,6 +2352,7 @@ def d2_00077(msc_patrimonial):
     return d2_00077, d2_00077_t
 
 
+@verificacao('D2', entradas=('msc_consolidada',))
 def d2_00079(msc_patrimonial):
     """
     Verifica o somatório dos saldos das contas começam com 119,
@@ -2345,6 +2408,7 @@ def d2_00079(msc_patrimonial):
     return d2_00079, d2_00079_t
 
 
+@verificacao('D2', entradas=('msc_consolidada',), ano_max=2023)
 def d2_00080(msc_patrimonial):
     """
     Avaliação do saldo das contas contábeis começadas por 1156
@@ -2388,6 +2452,7 @@ def d2_00080(msc_patrimonial):
     return d2_00080, d2_00080_t
 
 
+@verificacao('D2', entradas=('msc_consolidada',))
 def d2_00081(msc_patrimonial):
     """
     Avalia a existência de movimento credor nas contas 2.1.1.1.1.01.02 e 2.1.1.1.1.01.03
@@ -2433,6 +2498,7 @@ def d2_00081(msc_patrimonial):
     return d2_00081, d2_00081_t
 
 
+@verificacao('D2', entradas=('msc_consolidada',))
 def d2_00082(msc_patrimonial):
     """
     Avalia a existência de movimento credor nas contas
@@ -1,7 +1,10 @@
 import numpy as np
 import pandas as pd
 
+from api_ranking.analysis.registro import verificacao
 
+
+@verificacao('D3', entradas=('df_rreo_1',))
 def d3_00001(df_rreo_1):
     rec_rreo_1 = df_rreo_1.query('coluna == "Até o Bimestre (c)" & cod_conta == "TotalReceitas"')
     rec_rreo_1['dimensao'] = 'D3_00001_Superavit ou Defcit_ Empenhado'
@@ -87,6 +90,7 @@ def d3_00001(df_rreo_1):
     return d3_00001, d3_00001_t
 
 
+@verificacao('D3', entradas=('df_rreo_1', 'df_rreo_2'))
 def d3_00002(df_rreo_1, df_rreo_2):
     dotinic_rreo_2 = df_rreo_2.query('coluna == "DOTAÇÃO INICIAL" & cod_conta == "RREO2TotalDespesas" & conta == "DESPESAS (EXCETO INTRA-ORÇAMENTÁRIAS) (I)"')
     dotinic_rreo_2['dimensao'] = 'D3_00002_Dotação_Inicial'
@@ -264,6 +268,7 @@ def d3_00002(df_rreo_1, df_rreo_2):
     return d3_00002, d3_00002_t
 
 
+@verificacao('D3', entradas=('df_rreo_3', 'df_rgf_1e', 'df_rgf_2e', 'df_rgf_3e', 'df_rgf_4e'))
 def d3_00005(df_rreo_3, df_rgf_1e, df_rgf_2e, df_rgf_3e, df_rgf_4e):
     rcl_rreo3_df = df_rreo_3.query('coluna == "TOTAL (ÚLTIMOS 12 MESES)"').copy()
     rcl_rreo_3 = rcl_rreo3_df.query('cod_conta == "RREO3ReceitaCorrenteLiquida"')
@@ -322,6 +327,7 @@ def d3_00005(df_rreo_3, df_rgf_1e, df_rgf_2e, df_rgf_3e, df_rgf_4e):
     return d3_00005, d3_00005_t
 
 
+@verificacao('D3', entradas=('df_rgf_2e', 'df_rreo_6', 'ano'))
 def d3_00006(df_rgf_2e, df_rreo_6, ano):
     dcl_rgf2 = df_rgf_2e.query('cod_conta == "DividaConsolidadaLiquida" and coluna == "Até o 3º Quadrimestre"')
     dcl_rreo6 = df_rreo_6.query(f'cod_conta == "DividaConsolidadaLiquida" and coluna == "Até o Bimestre {ano} (b)"')
@@ -353,6 +359,7 @@ def d3_00006(df_rgf_2e, df_rreo_6, ano):
     return d3_00006, d3_00006_t
 
 
+@verificacao('D3', entradas=('df_rgf_5e', 'rgf_o', 'df_rreo_1', 'tipo_ente'))
 def d3_00008(df_rgf_5e, rgf_o, df_rreo_1, tipo_ente):
     if tipo_ente == "E":
         rpnp_rgf_5e = df_rgf_5e.query(
@@ -419,6 +426,7 @@ def d3_00008(df_rgf_5e, rgf_o, df_rreo_1, tipo_ente):
     return d3_00008, d3_00008_t
 
 
+@verificacao('D3', entradas=('df_rgf_5e', 'rgf_o', 'df_rreo_7', 'tipo_ente'))
 def d3_00009(df_rgf_5e, rgf_o, df_rreo_7, tipo_ente):
     if tipo_ente == "E":
         rpnp_a_pagar_rgf_e = df_rgf_5e.query(
@@ -522,6 +530,7 @@ def d3_00009(df_rgf_5e, rgf_o, df_rreo_7, tipo_ente):
     return d3_00009, d3_00009_t
 
 
+@verificacao('D3', entradas=('df_rgf_1e', 'rgf', 'tipo_ente'))
 def d3_00010(df_rgf_1e, rgf, tipo_ente):
     if tipo_ente == "E":
         fontes_rgf1 = [
@@ -572,6 +581,7 @@ def d3_00010(df_rgf_1e, rgf, tipo_ente):
     return d3_00010, d3_00010_t
 
 
+@verificacao('D3', entradas=('rgf', 'tipo_ente'))
 def d3_00011(rgf, tipo_ente):
     if tipo_ente == "E":
         inativo_rgf1e = rgf.get("1e", pd.DataFrame())
@@ -666,6 +676,7 @@ def d3_00011(rgf, tipo_ente):
     return d3_00011, d3_00011_t
 
 
+@verificacao('D3', entradas=('df_rgf_1e', 'df_rgf_2e', 'df_rgf_3e', 'df_rgf_4e'))
 def d3_00014(df_rgf_1e, df_rgf_2e, df_rgf_3e, df_rgf_4e):
     emenda_indiv_rgf1e = pd.DataFrame()
     if isinstance(df_rgf_1e, pd.DataFrame) and not df_rgf_1e.empty and 'cod_conta' in df_rgf_1e.columns:
@@ -725,6 +736,7 @@ def d3_00014(df_rgf_1e, df_rgf_2e, df_rgf_3e, df_rgf_4e):
     return d3_00014, d3_00014_t
 
 
+@verificacao('D3', entradas=('df_rgf_1e', 'df_rreo_3'))
 def d3_00015(df_rgf_1e, df_rreo_3):
     emenda_indiv_rgf1e = pd.DataFrame()
     if isinstance(df_rgf_1e, pd.DataFrame) and not df_rgf_1e.empty and 'cod_conta' in df_rgf_1e.columns:
@@ -773,6 +785,7 @@ def d3_00015(df_rgf_1e, df_rreo_3):
     return d3_00015, d3_00015_t
 
 
+@verificacao('D3', entradas=('df_rgf_1e', 'df_rreo_3'))
 def d3_00016(df_rgf_1e, df_rreo_3):
     emenda_bancada_rgf1e = pd.DataFrame()
     if isinstance(df_rgf_1e, pd.DataFrame) and not df_rgf_1e.empty and 'cod_conta' in df_rgf_1e.columns:
@@ -823,6 +836,7 @@ def d3_00016(df_rgf_1e, df_rreo_3):
     return d3_00016, d3_00016_t
 
 
+@verificacao('D3', entradas=('df_rreo_6', 'df_rreo_7'))
 def d3_00017(df_rreo_6, df_rreo_7):
     rpp_pago_rreo_7 = df_rreo_7.query(
         'cod_conta == "RestosAPagarProcessadosENaoProcessadosLiquidadosPagos" '
@@ -1,7 +1,14 @@
 import numpy as np
 import pandas as pd
 
+from api_ranking.analysis.registro import verificacao
+from api_ranking.services.msc_view import MscView
 
+# Receita realizada (MSC) usada nas verificações de tributos e transferências municipais
+_CONTAS_RECEITA_MUNICIPIO = ("621200000", "621310100", "621310200", "621320000", "621390000")
+
+
+@verificacao('D4', entradas=('df_rreo_1', 'df_dca_c'))
 def d4_00001(df_rreo_1, df_dca_c):
     rec_rreo_d4 = df_rreo_1.query('coluna == "Até o Bimestre (c)" & cod_conta == "TotalReceitas"')
     rec_rreo_d4 = rec_rreo_d4.copy()
@@ -40,6 +47,7 @@ def d4_00001(df_rreo_1, df_dca_c):
     return d4_00001, d4_00001_t
 
 
+@verificacao('D4', entradas=('df_rreo_1', 'df_dca_d'))
 def d4_00002(df_rreo_1, df_dca_d):
     emp_rreo_d4 = df_rreo_1.query('coluna == "DESPESAS EMPENHADAS ATÉ O BIMESTRE (f)" & cod_conta == "TotalDespesas"')
     emp_rreo_d4 = emp_rreo_d4.copy()
@@ -120,6 +128,7 @@ def d4_00002(df_rreo_1, df_dca_d):
     return d4_00002, d4_00002_t
 
 
+@verificacao('D4', entradas=('df_rreo_2', 'df_dca_e'))
 def d4_00003(df_rreo_2, df_dca_e):
     emp_rreo2_d4 = df_rreo_2.query('coluna == "DESPESAS EMPENHADAS ATÉ O BIMESTRE (b)" & cod_conta == "RREO2TotalDespesas" & conta == "DESPESAS (EXCETO INTRA-ORÇAMENTÁRIAS) (I)"')
     emp_rreo2_d4 = emp_rreo2_d4.copy()
@@ -186,6 +195,7 @@ def d4_00003(df_rreo_2, df_dca_e):
     return d4_00003, d4_00003_t
 
 
+@verificacao('D4', entradas=('df_rreo_2', 'df_dca_e'))
 def d4_00004(df_rreo_2, df_dca_e):
     emp_intra_rreo2_d4 = df_rreo_2.query('coluna == "DESPESAS EMPENHADAS ATÉ O BIMESTRE (b)" & cod_conta == "RREO2TotalDespesas" & conta == "DESPESAS (INTRA-ORÇAMENTÁRIAS) (II)"')
     emp_intra_rreo2_d4 = emp_intra_rreo2_d4.copy()
@@ -252,6 +262,7 @@ def d4_00004(df_rreo_2, df_dca_e):
     return d4_00004, d4_00004_t
 
 
+@verificacao('D4', entradas=('df_rreo_7', 'df_dca_f'))
 def d4_00005(df_rreo_7, df_dca_f):
     rpp_exerc_ant_rreo_7 = df_rreo_7.query('conta == "TOTAL (III) = (I + II)" & cod_conta == "RestosAPagarProcessadosENaoProcessadosLiquidadosInscritosEmExerciciosAnteriores"')
     rpp_exerc_ant_rreo_7 = rpp_exerc_ant_rreo_7.copy()
@@ -408,6 +419,7 @@ def d4_00005(df_rreo_7, df_dca_f):
     return d4_00005, d4_00005_t
 
 
+@verificacao('D4', entradas=('df_rreo_7', 'df_dca_g'))
 def d4_00006(df_rreo_7, df_dca_g):
     rpnp_exerc_ant_rreo_7_d6 = df_rreo_7.query('conta == "TOTAL (III) = (I + II)" & cod_conta == "RestosAPagarNaoProcessadosInscritosEmExerciciosAnteriores"')
     rpnp_exerc_ant_rreo_7_d6 = rpnp_exerc_ant_rreo_7_d6.copy()
@@ -490,6 +502,7 @@ def d4_00006(df_rreo_7, df_dca_g):
     return d4_00006, d4_00006_t
 
 
+@verificacao('D4', entradas=('df_rreo_7', 'df_dca_g'))
 def d4_00007(df_rreo_7, df_dca_g):
     rpp_exerc_ant_rreo_7_d7 = df_rreo_7.query('conta == "TOTAL (III) = (I + II)" & cod_conta == "RestosAPagarProcessadosENaoProcessadosLiquidadosInscritosEmExerciciosAnteriores"')
     rpp_exerc_ant_rreo_7_d7 = rpp_exerc_ant_rreo_7_d7.copy()
@@ -572,6 +585,7 @@ def d4_00007(df_rreo_7, df_dca_g):
     return d4_00007, d4_00007_t
 
 
+@verificacao('D4', entradas=('df_rreo_3', 'df_dca_c', 'tipo_ente'), tipo_ente='E')
 def d4_00009(df_rreo_3, df_dca_c, tipo_ente):
     if tipo_ente == "E":
         icms_rreo_3 = df_rreo_3[df_rreo_3["conta"].str.contains("ICMS", na=False)]
@@ -628,6 +642,7 @@ def d4_00009(df_rreo_3, df_dca_c, tipo_ente):
     return d4_00009, d4_00009_t
 
 
+@verificacao('D4', entradas=('df_rreo_3', 'df_dca_c', 'tipo_ente'), tipo_ente='M')
 def d4_00010(df_rreo_3, df_dca_c, tipo_ente):
     if tipo_ente == "M":
         tributos_municipais = ["IPTU", "ISS", "ITBI", "IRRF"]
@@ -680,6 +695,7 @@ def d4_00010(df_rreo_3, df_dca_c, tipo_ente):
     return d4_00010, d4_00010_t
 
 
+@verificacao('D4', entradas=('df_rreo_3', 'df_dca_c', 'tipo_ente'), tipo_ente='E')
 def d4_00011(df_rreo_3, df_dca_c, tipo_ente):
     if tipo_ente == "E":
         fpe_rreo_3 = df_rreo_3[df_rreo_3["conta"].str.contains("Cota-Parte do FPE", na=False)]
@@ -731,6 +747,7 @@ def d4_00011(df_rreo_3, df_dca_c, tipo_ente):
     return d4_00011, d4_00011_t
 
 
+@verificacao('D4', entradas=('df_rreo_3', 'df_dca_c', 'tipo_ente'), tipo_ente='M')
 def d4_00012(df_rreo_3, df_dca_c, tipo_ente):
     if tipo_ente == "M":
         contas_rreo = [
@@ -799,6 +816,7 @@ def d4_00012(df_rreo_3, df_dca_c, tipo_ente):
 
 
 
+@verificacao('D4', entradas=('df_rreo_3', 'df_dca_c'))
 def d4_00017(df_rreo_3, df_dca_c):
     contrib_serv_rreo_3 = df_rreo_3.query(
         'coluna == "TOTAL (ÚLTIMOS 12 MESES)" & cod_conta == "ContribuicaoDoServidorParaOPlanoDePrevidencia"'
@@ -851,6 +869,7 @@ def d4_00017(df_rreo_3, df_dca_c):
     return d4_00017, d4_00017_t
 
 
+@verificacao('D4', entradas=('df_rreo_9', 'df_dca_d'))
 def d4_00019(df_rreo_9, df_dca_d):
     df_rreo_9_dps_kap_bruto = df_rreo_9.query(
         'coluna == "DESPESAS EMPENHADAS (e)" & cod_conta == "RREO9DespesasDeCapital"'
@@ -889,12 +908,11 @@ def d4_00019(df_rreo_9, df_dca_d):
     return d4_00019, d4_00019_t
 
 
+@verificacao('D4', entradas=('msc_dez_view', 'df_rreo_1'))
 def d4_00020(msc_dez, df_rreo_1):
-    rec_total = msc_dez.query(
-        'tipo_valor == "ending_balance" and '
-        '(conta_contabil == "621200000" or conta_contabil == "621310100" or '
-        'conta_contabil == "621310200" or conta_contabil == "621390000")'
-    ).copy()
+    rec_total = MscView.de(msc_dez).fatia(
+        tipo_valor='ending_balance', contas=("621200000", "621310100", "621310200", "621390000")
+    )
     rec_total['dimensao'] = 'D4_00020_Rec.Realizada'
     rec_msc = rec_total.groupby('dimensao').agg({'valor': 'sum'}).reset_index()
 
@@ -929,10 +947,9 @@ def d4_00020(msc_dez, df_rreo_1):
 
 
 
+@verificacao('D4', entradas=('msc_dez_view', 'df_rreo_3'), tipo_ente='E')
 def d4_00021(msc_dez, df_rreo_3):
-    rec_total = msc_dez.query(
-        'tipo_valor == "ending_balance" and (conta_contabil == "621200000" or conta_contabil == "621390000")'
-    ).copy()
+    rec_total = MscView.de(msc_dez).fatia(tipo_valor='ending_balance', contas=("621200000", "621390000"))
     imposto_msc_1 = rec_total[rec_total['natureza_receita'].str.contains("11125", case=False, regex=True)]
     imposto_msc_2 = rec_total[rec_total['natureza_receita'].str.contains("11130", case=False, regex=True)]
     imposto_msc_3 = rec_total[rec_total['natureza_receita'].str.contains("11145", case=False, regex=True)]
@@ -975,12 +992,10 @@ def d4_00021(msc_dez, df_rreo_3):
     return d4_00021, d4_00021_t
 
 
+@verificacao('D4', entradas=('msc_dez_view', 'df_rreo_3'), tipo_ente='M')
 def d4_00022(msc_dez, df_rreo_3):
     codigos_msc = ["111201", "111250", "111253", "111303", "111451", "1119"]
-    rec_msc = msc_dez.query(
-        'tipo_valor == "ending_balance" and (conta_contabil == "621200000" or conta_contabil == "621310100" '
-        'or conta_contabil == "621310200" or conta_contabil == "621320000" or conta_contabil == "621390000")'
-    ).copy()
+    rec_msc = MscView.de(msc_dez).fatia(tipo_valor='ending_balance', contas=_CONTAS_RECEITA_MUNICIPIO)
     rec_msc['natureza_receita'] = rec_msc['natureza_receita'].astype(str)
     valor_msc = rec_msc[rec_msc['natureza_receita'].str.contains('|'.join(codigos_msc), na=False)]['valor'].sum()
 
@@ -1019,13 +1034,12 @@ def d4_00022(msc_dez, df_rreo_3):
     return d4_00022, d4_00022_t
 
 
+@verificacao('D4', entradas=('msc_dez_view', 'df_rreo_3'), tipo_ente='E')
 def d4_00023(msc_dez, df_rreo_3):
     """
     Igualdade nas receitas estaduais com transferências constitucionais (MSC Dez x RREO 03).
     """
-    rec_total = msc_dez.query(
-        'tipo_valor == "ending_balance" and conta_contabil == "621200000"'
-    )
+    rec_total = MscView.de(msc_dez).fatia(tipo_valor='ending_balance', contas="621200000")
 
     fpe_msc = rec_total[rec_total["natureza_receita"].str.contains("17115001")]
     fundeb_msc = rec_total[rec_total["natureza_receita"].str.contains("17515001")]
@@ -1068,17 +1082,15 @@ def d4_00023(msc_dez, df_rreo_3):
     return d4_00023, d4_00023_t
 
 
+@verificacao('D4', entradas=('msc_dez_view', 'df_rreo_3'), tipo_ente='M')
 def d4_00024(msc_dez, df_rreo_3):
     """
     Igualdade nas transferências constitucionais municipais (MSC Dez x RREO 03).
     """
     codigos_msc = ["171151", "172150", "172151", "171152", "17515", "17155"]
 
-    rec_msc = msc_dez.query('tipo_valor == "ending_balance"').copy()
+    rec_msc = MscView.de(msc_dez).fatia(tipo_valor='ending_balance', contas=("621200000", "621310200", "621390000"))
     rec_msc['natureza_receita'] = rec_msc['natureza_receita'].astype(str)
-    rec_msc = rec_msc.query(
-        'conta_contabil == "621200000" or conta_contabil == "621310200" or conta_contabil == "621390000"'
-    )
     valor_msc = rec_msc[rec_msc['natureza_receita'].str.contains('|'.join(codigos_msc), na=False)]['valor'].sum()
 
     contas_rreo = [
@@ -1120,23 +1132,21 @@ def d4_00024(msc_dez, df_rreo_3):
     return d4_00024, d4_00024_t
 
 
+@verificacao('D4', entradas=('msc_dez_view', 'df_rreo_1'))
 def d4_00025(msc_dez, df_rreo_1):
     """
     Igualdade das despesas orçamentárias empenhadas, liquidadas e pagas (MSC Dez x RREO 01).
     """
-    emp_msc = msc_dez.query(
-        'tipo_valor == "ending_balance" and (conta_contabil == "622130500" or conta_contabil == "622130600" or conta_contabil == "622130700" or conta_contabil == "622130400")'
-    )
+    visao = MscView.de(msc_dez)
+    emp_msc = visao.fatia(tipo_valor='ending_balance', contas=("622130500", "622130600", "622130700", "622130400"))
     emp_msc['dimensao'] = 'D4_00025_Empenhado'
     emp_msc = emp_msc.groupby('dimensao').agg({'valor': 'sum'}).reset_index()
 
-    liq_msc = msc_dez.query(
-        'tipo_valor == "ending_balance" and (conta_contabil == "622130700" or conta_contabil == "622130400")'
-    )
+    liq_msc = visao.fatia(tipo_valor='ending_balance', contas=("622130700", "622130400"))
     liq_msc['dimensao'] = 'D4_00025_Liquidado'
     liq_msc = liq_msc.groupby('dimensao').agg({'valor': 'sum'}).reset_index()
 
-    pago_msc = msc_dez.query('tipo_valor == "ending_balance" and conta_contabil == "622130400"')
+    pago_msc = visao.fatia(tipo_valor='ending_balance', contas="622130400")
     pago_msc['dimensao'] = 'D4_00025_Pago'
     pago_msc = pago_msc.groupby('dimensao').agg({'valor': 'sum'}).reset_index()
 
@@ -1190,13 +1200,12 @@ def d4_00025(msc_dez, df_rreo_1):
     return d4_00025, d4_00025_t
 
 
+@verificacao('D4', entradas=('msc_dez_view', 'df_rreo_1'))
 def d4_00026(msc_dez, df_rreo_1):
     """
     Igualdade dos Restos a Pagar não processados (MSC Dez x RREO 01).
     """
-    rpnp_msc = msc_dez.query(
-        'tipo_valor == "ending_balance" and (conta_contabil == "622130500" or conta_contabil == "622130600")'
-    )
+    rpnp_msc = MscView.de(msc_dez).fatia(tipo_valor='ending_balance', contas=("622130500", "622130600"))
     rpnp_msc['dimensao'] = 'D4_00026_Inscrição RPNP'
     rpnp_msc = rpnp_msc.groupby('dimensao').agg({'valor': 'sum'}).reset_index()
 
@@ -1230,6 +1239,7 @@ def d4_00026(msc_dez, df_rreo_1):
     return d4_00026, d4_00026_t
 
 
+@verificacao('D4', entradas=('df_dca_ab', 'df_rgf_2e'))
 def d4_00027(df_dca_ab, df_rgf_2e):
     """
     Disponibilidade de Caixa Bruta do RGF Anexo 2 <= Caixa e Equivalentes (DCA AB).
@@ -1266,6 +1276,7 @@ def d4_00027(df_dca_ab, df_rgf_2e):
     return d4_00027, d4_00027_t
 
 
+@verificacao('D4', entradas=('df_dca_ab', 'rgf_total'))
 def d4_00028(df_dca_ab, rgf_total):
     """
     Disponibilidade de Caixa Bruta do RGF Anexo 5 <= Caixa e Equivalentes (DCA AB).
@@ -1310,6 +1321,7 @@ def d4_00028(df_dca_ab, rgf_total):
     return d4_00028, d4_00028_t
 
 
+@verificacao('D4', entradas=('df_rreo_2', 'emp_msc_dez'))
 def d4_00029(df_rreo_2, emp_msc_dez):
     """
     Previdência Social: RREO 02 (Empenhadas) x MSC Dez.
@@ -1350,6 +1362,7 @@ def d4_00029(df_rreo_2, emp_msc_dez):
     return d4_00029, d4_00029_t
 
 
+@verificacao('D4', entradas=('df_rreo_2', 'emp_msc_dez'))
 def d4_00030(df_rreo_2, emp_msc_dez):
     """
     Saúde: RREO 02 (Empenhadas) x MSC Dez.
@@ -1390,6 +1403,7 @@ def d4_00030(df_rreo_2, emp_msc_dez):
     return d4_00030, d4_00030_t
 
 
+@verificacao('D4', entradas=('df_rreo_2', 'emp_msc_dez'))
 def d4_00031(df_rreo_2, emp_msc_dez):
     """
     Educação: RREO 02 (Empenhadas) x MSC Dez.
@@ -1430,6 +1444,7 @@ def d4_00031(df_rreo_2, emp_msc_dez):
     return d4_00031, d4_00031_t
 
 
+@verificacao('D4', entradas=('df_rreo_2', 'emp_msc_dez'))
 def d4_00032(df_rreo_2, emp_msc_dez):
     """
     Demais Funções: RREO 02 (Empenhadas) x MSC Dez.
@@ -1475,6 +1490,7 @@ def d4_00032(df_rreo_2, emp_msc_dez):
     return d4_00032, d4_00032_t
 
 
+@verificacao('D4', entradas=('df_rreo_2', 'emp_msc_dez'))
 def d4_00033(df_rreo_2, emp_msc_dez):
     """
     Despesas intraorçamentárias: RREO 02 x MSC Dez.
@@ -1515,11 +1531,13 @@ def d4_00033(df_rreo_2, emp_msc_dez):
     return d4_00033, d4_00033_t
 
 
+@verificacao('D4', entradas=('msc_dez_view', 'df_rreo_7'))
 def d4_00034(msc_dez, df_rreo_7):
     """
     Igualdade entre os saldos finais de RPP pagos e RPNP pagos (MSC Dez x RREO 07).
     """
-    rpnp_pago_msc = msc_dez.query('tipo_valor == "ending_balance" and conta_contabil == "631400000"')
+    visao = MscView.de(msc_dez)
+    rpnp_pago_msc = visao.fatia(tipo_valor='ending_balance', contas="631400000")
     rpnp_pago_msc['dimensao'] = 'D4_00034_RPNP Pago'
     rpnp_pago_msc = rpnp_pago_msc.groupby('dimensao').agg({'valor': 'sum'}).reset_index()
 
@@ -1527,7 +1545,7 @@ def d4_00034(msc_dez, df_rreo_7):
     rpnp_pago_rreo['dimensao'] = 'D4_00034_RPNP Pago'
     rpnp_pago_rreo = rpnp_pago_rreo.filter(items=['dimensao', 'valor']).reset_index(drop=True)
 
-    rpp_pago_msc = msc_dez.query('tipo_valor == "ending_balance" and conta_contabil == "632200000"')
+    rpp_pago_msc = visao.fatia(tipo_valor='ending_balance', contas="632200000")
     rpp_pago_msc['dimensao'] = 'D4_00034_RPP Pago'
     rpp_pago_msc = rpp_pago_msc.groupby('dimensao').agg({'valor': 'sum'}).reset_index()
 
@@ -1564,18 +1582,13 @@ def d4_00034(msc_dez, df_rreo_7):
     return d4_00034, d4_00034_t
 
 
+@verificacao('D4', entradas=('msc_encerr_view', 'rgf_total'))
 def d4_00035(msc_encerr, rgf_total):
     """
     Disponibilidade de Caixa Bruta do RGF 5 <= Caixa e Equivalentes (MSC Encerramento).
     """
-    msc_encerr_b = msc_encerr.query('tipo_valor == "beginning_balance"')
-    caixa_msc_encerr = msc_encerr_b[msc_encerr_b['conta_contabil'].str.startswith('111')]
-    caixa_msc_encerr = caixa_msc_encerr[['conta_contabil', 'valor']].rename(columns={'conta_contabil': 'cod_conta'})
-
-    total_valor = caixa_msc_encerr['valor'].sum()
-    nova_linha = pd.DataFrame([{'cod_conta': 'TOTAL', 'valor': total_valor}])
-    caixa_msc_encerr = pd.concat([caixa_msc_encerr, nova_linha], ignore_index=True)
-    caixa_msc_encerr = caixa_msc_encerr.drop(caixa_msc_encerr.index[:-1])
+    total_valor = MscView.de(msc_encerr).soma(tipo_valor='beginning_balance', prefixos="111")
+    caixa_msc_encerr = pd.DataFrame([{'cod_conta': 'TOTAL', 'valor': total_valor}])
 
     filtro = rgf_total['cod_conta'].str.contains('DisponibilidadeDeCaixaBruta', case=False, na=False)
     caixa_rgf5_t = rgf_total[filtro]
@@ -1612,18 +1625,13 @@ def d4_00035(msc_encerr, rgf_total):
     return d4_00035, d4_00035_t
 
 
+@verificacao('D4', entradas=('msc_encerr_view', 'df_rgf_2e'))
 def d4_00036(msc_encerr, df_rgf_2e):
     """
     Disponibilidade de Caixa Bruta do RGF 2 <= Caixa e Equivalentes (MSC Encerramento).
     """
-    msc_encerr_b = msc_encerr.query('tipo_valor == "beginning_balance"')
-    caixa_msc_encerr = msc_encerr_b[msc_encerr_b['conta_contabil'].str.startswith('111')]
-    caixa_msc_encerr = caixa_msc_encerr[['conta_contabil', 'valor']].rename(columns={'conta_contabil': 'cod_conta'})
-
-    total_valor = caixa_msc_encerr['valor'].sum()
-    nova_linha = pd.DataFrame([{'cod_conta': 'TOTAL', 'valor': total_valor}])
-    caixa_msc_encerr = pd.concat([caixa_msc_encerr, nova_linha], ignore_index=True)
-    caixa_msc_encerr = caixa_msc_encerr.drop(caixa_msc_encerr.index[:-1])
+    total_valor = MscView.de(msc_encerr).soma(tipo_valor='beginning_balance', prefixos="111")
+    caixa_msc_encerr = pd.DataFrame([{'cod_conta': 'TOTAL', 'valor': total_valor}])
 
     filtro = df_rgf_2e['cod_conta'].str.contains('DisponibilidadeDeCaixaBruta', case=False, na=False)
     caixa_rgf2 = df_rgf_2e[filtro]
@@ -1653,6 +1661,7 @@ def d4_00036(msc_encerr, df_rgf_2e):
     return d4_00036, d4_00036_t
 
 
+@verificacao('D4', entradas=('receita', 'df_rreo_6'), tipo_ente='E')
 def d4_00037(receita, df_rreo_6):
     """
     Igualdade das receitas com tributos estaduais (RREO 06 x MSC).
@@ -1697,15 +1706,13 @@ def d4_00037(receita, df_rreo_6):
     return d4_00037, d4_00037_t
 
 
+@verificacao('D4', entradas=('msc_dez_view', 'df_rreo_6'), tipo_ente='M')
 def d4_00038(msc_dez, df_rreo_6):
     """
     Igualdade das receitas com tributos municipais (MSC Dezembro x RREO-06).
     """
     codigos_msc = ["111250", "111253", "111303", "111451"]
-    rec_msc = msc_dez.query(
-        'tipo_valor == "ending_balance" and (conta_contabil == "621200000" or conta_contabil == "621310100" '
-        'or conta_contabil == "621310200" or conta_contabil == "621320000" or conta_contabil == "621390000")'
-    ).copy()
+    rec_msc = MscView.de(msc_dez).fatia(tipo_valor='ending_balance', contas=_CONTAS_RECEITA_MUNICIPIO)
     rec_msc['natureza_receita'] = rec_msc['natureza_receita'].astype(str)
     valor_msc = rec_msc[rec_msc['natureza_receita'].str.contains('|'.join(codigos_msc), na=False)]['valor'].sum()
 
@@ -1742,6 +1749,7 @@ def d4_00038(msc_dez, df_rreo_6):
     return d4_00038, d4_00038_t
 
 
+@verificacao('D4', entradas=('receita', 'df_rreo_6'), tipo_ente='E')
 def d4_00039(receita, df_rreo_6):
     """
     Igualdade nas transferências constitucionais estaduais (MSC Dezembro vs RREO-06).
@@ -1784,15 +1792,13 @@ def d4_00039(receita, df_rreo_6):
     return d4_00039, d4_00039_t
 
 
+@verificacao('D4', entradas=('msc_dez_view', 'df_rreo_6'), tipo_ente='M')
 def d4_00040(msc_dez, df_rreo_6):
     """
     Igualdade nas transferências constitucionais municipais (MSC Dezembro vs RREO-06).
     """
     codigos_msc = ["171151", "172150", "172151", "171152", "17515", "17155"]
-    rec_msc = msc_dez.query(
-        'tipo_valor == "ending_balance" and (conta_contabil == "621200000" or conta_contabil == "621310100" '
-        'or conta_contabil == "621310200" or conta_contabil == "621320000" or conta_contabil == "621390000")'
-    ).copy()
+    rec_msc = MscView.de(msc_dez).fatia(tipo_valor='ending_balance', contas=_CONTAS_RECEITA_MUNICIPIO)
     rec_msc['natureza_receita'] = rec_msc['natureza_receita'].astype(str)
     valor_msc = rec_msc[rec_msc['natureza_receita'].str.contains('|'.join(codigos_msc), na=False)]['valor'].sum()
 
@@ -0,0 +1,142 @@
+import importlib
+from dataclasses import dataclass
+
+import pandas as pd
+
+#############################################################################
+####  Registro das verificações (D1..D4)  ####
+#############################################################################
+#
+# Cada função de verificação declara, no decorador `@verificacao`, os frames
+# de que precisa e quando se aplica:
+#
+#   @verificacao('D2', entradas=('msc_encerr', 'df_dca_c'), tipo_ente='E')
+#   def d2_00045(msc_encerr, df_dca_c):
+#       ...
+#
+# - entradas: nomes, na ordem dos argumentos, resolvidos nos frames preparados
+#   (`api_ranking.pipeline.preparar_frames`), em `ano`, `tipo_ente`,
+#   `disponibilidade` ou no retorno de outra verificação ('d1_00025.pc_estendido',
+#   nomes de `retornos`) — nesse caso a outra verificação é uma dependência;
+# - retornos: nomes dos elementos do retorno após o resumo. Nomes iniciados por
+#   "_" são sufixos do código (d2_00012_ta); os demais, variáveis auxiliares
+#   usadas pelos renders;
+# - ano_min / ano_max / tipo_ente: aplicabilidade; fora dela a verificação não
+#   é executada e não entra na tabela final;
+# - requer: demonstrativos exigidos ('dca', 'rreo'), além dos da dimensão
+#   (DIMENSOES). Sem eles, a dimensão inteira vira uma linha N/A;
+# - altera: a função escreve nos frames recebidos (colunas auxiliares,
+#   `.loc[...] =`); só essas recebem cópias profundas das entradas.
+#
+# A execução (dependências, paralelismo) fica em `api_ranking.analysis.agendador`.
+
+# Módulos com as funções decoradas (importados por `carregar`)
+MODULOS = (
+    "api_ranking.analysis.d1",
+    "api_ranking.analysis.d2_dca",
+    "api_ranking.analysis.d3",
+    "api_ranking.analysis.d4",
+)
+
+# Variáveis de contexto aceitas em `entradas` além dos frames
+PARAMETROS = ("ano", "tipo_ente", "disponibilidade")
+
+# Demonstrativo -> teste sobre o retorno de `verificar_disponibilidade_demonstrativos`
+_REQUISITOS = {
+    "dca": lambda disponibilidade: disponibilidade.get('dca', {}).get('disponivel', False),
+    "rreo": lambda disponibilidade: disponibilidade.get('rreo', {}).get('completo', False),
+}
+
+# Requisitos de cada dimensão e linha consolidada quando não atendidos
+DIMENSOES = {
+    "D1": dict(requer=(), descricao=None, obs=None),
+    "D2": dict(requer=("dca",),
+               descricao='Dimensão D2 não disponível - Requer DCA (Balanço Anual)',
+               obs='DCA não enviada para este exercício'),
+    "D3": dict(requer=("rreo",),
+               descricao='Dimensão D3 não disponível - Requer RREO completo (6º bimestre)',
+               obs='RREO 6º bimestre não enviado para este exercício'),
+    "D4": dict(requer=("dca", "rreo"),
+               descricao='Dimensão D4 não disponível - Requer DCA e RREO completos',
+               obs='DCA ou RREO 6º bimestre não enviados para este exercício'),
+}
+
+REGISTRO = {}
+
+
+def atende(requer, disponibilidade):
+    """Indica se todos os demonstrativos de `requer` estão disponíveis."""
+    return all(_REQUISITOS[demonstrativo](disponibilidade) for demonstrativo in requer)
+
+
+@dataclass(frozen=True)
+class Verificacao:
+    """Uma verificação registrada (ver `verificacao`)."""
+    codigo: str
+    dimensao: str
+    funcao: object
+    entradas: tuple
+    retornos: tuple = ('_t',)
+    ano_min: int = None
+    ano_max: int = None
+    tipo_ente: str = None
+    requer: tuple = ()
+    altera: bool = False
+
+    @property
+    def dependencias(self):
+        """Códigos das verificações cujo retorno é usado como entrada."""
+        return tuple(dict.fromkeys(nome.split('.')[0] for nome in self.entradas if '.' in nome))
+
+    def aplicavel(self, ano, tipo_ente, disponibilidade):
+        if self.ano_min is not None and ano < self.ano_min:
+            return False
+        if self.ano_max is not None and ano > self.ano_max:
+            return False
+        if self.tipo_ente is not None and tipo_ente != self.tipo_ente:
+            return False
+        return atende(DIMENSOES[self.dimensao]["requer"] + self.requer, disponibilidade)
+
+    def retorno(self, resultado, nome):
+        """Elemento `nome` (de `retornos`) do resultado desta verificação."""
+        return resultado[1 + self.retornos.index(nome)]
+
+
+def verificacao(dimensao, entradas, retornos=('_t',), ano_min=None, ano_max=None, tipo_ente=None, requer=(),
+                altera=False):
+    """Registra a função decorada como verificação; a função não é alterada."""
+    def registrar(funcao):
+        codigo = funcao.__name__
+        if codigo in REGISTRO and REGISTRO[codigo].funcao is not funcao:
+            raise ValueError(f"Verificação registrada duas vezes: {codigo}")
+        REGISTRO[codigo] = Verificacao(
+            codigo=codigo, dimensao=dimensao, funcao=funcao, entradas=tuple(entradas),
+            retornos=tuple(retornos), ano_min=ano_min, ano_max=ano_max, tipo_ente=tipo_ente,
+            requer=tuple(requer), altera=altera,
+        )
+        return funcao
+    return registrar
+
+
+def carregar():
+    """Importa os módulos de verificação (popula REGISTRO) e devolve o registro."""
+    for modulo in MODULOS:
+        importlib.import_module(modulo)
+    return REGISTRO
+
+
+def verificacoes(dimensao=None):
+    """Verificações registradas, em ordem de código (a ordem da tabela final)."""
+    carregar()
+    return [v for codigo, v in sorted(REGISTRO.items()) if dimensao is None or v.dimensao == dimensao]
+
+
+def linha_na(dimensao):
+    """Linha consolidada de uma dimensão cujos demonstrativos não estão disponíveis."""
+    return pd.DataFrame([{
+        'Dimensão': f'{dimensao}_NA',
+        'Resposta': 'N/A',
+        'Descrição da Dimensão': DIMENSOES[dimensao]["descricao"],
+        'Nota': 0,
+        'OBS': DIMENSOES[dimensao]["obs"]
+    }])
@@ -0,0 +1,320 @@
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from api_ranking.pipeline import executar_pipeline
+from api_ranking.services.api_loader import get_extratos, load_all_data_cached, load_base_ranking
+from api_ranking.services.check_types import detectar_tipo_relatorio, verificar_disponibilidade_demonstrativos
+from api_ranking.services import extrato_index
+from core import http_siconfi
+
+#############################################################################
+####  Ranking em lote (sem Streamlit)  ####
+#############################################################################
+#
+# Calcula as verificações D1-D4 do Ranking para vários entes de um exercício,
+# fora da interface. Cada ente é processado num processo separado: busca o
+# extrato e os demonstrativos pela mesma carga do `api_loader` (com o cache em
+# disco de `response_cache`) e executa o mesmo `api_ranking.pipeline` da
+# página do Ranking.
+#
+# O resultado de cada ente é gravado como checkpoint (Parquet) assim que fica
+# pronto; numa nova execução os entes com checkpoint são pulados, então uma
+# falha (ou interrupção) só custa os entes que ainda não terminaram.
+#
+# A taxa (SICONFI_HTTP_TAXA) e a concorrência máxima com a API são do lote,
+# e não de cada processo: o orçamento é dividido igualmente entre os
+# processos do pool (cada um tem o próprio cliente HTTP e limitador), de modo
+# que o SICONFI continua vendo no máximo a taxa e as conexões configuradas.
+#
+# A saída consolidada tem o formato das bases de `load_base_ranking`:
+# - Estados: uma linha por verificação (VA_EXERCICIO, COD_IBGE, NO_ESTADO,
+#   SG_ESTADO, SG_DIMENSAO, NO_VERIFICACAO, PONTUACAO)
+# - Municípios: uma linha por ente (ID_ENTE, NOME_ENTE, VA_EXERCICIO, D1_..., D4_...)
+#
+# Uso:
+#   python -m api_ranking.batch --tipo E --ano 2024                 # todos os estados da base
+#   python -m api_ranking.batch --tipo M --ano 2024 --entes-arquivo entes.txt --processos 8
+#
+#   from api_ranking.batch import executar_lote
+#   resultado = executar_lote(["33", "35"], 2024, tipo_ente="E")
+
+CAMINHO_BASE_ESTADOS = "api_ranking/base_ranking/estados_analitico_base.csv"
+CAMINHO_BASE_MUNICIPIOS = "api_ranking/base_ranking/municipios_bspn_base.csv"
+CHECKPOINT_DIR = os.environ.get("RANKING_LOTE_DIR", os.path.join(".cache", "ranking_lote"))
+
+TIPOS_BALANCO = ['ending_balance', 'beginning_balance', 'period_change']
+
+SG_DIMENSAO = {"D1": "DI", "D2": "DII", "D3": "DIII", "D4": "DIV"}
+
+#############################################################################
+####  Processamento de um ente  ####
+#############################################################################
+
+def _iniciar_processo(taxa, concorrencia_max):
+    """Inicializador do pool: parcela do orçamento de requisições deste processo."""
+    http_siconfi.configurar(taxa=taxa, concorrencia_max=concorrencia_max)
+
+
+def processar_ente(ente, ano, tipo_ente="E"):
+    """
+    Busca os demonstrativos de um ente e calcula o Ranking.
+
+    Usa as funções do `api_loader` sem o `st.cache_data` (o cache em disco
+    continua valendo), então pode rodar fora do Streamlit.
+
+    Returns:
+        DataFrame `final` (uma linha por verificação)
+    """
+    ente, ano = str(ente), int(ano)
+    # Índice local do extrato (`extrato_index`), se sincronizado há pouco; senão, a API
+    indice = extrato_index.indice_atual(ano)
+    if indice is not None and ente in indice:
+        tipo_relatorio = "Completo" if tipo_ente == "E" else (indice.tipo_relatorio(ente) or "Completo")
+        disponibilidade = indice.disponibilidade(ente, tipo_ente, tipo_relatorio)
+    else:
+        extrato = get_extratos.__wrapped__(ente, ano)
+        if tipo_ente == "E":
+            tipo_relatorio = "Completo"
+        else:
+            tipo_relatorio = detectar_tipo_relatorio(extrato) or "Completo"
+        disponibilidade = verificar_disponibilidade_demonstrativos(extrato, tipo_ente, tipo_relatorio)
+
+    meses = disponibilidade['msc']['periodos'] if disponibilidade['msc']['disponivel'] else []
+    meses = [int(m) for m in meses] or list(range(1, 13))
+    carregar_msce = disponibilidade.get('msc_encerramento', {}).get('disponivel', True)
+    carregar_dca = disponibilidade.get('dca', {}).get('disponivel', True)
+
+    dados = load_all_data_cached.__wrapped__(
+        ente, ano, meses, TIPOS_BALANCO,
+        tipo_ente=tipo_ente, tipo_relatorio=tipo_relatorio,
+        carregar_msce=carregar_msce, carregar_dca=carregar_dca,
+        carregar_rreo=disponibilidade.get('rreo', {}).get('disponivel', True),
+        carregar_rgf=disponibilidade.get('rgf', {}).get('disponivel', True),
+    )
+    # O lote já paraleliza por ente (um processo por ente): verificações em sequência
+    resultado = executar_pipeline(dados, ano, tipo_ente, disponibilidade, meses,
+                                  carregar_msce=carregar_msce, carregar_dca=carregar_dca, usar_memoria=False,
+                                  workers=1)
+    return resultado.final
+
+
+#############################################################################
+####  Checkpoints  ####
+#############################################################################
+
+def _pasta_checkpoint(checkpoint_dir, ano, tipo_ente):
+    return os.path.join(checkpoint_dir or CHECKPOINT_DIR, f"{tipo_ente}_{ano}")
+
+
+def _arquivo_checkpoint(pasta, ente):
+    return os.path.join(pasta, f"{ente}.parquet")
+
+
+def _gravar_checkpoint(final, arquivo):
+    """Grava o resultado de um ente (escrita atômica)."""
+    tabela = final[['Dimensão', 'Resposta', 'Descrição da Dimensão', 'Nota', 'OBS']].copy()
+    for col in ('Resposta', 'Descrição da Dimensão', 'OBS'):
+        tabela[col] = tabela[col].where(tabela[col].isna(), tabela[col].astype(str))
+    tabela['Nota'] = pd.to_numeric(tabela['Nota'], errors='coerce')
+
+    pasta = os.path.dirname(arquivo)
+    os.makedirs(pasta, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=pasta, suffix=".tmp")
+    os.close(fd)
+    try:
+        pq.write_table(pa.Table.from_pandas(tabela, preserve_index=False), tmp, compression="zstd")
+        os.replace(tmp, arquivo)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _executar_com_checkpoint(ente, ano, tipo_ente, arquivo):
+    """Tarefa de um processo do pool: calcula um ente e grava o checkpoint."""
+    inicio = time.perf_counter()
+    try:
+        final = processar_ente(ente, ano, tipo_ente)
+        _gravar_checkpoint(final, arquivo)
+    except Exception:
+        return ente, None, traceback.format_exc(), time.perf_counter() - inicio
+    return ente, arquivo, None, time.perf_counter() - inicio
+
+
+#############################################################################
+####  Lote  ####
+#############################################################################
+
+def _cadastro_entes(tipo_ente):
+    """Nomes (e siglas, para estados) dos entes, a partir da base do ranking."""
+    try:
+        df, coluna_codigo, coluna_nome = load_base_ranking.__wrapped__(
+            tipo_ente, CAMINHO_BASE_ESTADOS, CAMINHO_BASE_MUNICIPIOS)
+    except (FileNotFoundError, OSError):
+        return pd.DataFrame(columns=['ente', 'nome', 'sigla']), None
+    colunas = [coluna_codigo, coluna_nome] + (['SG_ESTADO'] if 'SG_ESTADO' in df.columns else [])
+    cadastro = (df.sort_values('VA_EXERCICIO')[colunas]
+                .drop_duplicates(coluna_codigo, keep='last')
+                .rename(columns={coluna_codigo: 'ente', coluna_nome: 'nome', 'SG_ESTADO': 'sigla'}))
+    cadastro['ente'] = cadastro['ente'].astype(str)
+    return cadastro, df
+
+
+def entes_da_base(tipo_ente):
+    """Códigos de todos os entes presentes na base do ranking."""
+    cadastro, _ = _cadastro_entes(tipo_ente)
+    return cadastro['ente'].tolist()
+
+
+def formatar_base(resultados, ano, tipo_ente):
+    """
+    Converte os resultados por ente para o formato das bases de `load_base_ranking`.
+
+    Args:
+        resultados: dict ente -> DataFrame `final`
+        ano: exercício
+        tipo_ente: "E" (Estado) ou "M" (Município)
+    """
+    cadastro, _ = _cadastro_entes(tipo_ente)
+    cadastro = cadastro.set_index('ente')
+
+    linhas = []
+    for ente, final in resultados.items():
+        # Apenas verificações reais (as linhas D2_NA/D3_NA/D4_NA são agregadas)
+        final = final[final['Dimensão'].str.match(r"^D[1-4]_\d{5}$")]
+        linhas.append(pd.DataFrame({
+            'VA_EXERCICIO': ano,
+            'ente': str(ente),
+            'NO_VERIFICACAO': final['Dimensão'].to_numpy(),
+            'PONTUACAO': pd.to_numeric(final['Nota'], errors='coerce').to_numpy(),
+        }))
+    if not linhas:
+        return pd.DataFrame()
+    longo = pd.concat(linhas, ignore_index=True)
+    longo['nome'] = longo['ente'].map(cadastro['nome']) if 'nome' in cadastro else None
+
+    if tipo_ente == "E":
+        longo['sigla'] = longo['ente'].map(cadastro['sigla']) if 'sigla' in cadastro else None
+        longo['SG_DIMENSAO'] = longo['NO_VERIFICACAO'].str[:2].map(SG_DIMENSAO)
+        longo['COD_IBGE'] = pd.to_numeric(longo['ente'], errors='coerce').astype('Int64')
+        longo = longo.rename(columns={'nome': 'NO_ESTADO', 'sigla': 'SG_ESTADO'})
+        return longo[['VA_EXERCICIO', 'COD_IBGE', 'NO_ESTADO', 'SG_ESTADO', 'SG_DIMENSAO',
+                      'NO_VERIFICACAO', 'PONTUACAO']]
+
+    largo = longo.pivot_table(index=['ente', 'VA_EXERCICIO'], columns='NO_VERIFICACAO',
+                              values='PONTUACAO', aggfunc='first', dropna=False).reset_index()
+    largo.columns.name = None
+    largo['NOME_ENTE'] = largo['ente'].map(cadastro['nome']) if 'nome' in cadastro else None
+    largo['ID_ENTE'] = pd.to_numeric(largo['ente'], errors='coerce').astype('Int64')
+    dimensoes = sorted(c for c in largo.columns if str(c)[:3] in ('D1_', 'D2_', 'D3_', 'D4_'))
+    return largo[['ID_ENTE', 'NOME_ENTE', 'VA_EXERCICIO'] + dimensoes]
+
+
+def executar_lote(entes, ano, tipo_ente="E", processos=None, checkpoint_dir=None, refazer=False, progresso=None):
+    """
+    Calcula o Ranking de vários entes em paralelo (um processo por ente).
+
+    Args:
+        entes: códigos dos entes (IBGE)
+        ano: exercício
+        tipo_ente: "E" (Estado) ou "M" (Município)
+        processos: tamanho do pool (padrão: número de núcleos); a taxa e a
+                   concorrência do SICONFI são divididas entre os processos
+        checkpoint_dir: pasta dos checkpoints (padrão: CHECKPOINT_DIR)
+        refazer: se True, ignora os checkpoints existentes
+        progresso: callable(ente, ok, segundos, erro) chamado a cada ente concluído
+
+    Returns:
+        Tupla (base, falhas): `base` no formato de `load_base_ranking` com todos
+        os entes que têm checkpoint; `falhas` dict ente -> traceback.
+    """
+    ano = int(ano)
+    pasta = _pasta_checkpoint(checkpoint_dir, ano, tipo_ente)
+    entes = list(dict.fromkeys(str(e) for e in entes))
+    pendentes = [e for e in entes if refazer or not os.path.exists(_arquivo_checkpoint(pasta, e))]
+
+    falhas = {}
+    if pendentes:
+        # no máximo um processo por conexão do orçamento
+        processos = min(processos or os.cpu_count() or 1, len(pendentes), http_siconfi.CONCORRENCIA_MAX)
+        contexto = multiprocessing.get_context("spawn")
+        orcamento = (http_siconfi.TAXA_MAX / processos, http_siconfi.CONCORRENCIA_MAX // processos)
+        with ProcessPoolExecutor(max_workers=processos, mp_context=contexto,
+                                 initializer=_iniciar_processo, initargs=orcamento) as pool:
+            futuros = [pool.submit(_executar_com_checkpoint, e, ano, tipo_ente, _arquivo_checkpoint(pasta, e))
+                       for e in pendentes]
+            for futuro in as_completed(futuros):
+                ente, arquivo, erro, segundos = futuro.result()
+                if erro is not None:
+                    falhas[ente] = erro
+                if progresso is not None:
+                    progresso(ente, erro is None, segundos, erro)
+
+    resultados = {}
+    for ente in entes:
+        arquivo = _arquivo_checkpoint(pasta, ente)
+        if os.path.exists(arquivo):
+            resultados[ente] = pq.read_table(arquivo).to_pandas()
+    return formatar_base(resultados, ano, tipo_ente), falhas
+
+
+#############################################################################
+####  Linha de comando  ####
+#############################################################################
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m api_ranking.batch",
+        description="Calcula o Ranking SICONFI (D1-D4) em lote.")
+    parser.add_argument("--ano", type=int, required=True, help="Exercício")
+    parser.add_argument("--tipo", choices=["E", "M"], default="E", help="E (Estados) ou M (Municípios)")
+    parser.add_argument("--entes", nargs="*", help="Códigos IBGE (padrão: todos os entes da base do ranking)")
+    parser.add_argument("--entes-arquivo", help="Arquivo com um código IBGE por linha")
+    parser.add_argument("--processos", type=int, default=None, help="Tamanho do pool (padrão: núcleos)")
+    parser.add_argument("--checkpoints", default=None, help=f"Pasta dos checkpoints (padrão: {CHECKPOINT_DIR})")
+    parser.add_argument("--refazer", action="store_true", help="Ignora checkpoints existentes")
+    parser.add_argument("--saida", default=None, help="CSV de saída (padrão: ranking_{tipo}_{ano}.csv)")
+    args = parser.parse_args(argv)
+
+    entes = list(args.entes or [])
+    if args.entes_arquivo:
+        with open(args.entes_arquivo, encoding="utf-8") as arquivo:
+            entes += [linha.strip() for linha in arquivo if linha.strip()]
+    if not entes:
+        entes = entes_da_base(args.tipo)
+    if not entes:
+        parser.error("nenhum ente informado e base do ranking não encontrada")
+
+    total = len(entes)
+    concluidos = [0]
+
+    def progresso(ente, ok, segundos, erro):
+        concluidos[0] += 1
+        situacao = "ok" if ok else "ERRO"
+        print(f"[{concluidos[0]}/{total}] {ente}: {situacao} ({segundos:.1f}s)", flush=True)
+        if not ok:
+            print(erro, file=sys.stderr, flush=True)
+
+    base, falhas = executar_lote(entes, args.ano, args.tipo, processos=args.processos,
+                                 checkpoint_dir=args.checkpoints, refazer=args.refazer, progresso=progresso)
+
+    saida = args.saida or f"ranking_{args.tipo}_{args.ano}.csv"
+    base.to_csv(saida, sep=';', decimal=',', index=False, encoding='utf-8-sig')
+    print(f"{len(entes) - len(falhas)}/{len(entes)} entes gravados em {saida}")
+    if falhas:
+        print(f"Falharam: {', '.join(sorted(falhas))} (execute novamente para retomar)", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,415 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+import api_ranking.analysis.d2_antecipada as d2_ant_analysis
+from api_ranking.analysis.agendador import executar_verificacoes
+from api_ranking.analysis.registro import DIMENSOES, atende, verificacoes
+from api_ranking.services.msc_view import MscView
+from core.normalizacao_sinal import (inverter_sinal, mascara_inversao, REGRAS_PERIOD_CHANGE,
+                                     TIPO_PERIOD_CHANGE, TIPO_SALDO)
+
+#############################################################################
+####  Pipeline do Ranking: demonstrativos -> frames -> D1..D4  ####
+#############################################################################
+#
+# Recebe o dict de `load_all_data_cached` e devolve um `ResultadoRanking` com o
+# resumo e os detalhamentos de todas as verificações. Cada estágio é memoizado
+# pela impressão digital (sha256) das suas entradas:
+#
+# - frames:    hash dos demonstrativos + tipo_ente + flags de carga
+# - dimensoes: chave dos frames + ano + tipo_ente + disponibilidade + meses
+#
+# Em um rerun do Streamlit os demonstrativos chegam como cópias novas do
+# `st.cache_data`, mas com o mesmo conteúdo: o hash bate e nem a preparação nem
+# D1-D4 são recalculadas. As verificações são declaradas com `@verificacao`
+# (`api_ranking.analysis.registro`) e executadas em paralelo pelo agendador, cada
+# uma com cópias dos frames feitas na thread que a executa (profundas só para as
+# que alteram as entradas): os frames memoizados não são alterados.
+#
+# Uso:
+#   from api_ranking.pipeline import executar_pipeline
+#   resultado = executar_pipeline(dados, ano, tipo_ente, disponibilidade, meses)
+#   resultado.final                  # Dimensão, Resposta, Descrição, Nota, OBS
+#   resultado.detalhe("d2_00013")    # tabela de detalhamento
+#   render_tab_d2(tab, resultado.contexto())
+
+# Quantidade de entradas (somando estágios) mantidas em memória por processo
+MEMO_MAX = int(os.environ.get("RANKING_PIPELINE_MEMO", "8"))
+
+# Retificadoras ajustadas na carga (mesmas máscaras da página do Ranking)
+_RETIF_PATRIMONIAL = tuple((g, n, t) for g, n in (('1', 'C'), ('2', 'D'), ('3', 'C'), ('4', 'D'))
+                           for t in (TIPO_SALDO, TIPO_PERIOD_CHANGE))
+_RETIF_PATRIMONIAL_ENCERR = tuple((g, n, TIPO_SALDO) for g, n in (('1', 'C'), ('2', 'D'), ('3', 'C'), ('4', 'D')))
+_RETIF_ORCAM = (('5', 'C', TIPO_SALDO), ('6', 'D', TIPO_SALDO))
+_RETIF_CONTROLE = (('7', 'C', TIPO_SALDO), ('8', 'D', TIPO_SALDO))
+
+_CONTAS_EMPENHO = ("622130400", "622130500", "622130600", "622130700")
+
+
+#############################################################################
+####  Preparação dos frames  ####
+#############################################################################
+
+def _ajustar_retificadoras(df, regras):
+    """Inverte o sinal das retificadoras, a menos que a MSC já as traga negativas."""
+    if df.empty or 'conta_contabil' not in df.columns:
+        return df
+    mascara = mascara_inversao(df, regras)
+    valores = df['valor'].to_numpy()
+    if (valores[mascara] < 0).any():
+        return df
+    return df.assign(valor=np.where(mascara, -valores, valores))
+
+
+def _inverter_se_contem(df, coluna, trecho):
+    if df.empty or coluna not in df.columns or 'valor' not in df.columns:
+        return df
+    mascara = df[coluna].astype(str).str.contains(trecho, regex=False).to_numpy()
+    valores = df['valor'].to_numpy()
+    return df.assign(valor=np.where(mascara, -valores, valores))
+
+
+def _digito_intra(natureza_despesa):
+    texto = natureza_despesa.astype(str)
+    return texto.str[2:4].where(texto.str.len() >= 4)
+
+
+def _por_tipo(df, tipo_valor):
+    if df.empty or 'tipo_valor' not in df.columns:
+        return pd.DataFrame()
+    return df[df['tipo_valor'] == tipo_valor]
+
+
+def preparar_frames(dados, tipo_ente, carregar_msce=True, carregar_dca=True):
+    """
+    Monta, a partir do retorno de `load_all_data_cached`, os frames usados pelas
+    verificações (mesmos nomes e ajustes da página do Ranking).
+
+    Returns:
+        dict nome -> DataFrame (msc, msc_orig, msc_encerr, msc_consolidada,
+        msc_orig_consolidada, fatias _e/_b, msc_dez, receita, emp_msc_dez,
+        emp_msc_encerr, df_dca_*, df_rreo_*, df_rgf_*, rgf_total, rgf_o), as
+        MscView msc_view, msc_dez_view, msc_encerr_view e msc_consolidada_view
+        e o dict bruto `rgf`.
+    """
+    f = {}
+
+    msc_patrimonial = dados['msc_patrimonial']
+    msc_orcam = dados['msc_orcam']
+    msc_ctr = dados['msc_ctr']
+    f['msc_orig'] = pd.concat([msc_patrimonial, msc_orcam, msc_ctr])
+    f['msc'] = pd.concat([
+        _ajustar_retificadoras(msc_patrimonial, _RETIF_PATRIMONIAL),
+        _ajustar_retificadoras(msc_orcam, _RETIF_ORCAM),
+        _ajustar_retificadoras(msc_ctr, _RETIF_CONTROLE),
+    ])
+
+    if carregar_msce:
+        msc_patrimonial_encerr = dados['msc_patrimonial_encerr']
+        msc_orcam_encerr = dados['msc_orcam_encerr']
+        msc_ctr_encerr = dados['msc_ctr_encerr']
+        f['msc_encerr'] = pd.concat([
+            _ajustar_retificadoras(msc_patrimonial_encerr, _RETIF_PATRIMONIAL_ENCERR),
+            _ajustar_retificadoras(msc_orcam_encerr, _RETIF_ORCAM),
+            _ajustar_retificadoras(msc_ctr_encerr, _RETIF_CONTROLE),
+        ])
+        f['msc_orig_encerr'] = pd.concat([msc_patrimonial_encerr, msc_orcam_encerr, msc_ctr_encerr])
+        msc_consolidada = pd.concat([f['msc'], f['msc_encerr']])
+        f['msc_orig_consolidada'] = pd.concat([f['msc_orig'], f['msc_orig_encerr']])
+    else:
+        f['msc_encerr'] = pd.DataFrame()
+        f['msc_orig_encerr'] = pd.DataFrame()
+        msc_consolidada = f['msc'].copy()
+        f['msc_orig_consolidada'] = f['msc_orig'].copy()
+
+    # DCA
+    dca = dados['dca'] if carregar_dca else {}
+    for anexo in ('ab', 'c', 'd', 'e', 'f', 'g', 'hi'):
+        f[f'df_dca_{anexo}'] = dca.get(anexo, pd.DataFrame())
+    f['df_dca_ab_orig'] = f['df_dca_ab'].copy()
+    f['df_dca_c_orig'] = f['df_dca_c'].copy()
+    f['df_dca_c'] = _inverter_se_contem(f['df_dca_c'], 'coluna', 'Deduções')
+    f['df_dca_ab'] = _inverter_se_contem(f['df_dca_ab'], 'conta', '(-)')
+
+    # RREO / RGF
+    rreo = dados['rreo'] if isinstance(dados['rreo'], dict) else {}
+    for anexo in ('1', '2', '3', '6', '7', '9'):
+        f[f'df_rreo_{anexo}'] = rreo.get(anexo, pd.DataFrame())
+    rgf = dados['rgf'] if isinstance(dados['rgf'], dict) else {}
+    for anexo in ('1e', '2e', '3e', '4e', '5e'):
+        f[f'df_rgf_{anexo}'] = rgf.get(anexo, pd.DataFrame())
+    f['rgf'] = rgf
+
+    # Estados: todos os poderes (E, L, J, M, D); Municípios: Executivo e Legislativo
+    if tipo_ente == "E":
+        outros = [rgf.get(k, pd.DataFrame()) for k in ('5l', '5j', '5m', '5d')]
+        f['rgf_total'] = pd.concat([rgf.get("5e", pd.DataFrame())] + outros, ignore_index=True)
+        f['rgf_o'] = pd.concat(outros, ignore_index=True)
+    else:
+        rgf_5l = rgf.get("5l", pd.DataFrame())
+        f['rgf_total'] = pd.concat([rgf.get("5e", pd.DataFrame()), rgf_5l], ignore_index=True)
+        f['rgf_o'] = rgf_5l.copy() if not rgf_5l.empty else pd.DataFrame(columns=['cod_conta', 'conta', 'anexo', 'valor'])
+
+    # Matrizes específicas
+    msc = f['msc']
+    f['msc_dez'] = msc.query('mes_referencia == 12')
+    f['msc_consolidada_e'] = _por_tipo(msc_consolidada, 'ending_balance')
+    f['msc_consolidada_b'] = _por_tipo(msc_consolidada, 'beginning_balance')
+    f['msc_e'] = _por_tipo(msc, 'ending_balance')
+    f['msc_b'] = _por_tipo(msc, 'beginning_balance')
+    f['msc_orig_e'] = _por_tipo(f['msc_orig'], 'ending_balance')
+    f['msc_orig_b'] = _por_tipo(f['msc_orig'], 'beginning_balance')
+    f['msc_orig_consolidada_e'] = _por_tipo(f['msc_orig_consolidada'], 'ending_balance')
+    f['msc_orig_consolidada_b'] = _por_tipo(f['msc_orig_consolidada'], 'beginning_balance')
+
+    # Visões indexadas (partição + conta contábil) usadas pelas verificações
+    f['msc_view'] = msc_view = MscView(msc)
+    f['msc_dez_view'] = msc_view.restringir(mes=12)
+    f['msc_encerr_view'] = msc_encerr_view = MscView(f['msc_encerr'])
+
+    # Receita não usa o saldo final da matriz de encerramento
+    receita = msc_view.fatia(tipo_valor='ending_balance', prefixos=('6212', '6213'))
+    f['receita'] = receita.assign(cat_receita=receita['natureza_receita'].astype(str).str[0])
+
+    despesa = msc_view.fatia(mes=12, tipo_valor='ending_balance', contas=_CONTAS_EMPENHO)
+    f['emp_msc_dez'] = despesa.assign(DIGITO_INTRA=_digito_intra(despesa['natureza_despesa']))
+
+    if not msc_encerr_view.empty:
+        emp = msc_encerr_view.fatia(tipo_valor='beginning_balance', contas=_CONTAS_EMPENHO)
+        f['emp_msc_encerr'] = emp.assign(DIGITO_INTRA=_digito_intra(emp['natureza_despesa'])) if not emp.empty else emp
+    else:
+        f['emp_msc_encerr'] = pd.DataFrame()
+
+    # period_change com sinal do grupo e MSCE como mês 13
+    msc_consolidada = msc_consolidada.assign(Grupo_Contas=msc_consolidada["conta_contabil"].str[0])
+    msc_consolidada = inverter_sinal(msc_consolidada, REGRAS_PERIOD_CHANGE)
+    condicao_alt_msc = (msc_consolidada['mes_referencia'] == 12) & (msc_consolidada['tipo_matriz'] == 'MSCE')
+    msc_consolidada.loc[condicao_alt_msc, 'mes_referencia'] = 13
+    f['msc_consolidada'] = msc_consolidada
+    f['msc_consolidada_view'] = MscView(msc_consolidada)
+
+    return f
+
+
+#############################################################################
+####  Impressão digital e memoização dos estágios  ####
+#############################################################################
+
+_lock = threading.Lock()
+_memoria = OrderedDict()
+
+
+def _atualizar(h, obj):
+    if isinstance(obj, pd.DataFrame):
+        h.update(repr((obj.shape, [str(c) for c in obj.columns], [str(t) for t in obj.dtypes])).encode())
+        if len(obj):
+            try:
+                h.update(pd.util.hash_pandas_object(obj, index=False).to_numpy().tobytes())
+            except TypeError:
+                # Colunas com valores não hasheáveis (listas, dicts)
+                h.update(obj.to_json(orient="split", index=False).encode())
+    elif isinstance(obj, dict):
+        h.update(b"{")
+        for chave in sorted(obj, key=str):
+            _atualizar(h, str(chave))
+            _atualizar(h, obj[chave])
+        h.update(b"}")
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"[")
+        for valor in obj:
+            _atualizar(h, valor)
+        h.update(b"]")
+    else:
+        h.update(repr(obj).encode())
+        h.update(b";")
+
+
+def impressao_digital(*objetos):
+    """sha256 do conteúdo (DataFrames, dicts, listas e escalares), sem depender do índice."""
+    h = hashlib.sha256()
+    for obj in objetos:
+        _atualizar(h, obj)
+    return h.hexdigest()
+
+
+def _memoizar(etapa, chave, calcular, usar_memoria=True):
+    if not usar_memoria:
+        return calcular()
+    with _lock:
+        if (etapa, chave) in _memoria:
+            _memoria.move_to_end((etapa, chave))
+            return _memoria[(etapa, chave)]
+    valor = calcular()
+    with _lock:
+        _memoria[(etapa, chave)] = valor
+        while len(_memoria) > MEMO_MAX:
+            _memoria.popitem(last=False)
+    return valor
+
+
+def limpar_memoria():
+    """Descarta todos os estágios memoizados."""
+    with _lock:
+        _memoria.clear()
+
+
+#############################################################################
+####  Resultado  ####
+#############################################################################
+
+# Valores das variáveis auxiliares quando a verificação não foi executada
+_AUXILIARES_PADRAO = {
+    'condicao_negativa_cp': False,
+    'condicao_negativa_lp': False,
+    'condicao_negativa': False,
+    'diferencas_cp': [],
+    'dif_cred_lp': 0,
+    'valor_pass_circ': 0,
+    'valor_pass_circ_fin': 0,
+    'diferenca_passivo': 0,
+    'vpd_juros': pd.DataFrame(),
+    'emprest': pd.DataFrame(),
+    'pc_estendido': pd.DataFrame(),
+}
+
+_D2_ANTECIPADA = ('d2_antecipada', 'd2_ant_00002', 'd2_ant_00002_t', 'resposta_d2_ant_00002',
+                  'ultimo_mes_msc', 'executar_d2_ant')
+
+
+@dataclass
+class ResultadoRanking:
+    """
+    Resultado do pipeline para um ente/exercício.
+
+    Attributes:
+        ano, tipo_ente, disponibilidade: parâmetros da execução
+        frames: frames preparados (msc_consolidada, df_dca_c, emp_msc_encerr, ...)
+        resultados: código (ex.: 'd2_00013') -> tupla retornada pela função
+        final: tabela consolidada (Dimensão, Resposta, Descrição da Dimensão, Nota, OBS)
+        d2_antecipada: variáveis da D2 antecipada (ver `_D2_ANTECIPADA`)
+        executar_d2, executar_d3, executar_d4: se a dimensão foi executada
+    """
+    ano: int
+    tipo_ente: str
+    disponibilidade: dict
+    frames: dict
+    resultados: dict
+    final: pd.DataFrame
+    d2_antecipada: dict = field(default_factory=dict)
+    executar_d2: bool = False
+    executar_d3: bool = False
+    executar_d4: bool = False
+
+    def resumo(self, codigo):
+        """Linha de resumo da verificação (None se não foi executada)."""
+        retorno = self.resultados.get(codigo.lower())
+        return None if retorno is None else retorno[0]
+
+    def detalhe(self, codigo):
+        """Primeira tabela de detalhamento da verificação (vazia se não foi executada)."""
+        retorno = self.resultados.get(codigo.lower())
+        return pd.DataFrame() if retorno is None or len(retorno) < 2 else retorno[1]
+
+    def resposta(self, codigo):
+        resumo = self.resumo(codigo)
+        return 'N/A' if resumo is None else resumo['Resposta'].iloc[0]
+
+    def dimensao(self, dimensao):
+        """Linhas de `final` de uma dimensão ('D1'...'D4')."""
+        return self.final[self.final['Dimensão'].str.startswith(f'{dimensao}_')]
+
+    def contexto(self):
+        """
+        Variáveis no formato esperado por `render_tab_d1`...`render_tab_d4`
+        (d2_00013, d2_00013_t, resposta_d2_00013, condicao_negativa_cp, ...).
+        """
+        ctx = dict(_AUXILIARES_PADRAO)
+        registradas = {v.codigo: v for v in verificacoes()}
+        for codigo, v in registradas.items():
+            ctx[f'resposta_{codigo}'] = 'N/A'
+            for nome in ('_t',) + v.retornos:
+                if nome.startswith('_'):
+                    ctx[codigo + nome] = pd.DataFrame()
+
+        for codigo, retorno in self.resultados.items():
+            ctx[codigo] = retorno[0]
+            ctx[f'resposta_{codigo}'] = retorno[0]['Resposta'].iloc[0]
+            for nome, valor in zip(registradas[codigo].retornos, retorno[1:]):
+                ctx[codigo + nome if nome.startswith('_') else nome] = valor
+
+        ctx.update(self.d2_antecipada)
+        ctx.update(ano=self.ano, tipo_ente=self.tipo_ente, disponibilidade=self.disponibilidade,
+                   executar_d2=self.executar_d2, executar_d3=self.executar_d3, executar_d4=self.executar_d4,
+                   final=self.final)
+        return ctx
+
+
+#############################################################################
+####  Execução  ####
+#############################################################################
+
+def calcular_dimensoes(frames, ano, tipo_ente, disponibilidade, meses, workers=None):
+    """
+    Executa a D2 antecipada e as verificações registradas de D1..D4
+    (`api_ranking.analysis.agendador`).
+
+    Returns:
+        Tupla (resultados, partes, d2_antecipada): retorno de cada função por
+        código, lista de resumos na ordem da tabela final e variáveis da D2
+        antecipada.
+    """
+    d2_antecipada = dict(zip(_D2_ANTECIPADA, d2_ant_analysis.run_d2_antecipada(
+        frames['msc_consolidada'].copy(deep=False), meses, disponibilidade)))
+    resultados, partes = executar_verificacoes(frames, ano, tipo_ente, disponibilidade, workers=workers)
+    return resultados, partes, d2_antecipada
+
+
+def executar_pipeline(dados, ano, tipo_ente, disponibilidade, meses, carregar_msce=True, carregar_dca=True,
+                      usar_memoria=True, workers=None):
+    """
+    Executa o pipeline completo a partir dos demonstrativos carregados.
+
+    Args:
+        dados: dict retornado por `load_all_data_cached`
+        ano: exercício
+        tipo_ente: "E" (Estado) ou "M" (Município)
+        disponibilidade: retorno de `verificar_disponibilidade_demonstrativos`
+        meses: meses da MSC carregados
+        carregar_msce, carregar_dca: flags usadas na carga
+        usar_memoria: se False, não consulta nem grava a memoização
+        workers: threads das verificações (padrão: `agendador.WORKERS`)
+
+    Returns:
+        ResultadoRanking
+    """
+    ano = int(ano)
+    meses = [int(m) for m in meses]
+    chave_frames = impressao_digital(dados, tipo_ente, bool(carregar_msce), bool(carregar_dca))
+    frames = _memoizar("frames", chave_frames,
+                       lambda: preparar_frames(dados, tipo_ente, carregar_msce=carregar_msce, carregar_dca=carregar_dca),
+                       usar_memoria)
+
+    chave_dimensoes = impressao_digital(chave_frames, ano, tipo_ente, disponibilidade, meses)
+    resultados, partes, d2_antecipada = _memoizar(
+        "dimensoes", chave_dimensoes,
+        lambda: calcular_dimensoes(frames, ano, tipo_ente, disponibilidade, meses, workers),
+        usar_memoria)
+
+    return ResultadoRanking(
+        ano=ano,
+        tipo_ente=tipo_ente,
+        disponibilidade=disponibilidade,
+        frames=frames,
+        resultados=resultados,
+        final=pd.concat(partes, ignore_index=True),
+        d2_antecipada=d2_antecipada,
+        executar_d2=atende(DIMENSOES['D2']['requer'], disponibilidade),
+        executar_d3=atende(DIMENSOES['D3']['requer'], disponibilidade),
+        executar_d4=atende(DIMENSOES['D4']['requer'], disponibilidade),
+    )
@@ -226,7 +226,7 @@ def render_tab_d1(tab, ctx):
 
                 # Resumo por tipo de matriz
                 st.markdown("**📋 Resumo por Tipo de Matriz:**")
-                resumo_matriz = d1_00022_t.groupby(['mes_referencia', 'tipo_matriz']).size().reset_index(name='Quantidade de Registros')
+                resumo_matriz = d1_00022_t.groupby(['mes_referencia', 'tipo_matriz'], observed=True).size().reset_index(name='Quantidade de Registros')
                 resumo_matriz = resumo_matriz.rename(columns={
                     'mes_referencia': 'Mês',
                     'tipo_matriz': 'Tipo Matriz'
@@ -1,55 +1,203 @@
 import asyncio
+
 import httpx
 import pandas as pd
+import pyarrow as pa
 import streamlit as st
 
-API_ROOT = "https://apidatalake.tesouro.gov.br/ords/siconfi/tt"
+from api_ranking.services import response_cache
+from core import http_siconfi
+from core.voo_unico import reportar, voo_unico
+
+API_ROOT = http_siconfi.API_ROOT
+
+# Requisições simultâneas de uma carga completa de um ente (todos os demonstrativos).
+# O limite global do processo (compartilhado entre usuários) fica em `core.http_siconfi`.
+CONCORRENCIA_GLOBAL = 12
 
 #############################################################################
-####  Funções Assíncronas  ####
+####  Montagem tipada da MSC  ####
 #############################################################################
 
-async def _request_json(client, url, params, sem, retries=3, backoff=0.5, timeout=120):
-    for attempt in range(retries):
-        if sem:
-            await sem.acquire()
+# Colunas de baixa cardinalidade da MSC, entregues como `category`
+MSC_CATEGORICAS = ("tipo_matriz", "tipo_valor", "natureza_conta", "poder_orgao")
+
+
+class MscFrameBuilder:
+    """
+    Acumula as páginas JSON da MSC em buffers colunares (Arrow) e gera um único
+    DataFrame tipado ao final, em vez de um `pd.DataFrame(items)` por página.
+
+    Tipos gerados:
+    - tipo_matriz, tipo_valor, natureza_conta, poder_orgao: category
+    - mes_referencia: int8
+    - valor: float64
+    - conta_contabil: string[pyarrow] (buffer contíguo, sem objetos Python por linha)
+
+    As demais colunas mantêm o tipo inferido pelo pandas.
+    """
+
+    def __init__(self):
+        self._tabelas = []
+        self._frames = []
+
+    def append(self, items):
+        if not items:
+            return
         try:
-            resp = await client.get(url, params=params, timeout=timeout)
-            if resp.status_code in (429, 500, 502, 503, 504):
-                # backoff e retry para sobrecarga/limite
-                await asyncio.sleep(backoff * (2 ** attempt))
+            self._tabelas.append(self._tipar(response_cache.tabela_de_items(items)))
+        except (pa.ArrowException, TypeError, ValueError):
+            # página com tipos mistos numa mesma coluna: segue pelo caminho antigo
+            self._frames.append(pd.DataFrame(items))
+
+    def merge(self, *outros):
+        """Incorpora os buffers de outros builders, na ordem recebida."""
+        for outro in outros:
+            self._tabelas.extend(outro._tabelas)
+            self._frames.extend(outro._frames)
+            outro._tabelas, outro._frames = [], []
+        return self
+
+    @staticmethod
+    def _tipar(tabela):
+        for i, nome in enumerate(tabela.column_names):
+            coluna = tabela.column(i)
+            if nome == "valor":
+                coluna = coluna.cast(pa.float64())
+            elif nome == "mes_referencia":
+                coluna = coluna.cast(pa.int8())
+            elif nome == "conta_contabil":
+                coluna = coluna.cast(pa.string())
+            elif nome in MSC_CATEGORICAS:
+                coluna = coluna.dictionary_encode()
+            else:
                 continue
-            resp.raise_for_status()
-            data = resp.json()
-            return data.get("items", [])
-        finally:
-            if sem:
-                sem.release()
-    # última tentativa
+            tabela = tabela.set_column(i, nome, coluna)
+        return tabela
+
+    def build(self):
+        frames = list(self._frames)
+        if self._tabelas:
+            tabela = pa.concat_tables(self._tabelas, promote_options="permissive").unify_dictionaries()
+            df = tabela.to_pandas()
+            for nome in MSC_CATEGORICAS:
+                if nome in df.columns and isinstance(df[nome].dtype, pd.CategoricalDtype):
+                    # categorias em ordem fixa para que concat entre grupos preserve o dtype
+                    df[nome] = df[nome].cat.set_categories(sorted(df[nome].cat.categories))
+            if "conta_contabil" in df.columns:
+                df["conta_contabil"] = df["conta_contabil"].astype("string[pyarrow]")
+            frames.insert(0, df)
+        self._tabelas, self._frames = [], []
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+#############################################################################
+####  Funções Assíncronas  ####
+#############################################################################
+
+async def _request_page(url, params, sem, retries=3, timeout=120, cache=True):
+    """
+    Faz uma requisição à API e retorna (items, has_more) da página.
+    Retry, backoff e limite de taxa ficam a cargo de `core.http_siconfi`.
+    """
+    path = url[len(API_ROOT) + 1:] if url.startswith(API_ROOT) else url
+    entrada = response_cache.ler(path, params) if cache else None
+    if entrada is not None and entrada["fresca"]:
+        return entrada["items"], entrada["has_more"]
+
+    headers = {"If-None-Match": entrada["etag"]} if entrada is not None and entrada["etag"] else None
+    if sem:
+        await sem.acquire()
+    try:
+        resp = await http_siconfi.get_async(url, params=params, headers=headers, timeout=timeout, retries=retries)
+    except httpx.TransportError:
+        # tentativas esgotadas: se há cópia expirada, é melhor que falhar
+        if entrada is not None:
+            return entrada["items"], entrada["has_more"]
+        raise
+    finally:
+        if sem:
+            sem.release()
+
+    if resp.status_code == 304 and entrada is not None:
+        # conteúdo não mudou desde a última gravação: só renova o TTL
+        response_cache.renovar(path, params)
+        return entrada["items"], entrada["has_more"]
+    if resp.status_code in http_siconfi.TRANSIENT_STATUS and entrada is not None:
+        return entrada["items"], entrada["has_more"]
     resp.raise_for_status()
+    data = resp.json()
+    items = data.get("items", [])
+    has_more = data.get("hasMore")
+    if cache:
+        response_cache.gravar(path, params, items, etag=resp.headers.get("ETag"), has_more=has_more)
+    return items, has_more
 
 
-async def fetch_paginated(client, path, params, sem=None, page_size=5000, delay=0.0):
-    frames, offset = [], 0
-    while True:
+async def _request_json(url, params, sem, retries=3, timeout=120, cache=True):
+    items, _ = await _request_page(url, params, sem, retries, timeout, cache)
+    return items
+
+
+def _tem_proxima_pagina(items, has_more, page_size):
+    """Usa o `hasMore` da API quando presente; senão, página cheia indica que há mais."""
+    if not items:
+        return False
+    if has_more is not None:
+        return bool(has_more)
+    return len(items) >= page_size
+
+
+async def fetch_paginated(path, params, sem=None, page_size=5000, delay=0.0, janela_max=8, builder=None):
+    """
+    Busca todas as páginas de um endpoint.
+
+    A primeira página é lida sozinha; se o `hasMore` indicar continuação, as
+    próximas páginas são pedidas em janelas concorrentes (1, 2, 4, ... até
+    `janela_max` offsets por vez) sob o mesmo semáforo. A busca para na
+    primeira página vazia, incompleta (`len(items) < page_size`) ou com
+    `hasMore` falso, sem a requisição extra que confirmava o fim.
+
+    Se `builder` (ex.: `MscFrameBuilder`) for informado, as páginas são
+    acumuladas nele e a função retorna o próprio builder.
+    """
+    url = f"{API_ROOT}/{path}"
+
+    def _params(offset):
         q = dict(params)
         q.update({"offset": offset, "limit": page_size})
-        items = await _request_json(client, f"{API_ROOT}/{path}", q, sem)
-        if not items:
-            break
-        frames.append(pd.DataFrame(items))
-        offset += page_size
+        return q
+
+    items, has_more = await _request_page(url, _params(0), sem)
+    paginas = [items]
+    offset, janela = page_size, 1
+    while _tem_proxima_pagina(items, has_more, page_size):
         if delay:  # para ser gentil com a API
             await asyncio.sleep(delay)
+        offsets = [offset + i * page_size for i in range(janela)]
+        resultados = await asyncio.gather(*(_request_page(url, _params(o), sem) for o in offsets))
+        for items, has_more in resultados:
+            paginas.append(items)
+            if not _tem_proxima_pagina(items, has_more, page_size):
+                break
+        offset = offsets[-1] + page_size
+        janela = min(janela * 2, janela_max)
+
+    if builder is not None:
+        for p in paginas:
+            builder.append(p)
+        return builder
+
+    frames = [pd.DataFrame(p) for p in paginas if p]
     return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
 
 
-async def fetch_once(client, path, params, sem=None):
-    items = await _request_json(client, f"{API_ROOT}/{path}", params, sem)
+async def fetch_once(path, params, sem=None):
+    items = await _request_json(f"{API_ROOT}/{path}", params, sem)
     return pd.DataFrame(items)
 
 
-async def load_msc_group(client, path, classes, co_tipo_matriz, tipos_balanco, meses, ente, ano, sem, delay=0.0):
+async def load_msc_group(path, classes, co_tipo_matriz, tipos_balanco, meses, ente, ano, sem, delay=0.0):
     tasks = []
     for classe in map(str, classes):
         for tipo in tipos_balanco:
@@ -62,22 +210,29 @@ async def load_msc_group(client, path, classes, co_tipo_matriz, tipos_balanco, m
                     "classe_conta": classe,
                     "id_tv": tipo,
                 }
-                tasks.append(fetch_paginated(client, path, params, sem=sem, delay=delay))
-    dfs = await asyncio.gather(*tasks)
-    return pd.concat([df for df in dfs if not df.empty], ignore_index=True) if dfs else pd.DataFrame()
+                tasks.append(fetch_paginated(path, params, sem=sem, delay=delay, builder=MscFrameBuilder()))
+    builders = await asyncio.gather(*tasks)
+    return MscFrameBuilder().merge(*builders).build()
 
 
-async def load_msc_all(ente, ano, meses, tipos_balanco, co_tipo_matriz="MSCC", concurrency=8, delay=0.05):
-    sem = asyncio.Semaphore(concurrency)
-    async with httpx.AsyncClient(http2=True) as client:
-        msc_patrimonial = await load_msc_group(client, "msc_patrimonial", [1, 2, 3, 4], co_tipo_matriz, tipos_balanco, meses, ente, ano, sem, delay)
-        msc_orcam = await load_msc_group(client, "msc_orcamentaria", [5, 6], co_tipo_matriz, tipos_balanco, meses, ente, ano, sem, delay)
-        msc_ctr = await load_msc_group(client, "msc_controle", [7, 8], co_tipo_matriz, tipos_balanco, meses, ente, ano, sem, delay)
+async def load_msc_all(ente, ano, meses, tipos_balanco, co_tipo_matriz="MSCC", concurrency=8, delay=0.05, sem=None):
+    """
+    Carrega os três grupos da MSC (patrimonial, orçamentária e controle) em paralelo.
+    `sem` permite compartilhar o orçamento de concorrência com outras cargas;
+    quando omitido, é criado localmente. As conexões são sempre as do pool de
+    `core.http_siconfi`.
+    """
+    sem = sem or asyncio.Semaphore(concurrency)
+    msc_patrimonial, msc_orcam, msc_ctr = await asyncio.gather(
+        load_msc_group("msc_patrimonial", [1, 2, 3, 4], co_tipo_matriz, tipos_balanco, meses, ente, ano, sem, delay),
+        load_msc_group("msc_orcamentaria", [5, 6], co_tipo_matriz, tipos_balanco, meses, ente, ano, sem, delay),
+        load_msc_group("msc_controle", [7, 8], co_tipo_matriz, tipos_balanco, meses, ente, ano, sem, delay),
+    )
     return msc_patrimonial, msc_orcam, msc_ctr
 
 
-async def load_dca(ente, ano, concurrency=8):
-    sem = asyncio.Semaphore(concurrency)
+async def load_dca(ente, ano, concurrency=8, sem=None):
+    sem = sem or asyncio.Semaphore(concurrency)
     anexos = {
         "ab": "DCA-Anexo I-AB",
         "c":  "DCA-Anexo I-C",
@@ -87,21 +242,20 @@ async def load_dca(ente, ano, concurrency=8):
         "g":  "DCA-Anexo I-G",
         "hi": "DCA-Anexo I-HI",
     }
-    async with httpx.AsyncClient(http2=True) as client:
-        tasks = {
-            k: fetch_once(client, "dca", {"an_exercicio": ano, "no_anexo": v, "id_ente": ente}, sem=sem)
-            for k, v in anexos.items()
-        }
-        results = await asyncio.gather(*tasks.values())
+    tasks = {
+        k: fetch_once("dca", {"an_exercicio": ano, "no_anexo": v, "id_ente": ente}, sem=sem)
+        for k, v in anexos.items()
+    }
+    results = await asyncio.gather(*tasks.values())
     return dict(zip(tasks.keys(), results))
 
 
-async def load_rreo(ente, ano, tipo_relatorio="Completo", concurrency=8):
+async def load_rreo(ente, ano, tipo_relatorio="Completo", concurrency=8, sem=None):
     """
     Carrega RREO da API.
     tipo_relatorio: "Completo" ou "Simplificado" (apenas para Municípios)
     """
-    sem = asyncio.Semaphore(concurrency)
+    sem = sem or asyncio.Semaphore(concurrency)
     anexos = {
         "1": "RREO-Anexo 01",
         "2": "RREO-Anexo 02",
@@ -118,13 +272,12 @@ async def load_rreo(ente, ano, tipo_relatorio="Completo", concurrency=8):
     co_tipo_demo = "RREO Simplificado" if tipo_relatorio == "Simplificado" else "RREO"
 
     base = {"an_exercicio": ano, "nr_periodo": 6, "co_tipo_demonstrativo": co_tipo_demo, "id_ente": ente}
-    async with httpx.AsyncClient(http2=True) as client:
-        tasks = {k: fetch_once(client, "rreo", base | {"no_anexo": v}, sem=sem) for k, v in anexos.items()}
-        results = await asyncio.gather(*tasks.values())
+    tasks = {k: fetch_once("rreo", base | {"no_anexo": v}, sem=sem) for k, v in anexos.items()}
+    results = await asyncio.gather(*tasks.values())
     return dict(zip(tasks.keys(), results))
 
 
-async def load_rgf(ente, ano, tipo_ente="E", tipo_relatorio="Completo", concurrency=8):
+async def load_rgf(ente, ano, tipo_ente="E", tipo_relatorio="Completo", concurrency=8, sem=None):
     """
     Carrega RGF da API.
     tipo_ente: "E" (Estado) ou "M" (Município)
@@ -135,7 +288,7 @@ async def load_rgf(ente, ano, tipo_ente="E", tipo_relatorio="Completo", concurre
     - Municípios Completo: Quadrimestral (Q), período 3, poderes E e L
     - Municípios Simplificado: Semestral (S), período 2, poderes E e L
     """
-    sem = asyncio.Semaphore(concurrency)
+    sem = sem or asyncio.Semaphore(concurrency)
 
     if tipo_ente == "E":
         periodicidade = "Q"
@@ -157,24 +310,23 @@ async def load_rgf(ente, ano, tipo_ente="E", tipo_relatorio="Completo", concurre
         a1_poderes = {"1e": "E", "1l": "L"}
         outros = {"2e": ("RGF-Anexo 02", "E"), "3e": ("RGF-Anexo 03", "E"), "4e": ("RGF-Anexo 04", "E")}
 
-    async with httpx.AsyncClient(http2=True) as client:
-        tasks = {}
-        for k, poder in a5_poderes.items():
-            tasks[k] = fetch_once(client, "rgf",
-                                  {"an_exercicio": ano, "in_periodicidade": periodicidade, "nr_periodo": periodo,
-                                   "co_tipo_demonstrativo": co_tipo_demo, "no_anexo": "RGF-Anexo 05",
-                                   "co_poder": poder, "id_ente": ente}, sem=sem)
-        for k, poder in a1_poderes.items():
-            tasks[k] = fetch_once(client, "rgf",
-                                  {"an_exercicio": ano, "in_periodicidade": periodicidade, "nr_periodo": periodo,
-                                   "co_tipo_demonstrativo": co_tipo_demo, "no_anexo": "RGF-Anexo 01",
-                                   "co_poder": poder, "id_ente": ente}, sem=sem)
-        for k, (anexo, poder) in outros.items():
-            tasks[k] = fetch_once(client, "rgf",
-                                  {"an_exercicio": ano, "in_periodicidade": periodicidade, "nr_periodo": periodo,
-                                   "co_tipo_demonstrativo": co_tipo_demo, "no_anexo": anexo,
-                                   "co_poder": poder, "id_ente": ente}, sem=sem)
-        results = await asyncio.gather(*tasks.values())
+    tasks = {}
+    for k, poder in a5_poderes.items():
+        tasks[k] = fetch_once("rgf",
+                              {"an_exercicio": ano, "in_periodicidade": periodicidade, "nr_periodo": periodo,
+                               "co_tipo_demonstrativo": co_tipo_demo, "no_anexo": "RGF-Anexo 05",
+                               "co_poder": poder, "id_ente": ente}, sem=sem)
+    for k, poder in a1_poderes.items():
+        tasks[k] = fetch_once("rgf",
+                              {"an_exercicio": ano, "in_periodicidade": periodicidade, "nr_periodo": periodo,
+                               "co_tipo_demonstrativo": co_tipo_demo, "no_anexo": "RGF-Anexo 01",
+                               "co_poder": poder, "id_ente": ente}, sem=sem)
+    for k, (anexo, poder) in outros.items():
+        tasks[k] = fetch_once("rgf",
+                              {"an_exercicio": ano, "in_periodicidade": periodicidade, "nr_periodo": periodo,
+                               "co_tipo_demonstrativo": co_tipo_demo, "no_anexo": anexo,
+                               "co_poder": poder, "id_ente": ente}, sem=sem)
+    results = await asyncio.gather(*tasks.values())
     return dict(zip(tasks.keys(), results))
 
 ####################################################################################################3
@@ -213,20 +365,31 @@ def load_base_ranking(tipo_ente, caminho_base_estados, caminho_base_municipios):
 
 # PEGAR A BASE DE EXTRATO DE ENTREGAS
 @st.cache_data(show_spinner=False, ttl=3600)
+@voo_unico()
 def get_extratos(ente: str, ano: int, page_size: int = 5000) -> pd.DataFrame:
     """
     Busca todos os registros de extrato na API SICONFI usando paginação.
     O resultado é cacheado por (ente, ano, page_size).
     TTL = 3600 segundos (1 hora)
+    Cada página também passa pelo cache em disco (`response_cache`).
+    Chamadas simultâneas com os mesmos argumentos (outras sessões) aguardam a
+    primeira (`core.voo_unico`).
     """
     url = f"{API_ROOT}/extrato_entregas"
     frames = []
     offset = 0
     while True:
         params = {"id_ente": ente, "an_referencia": ano, "limit": page_size, "offset": offset}
-        r = httpx.get(url, params=params, timeout=60)
-        r.raise_for_status()
-        items = r.json().get("items", [])
+        entrada = response_cache.ler("extrato_entregas", params)
+        if entrada is not None and entrada["fresca"]:
+            items = entrada["items"]
+        else:
+            r = http_siconfi.get(url, params=params, timeout=60)
+            r.raise_for_status()
+            data = r.json()
+            items = data.get("items", [])
+            response_cache.gravar("extrato_entregas", params, items,
+                                  etag=r.headers.get("ETag"), has_more=data.get("hasMore"))
         if not items:
             break
         frames.append(pd.DataFrame(items))
@@ -237,11 +400,17 @@ def get_extratos(ente: str, ano: int, page_size: int = 5000) -> pd.DataFrame:
 
 # PEGAR TODOS OS DEMONSTRATIVOS
 @st.cache_data(ttl=43200, show_spinner=False)  # Cache por 12 horas
+@voo_unico()
 def load_all_data_cached(ente, ano, meses, tipos_balanco, tipo_ente="E", tipo_relatorio="Completo",
                          carregar_msce=True, carregar_dca=True, carregar_rreo=True, carregar_rgf=True):
     """
     Carrega todos os dados da API com cache.
     TTL = 43200 segundos (12 horas)
+    Abaixo deste cache em memória, cada página da API é persistida em disco
+    (`response_cache`), então reinícios e `st.cache_data.clear()` não
+    forçam o download completo novamente.
+    Sessões que pedem a mesma carga ao mesmo tempo aguardam a primeira
+    (`core.voo_unico`) e acompanham o mesmo progresso (`reportar`).
 
     Parâmetros:
     - ente: código do ente
@@ -255,38 +424,54 @@ def load_all_data_cached(ente, ano, meses, tipos_balanco, tipo_ente="E", tipo_re
     - carregar_rreo: se True, carrega RREO
     - carregar_rgf: se True, carrega RGF
     """
-    async def _load_all():
-        if meses:
-            msc_patrimonial, msc_orcam, msc_ctr = await load_msc_all(
-                ente, ano, meses, tipos_balanco, co_tipo_matriz="MSCC", concurrency=8, delay=0.05
-            )
-        else:
-            msc_patrimonial, msc_orcam, msc_ctr = pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+    async def _vazio(valor):
+        return valor
 
-        if carregar_msce:
-            msc_patrimonial_encerr, msc_orcam_encerr, msc_ctr_encerr = await load_msc_all(
-                ente, ano, [12], tipos_balanco, co_tipo_matriz="MSCE", concurrency=8, delay=0.05
-            )
-        else:
-            msc_patrimonial_encerr, msc_orcam_encerr, msc_ctr_encerr = pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+    async def _com_progresso(tarefas):
+        # progresso compartilhado: fração de demonstrativos concluídos
+        nomes = {'mscc': 'MSC', 'msce': 'MSC de encerramento', 'dca': 'DCA', 'rreo': 'RREO', 'rgf': 'RGF'}
+        concluidas = 0
 
-        if carregar_dca:
-            dca = await load_dca(ente, ano)
-        else:
-            dca = {k: pd.DataFrame() for k in ['ab', 'c', 'd', 'e', 'f', 'g', 'hi']}
+        async def _acompanhar(nome, coro):
+            nonlocal concluidas
+            resultado = await coro
+            concluidas += 1
+            reportar(concluidas / len(tarefas), f"Carregado: {nomes[nome]} ({concluidas}/{len(tarefas)})")
+            return resultado
 
-        if carregar_rreo:
-            rreo = await load_rreo(ente, ano, tipo_relatorio=tipo_relatorio)
-        else:
-            rreo = {k: pd.DataFrame() for k in ['1', '2', '3', '4', '4_rpps', '4_rgps', '6', '7', '9', '11', '14']}
+        reportar(0.0, "Carregando demonstrativos…")
+        return await asyncio.gather(*(_acompanhar(nome, coro) for nome, coro in tarefas.items()))
 
+    async def _load_all():
+        # Plano único de carga: um orçamento de concorrência para todos os demonstrativos,
+        # disparados juntos (não há dependência entre eles), sobre o pool de conexões
+        # compartilhado de `core.http_siconfi`.
+        # A latência total passa a ser a do grupo mais lento, não a soma dos grupos.
+        sem = asyncio.Semaphore(CONCORRENCIA_GLOBAL)
+        msc_vazia = (pd.DataFrame(), pd.DataFrame(), pd.DataFrame())
+        tarefas = {
+            'mscc': (load_msc_all(ente, ano, meses, tipos_balanco, co_tipo_matriz="MSCC", delay=0.05,
+                                  sem=sem)
+                     if meses else _vazio(msc_vazia)),
+            'msce': (load_msc_all(ente, ano, [12], tipos_balanco, co_tipo_matriz="MSCE", delay=0.05,
+                                  sem=sem)
+                     if carregar_msce else _vazio(msc_vazia)),
+            'dca': (load_dca(ente, ano, sem=sem)
+                    if carregar_dca else _vazio({k: pd.DataFrame() for k in ['ab', 'c', 'd', 'e', 'f', 'g', 'hi']})),
+            'rreo': (load_rreo(ente, ano, tipo_relatorio=tipo_relatorio, sem=sem)
+                     if carregar_rreo else _vazio({k: pd.DataFrame() for k in ['1', '2', '3', '4', '4_rpps', '4_rgps', '6', '7', '9', '11', '14']})),
+        }
         if carregar_rgf:
-            rgf = await load_rgf(ente, ano, tipo_ente=tipo_ente, tipo_relatorio=tipo_relatorio)
+            tarefas['rgf'] = load_rgf(ente, ano, tipo_ente=tipo_ente, tipo_relatorio=tipo_relatorio, sem=sem)
+        elif tipo_ente == "E":
+            tarefas['rgf'] = _vazio({k: pd.DataFrame() for k in ['5e', '5l', '5j', '5m', '5d', '1e', '1l', '1j', '1m', '1d', '2e', '3e', '4e']})
         else:
-            if tipo_ente == "E":
-                rgf = {k: pd.DataFrame() for k in ['5e', '5l', '5j', '5m', '5d', '1e', '1l', '1j', '1m', '1d', '2e', '3e', '4e']}
-            else:
-                rgf = {k: pd.DataFrame() for k in ['5e', '5l', '1e', '1l', '2e', '3e', '4e']}
+            tarefas['rgf'] = _vazio({k: pd.DataFrame() for k in ['5e', '5l', '1e', '1l', '2e', '3e', '4e']})
+
+        resultados = dict(zip(tarefas.keys(), await _com_progresso(tarefas)))
+
+        msc_patrimonial, msc_orcam, msc_ctr = resultados['mscc']
+        msc_patrimonial_encerr, msc_orcam_encerr, msc_ctr_encerr = resultados['msce']
 
         return {
             'msc_patrimonial': msc_patrimonial,
@@ -295,9 +480,9 @@ def load_all_data_cached(ente, ano, meses, tipos_balanco, tipo_ente="E", tipo_re
             'msc_patrimonial_encerr': msc_patrimonial_encerr,
             'msc_orcam_encerr': msc_orcam_encerr,
             'msc_ctr_encerr': msc_ctr_encerr,
-            'dca': dca,
-            'rreo': rreo,
-            'rgf': rgf
+            'dca': resultados['dca'],
+            'rreo': resultados['rreo'],
+            'rgf': resultados['rgf']
         }
 
     return asyncio.run(_load_all())
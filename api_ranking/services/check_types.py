@@ -1,3 +1,32 @@
+import pandas as pd
+
+# Padrões (regex, sem diferenciar maiúsculas) do campo `entregavel` de cada demonstrativo
+PADROES_ENTREGAVEL = {
+    'msc': 'MSC Agregada',
+    'msc_encerramento': 'MSC Encerramento',
+    'dca': 'Balanço Anual|DCA',
+    'rreo': 'RREO|Resumido de Execução Orçamentária',
+    'rgf': 'RGF|Gestão Fiscal',
+}
+
+# Padrões do campo `instituicao` que separam o RGF por poder
+PADROES_INSTITUICAO = {
+    'rgf_exec': 'Executivo|Prefeitura|Governo',
+    'rgf_leg': 'Legislativ|Câmara|Assembl',
+}
+
+
+def contem(serie, padrao, case=False, regex=True):
+    """
+    Equivale a `serie.str.contains(padrao, case=case, na=False)`, mas avalia o
+    padrão apenas uma vez por valor distinto (o extrato repete poucos textos
+    em muitas linhas).
+    """
+    unicos = pd.unique(serie)
+    encontrados = pd.Series(unicos, dtype=object).str.contains(padrao, case=case, regex=regex, na=False)
+    return serie.isin(unicos[encontrados.to_numpy(dtype=bool)])
+
+
 #############################################################################
 # FUNÇÃO: VERIFICAR TIPO DE RELATÓRIO (Simplificado ou Completo)
 #############################################################################
@@ -18,13 +47,104 @@ def detectar_tipo_relatorio(df_extrato):
     if 'entregavel' not in df_extrato.columns:
         return None
 
-    entregaveis = df_extrato['entregavel'].dropna().unique()
-    for entregavel in entregaveis:
-        if 'Simplificado' in str(entregavel):
-            return 'Simplificado'
+    entregaveis = df_extrato['entregavel'].dropna().astype(str)
+    if contem(entregaveis, 'Simplificado', case=True, regex=False).any():
+        return 'Simplificado'
     return 'Completo'
 
 
+#############################################################################
+# FUNÇÃO: RESUMIR O EXTRATO POR DEMONSTRATIVO
+#############################################################################
+
+def _resumo_vazio():
+    return dict.fromkeys([*PADROES_ENTREGAVEL, *PADROES_INSTITUICAO, 'periodicidade'])
+
+
+def resumir_extratos(df_extrato, por=None):
+    """
+    Resume o extrato nos dados usados por `verificar_disponibilidade_demonstrativos`.
+
+    Cada resumo é um dict com:
+    - uma chave por demonstrativo (PADROES_ENTREGAVEL) e por poder do RGF
+      (PADROES_INSTITUICAO): None se não há linhas, senão a lista ordenada
+      dos períodos encontrados
+    - 'periodicidade': moda da periodicidade das linhas de RGF ('Q' se todas
+      vazias; None sem linhas de RGF ou sem a coluna)
+
+    Args:
+        df_extrato: DataFrame com os extratos de entregas
+        por: coluna que separa os entes (ex.: 'id_ente'). Sem ela, o frame
+             inteiro é resumido.
+
+    Returns:
+        dict de resumo; com `por`, dict {valor da coluna: resumo}
+    """
+    if (df_extrato is None or df_extrato.empty
+            or 'entregavel' not in df_extrato.columns or 'periodo' not in df_extrato.columns):
+        return {} if por else _resumo_vazio()
+
+    if not por:
+        return _resumir(df_extrato)
+
+    df = df_extrato.reset_index(drop=True)
+    grupos = df[por]
+    resumos = {grupo: _resumo_vazio() for grupo in pd.unique(grupos)}
+
+    def _periodos(chave, mascara):
+        for grupo in pd.unique(grupos[mascara]):
+            resumos[grupo][chave] = []
+        pares = pd.DataFrame({'grupo': grupos[mascara], 'periodo': df.loc[mascara, 'periodo']})
+        pares = pares.dropna(subset=['periodo']).drop_duplicates().sort_values(['grupo', 'periodo'])
+        for grupo, periodo in zip(pares['grupo'].tolist(), pares['periodo'].tolist()):
+            resumos[grupo][chave].append(periodo)
+
+    mascaras = {chave: contem(df['entregavel'], padrao) for chave, padrao in PADROES_ENTREGAVEL.items()}
+    for chave, mascara in mascaras.items():
+        _periodos(chave, mascara)
+
+    rgf = mascaras['rgf']
+    if 'periodicidade' in df.columns and rgf.any():
+        for grupo in pd.unique(grupos[rgf]):
+            resumos[grupo]['periodicidade'] = 'Q'
+        # moda por grupo (empate: menor valor, como `Series.mode`)
+        contagem = (pd.DataFrame({'grupo': grupos[rgf], 'periodicidade': df.loc[rgf, 'periodicidade']})
+                    .dropna().value_counts().rename('n').reset_index())
+        contagem = contagem.sort_values(['grupo', 'n', 'periodicidade'], ascending=[True, False, True])
+        for grupo, periodicidade in contagem.drop_duplicates('grupo')[['grupo', 'periodicidade']].itertuples(index=False):
+            resumos[grupo]['periodicidade'] = periodicidade
+
+    if 'instituicao' in df.columns:
+        for chave, padrao in PADROES_INSTITUICAO.items():
+            _periodos(chave, rgf & contem(df['instituicao'], padrao))
+
+    return resumos
+
+
+def _resumir(df):
+    """`resumir_extratos` de um único ente (frame pequeno: filtros diretos são mais baratos)."""
+    resumo = _resumo_vazio()
+
+    def _periodos(linhas):
+        return None if linhas.empty else sorted(linhas['periodo'].dropna().unique().tolist())
+
+    linhas = {chave: df[df['entregavel'].str.contains(padrao, case=False, na=False)]
+              for chave, padrao in PADROES_ENTREGAVEL.items()}
+    for chave, selecionadas in linhas.items():
+        resumo[chave] = _periodos(selecionadas)
+
+    rgf_df = linhas['rgf']
+    if not rgf_df.empty:
+        if 'periodicidade' in rgf_df.columns:
+            moda = rgf_df['periodicidade'].mode()
+            resumo['periodicidade'] = moda.iloc[0] if not moda.empty else 'Q'
+        if 'instituicao' in rgf_df.columns:
+            for chave, padrao in PADROES_INSTITUICAO.items():
+                resumo[chave] = _periodos(rgf_df[rgf_df['instituicao'].str.contains(padrao, case=False, na=False)])
+
+    return resumo
+
+
 #############################################################################
 # FUNÇÃO: VERIFICAR A DISPONIBILIDADE DE CADA DEMONSTRATIVO
 #############################################################################
@@ -46,6 +166,11 @@ def verificar_disponibilidade_demonstrativos(df_extrato, tipo_ente, tipo_relator
         - 'periodos': list de períodos encontrados
         - 'mensagem': str descritiva para exibição
     """
+    return disponibilidade_do_resumo(resumir_extratos(df_extrato), tipo_relatorio)
+
+
+def disponibilidade_do_resumo(resumo, tipo_relatorio):
+    """Monta o dict de `verificar_disponibilidade_demonstrativos` a partir de um resumo de `resumir_extratos`."""
     resultado = {
         'msc': {'disponivel': False, 'completo': False, 'periodos': [], 'mensagem': 'Não enviada'},
         'msc_encerramento': {'disponivel': False, 'completo': False, 'periodos': [], 'mensagem': 'Não enviada'},
@@ -56,15 +181,8 @@ def verificar_disponibilidade_demonstrativos(df_extrato, tipo_ente, tipo_relator
         'rgf_leg': {'disponivel': False, 'completo': False, 'periodos': [], 'mensagem': 'Não enviado'},
     }
 
-    if df_extrato is None or df_extrato.empty:
-        return resultado
-
-    if 'entregavel' not in df_extrato.columns or 'periodo' not in df_extrato.columns:
-        return resultado
-
-    msc_df = df_extrato[df_extrato['entregavel'].str.contains('MSC Agregada', case=False, na=False)]
-    if not msc_df.empty:
-        periodos_msc = sorted(msc_df['periodo'].dropna().unique().tolist())
+    if resumo['msc'] is not None:
+        periodos_msc = list(resumo['msc'])
         resultado['msc']['periodos'] = periodos_msc
         resultado['msc']['disponivel'] = len(periodos_msc) > 0
         resultado['msc']['completo'] = set(range(1, 13)).issubset(set(periodos_msc))
@@ -76,23 +194,20 @@ def verificar_disponibilidade_demonstrativos(df_extrato, tipo_ente, tipo_relator
             faltam_str = ', '.join(map(str, faltam))
             resultado['msc']['mensagem'] = f'Parcial: meses {meses_str} (falta: {faltam_str})'
 
-    msce_df = df_extrato[df_extrato['entregavel'].str.contains('MSC Encerramento', case=False, na=False)]
-    if not msce_df.empty:
+    if resumo['msc_encerramento'] is not None:
         resultado['msc_encerramento']['disponivel'] = True
         resultado['msc_encerramento']['completo'] = True
         resultado['msc_encerramento']['periodos'] = [1]
         resultado['msc_encerramento']['mensagem'] = 'Enviada'
 
-    dca_df = df_extrato[df_extrato['entregavel'].str.contains('Balanço Anual|DCA', case=False, na=False)]
-    if not dca_df.empty:
+    if resumo['dca'] is not None:
         resultado['dca']['disponivel'] = True
         resultado['dca']['completo'] = True
         resultado['dca']['periodos'] = [1]
         resultado['dca']['mensagem'] = 'Enviada'
 
-    rreo_df = df_extrato[df_extrato['entregavel'].str.contains('RREO|Resumido de Execução Orçamentária', case=False, na=False)]
-    if not rreo_df.empty:
-        periodos_rreo = sorted(rreo_df['periodo'].dropna().unique().tolist())
+    if resumo['rreo'] is not None:
+        periodos_rreo = list(resumo['rreo'])
         resultado['rreo']['periodos'] = periodos_rreo
         resultado['rreo']['disponivel'] = len(periodos_rreo) > 0
         resultado['rreo']['completo'] = 6 in periodos_rreo
@@ -104,14 +219,13 @@ def verificar_disponibilidade_demonstrativos(df_extrato, tipo_ente, tipo_relator
             faltam_str = ', '.join(map(str, faltam))
             resultado['rreo']['mensagem'] = f'Parcial: bimestres {bim_str} (falta: {faltam_str})'
 
-    rgf_df = df_extrato[df_extrato['entregavel'].str.contains('RGF|Gestão Fiscal', case=False, na=False)]
-    if not rgf_df.empty:
-        if 'periodicidade' in rgf_df.columns:
-            periodicidade = rgf_df['periodicidade'].mode().iloc[0] if not rgf_df['periodicidade'].mode().empty else 'Q'
+    if resumo['rgf'] is not None:
+        if resumo['periodicidade'] is not None:
+            periodicidade = resumo['periodicidade']
         else:
             periodicidade = 'S' if tipo_relatorio == 'Simplificado' else 'Q'
 
-        periodos_rgf = sorted(rgf_df['periodo'].dropna().unique().tolist())
+        periodos_rgf = list(resumo['rgf'])
         resultado['rgf']['periodos'] = periodos_rgf
         resultado['rgf']['disponivel'] = len(periodos_rgf) > 0
 
@@ -128,28 +242,25 @@ def verificar_disponibilidade_demonstrativos(df_extrato, tipo_ente, tipo_relator
             faltam_str = ', '.join(map(str, faltam))
             resultado['rgf']['mensagem'] = f'Parcial: {tipo_per} {per_str} (falta: {faltam_str})'
 
-        if 'instituicao' in rgf_df.columns:
-            rgf_exec = rgf_df[rgf_df['instituicao'].str.contains('Executivo|Prefeitura|Governo', case=False, na=False)]
-            if not rgf_exec.empty:
-                periodos_exec = sorted(rgf_exec['periodo'].dropna().unique().tolist())
-                resultado['rgf_exec']['periodos'] = periodos_exec
-                resultado['rgf_exec']['disponivel'] = len(periodos_exec) > 0
-                resultado['rgf_exec']['completo'] = ultimo_periodo_esperado in periodos_exec
-                if resultado['rgf_exec']['completo']:
-                    resultado['rgf_exec']['mensagem'] = 'Completo'
-                elif resultado['rgf_exec']['disponivel']:
-                    resultado['rgf_exec']['mensagem'] = f'Parcial: períodos {", ".join(map(str, periodos_exec))}'
-
-            rgf_leg = rgf_df[rgf_df['instituicao'].str.contains('Legislativ|Câmara|Assembl', case=False, na=False)]
-            if not rgf_leg.empty:
-                periodos_leg = sorted(rgf_leg['periodo'].dropna().unique().tolist())
-                resultado['rgf_leg']['periodos'] = periodos_leg
-                resultado['rgf_leg']['disponivel'] = len(periodos_leg) > 0
-                resultado['rgf_leg']['completo'] = ultimo_periodo_esperado in periodos_leg
-                if resultado['rgf_leg']['completo']:
-                    resultado['rgf_leg']['mensagem'] = 'Completo'
-                elif resultado['rgf_leg']['disponivel']:
-                    resultado['rgf_leg']['mensagem'] = f'Parcial: períodos {", ".join(map(str, periodos_leg))}'
+        if resumo['rgf_exec'] is not None:
+            periodos_exec = list(resumo['rgf_exec'])
+            resultado['rgf_exec']['periodos'] = periodos_exec
+            resultado['rgf_exec']['disponivel'] = len(periodos_exec) > 0
+            resultado['rgf_exec']['completo'] = ultimo_periodo_esperado in periodos_exec
+            if resultado['rgf_exec']['completo']:
+                resultado['rgf_exec']['mensagem'] = 'Completo'
+            elif resultado['rgf_exec']['disponivel']:
+                resultado['rgf_exec']['mensagem'] = f'Parcial: períodos {", ".join(map(str, periodos_exec))}'
+
+        if resumo['rgf_leg'] is not None:
+            periodos_leg = list(resumo['rgf_leg'])
+            resultado['rgf_leg']['periodos'] = periodos_leg
+            resultado['rgf_leg']['disponivel'] = len(periodos_leg) > 0
+            resultado['rgf_leg']['completo'] = ultimo_periodo_esperado in periodos_leg
+            if resultado['rgf_leg']['completo']:
+                resultado['rgf_leg']['mensagem'] = 'Completo'
+            elif resultado['rgf_leg']['disponivel']:
+                resultado['rgf_leg']['mensagem'] = f'Parcial: períodos {", ".join(map(str, periodos_leg))}'
 
     return resultado
 
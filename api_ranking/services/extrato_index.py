@@ -0,0 +1,437 @@
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from api_ranking.services.check_types import contem, disponibilidade_do_resumo, resumir_extratos
+from core import http_siconfi
+
+#############################################################################
+####  Índice local do extrato de entregas (todos os entes de um ano)  ####
+#############################################################################
+#
+# O Ranking consulta o `extrato_entregas` ente a ente. A sincronização baixa o
+# extrato de todos os entes do exercício (lista do endpoint `entes`) e grava
+# uma única tabela Parquet por ano em INDICE_DIR, ordenada por
+#
+#   (id_ente, entregavel, periodo)
+#
+# Em memória, `IndiceExtratos` guarda a faixa de linhas de cada ente e o
+# resumo de disponibilidade de todos os entes (calculado de uma vez, de forma
+# vetorizada, por `check_types.resumir_extratos`). Extrato, tipo de relatório
+# e disponibilidade de um ente passam a ser consultas em dicionário.
+#
+# Feed de mudanças: a cada sincronização, as linhas de cada ente são
+# comparadas com as da sincronização anterior; entes com entregas novas ou
+# alteradas (homologação, retificação) são registrados em
+# `mudancas_{ano}.parquet` (`mudancas` / `entes_alterados`).
+#
+# Uso:
+#   python -m api_ranking.services.extrato_index --ano 2025      # sincroniza (cron)
+#
+#   indice = indice_atual(2025)  # None se ausente/antigo (aí a página consulta a API)
+#   if indice is not None and "33" in indice:
+#       indice.extrato("33"); indice.tipo_relatorio("33")
+#       indice.disponibilidade("33", "E", "Completo")
+
+INDICE_DIR = os.environ.get("SICONFI_EXTRATOS_DIR", os.path.join(".cache", "extratos"))
+# Idade máxima (s) do índice para substituir a consulta direta à API (mesmo TTL do `get_extratos`)
+TTL_INDICE = int(os.environ.get("SICONFI_EXTRATOS_TTL", "3600"))
+# Requisições simultâneas da sincronização (baixa, para não disputar o cliente com as páginas)
+CONCORRENCIA = int(os.environ.get("SICONFI_EXTRATOS_CONCORRENCIA", "4"))
+# Se "1", as páginas disparam a sincronização em segundo plano de um índice ausente ou
+# antigo. Padrão: só a linha de comando (cron) sincroniza, já que cada sincronização
+# consulta o extrato de todos os entes
+SINCRONIZAR_AUTO = os.environ.get("SICONFI_EXTRATOS_AUTO", "0") == "1"
+PAGE_SIZE = 5000
+
+CHAVE = ["id_ente", "entregavel", "periodo"]
+
+_lock = threading.Lock()
+_indices = {}          # ano -> (mtime, IndiceExtratos)
+_sincronizacoes = {}   # ano -> Thread
+_situacao = {}         # ano -> {'progresso': (feitos, total), 'erro': str | None}
+
+
+def _arquivo(ano):
+    return os.path.join(INDICE_DIR, f"extratos_{int(ano)}.parquet")
+
+
+def _arquivo_mudancas(ano):
+    return os.path.join(INDICE_DIR, f"mudancas_{int(ano)}.parquet")
+
+
+def _estavel(ano, sincronizado_em):
+    """Sincronizado com o exercício já encerrado (mesma regra de `response_cache.exercicio_encerrado`)."""
+    return int(ano) < datetime.fromtimestamp(sincronizado_em).year - 1
+
+
+#############################################################################
+####  Índice em memória  ####
+#############################################################################
+
+class IndiceExtratos:
+    """
+    Extrato de entregas de todos os entes de um ano (somente leitura).
+
+    Attributes:
+        ano: exercício
+        tabela: linhas de todos os entes, ordenadas por CHAVE
+        sincronizado_em: instante (epoch) da sincronização
+        entes: entes sincronizados (inclusive os sem nenhuma entrega)
+    """
+
+    def __init__(self, ano, tabela, sincronizado_em, entes):
+        self.ano = int(ano)
+        self.tabela = tabela
+        self.sincronizado_em = float(sincronizado_em)
+        self.entes = frozenset(entes)
+
+        ids = tabela["id_ente"].to_numpy() if not tabela.empty else np.empty(0, dtype=object)
+        inicios = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]]) if len(ids) else np.empty(0, dtype=int)
+        fins = np.r_[inicios[1:], len(ids)]
+        self._faixas = {ids[i]: (int(i), int(f)) for i, f in zip(inicios, fins)}
+        self._resumos = resumir_extratos(tabela, por="id_ente")
+        entregaveis = tabela["entregavel"].astype(str) if "entregavel" in tabela.columns else pd.Series(dtype=str)
+        simplificados = tabela["entregavel"].notna() & contem(entregaveis, "Simplificado", case=True, regex=False)
+        self._simplificados = frozenset(tabela.loc[simplificados, "id_ente"]) if len(tabela) else frozenset()
+
+    def __contains__(self, ente):
+        return str(ente) in self.entes
+
+    def __len__(self):
+        return len(self.tabela)
+
+    @property
+    def idade(self):
+        return time.time() - self.sincronizado_em
+
+    def fresco(self, max_idade=None):
+        max_idade = TTL_INDICE if max_idade is None else max_idade
+        return self.idade <= max_idade or _estavel(self.ano, self.sincronizado_em)
+
+    def extrato(self, ente):
+        """Extrato do ente (cópia, colunas da API), ou None se o ente não foi sincronizado."""
+        ente = str(ente)
+        if ente not in self.entes:
+            return None
+        inicio, fim = self._faixas.get(ente, (0, 0))
+        return self.tabela.iloc[inicio:fim].drop(columns="id_ente").reset_index(drop=True)
+
+    def tipo_relatorio(self, ente):
+        """Mesmo resultado de `detectar_tipo_relatorio(extrato)`."""
+        ente = str(ente)
+        if ente not in self._faixas:
+            return None
+        return "Simplificado" if ente in self._simplificados else "Completo"
+
+    def disponibilidade(self, ente, tipo_ente, tipo_relatorio):
+        """Mesmo resultado de `verificar_disponibilidade_demonstrativos(extrato, tipo_ente, tipo_relatorio)`."""
+        resumo = self._resumos.get(str(ente)) or resumir_extratos(None)
+        return disponibilidade_do_resumo(resumo, tipo_relatorio)
+
+
+def carregar_indice(ano):
+    """Índice gravado do ano (recarregado quando o arquivo muda), ou None se não houver."""
+    arquivo = _arquivo(ano)
+    try:
+        mtime = os.stat(arquivo).st_mtime
+    except OSError:
+        return None
+    with _lock:
+        atual = _indices.get(int(ano))
+    if atual is not None and atual[0] == mtime:
+        return atual[1]
+    try:
+        tabela = pq.read_table(arquivo)
+    except (OSError, pa.ArrowException):
+        return None
+    meta = {k.decode(): v.decode() for k, v in (tabela.schema.metadata or {}).items()}
+    tabela = tabela.to_pandas()
+    entes = [e for e in meta.get("entes", "").split(",") if e]
+    indice = IndiceExtratos(ano, tabela, float(meta.get("sincronizado_em", mtime)), entes)
+    with _lock:
+        _indices[int(ano)] = (mtime, indice)
+    return indice
+
+
+def indice_atual(ano, max_idade=None, sincronizar=False):
+    """
+    Índice do ano se ele existir e estiver dentro de `max_idade` (padrão
+    TTL_INDICE; exercícios encerrados não expiram); senão None.
+
+    Com `sincronizar=True` (e SINCRONIZAR_AUTO), um índice ausente ou antigo
+    dispara a sincronização em segundo plano.
+    """
+    indice = carregar_indice(ano)
+    fresco = indice is not None and indice.fresco(max_idade)
+    if not fresco and sincronizar and SINCRONIZAR_AUTO:
+        sincronizar_em_segundo_plano(ano)
+    return indice if fresco else None
+
+
+def extrato_do_ente(ente, ano, sincronizar=True):
+    """Extrato do ente pelo índice (DataFrame), ou None quando é preciso consultar a API."""
+    indice = indice_atual(ano, sincronizar=sincronizar)
+    return None if indice is None else indice.extrato(ente)
+
+
+#############################################################################
+####  Sincronização  ####
+#############################################################################
+
+async def _paginas(path, params, sem):
+    frames, offset = [], 0
+    while True:
+        async with sem:
+            resp = await http_siconfi.get_async(f"{http_siconfi.API_ROOT}/{path}",
+                                                params=dict(params, offset=offset, limit=PAGE_SIZE),
+                                                timeout=60.0, retries=6)
+        resp.raise_for_status()
+        items = resp.json().get("items", [])
+        if not items:
+            break
+        frames.append(pd.DataFrame(items))
+        if len(items) < PAGE_SIZE:
+            break
+        offset += PAGE_SIZE
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+async def _listar_entes(sem):
+    entes = await _paginas("entes", {}, sem)
+    if entes.empty or "cod_ibge" not in entes.columns:
+        return []
+    return list(dict.fromkeys(str(c) for c in entes["cod_ibge"].dropna()))
+
+
+async def _baixar(entes, ano, concorrencia, progresso):
+    sem = asyncio.Semaphore(concorrencia)
+    if entes is None:
+        entes = await _listar_entes(sem)
+    feitos = [0]
+
+    async def _ente(ente):
+        try:
+            return await _paginas("extrato_entregas", {"id_ente": ente, "an_referencia": int(ano)}, sem)
+        finally:
+            feitos[0] += 1
+            if progresso is not None:
+                progresso(feitos[0], len(entes))
+
+    resultados = await asyncio.gather(*(_ente(e) for e in entes), return_exceptions=True)
+    return dict(zip(entes, resultados))
+
+
+def _montar_tabela(frames):
+    frames = [df.assign(id_ente=ente) for ente, df in frames.items() if not df.empty]
+    if not frames:
+        return pd.DataFrame(columns=CHAVE)
+    tabela = pd.concat(frames, ignore_index=True)
+    ordem = [c for c in CHAVE if c in tabela.columns]
+    return tabela.sort_values(ordem, kind="stable", na_position="last").reset_index(drop=True)
+
+
+def _hashes(tabela):
+    colunas = sorted(c for c in tabela.columns if c != "id_ente")
+    return pd.util.hash_pandas_object(tabela[colunas].astype(str), index=False)
+
+
+def _mudancas(anterior, tabela, sincronizado_em):
+    """Linhas (por ente) novas ou alteradas em relação à sincronização anterior."""
+    colunas = ["id_ente", "novas", "entregaveis", "sincronizado_em", "sincronizacao_anterior"]
+    if anterior is None or tabela.empty:
+        return pd.DataFrame(columns=colunas)
+    atuais = tabela.assign(_hash=_hashes(tabela).to_numpy())
+    atuais = atuais[atuais["id_ente"].isin(anterior.entes)]
+    if not anterior.tabela.empty:
+        antes = anterior.tabela[["id_ente"]].assign(_hash=_hashes(anterior.tabela).to_numpy())
+        atuais = atuais.merge(antes.drop_duplicates(), on=["id_ente", "_hash"], how="left", indicator=True)
+        atuais = atuais[atuais["_merge"] == "left_only"]
+    if atuais.empty:
+        return pd.DataFrame(columns=colunas)
+    entregaveis = atuais["entregavel"].astype(str) if "entregavel" in atuais.columns else pd.Series("", index=atuais.index)
+    feed = (atuais.assign(entregavel=entregaveis).groupby("id_ente", sort=True)
+            .agg(novas=("_hash", "size"), entregaveis=("entregavel", lambda s: "; ".join(sorted(set(s)))))
+            .reset_index())
+    feed["sincronizado_em"] = pd.Timestamp(sincronizado_em, unit="s")
+    feed["sincronizacao_anterior"] = pd.Timestamp(anterior.sincronizado_em, unit="s")
+    return feed[colunas]
+
+
+def _gravar(tabela, arquivo, metadata=None):
+    tabela = pa.Table.from_pandas(tabela, preserve_index=False)
+    if metadata:
+        tabela = tabela.replace_schema_metadata({**(tabela.schema.metadata or {}),
+                                                 **{k.encode(): v.encode() for k, v in metadata.items()}})
+    os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(arquivo), suffix=".tmp")
+    os.close(fd)
+    try:
+        pq.write_table(tabela, tmp, compression="zstd")
+        os.replace(tmp, arquivo)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def sincronizar(ano, entes=None, concorrencia=None, progresso=None):
+    """
+    Baixa o extrato de entregas de todos os entes do ano e grava o índice.
+
+    Entes cuja consulta falha mantêm as linhas da sincronização anterior.
+
+    Args:
+        ano: exercício
+        entes: códigos IBGE (padrão: todos os entes do endpoint `entes`)
+        concorrencia: requisições simultâneas (padrão: CONCORRENCIA)
+        progresso: callable(feitos, total) chamado a cada ente consultado
+
+    Returns:
+        Tupla (indice, mudancas, falhas): o novo `IndiceExtratos`, as linhas
+        adicionadas ao feed nesta sincronização e dict ente -> erro.
+    """
+    ano = int(ano)
+    entes = None if entes is None else list(dict.fromkeys(str(e) for e in entes))
+    resultados = asyncio.run(_baixar(entes, ano, concorrencia or CONCORRENCIA, progresso))
+    sincronizado_em = time.time()
+
+    anterior = carregar_indice(ano)
+    falhas = {e: repr(r) for e, r in resultados.items() if isinstance(r, BaseException)}
+    frames = {e: r for e, r in resultados.items() if not isinstance(r, BaseException)}
+    if anterior is not None:
+        for ente in falhas:
+            if ente in anterior:
+                frames[ente] = anterior.extrato(ente)
+        # entes fora desta lista (sincronização parcial) continuam no índice
+        for ente in anterior.entes - set(resultados):
+            frames[ente] = anterior.extrato(ente)
+    if not frames:
+        raise RuntimeError(f"Nenhum extrato obtido para {ano}: {next(iter(falhas.values()), 'sem entes')}")
+
+    tabela = _montar_tabela(frames)
+    mudancas = _mudancas(anterior, tabela, sincronizado_em)
+    _gravar(tabela, _arquivo(ano), {"sincronizado_em": repr(sincronizado_em),
+                                    "entes": ",".join(sorted(frames))})
+    if not mudancas.empty:
+        arquivo = _arquivo_mudancas(ano)
+        historico = pq.read_table(arquivo).to_pandas() if os.path.exists(arquivo) else None
+        _gravar(pd.concat([historico, mudancas], ignore_index=True) if historico is not None else mudancas, arquivo)
+
+    with _lock:
+        _indices.pop(ano, None)
+    return carregar_indice(ano), mudancas, falhas
+
+
+def _sincronizar_em_thread(ano):
+    def progresso(feitos, total):
+        _situacao[ano]["progresso"] = (feitos, total)
+
+    try:
+        _, _, falhas = sincronizar(ano, progresso=progresso)
+        _situacao[ano]["erro"] = f"{len(falhas)} entes falharam" if falhas else None
+    except Exception as e:
+        _situacao[ano]["erro"] = repr(e)
+
+
+def sincronizar_em_segundo_plano(ano):
+    """Inicia `sincronizar(ano)` numa thread (se já não houver uma em andamento). Retorna se iniciou."""
+    ano = int(ano)
+    with _lock:
+        thread = _sincronizacoes.get(ano)
+        if thread is not None and thread.is_alive():
+            return False
+        _situacao[ano] = {"progresso": (0, 0), "erro": None}
+        thread = _sincronizacoes[ano] = threading.Thread(
+            target=_sincronizar_em_thread, args=(ano,), name=f"extratos-{ano}", daemon=True)
+        thread.start()
+    return True
+
+
+def situacao(ano):
+    """
+    Estado do índice do ano: {'sincronizado_em': Timestamp | None, 'em_andamento': bool,
+    'progresso': (feitos, total), 'erro': str | None}.
+    """
+    ano = int(ano)
+    indice = carregar_indice(ano)
+    with _lock:
+        thread = _sincronizacoes.get(ano)
+        estado = dict(_situacao.get(ano, {"progresso": (0, 0), "erro": None}))
+    estado["em_andamento"] = thread is not None and thread.is_alive()
+    estado["sincronizado_em"] = None if indice is None else pd.Timestamp(indice.sincronizado_em, unit="s")
+    return estado
+
+
+#############################################################################
+####  Feed de mudanças  ####
+#############################################################################
+
+def mudancas(ano, desde=None):
+    """
+    Entes com entregas novas ou alteradas (homologações) por sincronização.
+
+    Args:
+        desde: Timestamp/datetime; padrão: apenas a última sincronização que
+               registrou mudanças
+
+    Returns:
+        DataFrame (id_ente, novas, entregaveis, sincronizado_em, sincronizacao_anterior)
+    """
+    try:
+        feed = pq.read_table(_arquivo_mudancas(ano)).to_pandas()
+    except (OSError, pa.ArrowException):
+        return pd.DataFrame(columns=["id_ente", "novas", "entregaveis", "sincronizado_em", "sincronizacao_anterior"])
+    if feed.empty:
+        return feed
+    if desde is None:
+        return feed[feed["sincronizado_em"] == feed["sincronizado_em"].max()].reset_index(drop=True)
+    return feed[feed["sincronizado_em"] > pd.Timestamp(desde)].reset_index(drop=True)
+
+
+def entes_alterados(ano, desde=None):
+    """Conjunto dos entes com novas homologações (ver `mudancas`)."""
+    return set(mudancas(ano, desde)["id_ente"])
+
+
+#############################################################################
+####  Linha de comando  ####
+#############################################################################
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m api_ranking.services.extrato_index",
+        description="Sincroniza o índice local do extrato de entregas (todos os entes de um ano).")
+    parser.add_argument("--ano", type=int, required=True, help="Exercício")
+    parser.add_argument("--entes", nargs="*", help="Códigos IBGE (padrão: todos os entes do SICONFI)")
+    parser.add_argument("--concorrencia", type=int, default=None,
+                        help=f"Requisições simultâneas (padrão: {CONCORRENCIA})")
+    args = parser.parse_args(argv)
+
+    def progresso(feitos, total):
+        if feitos == total or feitos % 250 == 0:
+            print(f"[{feitos}/{total}] entes consultados", flush=True)
+
+    indice, novas, falhas = sincronizar(args.ano, entes=args.entes or None,
+                                        concorrencia=args.concorrencia, progresso=progresso)
+    print(f"{len(indice.entes)} entes ({len(indice)} entregas) gravados em {_arquivo(args.ano)}")
+    if not novas.empty:
+        print(f"{len(novas)} entes com novas homologações: {', '.join(novas['id_ente'])}")
+    if falhas:
+        print(f"Falharam: {', '.join(sorted(falhas))} (mantidos da sincronização anterior, se houver)",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+#############################################################################
+####  Leiaute da Portaria STN 642 (Anexo II) já processado  ####
+#############################################################################
+#
+# O xlsx do leiaute é grande e o openpyxl leva segundos para ler cada aba.
+# As abas usadas nas análises (PO, PcaspEstendido{ano} e Leiaute MSC) são lidas
+# uma única vez por arquivo, normalizadas e gravadas em Parquet:
+#
+# - arquivos de `api_ranking/bases_layout_stn`: ao lado do próprio xlsx
+#   ({nome}.{aba}.parquet), com o sha256 do xlsx nos metadados — se o xlsx
+#   for substituído, o hash deixa de bater e as abas são lidas de novo;
+# - uploads: em LAYOUT_CACHE_DIR, com o hash no nome do arquivo.
+#
+# Em memória, cada arquivo vira um único `LayoutSTN` por processo (chave =
+# hash + exercício), compartilhado por todas as sessões e funções de dimensão;
+# são mantidos os LAYOUT_STN_MEMORIA leiautes usados mais recentemente.
+
+LAYOUT_DIR = os.path.join("api_ranking", "bases_layout_stn")
+LAYOUT_CACHE_DIR = os.environ.get("LAYOUT_STN_CACHE_DIR", os.path.join(".cache", "layout_stn"))
+
+# Leiautes mantidos em memória (os de uso mais recente)
+MEMORIA_MAX = int(os.environ.get("LAYOUT_STN_MEMORIA", "4"))
+
+ABAS = ("po", "pcasp", "leiaute")
+
+_lock = threading.Lock()
+_memoria = OrderedDict()
+
+
+def caminho_layout(ano):
+    """Caminho do leiaute oficial do exercício em `LAYOUT_DIR`."""
+    return os.path.join(LAYOUT_DIR, f"{ano}_Anexo_II_Portaria_STN_642_Leiaute_MSC.xlsx")
+
+
+def _sha256(dados):
+    return hashlib.sha256(dados).hexdigest()
+
+
+#############################################################################
+####  Leitura das abas do xlsx  ####
+#############################################################################
+
+def _ler_po(xls):
+    po_stn = pd.read_excel(xls, sheet_name="PO", header=4)
+    # Alguns arquivos chegam com o cabeçalho em outra codificação
+    coluna = next((c for c in po_stn.columns if str(c).startswith("C") and str(c).endswith("digo")), po_stn.columns[0])
+    po_stn = po_stn.rename(columns={coluna: "poder_orgao"})
+    po_stn["poder_orgao"] = pd.to_numeric(po_stn["poder_orgao"], errors='coerce').astype('Int64')
+    return po_stn
+
+
+def _ler_pcasp(xls, ano=None):
+    # Aba do exercício; sem exercício informado, a primeira PcaspEstendido*
+    if ano is not None:
+        aba = f"PcaspEstendido{ano}"
+    else:
+        aba = next(s for s in xls.sheet_names if s.startswith("PcaspEstendido"))
+    pc_estendido = pd.read_excel(xls, sheet_name=aba, header=3)
+    if 'T�?TULO.1' in pc_estendido.columns and 'TÍTULO.1' not in pc_estendido.columns:
+        pc_estendido = pc_estendido.rename(columns={'T�?TULO.1': 'TÍTULO.1'})
+    pc_estendido['CONTA'] = pc_estendido['CONTA'].astype(str)
+    pc_estendido['conta_4'] = pc_estendido['CONTA'].str.slice(stop=4)
+    return pc_estendido
+
+
+def _ler_leiaute(xls):
+    return pd.read_excel(xls, sheet_name='Leiaute MSC', header=3, dtype=str)
+
+
+def _parsear(dados, ano=None):
+    with pd.ExcelFile(io.BytesIO(dados)) as xls:
+        return {
+            "po": _ler_po(xls),
+            "pcasp": _ler_pcasp(xls, ano),
+            "leiaute": _ler_leiaute(xls),
+        }
+
+
+#############################################################################
+####  Persistência em Parquet  ####
+#############################################################################
+
+def _arquivos_parquet(origem, sha, ano=None):
+    if origem is not None:
+        base = os.path.splitext(origem)[0]
+        return {aba: f"{base}.{aba}.parquet" for aba in ABAS}
+    nome = sha if ano is None else f"{sha}.{ano}"
+    return {aba: os.path.join(LAYOUT_CACHE_DIR, f"{nome}.{aba}.parquet") for aba in ABAS}
+
+
+def _carregar_parquet(arquivos, sha, ano=None):
+    abas = {}
+    for aba, arquivo in arquivos.items():
+        try:
+            tabela = pq.read_table(arquivo)
+        except (FileNotFoundError, OSError, pa.ArrowException):
+            return None
+        meta = tabela.schema.metadata or {}
+        if meta.get(b"sha256", b"").decode() != sha or meta.get(b"ano", b"").decode() != _ano(ano):
+            return None
+        abas[aba] = tabela.to_pandas()
+    return abas
+
+
+def _texto(df):
+    """Converte colunas object para texto (Parquet não aceita tipos mistos)."""
+    df = df.copy()
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def _ano(ano):
+    return "" if ano is None else str(ano)
+
+
+def _gravar_parquet(arquivos, sha, abas, ano=None):
+    """Grava as abas (escrita atômica). Falhas de disco não interrompem a análise."""
+    for aba, arquivo in arquivos.items():
+        try:
+            tabela = pa.Table.from_pandas(abas[aba], preserve_index=False)
+        except (pa.ArrowException, TypeError, ValueError):
+            tabela = pa.Table.from_pandas(_texto(abas[aba]), preserve_index=False)
+        tabela = tabela.replace_schema_metadata({**(tabela.schema.metadata or {}), "sha256": sha,
+                                                 "ano": _ano(ano)})
+
+        pasta = os.path.dirname(arquivo) or "."
+        try:
+            os.makedirs(pasta, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=pasta, suffix=".tmp")
+            os.close(fd)
+        except OSError:
+            return
+        try:
+            pq.write_table(tabela, tmp, compression="zstd")
+            os.replace(tmp, arquivo)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+
+#############################################################################
+####  LayoutSTN  ####
+#############################################################################
+
+class LayoutSTN:
+    """
+    Abas do leiaute STN de um arquivo, já normalizadas:
+
+    - `po()`: tabela de Poderes e Órgãos, `poder_orgao` como Int64
+    - `pcasp()`: PCASP Estendido, `CONTA` como texto e `conta_4`
+    - `leiaute()`: aba Leiaute MSC, todas as colunas como texto
+
+    Esses métodos devolvem cópias (as funções de dimensão alteram os frames).
+    Os atributos `po_por_codigo`, `pcasp_por_conta`, `pcasp_por_conta_4` e
+    `leiaute_por_conta` são índices ordenados compartilhados, somente leitura.
+    """
+
+    def __init__(self, sha, abas):
+        self.sha256 = sha
+        self._abas = abas
+        self._indices = {}
+
+    @classmethod
+    def do_ano(cls, ano):
+        """Leiaute oficial do exercício (`api_ranking/bases_layout_stn`)."""
+        origem = caminho_layout(ano)
+        with open(origem, "rb") as f:
+            dados = f.read()
+        return cls._obter(dados, origem, ano)
+
+    @classmethod
+    def do_upload(cls, arquivo, ano=None):
+        """
+        Leiaute enviado pelo usuário (UploadedFile, arquivo aberto ou bytes).
+
+        Com `ano`, o PCASP vem da aba PcaspEstendido{ano}; sem ele, da
+        primeira aba PcaspEstendido.
+        """
+        if isinstance(arquivo, (bytes, bytearray)):
+            dados = bytes(arquivo)
+        elif hasattr(arquivo, "getvalue"):
+            dados = arquivo.getvalue()
+        else:
+            arquivo.seek(0)
+            dados = arquivo.read()
+        return cls._obter(dados, None, ano)
+
+    @classmethod
+    def _obter(cls, dados, origem, ano=None):
+        sha = _sha256(dados)
+        chave = (sha, _ano(ano))
+        with _lock:
+            layout = _memoria.get(chave)
+            if layout is not None:
+                _memoria.move_to_end(chave)
+                return layout
+
+        arquivos = _arquivos_parquet(origem, sha, ano)
+        abas = _carregar_parquet(arquivos, sha, ano)
+        if abas is None:
+            abas = _parsear(dados, ano)
+            _gravar_parquet(arquivos, sha, abas, ano)
+
+        layout = cls(sha, abas)
+        with _lock:
+            layout = _memoria.setdefault(chave, layout)
+            _memoria.move_to_end(chave)
+            while len(_memoria) > MEMORIA_MAX:
+                _memoria.popitem(last=False)
+        return layout
+
+    def po(self):
+        return self._abas["po"].copy()
+
+    def pcasp(self):
+        return self._abas["pcasp"].copy()
+
+    def leiaute(self):
+        return self._abas["leiaute"].copy()
+
+    def _indice(self, aba, coluna):
+        chave = (aba, coluna)
+        if chave not in self._indices:
+            self._indices[chave] = self._abas[aba].set_index(coluna).sort_index()
+        return self._indices[chave]
+
+    @property
+    def po_por_codigo(self):
+        return self._indice("po", "poder_orgao")
+
+    @property
+    def pcasp_por_conta(self):
+        return self._indice("pcasp", "CONTA")
+
+    @property
+    def pcasp_por_conta_4(self):
+        return self._indice("pcasp", "conta_4")
+
+    @property
+    def leiaute_por_conta(self):
+        return self._indice("leiaute", "CONTA")
+
+    def pcasp_conta_4(self, *codigos):
+        """Linhas do PCASP cujo `conta_4` está em `codigos` (em ordem de conta_4)."""
+        indice = self.pcasp_por_conta_4
+        return indice.loc[indice.index.intersection(list(codigos)).sort_values()].reset_index()
@@ -0,0 +1,311 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from api_ranking.services import extrato_index
+from api_ranking.services.response_cache import exercicio_encerrado
+from core import http_siconfi
+
+#############################################################################
+####  Armazém incremental da MSC mensal (por partição)  ####
+#############################################################################
+#
+# A análise mensal acumulada pede os meses 1..N da MSC. Em vez de baixar
+# tudo a cada mês selecionado, cada partição
+#
+#   (ente, ano, matriz, mês, classe de conta, tipo de valor)
+#
+# é gravada como um arquivo Parquet em STORE_DIR. Numa nova consulta:
+#
+# - partição ausente: é baixada (todas as páginas) e gravada;
+# - partição gravada há menos de TTL_SONDA segundos, ou de exercício
+#   encerrado: é reaproveitada sem acessar a API;
+# - partição mais antiga: uma sonda barata (offset = linhas - 1, limit = 2)
+#   confere se a API ainda tem exatamente a mesma quantidade de linhas; só em
+#   caso de divergência a partição é baixada de novo.
+#
+# A sonda só detecta mudança na quantidade de linhas: uma retificação que
+# altera valores sem mudar a contagem passa por ela. Por isso, independente
+# da sonda e também em exercícios encerrados:
+#
+# - a partição baixada há mais de IDADE_MAX segundos é baixada de novo (a
+#   sonda não renova esse prazo);
+# - cada partição guarda a data de homologação do mês no índice de extratos
+#   (`extrato_index`, `data_status` da MSC); se o índice passa a mostrar outra
+#   data (nova homologação/retificação), a partição é baixada de novo.
+#
+# Partições vazias (mês ainda não enviado) são sempre sondadas.
+#
+# Cada partição guarda um checksum do conteúdo; `versoes_por_mes` combina os
+# checksums de um mês, e `agregado_por_mes` usa essa versão para reaproveitar
+# agregações por mês já calculadas (apenas os meses novos ou alterados são
+# recalculados).
+
+STORE_DIR = os.environ.get("SICONFI_MSC_MENSAL_DIR", os.path.join(".cache", "msc_mensal"))
+TTL_SONDA = int(os.environ.get("SICONFI_MSC_MENSAL_TTL", "21600"))
+IDADE_MAX = int(os.environ.get("SICONFI_MSC_MENSAL_IDADE_MAX", "604800"))
+PAGE_SIZE = 5000
+
+# Endpoint -> classes de conta
+GRUPOS = {
+    "msc_patrimonial": (1, 2, 3, 4),
+    "msc_orcamentaria": (5, 6),
+    "msc_controle": (7, 8),
+}
+
+# Matriz -> entregável no extrato de entregas
+ENTREGAVEIS = {"MSCC": "MSC Agregada", "MSCE": "MSC Encerramento"}
+
+# Agregações por mês mantidas em memória (LRU)
+MAX_AGREGADOS = 4096
+
+_lock = threading.Lock()
+_agregados = OrderedDict()
+
+
+#############################################################################
+####  Partições em disco  ####
+#############################################################################
+
+def _arquivo(ente, ano, matriz, mes, classe, tipo_valor):
+    return os.path.join(STORE_DIR, str(ente), str(ano), str(matriz), f"{int(mes):02d}",
+                        f"{classe}_{tipo_valor}.parquet")
+
+
+def checksum(df):
+    """Checksum do conteúdo de uma partição (independe do índice)."""
+    if df.empty:
+        return "vazia"
+    try:
+        hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    except TypeError:
+        # colunas com valores não hasheáveis (listas/dicts): usa o texto
+        hashes = pd.util.hash_pandas_object(df.astype(str), index=False).to_numpy()
+    return hashlib.sha1(hashes.tobytes() + ",".join(map(str, df.columns)).encode()).hexdigest()
+
+
+def ler_particao(ente, ano, matriz, mes, classe, tipo_valor):
+    """
+    Returns:
+        None se a partição não estiver gravada; senão (df, meta, idade) com
+        meta = {'linhas': int, 'checksum': str, 'baixada_em': epoch do download,
+        'homologacao': str} e idade (s) desde a última gravação/validação.
+        Partições gravadas sem 'baixada_em' contam como baixadas em 0.
+    """
+    arquivo = _arquivo(ente, ano, matriz, mes, classe, tipo_valor)
+    try:
+        tabela = pq.read_table(arquivo)
+        idade = time.time() - os.stat(arquivo).st_mtime
+    except (FileNotFoundError, OSError, pa.ArrowException):
+        return None
+    meta = {k.decode(): v.decode() for k, v in (tabela.schema.metadata or {}).items()}
+    meta = {"linhas": int(meta.get("linhas", tabela.num_rows)), "checksum": meta.get("checksum", ""),
+            "baixada_em": float(meta.get("baixada_em", 0)), "homologacao": meta.get("homologacao", "")}
+    return tabela.to_pandas(), meta, idade
+
+
+def gravar_particao(ente, ano, matriz, mes, classe, tipo_valor, df, soma, homologacao=""):
+    """Grava a partição (escrita atômica). Conteúdo não representável em Arrow não é gravado."""
+    try:
+        tabela = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowException, TypeError, ValueError):
+        return False
+    tabela = tabela.replace_schema_metadata({"linhas": str(len(df)), "checksum": soma,
+                                             "baixada_em": repr(time.time()), "homologacao": homologacao or ""})
+
+    arquivo = _arquivo(ente, ano, matriz, mes, classe, tipo_valor)
+    os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(arquivo), suffix=".tmp")
+    os.close(fd)
+    try:
+        pq.write_table(tabela, tmp, compression="zstd")
+        os.replace(tmp, arquivo)
+    except OSError:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return False
+    return True
+
+
+def _renovar(ente, ano, matriz, mes, classe, tipo_valor):
+    """Marca a partição como validada agora (o mtime é o instante da última validação; 'baixada_em' não muda)."""
+    try:
+        os.utime(_arquivo(ente, ano, matriz, mes, classe, tipo_valor), None)
+    except OSError:
+        pass
+
+
+def homologacoes(ente, ano, matriz):
+    """
+    Data de homologação (`data_status`, como texto) de cada mês da matriz no
+    índice de extratos: {mês: data}. Para a MSC de encerramento, a data vale
+    para todos os meses.
+
+    Returns:
+        None se o índice do ano não existe ou não tem o ente/as colunas
+    """
+    indice = extrato_index.carregar_indice(ano)
+    extrato = None if indice is None else indice.extrato(ente)
+    if extrato is None or not {"entregavel", "periodo", "data_status"}.issubset(extrato.columns):
+        return None
+    linhas = extrato[(extrato["entregavel"] == ENTREGAVEIS.get(matriz)) & extrato["data_status"].notna()]
+    if matriz != "MSCC":
+        return {None: str(linhas["data_status"].astype(str).max())} if not linhas.empty else {}
+    meses = pd.to_numeric(linhas["periodo"], errors="coerce")
+    datas = linhas["data_status"].astype(str).groupby(meses).max()
+    return {int(mes): data for mes, data in datas.items()}
+
+
+#############################################################################
+####  API  ####
+#############################################################################
+
+async def _items(path, params, sem):
+    async with sem:
+        resp = await http_siconfi.get_async(f"{http_siconfi.API_ROOT}/{path}", params=params,
+                                            timeout=90.0, retries=6)
+    resp.raise_for_status()
+    return resp.json().get("items", [])
+
+
+async def _baixar(path, params, sem, delay):
+    frames, offset = [], 0
+    while True:
+        items = await _items(path, dict(params, offset=offset, limit=PAGE_SIZE), sem)
+        if not items:
+            break
+        frames.append(pd.DataFrame(items))
+        if len(items) < PAGE_SIZE:
+            break
+        offset += PAGE_SIZE
+        if delay:
+            await asyncio.sleep(delay)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+async def _sondar(path, params, linhas, sem):
+    """Confere, com uma requisição de até 2 linhas, se a API ainda tem `linhas` linhas."""
+    items = await _items(path, dict(params, offset=max(linhas - 1, 0), limit=2), sem)
+    return len(items) == (1 if linhas else 0)
+
+
+async def _particao(ente, ano, matriz, mes, classe, tipo_valor, path, sem, delay, contagem, datas):
+    params = {
+        "id_ente": ente,
+        "an_referencia": ano,
+        "me_referencia": mes,
+        "co_tipo_matriz": matriz,
+        "classe_conta": classe,
+        "id_tv": tipo_valor,
+    }
+    chave = (ente, ano, matriz, mes, classe, tipo_valor)
+    # None: sem índice de extratos, a homologação não é conferida
+    homologacao = None if datas is None else datas.get(int(mes) if matriz == "MSCC" else None, "")
+    salvo = ler_particao(*chave)
+    if salvo is not None:
+        df, meta, idade = salvo
+        valida = (time.time() - meta["baixada_em"] < IDADE_MAX
+                  and (homologacao is None or homologacao == meta["homologacao"]))
+        if valida and meta["linhas"] and (exercicio_encerrado(params) or idade < TTL_SONDA):
+            contagem["reaproveitadas"] += 1
+            return df, meta["checksum"]
+        if valida and await _sondar(path, params, meta["linhas"], sem):
+            _renovar(*chave)
+            contagem["sondadas"] += 1
+            return df, meta["checksum"]
+
+    df = await _baixar(path, params, sem, delay)
+    soma = checksum(df)
+    gravar_particao(*chave, df, soma, homologacao)
+    contagem["baixadas"] += 1
+    return df, soma
+
+
+async def carregar_msc(ente, ano, meses, tipos_balanco, co_tipo_matriz="MSCC", concurrency=3, delay=0.15):
+    """
+    Carrega os três grupos da MSC usando as partições gravadas sempre que possível.
+
+    Returns:
+        (msc_patrimonial, msc_orcam, msc_ctr, versoes, contagem):
+        - versoes: {(matriz, mês, classe, tipo_valor): checksum} das partições obtidas
+        - contagem: partições 'reaproveitadas', 'sondadas' e 'baixadas'
+    """
+    sem = asyncio.Semaphore(concurrency)
+    contagem = {"reaproveitadas": 0, "sondadas": 0, "baixadas": 0}
+    datas = homologacoes(ente, ano, co_tipo_matriz)
+    versoes = {}
+    grupos = []
+    for path, classes in GRUPOS.items():
+        chaves = [(co_tipo_matriz, mes, str(classe), tipo)
+                  for classe in classes for tipo in tipos_balanco for mes in meses]
+        resultados = await asyncio.gather(
+            *(_particao(ente, ano, *chave, path, sem, delay, contagem, datas) for chave in chaves),
+            return_exceptions=True,
+        )
+        dfs, erros = [], []
+        for chave, r in zip(chaves, resultados):
+            if isinstance(r, Exception):
+                erros.append(r)
+                continue
+            df, soma = r
+            versoes[chave] = soma
+            if not df.empty:
+                dfs.append(df)
+        # erro em todas as partições do grupo: propaga o primeiro (falhas isoladas não interrompem)
+        if not dfs and erros:
+            raise erros[0]
+        grupos.append(pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame())
+    return (*grupos, versoes, contagem)
+
+
+def versoes_por_mes(versoes, extra=""):
+    """Combina os checksums das partições de cada mês: {mês: versão}."""
+    por_mes = {}
+    for (matriz, mes, classe, tipo), soma in sorted(versoes.items(), key=lambda kv: tuple(map(str, kv[0]))):
+        por_mes.setdefault(int(mes), []).append(f"{matriz}|{classe}|{tipo}|{soma}")
+    return {mes: hashlib.sha1(("\n".join(partes) + extra).encode()).hexdigest() for mes, partes in por_mes.items()}
+
+
+#############################################################################
+####  Agregações por mês (com cache)  ####
+#############################################################################
+
+def agregado_por_mes(nome, df, versoes, funcao, ordenar):
+    """
+    Aplica `funcao` a cada mês de `df` e concatena os resultados.
+
+    O resultado de cada mês é guardado sob (nome, mês, versão do mês); meses
+    sem versão em `versoes` são sempre recalculados. Como `funcao` deve ser
+    uma agregação cujas chaves incluem `mes_referencia`, o resultado é o mesmo
+    da agregação sobre o frame inteiro, ordenado por `ordenar`.
+    """
+    if df.empty or "mes_referencia" not in df.columns:
+        return funcao(df)
+    partes = []
+    for mes, fatia in df.groupby("mes_referencia", sort=True):
+        versao = versoes.get(int(mes))
+        chave = (nome, int(mes), versao)
+        with _lock:
+            parte = _agregados.get(chave) if versao is not None else None
+            if parte is not None:
+                _agregados.move_to_end(chave)
+        if parte is None:
+            parte = funcao(fatia)
+            if versao is not None:
+                with _lock:
+                    _agregados[chave] = parte
+                    while len(_agregados) > MAX_AGREGADOS:
+                        _agregados.popitem(last=False)
+        partes.append(parte)
+    resultado = pd.concat(partes, ignore_index=True)
+    if ordenar and not resultado.empty:
+        resultado = resultado.sort_values(list(ordenar), kind="stable").reset_index(drop=True)
+    return resultado
@@ -0,0 +1,185 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+#############################################################################
+####  MscView: MSC indexada por partição e conta contábil  ####
+#############################################################################
+#
+# As verificações filtram a MSC inteira várias vezes com `.query(...)` e
+# `str.startswith`/`str.match` sobre `conta_contabil`. A MscView é montada uma
+# vez por execução:
+#
+# - linhas particionadas por (tipo_valor, tipo_matriz, mes_referencia);
+# - dentro de cada partição, as contas ficam ordenadas, de modo que contas
+#   exatas e prefixos ('111', '6212') viram buscas binárias (O(log n));
+# - `soma` e `somas_por` guardam o resultado de cada filtro já calculado.
+#
+# As fatias devolvem as linhas na ordem (e com o índice) do frame original,
+# exatamente como o filtro booleano equivalente.
+#
+# Uso:
+#   visao = MscView(msc_dez)
+#   visao.fatia(tipo_valor='ending_balance', contas=('621200000', '621390000'))
+#   visao.soma(tipo_valor='beginning_balance', prefixos=('111',))
+#
+# As funções de dimensão aceitam DataFrame ou MscView (`MscView.de`).
+
+PARTICOES = ("tipo_valor", "tipo_matriz", "mes_referencia")
+
+
+def _valores(filtro):
+    """None (sem filtro), escalar ou iterável -> None ou frozenset."""
+    if filtro is None:
+        return None
+    if isinstance(filtro, (str, bytes)) or not hasattr(filtro, "__iter__"):
+        return frozenset([filtro])
+    return frozenset(filtro)
+
+
+def _chave(filtro):
+    valores = _valores(filtro)
+    return None if valores is None else tuple(sorted(valores, key=str))
+
+
+def _codificar(contas):
+    """Contas como bytes de largura fixa (ASCII); texto Unicode se necessário."""
+    try:
+        return np.asarray(contas, dtype="S"), b"\xff"
+    except UnicodeEncodeError:
+        return np.asarray(contas, dtype="U"), "\U0010ffff"
+
+
+class MscView:
+    """
+    Visão indexada (somente leitura) de um DataFrame da MSC.
+
+    Attributes:
+        df: frame original (não é copiado nem alterado)
+    """
+
+    def __init__(self, df, _particoes=None, _fim=None):
+        self.df = df
+        self._lock = threading.Lock()
+        self._somas = {}
+        if _particoes is None:
+            _particoes, _fim = self._indexar(df)
+        self._particoes = _particoes
+        self._fim = _fim
+
+    @classmethod
+    def de(cls, msc):
+        """Devolve `msc` se já for uma MscView; caso contrário indexa o DataFrame."""
+        return msc if isinstance(msc, cls) else cls(msc)
+
+    @staticmethod
+    def _indexar(df):
+        if df.empty or "conta_contabil" not in df.columns:
+            return {}, b"\xff"
+        contas, fim = _codificar(df["conta_contabil"].astype(str).to_numpy())
+        chaves = [df[c] if c in df.columns else pd.Series(None, index=df.index, dtype=object) for c in PARTICOES]
+        grupos = df.groupby(chaves, sort=False, dropna=False, observed=True).indices
+
+        particoes = {}
+        for chave, posicoes in grupos.items():
+            posicoes = np.asarray(posicoes, dtype=np.intp)
+            ordem = np.argsort(contas[posicoes], kind="stable")
+            particoes[chave] = (contas[posicoes][ordem], posicoes[ordem])
+        return particoes, fim
+
+    def __len__(self):
+        return len(self.df)
+
+    @property
+    def empty(self):
+        return not self._particoes
+
+    def valores(self, coluna):
+        """Valores distintos de uma coluna de partição (tipo_valor, tipo_matriz, mes_referencia)."""
+        i = PARTICOES.index(coluna)
+        return sorted({chave[i] for chave in self._particoes if not pd.isna(chave[i])}, key=str)
+
+    #########################################################################
+    ####  Consultas  ####
+    #########################################################################
+
+    def _selecionar(self, tipo_valor, tipo_matriz, mes):
+        filtros = (_valores(tipo_valor), _valores(tipo_matriz), _valores(mes))
+        for chave, particao in self._particoes.items():
+            if all(f is None or k in f for f, k in zip(filtros, chave)):
+                yield chave, particao
+
+    def _intervalos(self, ordenadas, contas, prefixos):
+        if contas is not None:
+            alvo, _ = _codificar(sorted(_valores(contas)))
+            inicios = np.searchsorted(ordenadas, alvo, side="left")
+            fins = np.searchsorted(ordenadas, alvo, side="right")
+            yield from zip(inicios, fins)
+        if prefixos is not None:
+            alvo, _ = _codificar(sorted(_valores(prefixos)))
+            inicios = np.searchsorted(ordenadas, alvo, side="left")
+            fins = np.searchsorted(ordenadas, np.char.add(alvo, self._fim), side="left")
+            yield from zip(inicios, fins)
+
+    def posicoes(self, tipo_valor=None, tipo_matriz=None, mes=None, contas=None, prefixos=None):
+        """Posições (iloc, em ordem crescente) das linhas que atendem aos filtros."""
+        partes = []
+        for _, (ordenadas, posicoes) in self._selecionar(tipo_valor, tipo_matriz, mes):
+            if contas is None and prefixos is None:
+                partes.append(posicoes)
+                continue
+            for inicio, fim in self._intervalos(ordenadas, contas, prefixos):
+                if fim > inicio:
+                    partes.append(posicoes[inicio:fim])
+        if not partes:
+            return np.empty(0, dtype=np.intp)
+        return np.unique(np.concatenate(partes))
+
+    def fatia(self, tipo_valor=None, tipo_matriz=None, mes=None, contas=None, prefixos=None):
+        """
+        Linhas que atendem aos filtros (cópia, na ordem do frame original).
+
+        Args:
+            tipo_valor, tipo_matriz, mes: valor ou lista de valores (None = todos)
+            contas: contas contábeis exatas
+            prefixos: prefixos de conta contábil ('111', '6212', ...)
+
+        Quando `contas` e `prefixos` são informados, vale a união dos dois.
+        """
+        return self.df.take(self.posicoes(tipo_valor, tipo_matriz, mes, contas, prefixos))
+
+    def restringir(self, tipo_valor=None, tipo_matriz=None, mes=None):
+        """Nova visão com apenas as partições selecionadas (sem reindexar)."""
+        return MscView(self.df, dict(self._selecionar(tipo_valor, tipo_matriz, mes)), self._fim)
+
+    #########################################################################
+    ####  Somas (com cache)  ####
+    #########################################################################
+
+    def _memoizado(self, chave, calcular):
+        with self._lock:
+            if chave in self._somas:
+                return self._somas[chave]
+        valor = calcular()
+        with self._lock:
+            return self._somas.setdefault(chave, valor)
+
+    def soma(self, coluna="valor", tipo_valor=None, tipo_matriz=None, mes=None, contas=None, prefixos=None):
+        """Soma de `coluna` nas linhas que atendem aos filtros (0 se não houver linhas)."""
+        filtros = (tipo_valor, tipo_matriz, mes, contas, prefixos)
+        chave = ("soma", coluna) + tuple(_chave(f) for f in filtros)
+        return self._memoizado(chave, lambda: self.fatia(*filtros)[coluna].sum() if len(self.df) else 0.0)
+
+    def somas_por(self, grupos, coluna="valor", tipo_valor=None, tipo_matriz=None, mes=None, contas=None,
+                  prefixos=None):
+        """
+        Soma de `coluna` agrupada por `grupos` (colunas em formato de tabela,
+        como `groupby(..., as_index=False, observed=True)`). Devolve uma cópia.
+        """
+        grupos = [grupos] if isinstance(grupos, str) else list(grupos)
+        filtros = (tipo_valor, tipo_matriz, mes, contas, prefixos)
+        chave = ("somas_por", tuple(grupos), coluna) + tuple(_chave(f) for f in filtros)
+        tabela = self._memoizado(chave, lambda: self.fatia(*filtros).groupby(
+            grupos, as_index=False, observed=True)[coluna].sum())
+        return tabela.copy()
@@ -0,0 +1,234 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import date
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+#############################################################################
+####  Cache persistente (disco) das respostas da API SICONFI  ####
+#############################################################################
+#
+# Cada página retornada pela API é gravada como um arquivo Parquet (zstd) em
+# CACHE_DIR, com nome derivado de (endpoint, parâmetros normalizados). Como
+# `offset`/`limit` fazem parte dos parâmetros, cada página tem sua própria
+# entrada. Os metadados (ETag, instante de gravação, hasMore) ficam no
+# próprio schema do Parquet, de modo que uma entrada é sempre um único arquivo.
+#
+# O cache sobrevive a reinícios do container, a `st.cache_data.clear()` e é
+# compartilhado entre workers do Streamlit que usem o mesmo diretório.
+
+CACHE_DIR = os.environ.get("SICONFI_CACHE_DIR", os.path.join(".cache", "siconfi"))
+CACHE_MAX_BYTES = int(os.environ.get("SICONFI_CACHE_MAX_MB", "2048")) * 1024 * 1024
+CACHE_ATIVO = os.environ.get("SICONFI_CACHE", "1") != "0"
+
+# TTL (segundos) por endpoint para exercícios ainda em aberto.
+# Exercícios encerrados (ver `exercicio_encerrado`) não expiram.
+TTL_ENDPOINT = {
+    "msc_patrimonial": 86400,
+    "msc_orcamentaria": 86400,
+    "msc_controle": 86400,
+    "dca": 43200,
+    "rreo": 43200,
+    "rgf": 43200,
+    "extrato_entregas": 3600,
+}
+TTL_PADRAO = 3600
+
+# Quantidade de gravações entre duas varreduras de despejo (LRU)
+_INTERVALO_DESPEJO = 100
+
+_lock = threading.Lock()
+_gravacoes = 0
+
+
+def _normalizar_params(params):
+    """Converte os parâmetros para uma forma canônica (chaves ordenadas, valores str)."""
+    return {str(k): str(v) for k, v in sorted((params or {}).items())}
+
+
+def chave_cache(path, params):
+    """Gera a chave (sha256) de uma página a partir do endpoint e dos parâmetros."""
+    bruto = json.dumps([path, _normalizar_params(params)], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(bruto.encode("utf-8")).hexdigest()
+
+
+def _arquivo(chave):
+    return os.path.join(CACHE_DIR, chave[:2], f"{chave}.parquet")
+
+
+def exercicio_encerrado(params):
+    """
+    Indica se os parâmetros se referem a um exercício encerrado.
+
+    Considera encerrado o exercício anterior ao ano passado: DCA, RREO do 6º
+    bimestre e MSC de encerramento do ano X são entregues ao longo de X+1, então
+    apenas a partir de X+2 os dados deixam de mudar.
+    """
+    ano = (params or {}).get("an_referencia", (params or {}).get("an_exercicio"))
+    try:
+        return int(ano) < date.today().year - 1
+    except (TypeError, ValueError):
+        return False
+
+
+def ttl_para(path, params):
+    """Retorna o TTL (segundos) da página, ou None quando a entrada não expira."""
+    if exercicio_encerrado(params):
+        return None
+    return TTL_ENDPOINT.get(path, TTL_PADRAO)
+
+
+#############################################################################
+####  Leitura e gravação  ####
+#############################################################################
+
+def ler(path, params):
+    """
+    Busca uma página no cache.
+
+    Returns:
+        None se não houver entrada; caso contrário um dict com:
+        - 'items': lista de registros (mesmo formato do JSON da API)
+        - 'has_more': valor de `hasMore` da resposta original (ou None)
+        - 'etag': ETag da resposta original (ou None)
+        - 'fresca': False quando o TTL expirou (deve ser revalidada)
+    """
+    if not CACHE_ATIVO:
+        return None
+    arquivo = _arquivo(chave_cache(path, params))
+    try:
+        tabela = pq.read_table(arquivo)
+    except (FileNotFoundError, OSError, pa.ArrowException):
+        return None
+
+    meta = {k.decode(): v.decode() for k, v in (tabela.schema.metadata or {}).items()}
+    gravado_em = float(meta.get("gravado_em", 0))
+    ttl = ttl_para(path, params)
+    has_more = meta.get("has_more")
+
+    _tocar(arquivo)
+    return {
+        "items": tabela.to_pylist(),
+        "has_more": None if has_more in (None, "") else has_more == "1",
+        "etag": meta.get("etag") or None,
+        "fresca": ttl is None or (time.time() - gravado_em) < ttl,
+    }
+
+
+def tabela_de_items(items):
+    """
+    Tabela Arrow com as colunas de todas as linhas (`pa.Table.from_pylist`
+    só usa as chaves da primeira; chave ausente numa linha vira nulo).
+    """
+    items = items or []
+    colunas = dict.fromkeys(chave for item in items for chave in item)
+    return pa.Table.from_pydict({coluna: [item.get(coluna) for item in items] for coluna in colunas})
+
+
+def gravar(path, params, items, etag=None, has_more=None):
+    """
+    Grava uma página no cache (escrita atômica via arquivo temporário).
+
+    Páginas cujo conteúdo não pode ser representado em Arrow (tipos mistos na
+    mesma coluna) são simplesmente ignoradas — o cache nunca interrompe a carga.
+    """
+    if not CACHE_ATIVO:
+        return
+    try:
+        tabela = tabela_de_items(items)
+    except (pa.ArrowException, TypeError, ValueError):
+        return
+
+    meta = {
+        "path": path,
+        "gravado_em": repr(time.time()),
+        "etag": etag or "",
+        "has_more": "" if has_more is None else ("1" if has_more else "0"),
+    }
+    tabela = tabela.replace_schema_metadata(meta)
+
+    arquivo = _arquivo(chave_cache(path, params))
+    os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(arquivo), suffix=".tmp")
+    os.close(fd)
+    try:
+        pq.write_table(tabela, tmp, compression="zstd")
+        os.replace(tmp, arquivo)
+    except OSError:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return
+
+    _registrar_gravacao()
+
+
+def renovar(path, params):
+    """Marca uma entrada como recém-validada (resposta 304 para o ETag salvo)."""
+    entrada = ler(path, params)
+    if entrada is not None:
+        gravar(path, params, entrada["items"], etag=entrada["etag"], has_more=entrada["has_more"])
+
+
+#############################################################################
+####  Despejo LRU por tamanho  ####
+#############################################################################
+
+def _tocar(arquivo):
+    """Atualiza o mtime do arquivo; o mtime é usado como 'último acesso' no LRU."""
+    try:
+        os.utime(arquivo, None)
+    except OSError:
+        pass
+
+
+def _registrar_gravacao():
+    global _gravacoes
+    with _lock:
+        _gravacoes += 1
+        varrer = _gravacoes % _INTERVALO_DESPEJO == 1
+    if varrer:
+        despejar()
+
+
+def despejar(max_bytes=None):
+    """
+    Remove as entradas menos recentemente usadas até o cache caber em `max_bytes`.
+
+    Returns:
+        Quantidade de arquivos removidos.
+    """
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    entradas, total = [], 0
+    for raiz, _, arquivos in os.walk(CACHE_DIR):
+        for nome in arquivos:
+            if not nome.endswith(".parquet"):
+                continue
+            caminho = os.path.join(raiz, nome)
+            try:
+                st_ = os.stat(caminho)
+            except OSError:
+                continue
+            entradas.append((st_.st_mtime, st_.st_size, caminho))
+            total += st_.st_size
+
+    removidos = 0
+    for _, tamanho, caminho in sorted(entradas):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(caminho)
+        except OSError:
+            continue
+        total -= tamanho
+        removidos += 1
+    return removidos
+
+
+def limpar():
+    """Remove todas as entradas do cache em disco."""
+    return despejar(max_bytes=0)
@@ -0,0 +1,213 @@
+# ┌───────────────────────────────────────────────────────────────
+# │ core/conformidade_leiaute.py - Conferência da MSC com o Leiaute da STN
+# └───────────────────────────────────────────────────────────────
+#
+# Cada conta do Leiaute MSC (Portaria STN 642) define a sequência de
+# informações complementares esperada (TIPO1..TIPO6, ex.: PO, FP, FR, CO). A
+# conferência compara, por CONTA, a chave do leiaute (TIPO1..TIPO6
+# concatenados) com cada chave distinta encontrada na MSC e classifica as
+# diferenças:
+#
+# - MSCFaltandoComponente: a chave da MSC é prefixo da chave do leiaute
+# - PortariaFaltandoComponente: a chave do leiaute é prefixo da chave da MSC
+# - MismatchTotal: nenhuma das duas é prefixo da outra
+#
+# Uma MSC estadual tem milhões de linhas, mas poucos milhares de combinações
+# (CONTA, TIPO1..TIPO6). As linhas são deduplicadas antes de montar as chaves
+# e do merge; as chaves são concatenadas com operações de texto vetorizadas
+# e a classificação usa `startswith` elemento a elemento sobre arrays
+# alinhados, sem `DataFrame.apply` linha a linha.
+#
+# Uso:
+#   from core.conformidade_leiaute import conferir_leiaute
+#   divergencias = conferir_leiaute(layout.leiaute(), ler_msc_csv(arquivo, colunas=['CONTA', *COLUNAS_TIPO]))
+#
+# Benchmark (MSC anual sintética de 2 milhões de linhas):
+#   python -m core.conformidade_leiaute
+
+import time
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from core.msc_csv import COLUNAS_TIPO
+
+
+# ═══════════════════════════════════════════════════════════════
+# Constantes
+# ═══════════════════════════════════════════════════════════════
+
+OK = 'OK'
+MSC_FALTANDO = 'MSCFaltandoComponente'
+PORTARIA_FALTANDO = 'PortariaFaltandoComponente'
+MISMATCH = 'MismatchTotal'
+
+COLUNAS_RESULTADO = ['CONTA', 'status_comparacao', 'chave_portaria', 'chave_msc']
+
+
+# ═══════════════════════════════════════════════════════════════
+# Chaves e Classificação
+# ═══════════════════════════════════════════════════════════════
+
+def chave_tipos(df: pd.DataFrame, colunas: Iterable[str] = COLUNAS_TIPO) -> pd.Series:
+    """Concatena as colunas TIPO (nulo -> '') numa única chave de texto."""
+    partes = [df[c].astype(object).fillna('').astype(str) for c in colunas]
+    return partes[0].str.cat(partes[1:])
+
+
+def classificar(chave_portaria, chave_msc) -> np.ndarray:
+    """
+    Classifica pares alinhados de chaves (leiaute, MSC).
+
+    Returns:
+        Array com OK, MSC_FALTANDO, PORTARIA_FALTANDO ou MISMATCH por posição
+    """
+    portaria = np.asarray(chave_portaria, dtype=str)
+    msc = np.asarray(chave_msc, dtype=str)
+    return np.select(
+        [portaria == msc, np.char.startswith(portaria, msc), np.char.startswith(msc, portaria)],
+        [OK, MSC_FALTANDO, PORTARIA_FALTANDO],
+        default=MISMATCH,
+    )
+
+
+def _chaves_distintas(df: pd.DataFrame, colunas) -> pd.DataFrame:
+    """(CONTA, chave) distintos; as linhas repetidas saem antes de montar as chaves."""
+    df = df.dropna(subset=['CONTA']).drop_duplicates(['CONTA', *colunas])
+    return pd.DataFrame({'CONTA': df['CONTA'].to_numpy(), 'chave': chave_tipos(df, colunas).to_numpy()}).drop_duplicates()
+
+
+def conferir_leiaute(
+    df_portaria: pd.DataFrame,
+    df_msc: pd.DataFrame,
+    colunas: Iterable[str] = COLUNAS_TIPO,
+) -> pd.DataFrame:
+    """
+    Divergências entre as chaves TIPO1..TIPO6 da MSC e do leiaute, por CONTA.
+
+    Args:
+        df_portaria: Aba "Leiaute MSC" (CONTA, TIPO1..TIPO6)
+        df_msc: MSC com CONTA e TIPO1..TIPO6 (texto ou categóricas)
+        colunas: Colunas que formam a chave
+
+    Returns:
+        DataFrame (CONTA, status_comparacao, chave_portaria, chave_msc) com uma
+        linha por chave divergente, ordenado por essas colunas. Contas ausentes
+        de um dos lados não são comparadas.
+    """
+    colunas = list(colunas)
+    portaria = _chaves_distintas(df_portaria, colunas)
+    msc = _chaves_distintas(df_msc, colunas)
+
+    df = pd.merge(portaria, msc, on='CONTA', how='inner', suffixes=('_portaria', '_msc'))
+    df['status_comparacao'] = classificar(df['chave_portaria'], df['chave_msc'])
+    df = df[df['status_comparacao'] != OK]
+    return df.sort_values(COLUNAS_RESULTADO, kind='stable')[COLUNAS_RESULTADO].reset_index(drop=True)
+
+
+# ═══════════════════════════════════════════════════════════════
+# Benchmark
+# ═══════════════════════════════════════════════════════════════
+
+def _conferir_apply(df_portaria: pd.DataFrame, df_msc: pd.DataFrame) -> pd.DataFrame:
+    """Implementação anterior da página 13 (apply linha a linha), usada como referência."""
+    colunas_para_chave = list(COLUNAS_TIPO)
+    df_portaria = df_portaria[['CONTA', *colunas_para_chave]].copy()
+    df_portaria['chave'] = df_portaria[colunas_para_chave].fillna('').apply(lambda x: ''.join(x), axis=1)
+    df_portaria = df_portaria[['CONTA', 'chave']]
+
+    df_msc = df_msc[['CONTA', *colunas_para_chave]].copy()
+    df_msc['chave'] = df_msc[colunas_para_chave].astype(object).fillna('').apply(lambda x: ''.join(x), axis=1)
+    df_msc = df_msc[['CONTA', 'chave']]
+
+    df_diff = pd.merge(df_portaria, df_msc, on=['CONTA'], how='inner', suffixes=('_portaria', '_msc'))
+    df_diff['diferenca'] = df_diff['chave_portaria'] != df_diff['chave_msc']
+
+    def categorizar_diferenca(row):
+        if not row['diferenca']:
+            return OK
+        portaria = str(row['chave_portaria'])
+        msc = str(row['chave_msc'])
+        if portaria.startswith(msc):
+            return MSC_FALTANDO
+        elif msc.startswith(portaria):
+            return PORTARIA_FALTANDO
+        else:
+            return MISMATCH
+
+    df_diff['status_comparacao'] = df_diff.apply(categorizar_diferenca, axis=1)
+    df_analise = df_diff.groupby(['CONTA', 'diferenca', 'status_comparacao', 'chave_portaria', 'chave_msc']).size().reset_index(name='quantidade')
+    return df_analise.query("status_comparacao != 'OK'")[COLUNAS_RESULTADO]
+
+
+# Sequências de TIPO do leiaute 2024 (com a frequência aproximada de contas)
+_PADROES = [
+    (('PO',), 3500), (('PO', 'FP'), 1300), (('PO', 'FP', 'FR', 'CO'), 900),
+    (('PO', 'FP', 'DC', 'FR'), 100), (('PO', 'FS', 'FR', 'CO', 'ND'), 90),
+    (('PO', 'FR', 'CO'), 40), (('PO', 'FR', 'CO', 'NR'), 25), (('PO', 'FS', 'FR', 'CO', 'ND', 'AI'), 25),
+]
+
+
+def _sinteticos(linhas: int, seed: int = 0):
+    """Leiaute com ~6 mil contas e uma MSC anual cujas linhas seguem o leiaute, com ~5% de desvios."""
+    rng = np.random.default_rng(seed)
+    padroes = [p for p, n in _PADROES for _ in range(n)]
+    contas = np.array([f"{g}{c:08d}" for g, c in zip(rng.integers(1, 9, len(padroes)), rng.integers(0, 10**8, len(padroes)))])
+
+    def _frame(contas, seqs):
+        tipos = [tuple(s) + (None,) * (6 - len(s)) for s in seqs]
+        df = pd.DataFrame(tipos, columns=list(COLUNAS_TIPO))
+        df.insert(0, 'CONTA', contas)
+        return df
+
+    portaria = _frame(contas, padroes)
+
+    # cada combinação distinta (conta, variante) aparece em muitas linhas da MSC
+    variantes = []
+    for conta, padrao in zip(contas, padroes):
+        variantes.append((conta, padrao))
+        sorteio = rng.random()
+        if sorteio < 0.03 and len(padrao) > 1:
+            variantes.append((conta, padrao[:-1]))
+        elif sorteio < 0.05 and len(padrao) < 6:
+            variantes.append((conta, padrao + ('AI',)))
+        elif sorteio < 0.06:
+            variantes.append((conta, ('FR',) + padrao[1:]))
+    variantes += [(f"9{c:08d}", ('PO',)) for c in rng.integers(0, 10**8, 50)]  # contas fora do leiaute
+    escolha = rng.integers(0, len(variantes), linhas)
+    msc = _frame([variantes[i][0] for i in escolha], [variantes[i][1] for i in escolha])
+    for coluna in COLUNAS_TIPO:
+        msc[coluna] = msc[coluna].astype('category')
+    return portaria, msc
+
+
+def benchmark(linhas: int = 2_000_000, amostra_apply: int = 200_000) -> None:
+    """
+    Compara a conferência vetorizada com a versão linha a linha.
+
+    A versão linha a linha é medida numa amostra de `amostra_apply` linhas da
+    MSC e extrapolada para `linhas` (é dominada pelos dois `apply`, lineares
+    no número de linhas).
+    """
+    portaria, msc = _sinteticos(linhas)
+
+    t0 = time.perf_counter()
+    resultado = conferir_leiaute(portaria, msc)
+    t_vet = time.perf_counter() - t0
+
+    amostra = msc.iloc[:amostra_apply]
+    t0 = time.perf_counter()
+    referencia = _conferir_apply(portaria, amostra)
+    t_apply = (time.perf_counter() - t0) * linhas / len(amostra)
+
+    esperado = referencia.reset_index(drop=True)
+    assert conferir_leiaute(portaria, amostra).equals(esperado)
+    print(f"Linhas da MSC: {linhas:,} | contas no leiaute: {len(portaria):,} | divergências: {len(resultado):,}")
+    print(f"Vetorizado: {t_vet:.3f}s")
+    print(f"Apply (extrapolado de {len(amostra):,} linhas): {t_apply:.1f}s")
+    print(f"Ganho: {t_apply / t_vet:.0f}x")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -2,15 +2,24 @@
 # │ core/db_simple.py
 # │ Histórico de regras LME em 1 tabela (SCD-Type 2, sem snapshots)
 # └───────────────────────────────────────────────────────────────
+import io
 import os
 import hashlib
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timedelta
 from typing import Optional
 
 import pandas as pd
 import streamlit as st
 from sqlalchemy import create_engine, text
 
+# Estatísticas (get_estatisticas) em memória por alguns segundos
+ESTATISTICAS_TTL = int(os.environ.get("LME_ESTATISTICAS_TTL", "60"))
+
+_lock = threading.Lock()
+_estatisticas = {"valor": None, "em": 0.0}
+
 # -------------------------------------------------------------------
 # Conexão (reaproveite seu secrets.toml: db_url="postgresql+psycopg2://.../lme_db")
 # -------------------------------------------------------------------
@@ -98,6 +107,13 @@ def ensure_schema_simple():
     CREATE INDEX IF NOT EXISTS idx_hist_chave   ON lme_regras_hist (lme, gd, uo, acao);
     CREATE INDEX IF NOT EXISTS idx_hist_vigente ON lme_regras_hist (vigente_ate, vigente_desde);
 
+    -- Paginação do histórico por chave: ORDER BY / (lme, gd, uo, acao, id) > cursor
+    CREATE INDEX IF NOT EXISTS idx_hist_pagina  ON lme_regras_hist (lme, gd, uo, acao, id);
+
+    -- Consultas no tempo ("vigentes em X"): índice GiST sobre o intervalo de vigência
+    CREATE INDEX IF NOT EXISTS idx_hist_vigencia
+        ON lme_regras_hist USING gist (tstzrange(vigente_desde, vigente_ate, '[)'));
+
     -- Garante 1 única linha "aberta" por chave natural (lme,gd,uo,acao):
     DO $$
     BEGIN
@@ -124,28 +140,56 @@ def ensure_schema_simple():
 # -------------------------------------------------------------------
 # 2) Upsert de regras vigentes (fecha removidas, abre novas/alteradas)
 # -------------------------------------------------------------------
-def upsert_regras_vigentes(
-    df_regras: pd.DataFrame,
-    lme_tipo: str,
-    fonte_arquivo: Optional[str] = None,
-):
-    """
-    Recebe um DataFrame com colunas:
-      ['GRUPO DE DESPESA (=)', 'UNIDADE ORÇAMENTÁRIA (=)', 'AÇÃO PPA (TERMINA COM)', 'regra_completa']
-    e sincroniza a tabela para que o conjunto vigente corresponda exatamente ao DF.
-
-    Regras:
-      - (lme,gd,uo,acao) que NÃO estiver no DF e ESTIVER "aberta" no banco → fecha (vigente_ate=now()).
-      - (lme,gd,uo,acao) que estiver no DF e NÃO existir aberta → insere nova linha aberta.
-      - Se existir aberta com mesma chave mas 'regra_completa' diferente → fecha atual e insere nova.
-
-    Returns:
-        Dict com: {"novas": int, "removidas": int, "alteradas": int, "mantidas": int}
-    """
-    eng = get_engine()
-    if not eng:
-        raise RuntimeError("Sem engine de banco de dados.")
-
+# As regras do TXT vão por COPY para uma tabela temporária; o diff com as
+# linhas abertas é feito no próprio PostgreSQL, com junções por
+# (lme, gd, uo, acao) que usam idx_hist_chave / uq_hist_chave_aberta.
+
+_SQL_STAGING = """
+CREATE TEMP TABLE lme_regras_stage (
+    gd              TEXT     NOT NULL,
+    uo              TEXT     NOT NULL,
+    acao            TEXT     NOT NULL,
+    regra_completa  TEXT     NOT NULL,
+    regra_hash      CHAR(64) NOT NULL,
+    PRIMARY KEY (gd, uo, acao)
+) ON COMMIT DROP
+"""
+
+_SQL_FECHAR_REMOVIDAS = """
+UPDATE lme_regras_hist h
+SET vigente_ate = NOW()
+WHERE h.lme = :lme
+  AND h.vigente_ate IS NULL
+  AND NOT EXISTS (
+      SELECT 1 FROM lme_regras_stage s
+      WHERE s.gd = h.gd AND s.uo = h.uo AND s.acao = h.acao
+  )
+"""
+
+_SQL_FECHAR_ALTERADAS = """
+UPDATE lme_regras_hist h
+SET vigente_ate = NOW()
+FROM lme_regras_stage s
+WHERE h.lme = :lme
+  AND h.vigente_ate IS NULL
+  AND h.gd = s.gd AND h.uo = s.uo AND h.acao = s.acao
+  AND h.regra_hash <> s.regra_hash
+"""
+
+_SQL_INSERIR_SEM_ABERTA = """
+INSERT INTO lme_regras_hist (lme, gd, uo, acao, regra_completa, regra_hash)
+SELECT :lme, s.gd, s.uo, s.acao, s.regra_completa, s.regra_hash
+FROM lme_regras_stage s
+WHERE NOT EXISTS (
+    SELECT 1 FROM lme_regras_hist h
+    WHERE h.lme = :lme AND h.gd = s.gd AND h.uo = s.uo AND h.acao = s.acao
+      AND h.vigente_ate IS NULL
+)
+"""
+
+
+def _preparar_regras(df_regras: pd.DataFrame) -> pd.DataFrame:
+    """Renomeia/normaliza as colunas do TXT processado e calcula o hash de cada regra."""
     # Normaliza/renomeia colunas do DF de entrada
     col_map = {
         "GRUPO DE DESPESA (=)": "gd",
@@ -170,88 +214,82 @@ def upsert_regras_vigentes(
 
     # Cria hash textual para detectar "alteradas"
     df["regra_hash"] = df["regra_completa"].apply(sha256)
-    df["lme"] = lme_tipo
+    return df
 
-    # Construímos o conjunto de chaves ATUAIS (do TXT)
-    df["chave"] = df["lme"] + "|" + df["gd"] + "|" + df["uo"] + "|" + df["acao"]
-    chaves_atuais = set(df["chave"])
+
+# Colunas de texto da staging (NOT NULL) que podem vir vazias
+_COLUNAS_TEXTO = ("gd", "uo", "acao", "regra_completa")
+
+
+def _copiar_para_staging(con, df: pd.DataFrame):
+    """
+    COPY do DataFrame para lme_regras_stage na mesma transação de `con` (psycopg2).
+
+    O CSV grava texto vazio como campo vazio, que o COPY leria como NULL;
+    FORCE_NOT_NULL mantém '' nas colunas de texto (como o INSERT anterior).
+    """
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    cursor = con.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY lme_regras_stage ({', '.join(df.columns)}) FROM STDIN "
+            f"WITH (FORMAT csv, FORCE_NOT_NULL ({', '.join(c for c in _COLUNAS_TEXTO if c in df.columns)}))",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def upsert_regras_vigentes(
+    df_regras: pd.DataFrame,
+    lme_tipo: str,
+    fonte_arquivo: Optional[str] = None,
+):
+    """
+    Recebe um DataFrame com colunas:
+      ['GRUPO DE DESPESA (=)', 'UNIDADE ORÇAMENTÁRIA (=)', 'AÇÃO PPA (TERMINA COM)', 'regra_completa']
+    e sincroniza a tabela para que o conjunto vigente corresponda exatamente ao DF.
+
+    Regras:
+      - (lme,gd,uo,acao) que NÃO estiver no DF e ESTIVER "aberta" no banco → fecha (vigente_ate=now()).
+      - (lme,gd,uo,acao) que estiver no DF e NÃO existir aberta → insere nova linha aberta.
+      - Se existir aberta com mesma chave mas 'regra_completa' diferente → fecha atual e insere nova.
+
+    Returns:
+        Dict com: {"novas": int, "removidas": int, "alteradas": int, "mantidas": int}
+    """
+    eng = get_engine()
+    if not eng:
+        raise RuntimeError("Sem engine de banco de dados.")
+
+    df = _preparar_regras(df_regras)
+    regras_staging = df[["gd", "uo", "acao", "regra_completa", "regra_hash"]]
 
     try:
         with eng.begin() as con:
-            # 1) Buscar tudo que está ABERTO hoje para esse LME
-            atuais_sql = """
-                SELECT lme, gd, uo, acao, regra_hash, regra_completa
-                FROM lme_regras_hist
-                WHERE lme = :lme AND vigente_ate IS NULL
-            """
-            atuais = pd.read_sql(text(atuais_sql), con, params={"lme": lme_tipo})
-            atuais["chave"] = atuais["lme"] + "|" + atuais["gd"] + "|" + atuais["uo"] + "|" + atuais["acao"]
-            chaves_abertas = set(atuais["chave"])
-
-            # 2) Determinar movimentos
-            chaves_novas      = chaves_atuais - chaves_abertas
-            chaves_removidas  = chaves_abertas - chaves_atuais
-            chaves_comuns     = chaves_atuais & chaves_abertas
-
-            alteradas = []
-
-            # 3) Fechar as REMOVIDAS
-            if chaves_removidas:
-                q = """
-                UPDATE lme_regras_hist
-                SET vigente_ate = NOW()
-                WHERE vigente_ate IS NULL
-                  AND lme = :lme
-                  AND (lme || '|' || gd || '|' || uo || '|' || acao) = ANY(:keys)
-                """
-                con.execute(text(q), {"lme": lme_tipo, "keys": list(chaves_removidas)})
-
-            # 4) Inserir as NOVAS
-            if chaves_novas:
-                inserir = df[df["chave"].isin(chaves_novas)][
-                    ["lme", "gd", "uo", "acao", "regra_completa", "regra_hash"]
-                ].to_dict("records")
-                con.execute(text("""
-                    INSERT INTO lme_regras_hist (lme, gd, uo, acao, regra_completa, regra_hash)
-                    VALUES (:lme, :gd, :uo, :acao, :regra_completa, :regra_hash)
-                """), inserir)
-
-            # 5) Tratar ALTERADAS (mesma chave, hash mudou)
-            if chaves_comuns:
-                # junta DF atual com o que está aberto
-                base = df[df["chave"].isin(chaves_comuns)][
-                    ["chave", "regra_hash", "regra_completa"]
-                ].merge(
-                    atuais[["chave", "regra_hash"]].rename(columns={"regra_hash": "hash_antigo"}),
-                    on="chave",
-                    how="left",
-                )
-                alteradas = base[base["regra_hash"] != base["hash_antigo"]]["chave"].tolist()
-
-                if alteradas:
-                    # fecha as antigas
-                    con.execute(text("""
-                        UPDATE lme_regras_hist
-                        SET vigente_ate = NOW()
-                        WHERE vigente_ate IS NULL
-                          AND (lme || '|' || gd || '|' || uo || '|' || acao) = ANY(:keys)
-                    """), {"keys": alteradas})
-
-                    # insere as novas linhas abertas
-                    inserir_alt = df[df["chave"].isin(alteradas)][
-                        ["lme", "gd", "uo", "acao", "regra_completa", "regra_hash"]
-                    ].to_dict("records")
-                    con.execute(text("""
-                        INSERT INTO lme_regras_hist (lme, gd, uo, acao, regra_completa, regra_hash)
-                        VALUES (:lme, :gd, :uo, :acao, :regra_completa, :regra_hash)
-                    """), inserir_alt)
-
-        # Retorno resumido (pode usar na UI)
+            # 1) COPY das regras do TXT para uma tabela temporária (some no COMMIT)
+            con.execute(text(_SQL_STAGING))
+            _copiar_para_staging(con, regras_staging)
+            con.execute(text("ANALYZE lme_regras_stage"))
+
+            # 2) Fechar as REMOVIDAS (abertas no banco e ausentes do TXT)
+            removidas = con.execute(text(_SQL_FECHAR_REMOVIDAS), {"lme": lme_tipo}).rowcount
+
+            # 3) Fechar as ALTERADAS (mesma chave, hash mudou)
+            alteradas = con.execute(text(_SQL_FECHAR_ALTERADAS), {"lme": lme_tipo}).rowcount
+
+            # 4) Abrir as NOVAS e as versões novas das ALTERADAS (chaves sem linha aberta)
+            inseridas = con.execute(text(_SQL_INSERIR_SEM_ABERTA), {"lme": lme_tipo}).rowcount
+
+        invalidar_estatisticas()
+        novas = inseridas - alteradas
         return {
-            "novas": len(chaves_novas),
-            "removidas": len(chaves_removidas),
-            "alteradas": len(alteradas) if chaves_comuns else 0,
-            "mantidas": len(chaves_comuns) - (len(alteradas) if chaves_comuns else 0),
+            "novas": novas,
+            "removidas": removidas,
+            "alteradas": alteradas,
+            "mantidas": len(regras_staging) - novas - alteradas,
         }
 
     except Exception as e:
@@ -315,47 +353,120 @@ def listar_historico(lme_tipo: Optional[str] = None, uo: Optional[str] = None) -
         return pd.DataFrame()
 
 
-def get_estatisticas() -> dict:
-    """Retorna estatísticas gerais do banco."""
+def pagina_historico(
+    lme_tipo: Optional[str] = None,
+    uo: Optional[str] = None,
+    gd: Optional[str] = None,
+    desde=None,
+    ate=None,
+    apos: Optional[tuple] = None,
+    limite: int = 500,
+):
+    """
+    Uma página do histórico (abertas + fechadas), com paginação por chave (keyset).
+
+    Args:
+        lme_tipo, uo, gd: Filtros opcionais
+        desde, ate: date/datetime opcionais; mantém as regras cuja vigência
+                    toca o período (usa idx_hist_vigencia)
+        apos: Cursor devolvido pela página anterior (None = primeira página)
+        limite: Linhas por página
+
+    Returns:
+        Tuple (DataFrame, cursor da próxima página ou None se esta for a última).
+        As linhas vêm ordenadas por (lme, gd, uo, acao, id) — cada chave em
+        ordem cronológica.
+    """
     eng = get_engine()
     if not eng:
-        return {}
+        return pd.DataFrame(), None
+
+    clauses, params = [], {"limite": limite + 1}
+    for coluna, valor in (("lme", lme_tipo), ("uo", uo), ("gd", gd)):
+        if valor:
+            clauses.append(f"{coluna} = :{coluna}")
+            params[coluna] = valor
+    if desde is not None or ate is not None:
+        clauses.append(f"{VIGENCIA} && tstzrange(CAST(:desde AS TIMESTAMPTZ), CAST(:ate AS TIMESTAMPTZ), '[]')")
+        params["desde"] = None if desde is None else (
+            desde if isinstance(desde, datetime) else datetime.combine(desde, datetime.min.time()))
+        params["ate"] = None if ate is None else _instante(ate)
+    if apos is not None:
+        clauses.append("(lme, gd, uo, acao, id) > (:k_lme, :k_gd, :k_uo, :k_acao, :k_id)")
+        params.update(zip(("k_lme", "k_gd", "k_uo", "k_acao", "k_id"), apos))
+
+    sql = """
+    SELECT id, lme, gd, uo, acao, regra_completa, vigente_desde, vigente_ate
+    FROM lme_regras_hist
+    """
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY lme, gd, uo, acao, id LIMIT :limite"
 
     try:
         with eng.begin() as con:
-            # Total de regras vigentes
-            total_vigentes = pd.read_sql(
-                text("SELECT COUNT(*) as count FROM lme_regras_hist WHERE vigente_ate IS NULL"),
-                con
-            )["count"][0]
+            df = pd.read_sql(text(sql), con, params=params)
+    except Exception as e:
+        st.error(f"Erro ao listar histórico: {e}")
+        return pd.DataFrame(), None
+
+    if len(df) <= limite:
+        return df, None
+    df = df.iloc[:limite]
+    ultima = df.iloc[-1]
+    cursor = (ultima["lme"], ultima["gd"], ultima["uo"], ultima["acao"], int(ultima["id"]))
+    return df, cursor
 
-            # Total de registros históricos
-            total_historico = pd.read_sql(
-                text("SELECT COUNT(*) as count FROM lme_regras_hist"),
-                con
-            )["count"][0]
 
-            # Por LME vigente
+def get_estatisticas() -> dict:
+    """
+    Retorna estatísticas gerais do banco (uma única consulta).
+
+    O resultado fica em memória por ESTATISTICAS_TTL segundos e é descartado
+    quando as regras mudam (upsert_regras_vigentes / deletar_todas_regras_lme).
+    """
+    with _lock:
+        if _estatisticas["valor"] is not None and time.monotonic() - _estatisticas["em"] < ESTATISTICAS_TTL:
+            return dict(_estatisticas["valor"])
+
+    eng = get_engine()
+    if not eng:
+        return {}
+
+    try:
+        with eng.begin() as con:
             por_lme = pd.read_sql(
                 text("""
-                    SELECT lme, COUNT(*) as count
+                    SELECT lme,
+                           COUNT(*) FILTER (WHERE vigente_ate IS NULL) AS vigentes,
+                           COUNT(*) AS historico
                     FROM lme_regras_hist
-                    WHERE vigente_ate IS NULL
                     GROUP BY lme
                     ORDER BY lme
                 """),
                 con
             )
-
-            return {
-                "total_vigentes": total_vigentes,
-                "total_historico": total_historico,
-                "por_lme": por_lme.to_dict("records")
-            }
     except Exception as e:
         st.error(f"Erro ao obter estatísticas: {e}")
         return {}
 
+    # Distribuição por LME vigente (só LMEs com regras abertas)
+    vigentes = por_lme[por_lme["vigentes"] > 0]
+    estatisticas = {
+        "total_vigentes": int(por_lme["vigentes"].sum()),
+        "total_historico": int(por_lme["historico"].sum()),
+        "por_lme": vigentes.rename(columns={"vigentes": "count"})[["lme", "count"]].to_dict("records"),
+    }
+    with _lock:
+        _estatisticas.update(valor=estatisticas, em=time.monotonic())
+    return dict(estatisticas)
+
+
+def invalidar_estatisticas():
+    """Descarta as estatísticas em memória (chamada após alterar as regras)."""
+    with _lock:
+        _estatisticas.update(valor=None, em=0.0)
+
 
 def deletar_todas_regras_lme(lme_tipo: str) -> bool:
     """
@@ -372,7 +483,159 @@ def deletar_todas_regras_lme(lme_tipo: str) -> bool:
                 text("DELETE FROM lme_regras_hist WHERE lme = :lme"),
                 {"lme": lme_tipo}
             )
+        invalidar_estatisticas()
         return True
     except Exception as e:
         st.error(f"Erro ao deletar regras: {e}")
         return False
+
+
+# -------------------------------------------------------------------
+# 4) Consultas no tempo (vigência em uma data) e snapshots mensais
+# -------------------------------------------------------------------
+# `VIGENCIA` é a mesma expressão do índice idx_hist_vigencia; use-a sem
+# alterações para que o planner use o índice GiST.
+VIGENCIA = "tstzrange(vigente_desde, vigente_ate, '[)')"
+
+_SQL_SNAPSHOTS_MENSAIS = f"""
+CREATE MATERIALIZED VIEW IF NOT EXISTS lme_regras_mensal AS
+SELECT CAST(m.mes AS DATE) AS mes,
+       h.lme,
+       COUNT(*) FILTER (WHERE {VIGENCIA} @> (m.mes + INTERVAL '1 month' - INTERVAL '1 microsecond')) AS vigentes,
+       COUNT(*) FILTER (WHERE h.vigente_desde >= m.mes AND h.vigente_desde < m.mes + INTERVAL '1 month') AS abertas,
+       COUNT(*) FILTER (WHERE h.vigente_ate >= m.mes AND h.vigente_ate < m.mes + INTERVAL '1 month') AS encerradas
+FROM generate_series(
+         (SELECT date_trunc('month', MIN(vigente_desde)) FROM lme_regras_hist),
+         date_trunc('month', NOW()),
+         INTERVAL '1 month'
+     ) AS m(mes)
+JOIN lme_regras_hist h
+  ON {VIGENCIA} && tstzrange(m.mes, m.mes + INTERVAL '1 month', '[)')
+GROUP BY m.mes, h.lme
+WITH DATA
+"""
+
+
+def _instante(data) -> datetime:
+    """Data -> último instante do dia (a situação ao fim do dia); datetime é usado como está."""
+    if isinstance(data, datetime):
+        return data
+    return datetime.combine(data + timedelta(days=1), datetime.min.time()) - timedelta(microseconds=1)
+
+
+def regras_em(data, lme_tipo: Optional[str] = None) -> pd.DataFrame:
+    """
+    Regras vigentes numa data (ou datetime), resolvido no banco via idx_hist_vigencia.
+
+    Args:
+        data: date (situação ao fim do dia) ou datetime
+        lme_tipo: 'LME 1' | 'LME 2' | 'LME 6' (opcional)
+    """
+    eng = get_engine()
+    if not eng:
+        return pd.DataFrame()
+    sql = f"""
+    SELECT lme, gd, uo, acao, regra_completa, vigente_desde, vigente_ate
+    FROM lme_regras_hist
+    WHERE {VIGENCIA} @> CAST(:instante AS TIMESTAMPTZ)
+    """
+    params = {"instante": _instante(data)}
+    if lme_tipo:
+        sql += " AND lme = :lme"
+        params["lme"] = lme_tipo
+    sql += " ORDER BY lme, gd, uo, acao"
+    try:
+        with eng.begin() as con:
+            return pd.read_sql(text(sql), con, params=params)
+    except Exception as e:
+        st.error(f"Erro ao consultar regras na data: {e}")
+        return pd.DataFrame()
+
+
+def diff_regras(data1, data2, lme_tipo: Optional[str] = None) -> pd.DataFrame:
+    """
+    Diferença entre as regras vigentes em `data1` e em `data2`, calculada no banco.
+
+    Returns:
+        DataFrame (lme, gd, uo, acao, status, regra_antes, regra_depois) com
+        status 'ENTROU' (só em data2), 'SAIU' (só em data1) ou 'ALTERADA'
+        (mesma chave, texto diferente). Regras iguais nas duas datas não aparecem.
+    """
+    eng = get_engine()
+    if not eng:
+        return pd.DataFrame()
+    filtro_lme = " AND lme = :lme" if lme_tipo else ""
+    sql = f"""
+    WITH antes AS (
+        SELECT lme, gd, uo, acao, regra_hash, regra_completa
+        FROM lme_regras_hist
+        WHERE {VIGENCIA} @> CAST(:instante1 AS TIMESTAMPTZ){filtro_lme}
+    ), depois AS (
+        SELECT lme, gd, uo, acao, regra_hash, regra_completa
+        FROM lme_regras_hist
+        WHERE {VIGENCIA} @> CAST(:instante2 AS TIMESTAMPTZ){filtro_lme}
+    )
+    SELECT lme, gd, uo, acao,
+           CASE WHEN antes.regra_hash IS NULL THEN 'ENTROU'
+                WHEN depois.regra_hash IS NULL THEN 'SAIU'
+                ELSE 'ALTERADA' END AS status,
+           antes.regra_completa AS regra_antes,
+           depois.regra_completa AS regra_depois
+    FROM antes FULL OUTER JOIN depois USING (lme, gd, uo, acao)
+    WHERE antes.regra_hash IS DISTINCT FROM depois.regra_hash
+    ORDER BY lme, gd, uo, acao
+    """
+    params = {"instante1": _instante(data1), "instante2": _instante(data2)}
+    if lme_tipo:
+        params["lme"] = lme_tipo
+    try:
+        with eng.begin() as con:
+            return pd.read_sql(text(sql), con, params=params)
+    except Exception as e:
+        st.error(f"Erro ao comparar regras entre datas: {e}")
+        return pd.DataFrame()
+
+
+def atualizar_snapshots_mensais() -> bool:
+    """
+    Cria (se preciso) e atualiza a view materializada `lme_regras_mensal`:
+    por mês e LME, regras vigentes no fim do mês, abertas e encerradas no mês.
+    É opcional — só é usada pelos painéis que a consultam.
+    """
+    eng = get_engine()
+    if not eng:
+        return False
+    try:
+        with eng.begin() as con:
+            existia = con.execute(text("SELECT to_regclass('lme_regras_mensal') IS NOT NULL")).scalar()
+            con.execute(text(_SQL_SNAPSHOTS_MENSAIS))
+            if existia:
+                con.execute(text("REFRESH MATERIALIZED VIEW lme_regras_mensal"))
+        return True
+    except Exception as e:
+        st.error(f"Erro ao atualizar snapshots mensais: {e}")
+        return False
+
+
+def snapshots_mensais(lme_tipo: Optional[str] = None) -> pd.DataFrame:
+    """Lê `lme_regras_mensal` (vazio se a view ainda não foi criada)."""
+    eng = get_engine()
+    if not eng:
+        return pd.DataFrame()
+    sql = """
+    SELECT mes, lme, vigentes, abertas, encerradas
+    FROM lme_regras_mensal
+    """
+    params = {}
+    if lme_tipo:
+        sql += " WHERE lme = :lme"
+        params["lme"] = lme_tipo
+    sql += " ORDER BY mes, lme"
+    try:
+        with eng.begin() as con:
+            if not con.execute(text("SELECT to_regclass('lme_regras_mensal') IS NOT NULL")).scalar():
+                return pd.DataFrame()
+            return pd.read_sql(text(sql), con, params=params)
+    except Exception as e:
+        st.error(f"Erro ao ler snapshots mensais: {e}")
+        return pd.DataFrame()
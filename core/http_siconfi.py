@@ -0,0 +1,378 @@
+# ┌───────────────────────────────────────────────────────────────
+# │ core/http_siconfi.py
+# │ Cliente HTTP compartilhado para a API de dados abertos do SICONFI
+# └───────────────────────────────────────────────────────────────
+#
+# Todas as consultas à API (api_loader, páginas de MSC mensal, extratos e
+# dashboard do RREO) passam por aqui:
+#
+# - um único httpx.AsyncClient (pool de conexões) por processo, rodando num
+#   event loop próprio em thread de fundo. Chamadas síncronas (`get`) e
+#   assíncronas (`get_async`, de qualquer event loop) são encaminhadas a ele;
+# - limitador AIMD: o limite de requisições simultâneas cresce +1 a cada
+#   "janela" de respostas bem-sucedidas e cai pela metade quando a API
+#   responde 429/5xx ou a conexão falha; um token bucket limita a taxa
+#   (req/s) e respeita `Retry-After`;
+# - retry com backoff exponencial + jitter para erros transitórios;
+# - coalescência: GETs idênticos (URL + parâmetros + cabeçalhos) em andamento
+#   compartilham uma única requisição;
+# - métricas (`metricas()`): histograma de latência, retries, bytes, status.
+#
+# Como limitador e pool são do processo, usuários simultâneos do Streamlit
+# dividem o mesmo orçamento de conexões com a API. Vários processos (ex.: o
+# Ranking em lote) devem dividir o orçamento entre si com `configurar`.
+#
+# Uso:
+#   resp = http_siconfi.get(f"{API_ROOT}/extrato_entregas", params=..., timeout=60)
+#   resp = await http_siconfi.get_async(url, params=..., retries=6)
+
+import asyncio
+import atexit
+import os
+import random
+import threading
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import httpx
+
+API_ROOT = "https://apidatalake.tesouro.gov.br/ords/siconfi/tt"
+
+# Limite inicial / máximo de requisições simultâneas (ajustado pelo AIMD)
+CONCORRENCIA_INICIAL = int(os.environ.get("SICONFI_HTTP_CONCORRENCIA", "8"))
+CONCORRENCIA_MAX = int(os.environ.get("SICONFI_HTTP_CONCORRENCIA_MAX", "32"))
+# Taxa máxima (requisições por segundo) do token bucket
+TAXA_MAX = float(os.environ.get("SICONFI_HTTP_TAXA", "20"))
+# HTTP/1.1 por padrão, como a página 10 já forçava para a API do SICONFI;
+# SICONFI_HTTP2=1 habilita HTTP/2
+HTTP2 = os.environ.get("SICONFI_HTTP2", "0") == "1"
+
+RETRIES = 5
+TIMEOUT = httpx.Timeout(90.0, connect=10.0)
+USER_AGENT = "streamlit-app/siconfi (httpx)"
+
+TRANSIENT_STATUS = frozenset({429, 500, 502, 503, 504})
+ERROS_TRANSITORIOS = (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)
+RETRY_AFTER_MAX = 15.0
+
+# Intervalo mínimo (s) entre duas reduções do limite: uma rajada de 429
+# simultâneos conta como um único sinal de sobrecarga
+_INTERVALO_REDUCAO = 1.0
+
+# Limites superiores (s) das faixas do histograma de latência
+FAIXAS_LATENCIA = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+# ═══════════════════════════════════════════════════════════════
+# Auxiliares
+# ═══════════════════════════════════════════════════════════════
+
+def _espera(tentativa: int, base: float = 0.6, teto: float = 10.0) -> float:
+    """Backoff exponencial com jitter (evita rajadas sincronizadas)."""
+    return min(teto, base * (2 ** tentativa)) + random.uniform(0, 0.35)
+
+
+def _retry_after(resp: httpx.Response) -> Optional[float]:
+    """Segundos indicados em `Retry-After` (número ou data HTTP), limitados a RETRY_AFTER_MAX."""
+    valor = resp.headers.get("Retry-After")
+    if not valor:
+        return None
+    try:
+        segundos = float(valor)
+    except ValueError:
+        try:
+            segundos = parsedate_to_datetime(valor).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(segundos, 0.0), RETRY_AFTER_MAX)
+
+
+def _chave(url: str, params: Optional[dict], headers: Optional[dict]) -> tuple:
+    """Identifica GETs idênticos para a coalescência."""
+    return (
+        url,
+        tuple(sorted((str(k), str(v)) for k, v in (params or {}).items())),
+        tuple(sorted((str(k).lower(), str(v)) for k, v in (headers or {}).items())),
+    )
+
+
+# ═══════════════════════════════════════════════════════════════
+# Limitador AIMD + token bucket
+# ═══════════════════════════════════════════════════════════════
+
+class LimitadorAIMD:
+    """
+    Controla quantas requisições podem estar em andamento e com que taxa.
+
+    - sucesso: limite += 1/limite (≈ +1 a cada `limite` respostas);
+    - sobrecarga (429/5xx/falha de conexão): limite /= 2, no máximo uma vez por
+      _INTERVALO_REDUCAO; com `Retry-After`, novas requisições aguardam o prazo;
+    - token bucket: no máximo `taxa` req/s, com rajada de até `taxa` requisições.
+
+    Usado apenas no event loop do ClienteSiconfi (sem locks).
+    """
+
+    def __init__(self, inicial: int = CONCORRENCIA_INICIAL, maximo: int = CONCORRENCIA_MAX,
+                 taxa: float = TAXA_MAX, minimo: int = 1):
+        self.minimo = minimo
+        self.maximo = max(maximo, minimo)
+        self.limite = float(min(max(inicial, minimo), self.maximo))
+        self.taxa = taxa
+        self.tokens = taxa
+        self.em_uso = 0
+        self._reposicao = time.monotonic()
+        self._pausa_ate = 0.0
+        self._ultima_reducao = 0.0
+        self._livre = asyncio.Condition()
+
+    def _token(self) -> float:
+        """Consome um token; se não houver, devolve quanto esperar (s)."""
+        agora = time.monotonic()
+        self.tokens = min(self.taxa, self.tokens + (agora - self._reposicao) * self.taxa)
+        self._reposicao = agora
+        if agora < self._pausa_ate:
+            return self._pausa_ate - agora
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.taxa
+
+    async def adquirir(self):
+        async with self._livre:
+            await self._livre.wait_for(lambda: self.em_uso < int(self.limite))
+            self.em_uso += 1
+        try:
+            while (espera := self._token()) > 0:
+                await asyncio.sleep(espera)
+        except BaseException:
+            await self.liberar()
+            raise
+
+    async def liberar(self):
+        async with self._livre:
+            self.em_uso -= 1
+            self._livre.notify_all()
+
+    def sucesso(self):
+        self.limite = min(float(self.maximo), self.limite + 1 / self.limite)
+
+    def sobrecarga(self, retry_after: Optional[float] = None):
+        agora = time.monotonic()
+        if retry_after:
+            self._pausa_ate = max(self._pausa_ate, agora + retry_after)
+        if agora - self._ultima_reducao >= _INTERVALO_REDUCAO:
+            self.limite = max(float(self.minimo), self.limite / 2)
+            self._ultima_reducao = agora
+
+
+# ═══════════════════════════════════════════════════════════════
+# Métricas
+# ═══════════════════════════════════════════════════════════════
+
+class Metricas:
+    """Contadores do cliente (thread-safe); `instantaneo()` devolve uma cópia."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.zerar()
+
+    def zerar(self):
+        with self._lock:
+            self._contadores = Counter()
+            self._status = Counter()
+            self._histograma = [0] * (len(FAIXAS_LATENCIA) + 1)
+            self._latencia_total = 0.0
+
+    def contar(self, nome: str, n: int = 1):
+        with self._lock:
+            self._contadores[nome] += n
+
+    def registrar(self, latencia: float, status: int, n_bytes: int):
+        faixa = next((i for i, limite in enumerate(FAIXAS_LATENCIA) if latencia <= limite), len(FAIXAS_LATENCIA))
+        with self._lock:
+            self._contadores["respostas"] += 1
+            self._contadores["bytes"] += n_bytes
+            self._status[status] += 1
+            self._histograma[faixa] += 1
+            self._latencia_total += latencia
+
+    def instantaneo(self) -> dict:
+        with self._lock:
+            respostas = self._contadores["respostas"]
+            faixas = [f"<={limite}s" for limite in FAIXAS_LATENCIA] + [f">{FAIXAS_LATENCIA[-1]}s"]
+            return {
+                "requisicoes": self._contadores["requisicoes"],
+                "coalescidas": self._contadores["coalescidas"],
+                "respostas": respostas,
+                "retries": self._contadores["retries"],
+                "falhas_conexao": self._contadores["falhas_conexao"],
+                "bytes": self._contadores["bytes"],
+                "status": dict(self._status),
+                "latencia_media": self._latencia_total / respostas if respostas else 0.0,
+                "latencia_histograma": dict(zip(faixas, self._histograma)),
+            }
+
+
+# ═══════════════════════════════════════════════════════════════
+# Cliente do processo
+# ═══════════════════════════════════════════════════════════════
+
+class ClienteSiconfi:
+    """
+    Pool de conexões + limitador num event loop dedicado (thread daemon).
+
+    Não instanciar diretamente: use `cliente()` (ou `get`/`get_async`).
+    """
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.metricas = Metricas()
+        self._em_andamento = {}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="siconfi-http", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._iniciar(), self._loop).result()
+
+    async def _iniciar(self):
+        self._limitador = LimitadorAIMD(CONCORRENCIA_INICIAL, CONCORRENCIA_MAX, TAXA_MAX)
+        self._client = httpx.AsyncClient(
+            http2=HTTP2,
+            timeout=TIMEOUT,
+            limits=httpx.Limits(max_connections=CONCORRENCIA_MAX, max_keepalive_connections=CONCORRENCIA_MAX),
+            headers={"User-Agent": USER_AGENT},
+        )
+
+    @property
+    def limite(self) -> float:
+        """Limite atual de requisições simultâneas."""
+        return self._limitador.limite
+
+    async def _executar(self, url, params, headers, timeout, retries):
+        resp = None
+        for tentativa in range(retries):
+            if tentativa:
+                self.metricas.contar("retries")
+            await self._limitador.adquirir()
+            inicio = time.perf_counter()
+            try:
+                resp = await self._client.get(url, params=params, headers=headers, timeout=timeout)
+            except ERROS_TRANSITORIOS:
+                self.metricas.contar("falhas_conexao")
+                self._limitador.sobrecarga()
+                if tentativa == retries - 1:
+                    raise
+                espera = _espera(tentativa)
+            else:
+                self.metricas.registrar(time.perf_counter() - inicio, resp.status_code, len(resp.content))
+                if resp.status_code not in TRANSIENT_STATUS:
+                    self._limitador.sucesso()
+                    return resp
+                retry_after = _retry_after(resp)
+                self._limitador.sobrecarga(retry_after)
+                espera = retry_after if retry_after is not None else _espera(tentativa)
+            finally:
+                await self._limitador.liberar()
+            if tentativa < retries - 1:
+                await asyncio.sleep(espera)
+        # tentativas esgotadas com status transitório: o chamador decide (raise_for_status, cache...)
+        return resp
+
+    async def _get(self, url, params, headers, timeout, retries):
+        self.metricas.contar("requisicoes")
+        chave = _chave(url, params, headers)
+        tarefa = self._em_andamento.get(chave)
+        if tarefa is None:
+            tarefa = self._loop.create_task(self._executar(url, params, headers, timeout, retries))
+            self._em_andamento[chave] = tarefa
+
+            def _concluida(t):
+                if self._em_andamento.get(chave) is t:
+                    del self._em_andamento[chave]
+                if not t.cancelled():
+                    t.exception()  # evita "exception was never retrieved" se ninguém mais aguarda
+
+            tarefa.add_done_callback(_concluida)
+        else:
+            self.metricas.contar("coalescidas")
+        # shield: o cancelamento de um chamador não derruba a requisição dos demais
+        return await asyncio.shield(tarefa)
+
+    def _submeter(self, url, params, headers, timeout, retries):
+        return asyncio.run_coroutine_threadsafe(self._get(url, params, headers, timeout, retries), self._loop)
+
+    def get(self, url: str, params: Optional[dict] = None, headers: Optional[dict] = None,
+            timeout=TIMEOUT, retries: int = RETRIES) -> httpx.Response:
+        """GET bloqueante. Retorna a resposta (já lida); não chama `raise_for_status`."""
+        return self._submeter(url, params, headers, timeout, retries).result()
+
+    async def get_async(self, url: str, params: Optional[dict] = None, headers: Optional[dict] = None,
+                        timeout=TIMEOUT, retries: int = RETRIES) -> httpx.Response:
+        """GET assíncrono, utilizável a partir de qualquer event loop."""
+        return await asyncio.wrap_future(self._submeter(url, params, headers, timeout, retries))
+
+    def fechar(self):
+        if not self._loop.is_running():
+            return
+        asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+_lock = threading.Lock()
+_cliente: Optional[ClienteSiconfi] = None
+
+
+def configurar(taxa: Optional[float] = None, concorrencia: Optional[int] = None,
+               concorrencia_max: Optional[int] = None) -> None:
+    """
+    Ajusta o orçamento do processo (taxa e limites de concorrência) antes do
+    primeiro uso do cliente; valores None mantêm os atuais.
+    """
+    global TAXA_MAX, CONCORRENCIA_INICIAL, CONCORRENCIA_MAX
+    with _lock:
+        if _cliente is not None and _cliente.pid == os.getpid():
+            raise RuntimeError("http_siconfi.configurar deve ser chamado antes do primeiro uso do cliente")
+        if taxa is not None:
+            TAXA_MAX = float(taxa)
+        if concorrencia_max is not None:
+            CONCORRENCIA_MAX = max(int(concorrencia_max), 1)
+        if concorrencia is not None:
+            CONCORRENCIA_INICIAL = int(concorrencia)
+        CONCORRENCIA_INICIAL = max(min(CONCORRENCIA_INICIAL, CONCORRENCIA_MAX), 1)
+
+
+def cliente() -> ClienteSiconfi:
+    """Cliente do processo (criado no primeiro uso; recriado após fork)."""
+    global _cliente
+    with _lock:
+        if _cliente is None or _cliente.pid != os.getpid():
+            _cliente = ClienteSiconfi()
+        return _cliente
+
+
+def get(url: str, params: Optional[dict] = None, headers: Optional[dict] = None,
+        timeout=TIMEOUT, retries: int = RETRIES) -> httpx.Response:
+    """Atalho para `cliente().get`."""
+    return cliente().get(url, params=params, headers=headers, timeout=timeout, retries=retries)
+
+
+async def get_async(url: str, params: Optional[dict] = None, headers: Optional[dict] = None,
+                    timeout=TIMEOUT, retries: int = RETRIES) -> httpx.Response:
+    """Atalho para `cliente().get_async`."""
+    return await cliente().get_async(url, params=params, headers=headers, timeout=timeout, retries=retries)
+
+
+def metricas() -> dict:
+    """Métricas acumuladas do processo, com o limite de concorrência atual."""
+    atual = cliente()
+    return dict(atual.metricas.instantaneo(), limite_concorrencia=atual.limite)
+
+
+@atexit.register
+def _fechar():
+    if _cliente is not None and _cliente.pid == os.getpid():
+        try:
+            _cliente.fechar()
+        except Exception:
+            pass
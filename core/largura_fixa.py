@@ -0,0 +1,425 @@
+# ┌───────────────────────────────────────────────────────────────
+# │ core/largura_fixa.py - Leitura de arquivos TXT de largura fixa (SIG)
+# └───────────────────────────────────────────────────────────────
+#
+# Os TXT do SIG (SIG003, arquivo de carga da receita) têm um registro por
+# linha com os campos em posições fixas. `pd.read_fwf` monta cada campo como
+# objeto Python linha a linha e é muito lento em arquivos de milhões de linhas.
+#
+# Aqui o arquivo é tratado como bytes (latin-1: 1 byte por caractere):
+#
+# - o conteúdo é percorrido em blocos terminados em fim de linha, como um
+#   array NumPy uint8 sobre o próprio buffer (sem copiar nem criar uma string
+#   por linha); inícios e fins de linha saem de uma busca vetorizada por '\n';
+# - cada campo é recortado das posições (ini, fim) de todas as linhas de uma
+#   vez numa matriz (linhas x largura) de bytes;
+# - campos de texto viram categóricas: a matriz é fatorada como inteiros de 8
+#   bytes e só os valores distintos são decodificados (latin-1, em bloco);
+# - campos numéricos são convertidos direto da matriz de bytes (dígitos,
+#   vírgula decimal, '.' de milhar, sinal '-' ou parênteses), sem texto.
+#
+# Uso:
+#   from core.largura_fixa import ler_largura_fixa
+#   df = ler_largura_fixa(arquivo, {'COD_UG': (7, 13), 'VALOR': (28, 47)}, numericos=['VALOR'])
+#
+# Benchmark (SIG003 sintético de 3 milhões de linhas):
+#   python -m core.largura_fixa
+
+import io
+import os
+import time
+from typing import Dict, Iterable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+# ═══════════════════════════════════════════════════════════════
+# Constantes
+# ═══════════════════════════════════════════════════════════════
+
+# Tamanho (bytes) de cada bloco processado de uma vez
+BLOCO = int(os.environ.get("LARGURA_FIXA_BLOCO_MB", "16")) * 1024 * 1024
+
+# Posição de um campo: (ini, fim) ou lista de posições concatenadas
+Posicao = Union[Tuple[int, int], Sequence[Tuple[int, int]]]
+
+_NL, _CR, _TAB, _ESPACO = 10, 13, 9, 32
+_ZERO, _NOVE = ord('0'), ord('9')
+
+# Classe de cada byte nos campos numéricos
+_IGNORADO, _DIGITO, _DECIMAL, _SINAL, _INVALIDO = range(5)
+_CLASSE = np.full(256, _INVALIDO, dtype=np.uint8)
+_CLASSE[[0, _TAB, _ESPACO, ord('.'), ord('+'), ord(')')]] = _IGNORADO
+_CLASSE[_ZERO:_NOVE + 1] = _DIGITO
+_CLASSE[ord(',')] = _DECIMAL
+_CLASSE[[ord('-'), ord('(')]] = _SINAL
+
+
+# ═══════════════════════════════════════════════════════════════
+# Linhas e Campos (por bloco)
+# ═══════════════════════════════════════════════════════════════
+
+def _conteudo(arquivo) -> bytes:
+    """Caminho, bytes ou arquivo (ex.: upload do Streamlit) -> conteúdo em bytes."""
+    if isinstance(arquivo, (bytes, bytearray)):
+        return bytes(arquivo)
+    if isinstance(arquivo, (str, os.PathLike)):
+        with open(arquivo, 'rb') as f:
+            return f.read()
+    if hasattr(arquivo, 'getvalue'):
+        return arquivo.getvalue()
+    if hasattr(arquivo, 'seek'):
+        arquivo.seek(0)
+    return arquivo.read()
+
+
+def _blocos(dados: bytes, tamanho: int = BLOCO):
+    """Visões (uint8, sem cópia) de trechos de `dados` terminados em fim de linha."""
+    visao = memoryview(dados)
+    inicio = 0
+    while inicio < len(dados):
+        fim = len(dados)
+        if inicio + tamanho < fim:
+            quebra = dados.rfind(b'\n', inicio, inicio + tamanho)
+            if quebra < 0:
+                quebra = dados.find(b'\n', inicio + tamanho)
+            fim = quebra + 1 if quebra >= 0 else fim
+        yield np.frombuffer(visao[inicio:fim], dtype=np.uint8)
+        inicio = fim
+
+
+def _linhas(buf: np.ndarray, ultimos: Optional[int]):
+    """
+    Início e fim (exclusivo) de cada linha não vazia do bloco.
+
+    Com `ultimos`, cada linha é aparada e só os seus últimos `ultimos` bytes
+    são considerados (equivale a `linha.strip()[-ultimos:]`).
+    """
+    fins = np.flatnonzero(buf == _NL)
+    if len(buf) and buf[-1] != _NL:
+        fins = np.append(fins, len(buf))
+    inicios = np.concatenate(([0], fins[:-1] + 1)) if len(fins) else fins
+
+    visivel = np.flatnonzero((buf != _ESPACO) & (buf != _TAB) & (buf != _NL) & (buf != _CR))
+    k = np.searchsorted(visivel, inicios)
+    primeiro = visivel[np.minimum(k, len(visivel) - 1)] if len(visivel) else inicios
+    cheia = (k < len(visivel)) & (primeiro < fins)
+    inicios, fins, primeiro = inicios[cheia], fins[cheia], primeiro[cheia]
+
+    if ultimos is None:
+        fins = fins - ((fins > inicios) & (buf[np.maximum(fins - 1, 0)] == _CR))
+        return inicios, fins
+    ultimo = visivel[np.searchsorted(visivel, fins) - 1] + 1
+    return np.maximum(primeiro, ultimo - ultimos), ultimo
+
+
+def _matriz(buf: np.ndarray, inicios: np.ndarray, fins: np.ndarray, posicao: Posicao,
+            linhas: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Bytes do campo em todas as linhas: matriz (linhas x largura); além do fim
+    da linha, 0. `linhas` (ver `_linhas_alinhadas`) evita a cópia indexada
+    quando o campo cabe em todas as linhas.
+    """
+    if isinstance(posicao[0], int):
+        posicao = [posicao]
+    partes = []
+    for ini, fim in posicao:
+        if linhas is not None and fim <= linhas.shape[1]:
+            partes.append(linhas[:, ini:fim])
+            continue
+        indices = inicios[:, None] + np.arange(ini, fim)
+        dentro = indices < fins[:, None]
+        partes.append(np.where(dentro, buf[np.minimum(indices, len(buf) - 1)], 0).astype(np.uint8))
+    return np.hstack(partes) if len(partes) > 1 else partes[0]
+
+
+def _linhas_alinhadas(buf: np.ndarray, inicios: np.ndarray, fins: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Visão (linhas x menor comprimento) do bloco, sem cópia, quando todas as
+    linhas começam a intervalos iguais (o caso normal de um arquivo de
+    largura fixa); senão None.
+    """
+    if len(inicios) < 2:
+        return None
+    passo = int(inicios[1] - inicios[0])
+    if not (np.diff(inicios) == passo).all():
+        return None
+    largura = int((fins - inicios).min())
+    return np.lib.stride_tricks.as_strided(buf[inicios[0]:], shape=(len(inicios), largura),
+                                           strides=(passo, 1), writeable=False)
+
+
+# ═══════════════════════════════════════════════════════════════
+# Conversões
+# ═══════════════════════════════════════════════════════════════
+
+def _fatorar(matriz: np.ndarray):
+    """
+    Códigos dos valores distintos das linhas da matriz de bytes.
+
+    Returns:
+        (códigos por linha, índice de uma linha representante de cada código)
+    """
+    n, largura = matriz.shape
+    palavras = np.zeros((n, -(-largura // 8) * 8), dtype=np.uint8)
+    palavras[:, :largura] = matriz
+    palavras = palavras.view(np.uint64)
+    codigos = np.zeros(n, dtype=np.int64)
+    for j in range(palavras.shape[1]):
+        parcial, distintos = pd.factorize(palavras[:, j])
+        codigos, _ = pd.factorize(codigos * len(distintos) + parcial)
+    representantes = np.empty(codigos.max() + 1 if n else 0, dtype=np.int64)
+    representantes[codigos] = np.arange(n)
+    return codigos, representantes
+
+
+def numeros(matriz: np.ndarray) -> np.ndarray:
+    """
+    Converte a matriz de bytes de um campo numérico em float64.
+
+    Aceita dígitos, espaços, '.' (milhar, ignorado), uma vírgula decimal e sinal
+    ('+', '-' ou parênteses). Campos vazios ou com outros caracteres -> NaN
+    (como `pd.to_numeric(errors='coerce')` sobre o texto no formato BR).
+    """
+    colunas = np.ascontiguousarray(matriz.T)
+    classe = _CLASSE[colunas]
+    valor = np.zeros(len(matriz))
+    digitos = np.zeros(len(matriz), dtype=np.int64)
+    decimais = np.zeros(len(matriz), dtype=np.int64)
+    virgulas = np.zeros(len(matriz), dtype=np.int64)
+    for j in range(len(colunas)):
+        digito = classe[j] == _DIGITO
+        valor = np.where(digito, valor * 10 + (colunas[j] - _ZERO), valor)
+        digitos += digito
+        decimais += digito & (virgulas > 0)
+        virgulas += classe[j] == _DECIMAL
+    valor /= 10.0 ** decimais
+
+    valor[(classe == _SINAL).any(axis=0)] *= -1
+    valor[(classe == _INVALIDO).any(axis=0) | (digitos == 0) | (virgulas > 1)] = np.nan
+    return valor
+
+
+def _decodificar(matriz: np.ndarray) -> np.ndarray:
+    """Linhas da matriz de bytes como texto (latin-1: cada byte é o próprio código do caractere)."""
+    nulo = matriz == 0
+    if nulo.any():
+        # bytes além do fim da linha (0) vão para o fim, onde o texto os descarta
+        matriz = np.take_along_axis(matriz, np.argsort(nulo, axis=1, kind='stable'), axis=1)
+    largura = max(matriz.shape[1], 1)
+    texto = np.zeros((len(matriz), largura), dtype=np.uint32)
+    texto[:, :matriz.shape[1]] = matriz
+    return texto.view(f'U{largura}').ravel()
+
+
+class _Texto:
+    """
+    Campo de texto acumulado entre os blocos. Como categórica, só os valores
+    distintos de cada bloco são decodificados; senão (campos quase únicos,
+    como chaves) todas as linhas são decodificadas em bloco para object.
+    """
+
+    def __init__(self, aparar: bool, categorica: bool):
+        self.aparar = aparar
+        self.categorica = categorica
+        self.blocos = []
+
+    def _texto(self, matriz: np.ndarray) -> np.ndarray:
+        texto = _decodificar(matriz)
+        if self.aparar:
+            texto = np.strings.strip(texto)
+        texto = texto.astype(object)
+        if self.aparar:
+            texto[texto == ''] = None
+        return texto
+
+    def adicionar(self, matriz: np.ndarray) -> None:
+        if not self.categorica:
+            self.blocos.append(self._texto(matriz))
+            return
+        codigos, representantes = _fatorar(matriz)
+        self.blocos.append((codigos, self._texto(matriz[representantes])))
+
+    def coluna(self):
+        if not self.categorica:
+            return np.concatenate(self.blocos) if self.blocos else np.empty(0, dtype=object)
+        if not self.blocos:
+            return pd.Categorical([], categories=pd.Index([], dtype=object))
+        globais, categorias = pd.factorize(np.concatenate([texto for _, texto in self.blocos]))
+        deslocamentos = np.cumsum([0] + [len(texto) for _, texto in self.blocos[:-1]])
+        codigos = np.concatenate([globais[inicio + codigos] for inicio, (codigos, _) in zip(deslocamentos, self.blocos)])
+        return pd.Categorical.from_codes(codigos, categories=pd.Index(categorias, dtype=object))
+
+
+# ═══════════════════════════════════════════════════════════════
+# Leitura
+# ═══════════════════════════════════════════════════════════════
+
+def ler_largura_fixa(
+    arquivo,
+    campos: Dict[str, Posicao],
+    numericos: Iterable[str] = (),
+    categoricas: Optional[Iterable[str]] = None,
+    aparar: bool = True,
+    ultimos: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Lê um TXT de largura fixa (latin-1; posições em bytes).
+
+    Args:
+        arquivo: caminho, bytes ou objeto de arquivo (ex.: upload do Streamlit)
+        campos: nome -> (ini, fim) (como em `colspecs`), ou lista de posições
+                cujos bytes são concatenados num único campo
+        numericos: campos convertidos para float64 (ver `numeros`)
+        categoricas: campos de texto lidos como categóricas (padrão: todos);
+                     os demais saem como texto (object)
+        aparar: remove espaços das pontas dos campos de texto; vazio -> nulo
+                (como `pd.read_fwf`). Com False, o recorte bruto é mantido.
+        ultimos: se informado, cada linha é aparada e as posições contam a
+                 partir do início dos seus últimos `ultimos` caracteres
+
+    Returns:
+        DataFrame com uma linha por linha não vazia do arquivo, colunas na
+        ordem de `campos`
+    """
+    numericos = frozenset(numericos)
+    categoricas = frozenset(campos if categoricas is None else categoricas)
+    textos = {nome: _Texto(aparar, nome in categoricas) for nome in campos if nome not in numericos}
+    valores = {nome: [] for nome in campos if nome in numericos}
+
+    for buf in _blocos(_conteudo(arquivo)):
+        inicios, fins = _linhas(buf, ultimos)
+        linhas = _linhas_alinhadas(buf, inicios, fins)
+        for nome, posicao in campos.items():
+            matriz = _matriz(buf, inicios, fins, posicao, linhas)
+            if nome in numericos:
+                valores[nome].append(numeros(matriz))
+            else:
+                textos[nome].adicionar(matriz)
+
+    return pd.DataFrame({
+        nome: (np.concatenate(valores[nome]) if valores[nome] else np.empty(0))
+        if nome in numericos else textos[nome].coluna()
+        for nome in campos
+    })
+
+
+# ═══════════════════════════════════════════════════════════════
+# Benchmark
+# ═══════════════════════════════════════════════════════════════
+
+# Leiaute do SIG003 (ver pages/12_🧾 Analise_Arquivos_SIG.py)
+_CAMPOS_SIG003 = {
+    'POSICAO': (0, 7), 'COD_UG': (7, 13), 'COD_NAT_RECEITA': (13, 21),
+    'COD_IDENT_EXERCICIO_FONTE': (21, 22), 'COD_GRUPO_FONTE': (22, 23), 'COD_FONTE': (23, 25),
+    'COD_MARCADOR_FONTE': (25, 28), 'RECEITA_PREVISTA': (28, 47), 'ALTERACAO_PREVISAO_RECEITA': (47, 66),
+    'RECEITA_ARRECADADA': (66, 85), 'RECEITA_A_ARRECADAR': (85, 104),
+}
+_VALORES_SIG003 = ['RECEITA_PREVISTA', 'ALTERACAO_PREVISAO_RECEITA', 'RECEITA_ARRECADADA', 'RECEITA_A_ARRECADAR']
+# Bytes por linha do SIG003 sintético (104 de campos + CRLF)
+_LARGURA_SIG003 = 106
+
+
+def _to_float_ptbr(series: pd.Series) -> pd.Series:
+    """Conversão de texto PT-BR da página 12 (referência)."""
+    return pd.to_numeric(
+        series.astype(str).str.strip().str.replace(r'\s+', '', regex=True)
+        .str.replace(r'^\((.*)\)$', r'-\1', regex=True)
+        .str.replace('.', '', regex=False).str.replace(',', '.', regex=False),
+        errors='coerce'
+    )
+
+
+def _valores_br(centavos: np.ndarray, largura: int = 19) -> np.ndarray:
+    """Matriz (linhas x largura) de bytes com os valores no formato BR ("-1.234,56"), alinhados à direita."""
+    n = len(centavos)
+    campo = np.full((n, largura), ord(' '), dtype=np.uint8)
+    negativo = centavos < 0
+    resto = np.abs(centavos)
+    campo[:, -1] = ord('0') + resto % 10
+    campo[:, -2] = ord('0') + resto // 10 % 10
+    campo[:, -3] = ord(',')
+    resto = resto // 100
+    ativo = np.ones(n, dtype=bool)   # linhas que ainda recebem dígitos (ou '.')
+    digitos, ponto = 0, False
+    for j in range(largura - 4, -1, -1):
+        if ponto:
+            ativo = resto > 0
+            campo[ativo, j] = ord('.')
+            ponto = False
+        else:
+            ativo = (resto > 0) | (digitos == 0)
+            campo[ativo, j] = ord('0') + resto[ativo] % 10
+            resto = resto // 10
+            digitos += 1
+            ponto = digitos % 3 == 0
+        # sinal logo antes do primeiro dígito
+        sinal = negativo & ~ativo
+        campo[sinal, j] = ord('-')
+        negativo &= ativo
+    return campo
+
+
+def _sig003_sintetico(linhas: int, seed: int = 0) -> bytes:
+    """SIG003 sintético montado direto numa matriz de bytes (linhas x _LARGURA_SIG003, com CRLF)."""
+    rng = np.random.default_rng(seed)
+
+    def _bytes(textos, largura):
+        return np.asarray(textos, dtype=f'S{largura}').view(np.uint8).reshape(-1, largura)
+
+    ugs = _bytes(rng.integers(10**5, 10**6, 400).astype(str), 6)
+    naturezas = _bytes(rng.integers(10**7, 10**8, 1500).astype(str), 8)
+    fontes = _bytes([f"{a}{g}{f:02d}{m:03d}" for a, g, f, m in
+                     zip(rng.integers(1, 3, 300), rng.integers(5, 8, 300), rng.integers(0, 100, 300),
+                         rng.integers(0, 1000, 300))], 7)
+
+    matriz = np.empty((linhas, _LARGURA_SIG003), dtype=np.uint8)
+    matriz[:, 0:7] = _bytes(['12/2025'], 7)
+    matriz[:, 7:13] = ugs[rng.integers(0, len(ugs), linhas)]
+    matriz[:, 13:21] = naturezas[rng.integers(0, len(naturezas), linhas)]
+    matriz[:, 21:28] = fontes[rng.integers(0, len(fontes), linhas)]
+    for ini in (28, 47, 66, 85):
+        centavos = np.round(rng.normal(0, 1e6, linhas) * 100).astype(np.int64)
+        matriz[:, ini:ini + 19] = _valores_br(centavos)
+    matriz[:, -2:] = _bytes(['\r\n'], 2)
+    return matriz.tobytes()
+
+
+def benchmark(linhas: int = 3_000_000, amostra_fwf: int = 200_000) -> None:
+    """
+    Compara `ler_largura_fixa` com `pd.read_fwf` + conversão PT-BR da página 12.
+
+    `read_fwf` é medido numa amostra de `amostra_fwf` linhas e extrapolado (é
+    linear no número de linhas).
+    """
+    dados = _sig003_sintetico(linhas)
+    mb = len(dados) / 1e6
+
+    t0 = time.perf_counter()
+    novo = ler_largura_fixa(dados, _CAMPOS_SIG003, numericos=_VALORES_SIG003)
+    t_novo = time.perf_counter() - t0
+
+    amostra = dados[:amostra_fwf * _LARGURA_SIG003]
+    t0 = time.perf_counter()
+    ref = pd.read_fwf(io.BytesIO(amostra), colspecs=list(_CAMPOS_SIG003.values()), names=list(_CAMPOS_SIG003),
+                      encoding='latin1', header=None, dtype=str)
+    for coluna in _VALORES_SIG003:
+        ref[coluna] = _to_float_ptbr(ref[coluna])
+    t_fwf = (time.perf_counter() - t0) * linhas / len(ref)
+
+    parcial = ler_largura_fixa(amostra, _CAMPOS_SIG003, numericos=_VALORES_SIG003)
+    for coluna in _CAMPOS_SIG003:
+        if coluna in _VALORES_SIG003:
+            assert np.allclose(parcial[coluna], ref[coluna], rtol=0, atol=1e-6, equal_nan=True)
+        else:
+            assert parcial[coluna].astype(object).equals(ref[coluna])
+
+    mem = novo.memory_usage(deep=True).sum() / 1e6
+    print(f"Linhas: {linhas:,} ({mb:.0f} MB de TXT) | DataFrame: {mem:.0f} MB")
+    print(f"  ler_largura_fixa                      : {t_novo:6.2f} s")
+    print(f"  read_fwf + PT-BR (extrapolado de {len(ref):,}): {t_fwf:6.2f} s   ({t_fwf / t_novo:.0f}x)")
+
+
+if __name__ == '__main__':
+    benchmark()
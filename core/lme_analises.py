@@ -3,32 +3,81 @@
 # │ Funções para análises de saldos de LME
 # └───────────────────────────────────────────────────────────────
 
+from dataclasses import dataclass
+
 import pandas as pd
 import numpy as np
 
+from core.regras_lme import parsear_regras, cobertura_regras
+from core.utils import serie_br_to_float
+
+
+# ═══════════════════════════════════════════════════════════════
+# Leitura dos CSVs do Flexvision
+# ═══════════════════════════════════════════════════════════════
+#
+# As exportações estaduais têm centenas de milhares de linhas, mas poucos
+# valores distintos de conta e conta corrente: Saldo é convertido do formato BR
+# de uma vez (`serie_br_to_float`) e as transformações de texto (Conta, GD a
+# partir do Conta Corrente, TRIMESTRE) são feitas uma vez por valor distinto,
+# sem `apply` linha a linha.
+
+# Conta -> posição do GD no Conta Corrente (segmentos separados por '.')
+POSICAO_GD = (('82313', 2), ('723130199', 6))
+
+
+def _por_valor(serie, funcao):
+    """Aplica `funcao` (vetorizada, sobre texto) uma vez por valor distinto de `serie`."""
+    codigos, distintos = pd.factorize(serie)
+    valores = np.append(np.asarray(funcao(pd.Series(distintos, dtype=object)), dtype=object), np.nan)
+    return pd.Series(valores[codigos], index=serie.index, name=serie.name)
+
+
+def _ler_saldos(uploaded_file):
+    """
+    CSV de saldos do Flexvision com Saldo (float), Conta e FONTE, sem os saldos zerados.
+
+    Saldo fora do formato numérico interrompe a leitura (ValueError com a
+    quantidade de valores inválidos), como a conversão direta para float.
+    """
+    df = pd.read_csv(uploaded_file, sep=';', encoding='latin1', dtype=str)
+    saldo = serie_br_to_float(df['Saldo'])
+    invalidos = df['Saldo'].notna() & saldo.isna()
+    if invalidos.any():
+        exemplos = ', '.join(repr(v) for v in df.loc[invalidos, 'Saldo'].unique()[:3])
+        raise ValueError(f"{int(invalidos.sum())} valor(es) de Saldo fora do formato numérico (ex.: {exemplos})")
+    df['Saldo'] = saldo
+    df = df[df['Saldo'] != 0].reset_index(drop=True)
+    df['Conta'] = _por_valor(df['Conta_Contabil'], lambda c: c.str[:9])
+    df['FONTE'] = df['Ano_Fonte'] + df['Fonte'] + df['Marcador_Fonte']
+    return df
+
+
+def extrair_gd(df):
+    """
+    GD com os vazios ('', '-' ou nulo) preenchidos a partir do Conta Corrente:
+    3º segmento nas contas 82313*, 7º na 723130199; demais contas inalteradas.
+    """
+    gd = df['GD']
+    vazio = gd.isna() | gd.isin([v for v in gd.dropna().unique() if str(v).strip() in ('', '-')])
+    contas = df['Conta'].dropna().unique()
+    for prefixo, posicao in POSICAO_GD:
+        mascara = vazio & df['Conta'].isin([c for c in contas if c.startswith(prefixo)])
+        if not mascara.any():
+            continue
+        segmento = _por_valor(
+            df.loc[mascara, 'Conta Corrente'].astype(str),
+            lambda cc: cc.str.split('.', n=posicao + 1, expand=True).reindex(columns=range(posicao + 1))[posicao],
+        )
+        gd = gd.mask(mascara, segmento)
+    return gd
+
 
 def processar_csv_principal(uploaded_file):
     """Processa o arquivo CSV principal de contas de LME"""
     try:
-        df = pd.read_csv(uploaded_file, sep=';', decimal=',', encoding='latin1', dtype=str)
-        df['Saldo'] = df['Saldo'].str.replace('.', '').str.replace(',', '.').astype(float)
-        df = df[df['Saldo'] != 0]
-        df['Conta'] = df['Conta_Contabil'].str[:9]
-        df['FONTE'] = df['Ano_Fonte'] + df['Fonte'] + df['Marcador_Fonte']
-
-        def extrair_gd(row):
-            codigo = row['Conta']
-            conta_corrente = str(row['Conta Corrente'])
-            if codigo.startswith('82313'):
-                return conta_corrente.split('.')[2]
-            elif codigo == '723130199':
-                return conta_corrente.split('.')[6]
-            else:
-                return row['GD']
-
-        mask_vazio = df['GD'].isna() | (df['GD'].astype(str).str.strip().isin(['', '-']))
-        df.loc[mask_vazio, 'GD'] = df[mask_vazio].apply(extrair_gd, axis=1)
-
+        df = _ler_saldos(uploaded_file)
+        df['GD'] = extrair_gd(df)
         return df, None
     except Exception as e:
         return None, f"Erro ao processar arquivo: {str(e)}"
@@ -37,290 +86,227 @@ def processar_csv_principal(uploaded_file):
 def processar_csv_cota_trimestral(uploaded_file):
     """Processa o arquivo CSV de Cota Trimestral"""
     try:
-        df_trimestral = pd.read_csv(uploaded_file, sep=';', decimal=',', encoding='latin1', dtype=str)
-        df_trimestral['Saldo'] = df_trimestral['Saldo'].str.replace('.', '').str.replace(',', '.').astype(float)
-        df_trimestral = df_trimestral[df_trimestral['Saldo'] != 0]
-        df_trimestral['Conta'] = df_trimestral['Conta_Contabil'].str[:9]
-        df_trimestral['FONTE'] = df_trimestral['Ano_Fonte'] + df_trimestral['Fonte'] + df_trimestral['Marcador_Fonte']
-        df_trimestral['TRIMESTRE'] = df_trimestral['Conta Corrente'].str[-1:]
+        df_trimestral = _ler_saldos(uploaded_file)
+        df_trimestral['TRIMESTRE'] = _por_valor(df_trimestral['Conta Corrente'], lambda cc: cc.str[-1:])
         return df_trimestral, None
     except Exception as e:
         return None, f"Erro ao processar arquivo: {str(e)}"
 
 
-def analise_72313_82313(df):
-    """Confere se os saldos batem entre a 72313 e 82313"""
-    df_cota_lme_723 = df[df['Conta'].str.startswith("72313")].copy()
-    df_cota_lme_823 = df[df['Conta'].str.startswith("82313")].copy()
-
-    soma_723 = df_cota_lme_723['Saldo'].sum()
-    soma_823 = df_cota_lme_823['Saldo'].sum()
-
-    tabela = pd.DataFrame({
-        'Conta': ['72313', '82313', 'Diferença'],
-        'Soma_Saldo': [soma_723, soma_823, soma_723 - soma_823]
+# ═══════════════════════════════════════════════════════════════
+# Conciliações entre grupos de contas (uma única agregação)
+# ═══════════════════════════════════════════════════════════════
+#
+# Cada conferência compara a soma de Saldo de dois conjuntos de contas
+# (prefixos de Conta_Contabil) por uma chave (concatenação de colunas). Em vez
+# de filtrar o frame inteiro e agrupar de novo em cada conferência, as contas
+# distintas são classificadas em "faixas" (combinação de lados de conciliação
+# a que pertencem), o frame é agrupado uma vez por (faixa, UO, LME, FONTE, GD)
+# e todas as conferências saem desse agregado, que é ordens de grandeza menor.
+
+COLUNAS_CHAVE = ('UO', 'LME', 'FONTE', 'GD')
+
+
+@dataclass(frozen=True)
+class Conciliacao:
+    """Conferência entre dois conjuntos de contas (ver CONCILIACOES)."""
+    nome: str
+    esquerda: tuple                 # prefixos de Conta_Contabil
+    direita: tuple
+    chave: tuple                    # colunas concatenadas na chave
+    sufixos: tuple                  # sufixos das colunas Saldo (esquerda, direita)
+    excluir_esquerda: tuple = ()
+    excluir_direita: tuple = ()
+    normalizar_direita: bool = False  # chave da direita: '-' -> '03', sem espaços
+    coluna_chave: str = 'chave'
+    coluna_dif: str = 'diferenca'
+    preencher_zeros: bool = False   # fillna(0) no resultado antes da diferença
+    total: bool = False             # acrescenta a linha TOTAL
+
+    def lados(self):
+        return ((self.esquerda, self.excluir_esquerda), (self.direita, self.excluir_direita))
+
+
+CONCILIACOES = (
+    Conciliacao('72313_82313', ('72313',), ('82313',), ('UO', 'LME', 'FONTE'), ('_723', '_823')),
+    Conciliacao('72311_82312', ('72311',), ('82312',), ('UO', 'FONTE'), ('_723', '_823')),
+    Conciliacao('contas_5_6', ('5',), ('6',), ('UO', 'FONTE', 'GD'), ('_5', '_6')),
+    Conciliacao('ctr_lme_723_e_6', ('82313',), ('6',), ('UO', 'LME', 'FONTE', 'GD'), ('_lme', '_orç'),
+                excluir_esquerda=('8231305',), excluir_direita=('6222',), normalizar_direita=True, total=True),
+    Conciliacao('ctr_lme_823_e_6', ('82313',), ('6',), ('UO', 'LME', 'FONTE', 'GD'), ('_lme', '_orç'),
+                excluir_esquerda=('8231305',), excluir_direita=('6222',), total=True),
+    Conciliacao('publicadas_liberadas', ('823120501',), ('8231302', '8231305', '8231306'), ('UO', 'FONTE', 'LME'),
+                ('_8231205', '_82313_demais'), coluna_dif='Dif', preencher_zeros=True, total=True),
+    Conciliacao('publicadas_a_liberar', ('823120101',), ('823130101',), ('UO', 'FONTE', 'LME'),
+                ('_8231201', '_8231301'), coluna_dif='Dif', preencher_zeros=True, total=True),
+    Conciliacao('empenhado', ('8231306',), ('62213',), ('LME',), ('_LME', '_ORÇ'),
+                coluna_chave='LME', coluna_dif='Dif', total=True),
+    Conciliacao('contingenciado', ('8231303',), ('622120104',), ('LME',), ('_LME', '_ORÇ'),
+                coluna_chave='LME', coluna_dif='Dif', total=True),
+    Conciliacao('descentralizado', ('8231305',), ('622220101',), ('LME',), ('_LME', '_ORÇ'),
+                coluna_chave='LME', coluna_dif='Dif', total=True),
+    Conciliacao('a_empenhar', ('8231301', '8231302'), ('622110101', '622120101'), ('LME',), ('_LME', '_ORÇ'),
+                coluna_chave='LME', coluna_dif='Dif', total=True),
+)
+
+POR_NOME = {c.nome: c for c in CONCILIACOES}
+
+
+def agregar_por_faixa(df, conciliacoes=CONCILIACOES):
+    """
+    Agrupa o frame uma única vez por (faixa de contas, UO, LME, FONTE, GD).
+
+    Returns:
+        Tuple (agregado, faixas): agregado com 'faixa' + COLUNAS_CHAVE + 'Saldo';
+        faixas[(prefixos, excluidos)] = ids das faixas que compõem esse lado.
+    """
+    lados = list(dict.fromkeys(lado for c in conciliacoes for lado in c.lados()))
+
+    # Contas distintas (poucas centenas) -> lados de conciliação a que pertencem
+    contas = pd.Series(df['Conta_Contabil'].dropna().unique(), dtype=object)
+    pertence = np.zeros((len(contas), len(lados)), dtype=bool)
+    for k, (incluir, excluir) in enumerate(lados):
+        pertence[:, k] = contas.str.startswith(incluir).to_numpy(dtype=bool)
+        if excluir:
+            pertence[:, k] &= ~contas.str.startswith(excluir).to_numpy(dtype=bool)
+    usada = pertence.any(axis=1)
+    membros, codigos = np.unique(pertence[usada], axis=0, return_inverse=True)
+    faixa_da_conta = dict(zip(contas[usada], codigos.ravel()))
+
+    faixa = df['Conta_Contabil'].map(faixa_da_conta)
+    base = df.loc[faixa.notna(), list(COLUNAS_CHAVE) + ['Saldo']].assign(faixa=faixa[faixa.notna()].astype(int))
+    agregado = base.groupby(['faixa', *COLUNAS_CHAVE], dropna=False, sort=False)['Saldo'].sum().reset_index()
+
+    faixas = {lado: np.flatnonzero(membros[:, k]) for k, lado in enumerate(lados)}
+    return agregado, faixas
+
+
+def _lado(agregado, faixas, chave, coluna_chave, normalizar):
+    """(soma total do lado, saldos agrupados pela chave)."""
+    parte = agregado[agregado['faixa'].isin(faixas)]
+    valores = parte[list(chave)]
+    chaves = valores.iloc[:, 0]
+    for coluna in chave[1:]:
+        chaves = chaves + valores[coluna]
+    if normalizar:
+        chaves = chaves.str.replace('-', '03', regex=False).astype(str).str.replace(' ', '', regex=False)
+    agrupado = parte['Saldo'].groupby(chaves.rename(coluna_chave)).sum().reset_index()
+    return parte['Saldo'].sum(), agrupado
+
+
+def _conciliar(conciliacao, agregado, faixas):
+    c = conciliacao
+    (incl_e, excl_e), (incl_d, excl_d) = c.lados()
+    soma_e, esquerda = _lado(agregado, faixas[(incl_e, excl_e)], c.chave, c.coluna_chave, False)
+    soma_d, direita = _lado(agregado, faixas[(incl_d, excl_d)], c.chave, c.coluna_chave, c.normalizar_direita)
+
+    merge = pd.merge(esquerda, direita, on=c.coluna_chave, how='outer', suffixes=c.sufixos)
+    col_e, col_d = (f'Saldo{s}' for s in c.sufixos)
+    if c.preencher_zeros:
+        merge = merge.fillna(0)
+    merge[c.coluna_dif] = merge[col_e].fillna(0) - merge[col_d].fillna(0)
+
+    if c.total:
+        linha_total = pd.DataFrame({
+            c.coluna_chave: ['TOTAL'],
+            col_e: [merge[col_e].sum()],
+            col_d: [merge[col_d].sum()],
+            c.coluna_dif: [merge[c.coluna_dif].sum()],
+        })
+        merge = pd.concat([merge, linha_total], ignore_index=True)
+    return merge, soma_e, soma_d
+
+
+def conciliar(df, conciliacoes=CONCILIACOES):
+    """
+    Executa as conciliações a partir de uma única agregação do frame.
+
+    Returns:
+        Dict nome -> (merge, soma_esquerda, soma_direita)
+    """
+    agregado, faixas = agregar_por_faixa(df, conciliacoes)
+    return {c.nome: _conciliar(c, agregado, faixas) for c in conciliacoes}
+
+
+def _resultado(df, nome, resultados):
+    """Resultado de `nome` já calculado por `conciliar` ou, se não houver, calculado agora."""
+    if resultados is None or nome not in resultados:
+        resultados = conciliar(df, [POR_NOME[nome]])
+    return resultados[nome]
+
+
+def _tabela_somas(rotulos, soma_e, soma_d):
+    return pd.DataFrame({
+        'Conta': [*rotulos, 'Diferença'],
+        'Soma_Saldo': [soma_e, soma_d, soma_e - soma_d]
     })
 
-    df_cota_lme_723['chave'] = df_cota_lme_723['UO'] + df_cota_lme_723['LME'] + df_cota_lme_723['FONTE']
-    df_cota_lme_723_grouped = df_cota_lme_723.groupby('chave').agg({'Saldo': 'sum'}).reset_index()
 
-    df_cota_lme_823['chave'] = df_cota_lme_823['UO'] + df_cota_lme_823['LME'] + df_cota_lme_823['FONTE']
-    df_cota_lme_823_grouped = df_cota_lme_823.groupby('chave').agg({'Saldo': 'sum'}).reset_index()
+def _checagem_total(merge, coluna_dif):
+    diferenca = round(merge[coluna_dif].iloc[-1], 2)
+    return merge, diferenca, abs(diferenca) < 0.01
 
-    merge_cota_lme = pd.merge(df_cota_lme_723_grouped, df_cota_lme_823_grouped,
-                              on='chave', how='outer', suffixes=('_723', '_823'))
-    merge_cota_lme['diferenca'] = merge_cota_lme['Saldo_723'].fillna(0) - merge_cota_lme['Saldo_823'].fillna(0)
 
-    return tabela, merge_cota_lme
+def analise_72313_82313(df, resultados=None):
+    """Confere se os saldos batem entre a 72313 e 82313"""
+    merge, soma_e, soma_d = _resultado(df, '72313_82313', resultados)
+    return _tabela_somas(['72313', '82313'], soma_e, soma_d), merge
 
 
-def analise_72311_82312(df):
+def analise_72311_82312(df, resultados=None):
     """Confere se os saldos batem entre a 72311 e 82312 (Publicadas)"""
-    df_cota_lme_723_pub = df[df['Conta'].str.startswith("72311")].copy()
-    df_cota_lme_823_pub = df[df['Conta'].str.startswith("82312")].copy()
-
-    soma_723_pub = df_cota_lme_723_pub['Saldo'].sum()
-    soma_823_pub = df_cota_lme_823_pub['Saldo'].sum()
-
-    tabela = pd.DataFrame({
-        'Conta': ['72311', '82312', 'Diferença'],
-        'Soma_Saldo': [soma_723_pub, soma_823_pub, soma_723_pub - soma_823_pub]
-    })
-
-    df_cota_lme_723_pub['chave'] = df_cota_lme_723_pub['UO'] + df_cota_lme_723_pub['FONTE']
-    df_cota_lme_723_pub_grouped = df_cota_lme_723_pub.groupby('chave').agg({'Saldo': 'sum'}).reset_index()
+    merge, soma_e, soma_d = _resultado(df, '72311_82312', resultados)
+    return _tabela_somas(['72311', '82312'], soma_e, soma_d), merge
 
-    df_cota_lme_823_pub['chave'] = df_cota_lme_823_pub['UO'] + df_cota_lme_823_pub['FONTE']
-    df_cota_lme_823_pub_grouped = df_cota_lme_823_pub.groupby('chave').agg({'Saldo': 'sum'}).reset_index()
 
-    merge_cota_lme_pub = pd.merge(df_cota_lme_723_pub_grouped, df_cota_lme_823_pub_grouped,
-                                  on='chave', how='outer', suffixes=('_723', '_823'))
-    merge_cota_lme_pub['diferenca'] = merge_cota_lme_pub['Saldo_723'].fillna(0) - merge_cota_lme_pub['Saldo_823'].fillna(0)
-
-    return tabela, merge_cota_lme_pub
-
-
-def analise_contas_5_6(df):
+def analise_contas_5_6(df, resultados=None):
     """Verifica se os totais batem entre contas 5 e 6"""
-    df_lme_orç_5 = df[df['Conta'].str.startswith("5")].copy()
-    df_lme_orç_6 = df[df['Conta'].str.startswith("6")].copy()
-
-    soma_df_lme_orç_5 = df_lme_orç_5['Saldo'].sum()
-    soma_df_lme_orç_6 = df_lme_orç_6['Saldo'].sum()
-
-    tabela = pd.DataFrame({
-        'Conta': ['5', '6', 'Diferença'],
-        'Soma_Saldo': [soma_df_lme_orç_5, soma_df_lme_orç_6, soma_df_lme_orç_5 - soma_df_lme_orç_6]
-    })
-
-    df_lme_orç_5['chave'] = df_lme_orç_5['UO'] + df_lme_orç_5['FONTE'] + df_lme_orç_5['GD']
-    df_lme_orç_5_grouped = df_lme_orç_5.groupby('chave').agg({'Saldo': 'sum'}).reset_index()
-
-    df_lme_orç_6['chave'] = df_lme_orç_6['UO'] + df_lme_orç_6['FONTE'] + df_lme_orç_6['GD']
-    df_lme_orç_6_grouped = df_lme_orç_6.groupby('chave').agg({'Saldo': 'sum'}).reset_index()
+    merge, soma_e, soma_d = _resultado(df, 'contas_5_6', resultados)
+    return _tabela_somas(['5', '6'], soma_e, soma_d), merge
 
-    merge_lme_orç = pd.merge(df_lme_orç_5_grouped, df_lme_orç_6_grouped,
-                             on='chave', how='outer', suffixes=('_5', '_6'))
-    merge_lme_orç['diferenca'] = merge_lme_orç['Saldo_5'].fillna(0) - merge_lme_orç['Saldo_6'].fillna(0)
 
-    return tabela, merge_lme_orç
-
-
-def analise_ctr_lme_723_e_6(df):
+def analise_ctr_lme_723_e_6(df, resultados=None):
     """Análise da LME no nível de Execução (Contas 6) e com o CTR DE LME 723"""
-    df_cota_lme_823_cal = df[df['Conta'].str.startswith("82313")].copy()
-    df_cota_lme_823_cal = df_cota_lme_823_cal[~df_cota_lme_823_cal['Conta'].str.startswith("8231305")]
-    df_cota_lme_823_cal['chave'] = df_cota_lme_823_cal['UO'] + df_cota_lme_823_cal['LME'] + df_cota_lme_823_cal['FONTE'] + df_cota_lme_823_cal['GD']
-    df_cota_lme_823_cal = df_cota_lme_823_cal[['chave', 'Saldo']]
-    df_cota_lme_823_cal = df_cota_lme_823_cal.groupby('chave').agg({'Saldo': 'sum'}).reset_index()
-
-    df_lme_orç_6_cal = df[df['Conta'].str.startswith("6")].copy()
-    df_lme_orç_6_cal = df_lme_orç_6_cal[~df_lme_orç_6_cal['Conta'].str.startswith("6222")]
-    df_lme_orç_6_cal['chave'] = df_lme_orç_6_cal['UO'] + df_lme_orç_6_cal['LME'] + df_lme_orç_6_cal['FONTE'] + df_lme_orç_6_cal['GD']
-    df_lme_orç_6_cal['chave'] = df_lme_orç_6_cal['chave'].str.replace('-', '03', regex=False)
-    df_lme_orç_6_cal['chave'] = df_lme_orç_6_cal['chave'].astype(str).str.replace(' ', '', regex=False)
-    df_lme_orç_6_cal = df_lme_orç_6_cal.groupby('chave').agg({'Saldo': 'sum'}).reset_index()
-
-    merge_cota_e_orç_7 = pd.merge(df_cota_lme_823_cal, df_lme_orç_6_cal, on='chave', how='outer', suffixes=('_lme', '_orç'))
-    merge_cota_e_orç_7['diferenca'] = merge_cota_e_orç_7['Saldo_lme'].fillna(0) - merge_cota_e_orç_7['Saldo_orç'].fillna(0)
-
-    total_lme = merge_cota_e_orç_7['Saldo_lme'].sum()
-    total_orc = merge_cota_e_orç_7['Saldo_orç'].sum()
-    total_dif = merge_cota_e_orç_7['diferenca'].sum()
-
-    linha_total = pd.DataFrame({
-        'chave': ['TOTAL'],
-        'Saldo_lme': [total_lme],
-        'Saldo_orç': [total_orc],
-        'diferenca': [total_dif]
-    })
+    return _checagem_total(_resultado(df, 'ctr_lme_723_e_6', resultados)[0], 'diferenca')
 
-    merge_cota_e_orç_total_7 = pd.concat([merge_cota_e_orç_7, linha_total], ignore_index=True)
-    diferenca = round(total_dif, 2)
-    check_result = abs(diferenca) < 0.01
 
-    return merge_cota_e_orç_total_7, diferenca, check_result
-
-
-def analise_ctr_lme_823_e_6(df):
+def analise_ctr_lme_823_e_6(df, resultados=None):
     """Análise da LME no nível de Execução (Contas 6) e com o CTR DE LME 823"""
-    df_cota_lme_823_cal = df[df['Conta'].str.startswith("82313")].copy()
-    df_cota_lme_823_cal = df_cota_lme_823_cal[~df_cota_lme_823_cal['Conta'].str.startswith("8231305")]
-    df_cota_lme_823_cal['chave'] = df_cota_lme_823_cal['UO'] + df_cota_lme_823_cal['LME'] + df_cota_lme_823_cal['FONTE'] + df_cota_lme_823_cal['GD']
-    df_cota_lme_823_cal = df_cota_lme_823_cal[['chave', 'Saldo']]
-    df_cota_lme_823_cal = df_cota_lme_823_cal.groupby('chave').agg({'Saldo': 'sum'}).reset_index()
-
-    df_lme_orç_6_cal = df[df['Conta'].str.startswith("6")].copy()
-    df_lme_orç_6_cal = df_lme_orç_6_cal[~df_lme_orç_6_cal['Conta'].str.startswith("6222")]
-    df_lme_orç_6_cal['chave'] = df_lme_orç_6_cal['UO'] + df_lme_orç_6_cal['LME'] + df_lme_orç_6_cal['FONTE'] + df_lme_orç_6_cal['GD']
-    df_lme_orç_6_cal = df_lme_orç_6_cal.groupby('chave').agg({'Saldo': 'sum'}).reset_index()
-
-    merge_cota_e_orç_8 = pd.merge(df_cota_lme_823_cal, df_lme_orç_6_cal, on='chave', how='outer', suffixes=('_lme', '_orç'))
-    merge_cota_e_orç_8['diferenca'] = merge_cota_e_orç_8['Saldo_lme'].fillna(0) - merge_cota_e_orç_8['Saldo_orç'].fillna(0)
-
-    total_lme = merge_cota_e_orç_8['Saldo_lme'].sum()
-    total_orc = merge_cota_e_orç_8['Saldo_orç'].sum()
-    total_dif = merge_cota_e_orç_8['diferenca'].sum()
-
-    linha_total = pd.DataFrame({
-        'chave': ['TOTAL'],
-        'Saldo_lme': [total_lme],
-        'Saldo_orç': [total_orc],
-        'diferenca': [total_dif]
-    })
-
-    merge_cota_e_orç_total_8 = pd.concat([merge_cota_e_orç_8, linha_total], ignore_index=True)
-    diferenca = round(total_dif, 2)
-    check_result = abs(diferenca) < 0.01
+    return _checagem_total(_resultado(df, 'ctr_lme_823_e_6', resultados)[0], 'diferenca')
 
-    return merge_cota_e_orç_total_8, diferenca, check_result
 
-
-def analise_publicadas_liberadas(df):
+def analise_publicadas_liberadas(df, resultados=None):
     """Análise entre Publicadas Liberadas (823120501) e Liberadas (8231302, 8231305, 8231306)"""
-    publicadas_liberadas = df.query('Conta == "823120501"').copy()
-    publicadas_liberadas['chave'] = publicadas_liberadas['UO'] + publicadas_liberadas['FONTE'] + publicadas_liberadas['LME']
-    publicadas_liberadas = publicadas_liberadas[['chave','Saldo']]
-
-    liberadas = df[df['Conta_Contabil'].str.startswith(("8231302", "8231305", "8231306"))].copy()
-    liberadas['chave'] = liberadas['UO'] + liberadas['FONTE'] + liberadas['LME']
-    liberadas = liberadas[['chave','Saldo']]
-    liberadas = liberadas.groupby('chave').agg({'Saldo': 'sum'}).reset_index()
-
-    merge_liberadas = publicadas_liberadas.merge(liberadas, on='chave', how='outer', suffixes=('_8231205', '_82313_demais'))
-    merge_liberadas = merge_liberadas.fillna(0)
-    merge_liberadas['Dif'] = merge_liberadas['Saldo_8231205'] - merge_liberadas['Saldo_82313_demais']
-
-    linha_total = pd.DataFrame({
-        'chave': ['TOTAL'],
-        'Saldo_8231205': [merge_liberadas['Saldo_8231205'].sum()],
-        'Saldo_82313_demais': [merge_liberadas['Saldo_82313_demais'].sum()],
-        'Dif': [merge_liberadas['Dif'].sum()],
-    })
-
-    merge_liberadas = pd.concat([merge_liberadas, linha_total], ignore_index=True)
-    return merge_liberadas
+    return _resultado(df, 'publicadas_liberadas', resultados)[0]
 
 
-def analise_publicadas_a_liberar(df):
+def analise_publicadas_a_liberar(df, resultados=None):
     """Análise entre Publicadas A Liberar (823120101) e A Liberar (823130101)"""
-    publicadas_a_liberar = df.query('Conta == "823120101"').copy()
-    publicadas_a_liberar['chave'] = publicadas_a_liberar['UO'] + publicadas_a_liberar['FONTE'] + publicadas_a_liberar['LME']
-    publicadas_a_liberar = publicadas_a_liberar[['chave','Saldo']]
-
-    a_liberar = df.query('Conta == "823130101"').copy()
-    a_liberar['chave'] = a_liberar['UO'] + a_liberar['FONTE'] + a_liberar['LME']
-    a_liberar = a_liberar[['chave','Saldo']]
-    a_liberar = a_liberar.groupby('chave').agg({'Saldo': 'sum'}).reset_index()
-
-    merge_a_liberar = publicadas_a_liberar.merge(a_liberar, on='chave', how='outer', suffixes=('_8231201', '_8231301'))
-    merge_a_liberar = merge_a_liberar.fillna(0)
-    merge_a_liberar['Dif'] = merge_a_liberar['Saldo_8231201'] - merge_a_liberar['Saldo_8231301']
-
-    linha_total = pd.DataFrame({
-        'chave': ['TOTAL'],
-        'Saldo_8231201': [merge_a_liberar['Saldo_8231201'].sum()],
-        'Saldo_8231301': [merge_a_liberar['Saldo_8231301'].sum()],
-        'Dif': [merge_a_liberar['Dif'].sum()],
-    })
-
-    merge_a_liberar = pd.concat([merge_a_liberar, linha_total], ignore_index=True)
-    return merge_a_liberar
+    return _resultado(df, 'publicadas_a_liberar', resultados)[0]
 
 
-def verificacoes_por_tipo(df):
+def verificacoes_por_tipo(df, resultados=None):
     """Realiza verificações de EMPENHADO, CONTINGENCIADO, DESCENTRALIZADO e A EMPENHAR"""
+    nomes = ('empenhado', 'contingenciado', 'descentralizado', 'a_empenhar')
+    if resultados is None:
+        resultados = conciliar(df, [POR_NOME[n] for n in nomes])
+    return tuple(resultados[n][0] for n in nomes)
 
-    # EMPENHADO
-    lme_empenhadas = df[df['Conta_Contabil'].str.startswith("8231306")].copy()
-    lme_empenhadas = lme_empenhadas.groupby('LME').agg({'Saldo': 'sum'}).reset_index()
-
-    df_orç_empenhadas = df[df['Conta_Contabil'].str.startswith("62213")].copy()
-    df_orç_empenhadas = df_orç_empenhadas.groupby('LME').agg({'Saldo': 'sum'}).reset_index()
-
-    merge_empenhadas = pd.merge(lme_empenhadas, df_orç_empenhadas, on='LME', how='outer', suffixes=('_LME', '_ORÇ'))
-    merge_empenhadas['Dif'] = merge_empenhadas['Saldo_LME'].fillna(0) - merge_empenhadas['Saldo_ORÇ'].fillna(0)
-
-    linha_total = pd.DataFrame({
-        'LME': ['TOTAL'],
-        'Saldo_LME': [merge_empenhadas['Saldo_LME'].sum()],
-        'Saldo_ORÇ': [merge_empenhadas['Saldo_ORÇ'].sum()],
-        'Dif': [merge_empenhadas['Dif'].sum()]
-    })
-    merge_empenhadas = pd.concat([merge_empenhadas, linha_total], ignore_index=True)
 
-    # CONTINGENCIADO
-    lme_conting = df[df['Conta_Contabil'].str.startswith("8231303")].copy()
-    lme_conting = lme_conting.groupby('LME').agg({'Saldo': 'sum'}).reset_index()
+def analise_cobertura_regras(df, conteudo_txt):
+    """Confere, numa passada, quais linhas (GD, UO, Ação) do saldo são cobertas pelas regras de um TXT de LME"""
+    regras = parsear_regras(conteudo_txt)
+    if regras.empty:
+        raise ValueError("Nenhuma regra reconhecida no TXT")
 
-    df_orç_conting = df[df['Conta_Contabil'].str.startswith("622120104")].copy()
-    df_orç_conting = df_orç_conting.groupby('LME').agg({'Saldo': 'sum'}).reset_index()
+    linhas, por_regra = cobertura_regras(regras, df)
+    sem_regra = linhas[linhas['regra_lme'].isna()]
+    regras_sem_saldo = por_regra[por_regra['linhas'] == 0]
 
-    merge_conting = pd.merge(lme_conting, df_orç_conting, on='LME', how='outer', suffixes=('_LME', '_ORÇ'))
-    merge_conting['Dif'] = merge_conting['Saldo_LME'].fillna(0) - merge_conting['Saldo_ORÇ'].fillna(0)
-
-    linha_total = pd.DataFrame({
-        'LME': ['TOTAL'],
-        'Saldo_LME': [merge_conting['Saldo_LME'].sum()],
-        'Saldo_ORÇ': [merge_conting['Saldo_ORÇ'].sum()],
-        'Dif': [merge_conting['Dif'].sum()]
-    })
-    merge_conting = pd.concat([merge_conting, linha_total], ignore_index=True)
-
-    # DESCENTRALIZADO
-    lme_descentr = df[df['Conta_Contabil'].str.startswith("8231305")].copy()
-    lme_descentr = lme_descentr.groupby('LME').agg({'Saldo': 'sum'}).reset_index()
-
-    df_orç_descentr = df[df['Conta_Contabil'].str.startswith("622220101")].copy()
-    df_orç_descentr = df_orç_descentr.groupby('LME').agg({'Saldo': 'sum'}).reset_index()
-
-    merge_descentr = pd.merge(lme_descentr, df_orç_descentr, on='LME', how='outer', suffixes=('_LME', '_ORÇ'))
-    merge_descentr['Dif'] = merge_descentr['Saldo_LME'].fillna(0) - merge_descentr['Saldo_ORÇ'].fillna(0)
-
-    linha_total = pd.DataFrame({
-        'LME': ['TOTAL'],
-        'Saldo_LME': [merge_descentr['Saldo_LME'].sum()],
-        'Saldo_ORÇ': [merge_descentr['Saldo_ORÇ'].sum()],
-        'Dif': [merge_descentr['Dif'].sum()]
-    })
-    merge_descentr = pd.concat([merge_descentr, linha_total], ignore_index=True)
-
-    # A EMPENHAR
-    lme_a_empenhar = df[df['Conta_Contabil'].str.startswith(("8231301", "8231302"))].copy()
-    lme_a_empenhar = lme_a_empenhar.groupby('LME').agg({'Saldo': 'sum'}).reset_index()
-
-    df_orç_a_empenhar = df[df['Conta_Contabil'].str.startswith(("622110101", "622120101"))].copy()
-    df_orç_a_empenhar = df_orç_a_empenhar.groupby('LME').agg({'Saldo': 'sum'}).reset_index()
-
-    merge_a_empenhar = pd.merge(lme_a_empenhar, df_orç_a_empenhar, on='LME', how='outer', suffixes=('_LME', '_ORÇ'))
-    merge_a_empenhar['Dif'] = merge_a_empenhar['Saldo_LME'].fillna(0) - merge_a_empenhar['Saldo_ORÇ'].fillna(0)
-
-    linha_total = pd.DataFrame({
-        'LME': ['TOTAL'],
-        'Saldo_LME': [merge_a_empenhar['Saldo_LME'].sum()],
-        'Saldo_ORÇ': [merge_a_empenhar['Saldo_ORÇ'].sum()],
-        'Dif': [merge_a_empenhar['Dif'].sum()]
+    tabela = pd.DataFrame({
+        'Item': ['Linhas cobertas', 'Linhas sem regra', 'Regras sem saldo'],
+        'Quantidade': [len(linhas) - len(sem_regra), len(sem_regra), len(regras_sem_saldo)],
+        'Saldo': [linhas.loc[linhas['regra_lme'].notna(), 'Saldo'].sum(), sem_regra['Saldo'].sum(), 0.0],
     })
-    merge_a_empenhar = pd.concat([merge_a_empenhar, linha_total], ignore_index=True)
 
-    return merge_empenhadas, merge_conting, merge_descentr, merge_a_empenhar
+    return tabela, sem_regra, por_regra
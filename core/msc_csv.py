@@ -0,0 +1,331 @@
+# ┌───────────────────────────────────────────────────────────────
+# │ core/msc_csv.py - Leitura em blocos de CSVs da MSC (SIAFE)
+# └───────────────────────────────────────────────────────────────
+#
+# A MSC exportada pelo SIAFE é um CSV `;` com uma linha de identificação antes
+# do cabeçalho (CONTA; IC1; TIPO1; ...; IC6; TIPO6; VALOR; TIPO_VALOR;
+# NATUREZA_VALOR). Ler com `pd.read_csv(dtype=object)` mantém o arquivo
+# inteiro como texto Python em memória.
+#
+# Aqui o arquivo é lido pelo leitor CSV do pyarrow em blocos (streaming): cada
+# bloco é convertido para o esquema tipado abaixo assim que é lido, e só a
+# forma compacta fica em memória até a conversão final para pandas:
+#
+# - TIPO1..TIPO6, TIPO_VALOR, NATUREZA_VALOR: categóricas
+# - VALOR: float64; aceita ponto decimal ("1234.56") e formato BR ("1.234,56")
+# - CONTA: texto sem espaços; códigos numéricos completados à direita com
+#   zeros até LARGURA_CONTA dígitos
+# - demais colunas (IC1..IC6, ...): texto (vazio -> nulo, como no pandas)
+#
+# Uso:
+#   from core.msc_csv import ler_msc_csv, ler_csv_texto
+#   msc = ler_msc_csv(arquivo)                                   # upload ou caminho
+#   chaves = ler_msc_csv(arquivo, colunas=['CONTA', *COLUNAS_TIPO])
+#   flex = ler_csv_texto(arquivo, encoding='latin1')             # tudo como texto
+#
+# Benchmark (MSC sintética de 2 milhões de linhas):
+#   python -m core.msc_csv
+
+import csv
+import io
+import os
+import time
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+
+
+# ═══════════════════════════════════════════════════════════════
+# Esquema
+# ═══════════════════════════════════════════════════════════════
+
+COLUNAS_TIPO = ('TIPO1', 'TIPO2', 'TIPO3', 'TIPO4', 'TIPO5', 'TIPO6')
+CATEGORICAS = COLUNAS_TIPO + ('TIPO_VALOR', 'NATUREZA_VALOR')
+COLUNA_VALOR = 'VALOR'
+COLUNA_CONTA = 'CONTA'
+LARGURA_CONTA = 9
+
+# Tamanho (bytes) de cada bloco lido do CSV
+BLOCO = int(os.environ.get("MSC_CSV_BLOCO_MB", "4")) * 1024 * 1024
+# Bytes lidos do início do arquivo para o cabeçalho e a amostra de VALOR
+AMOSTRA = 64 * 1024
+
+
+# ═══════════════════════════════════════════════════════════════
+# Conversões (por bloco, em pyarrow)
+# ═══════════════════════════════════════════════════════════════
+
+def _nulo_se_vazio(texto: pa.Array) -> pa.Array:
+    return pc.if_else(pc.equal(texto, ''), pa.scalar(None, pa.string()), texto)
+
+
+def valor_decimal(texto: pa.Array) -> pa.Array:
+    """
+    Converte texto em float64: ponto decimal ("-1234.56") ou formato BR
+    ("-1.234,56", reconhecido pela vírgula). Vazio -> nulo.
+    """
+    texto = pc.utf8_trim_whitespace(texto)
+    br = pc.replace_substring(pc.replace_substring(texto, '.', ''), ',', '.')
+    texto = pc.if_else(pc.match_substring(texto, ','), br, texto)
+    try:
+        return pc.cast(_nulo_se_vazio(texto), pa.float64())
+    except pa.ArrowInvalid as e:
+        raise ValueError(f"Valor numérico inválido na coluna {COLUNA_VALOR}: {e}") from None
+
+
+def conta_fixa(texto: pa.Array, largura: int = LARGURA_CONTA) -> pa.Array:
+    """
+    Conta contábil sem espaços; códigos só com dígitos completados com zeros à
+    direita. Em colunas codificadas (dicionário) o ajuste é feito uma vez por
+    valor distinto.
+    """
+    if pa.types.is_dictionary(texto.type):
+        return pa.DictionaryArray.from_arrays(texto.indices, conta_fixa(texto.dictionary, largura))
+    texto = _nulo_se_vazio(pc.utf8_trim_whitespace(texto))
+    completa = pc.utf8_rpad(texto, width=largura, padding='0')
+    return pc.if_else(pc.fill_null(pc.utf8_is_digit(texto), False), completa, texto)
+
+
+def _tipos(nomes, valor_texto: bool) -> dict:
+    """
+    Tipos das colunas na leitura. Todo texto é codificado (dicionário) já pelo
+    leitor CSV: os códigos da MSC se repetem muito e cada valor distinto vira um
+    único objeto Python na conversão para pandas.
+    """
+    dicionario = pa.dictionary(pa.int32(), pa.string())
+    tipos = {nome: dicionario for nome in nomes}
+    if COLUNA_VALOR in tipos and not valor_texto:
+        tipos[COLUNA_VALOR] = pa.float64()
+    return tipos
+
+
+def _converter(lote: pa.RecordBatch) -> pa.RecordBatch:
+    colunas = []
+    for nome, coluna in zip(lote.schema.names, lote.columns):
+        if nome == COLUNA_VALOR and pa.types.is_dictionary(coluna.type):
+            coluna = valor_decimal(coluna.dictionary_decode())
+        elif nome == COLUNA_CONTA:
+            coluna = conta_fixa(coluna)
+        colunas.append(coluna)
+    return pa.RecordBatch.from_arrays(colunas, names=lote.schema.names)
+
+
+# ═══════════════════════════════════════════════════════════════
+# Leitura
+# ═══════════════════════════════════════════════════════════════
+
+def _abrir(arquivo):
+    """Caminho -> arquivo binário aberto; upload/BytesIO -> o próprio objeto, no início."""
+    if isinstance(arquivo, (str, os.PathLike)):
+        return open(arquivo, 'rb'), True
+    if hasattr(arquivo, 'seek'):
+        arquivo.seek(0)
+    return arquivo, False
+
+
+def _cabecalho(arquivo, pular: int, sep: str, encoding: str):
+    """
+    Lê apenas o início do arquivo (que volta à posição original).
+
+    Returns:
+        (nomes das colunas, amostra de linhas de dados)
+    """
+    inicio = arquivo.tell()
+    texto = arquivo.read(AMOSTRA)
+    while texto.count(b'\n') <= pular:
+        bloco = arquivo.read(AMOSTRA)
+        if not bloco:
+            break
+        texto += bloco
+    arquivo.seek(inicio)
+    linhas = texto.decode(encoding, errors='replace').lstrip('\ufeff').split('\n')
+    if len(linhas) <= pular or not linhas[pular].strip():
+        raise ValueError("Arquivo CSV sem cabeçalho")
+    # a última linha da amostra pode estar incompleta
+    linhas = [linha.rstrip('\r') for linha in linhas[pular:-1] or linhas[pular:]]
+    nomes = next(csv.reader(linhas[:1], delimiter=sep))
+    return nomes, list(csv.reader(linhas[1:], delimiter=sep))
+
+
+def _valor_em_texto(nomes, amostra) -> bool:
+    """VALOR com vírgula na amostra (formato BR): lido como texto e convertido por `valor_decimal`."""
+    if COLUNA_VALOR not in nomes:
+        return False
+    i = nomes.index(COLUNA_VALOR)
+    return any(',' in linha[i] for linha in amostra if len(linha) > i)
+
+
+def _ler(arquivo, nomes, tipos, colunas, sep, encoding, pular):
+    leitor = pv.open_csv(
+        arquivo,
+        read_options=pv.ReadOptions(skip_rows=pular + 1, column_names=nomes, block_size=BLOCO,
+                                    encoding=encoding),
+        parse_options=pv.ParseOptions(delimiter=sep),
+        convert_options=pv.ConvertOptions(column_types=tipos, include_columns=colunas, strings_can_be_null=True),
+    )
+    for lote in leitor:
+        yield lote
+    # lote vazio ao final: define o esquema do resultado mesmo sem nenhuma linha
+    yield pa.RecordBatch.from_pylist([], schema=leitor.schema)
+
+
+def ler_lotes(arquivo, colunas: Optional[Iterable[str]] = None, sep: str = ';', encoding: str = 'utf-8',
+              pular: int = 1, tipado: bool = True, valor_texto: Optional[bool] = None):
+    """
+    Lê o CSV em blocos, devolvendo RecordBatches já convertidos (texto codificado em dicionário).
+
+    Args:
+        arquivo: caminho ou objeto de arquivo binário (ex.: upload do Streamlit)
+        colunas: colunas a ler (padrão: todas)
+        sep, encoding: separador e codificação do arquivo
+        pular: linhas antes do cabeçalho (1 na MSC do SIAFE)
+        tipado: aplica o esquema da MSC (VALOR numérico, CONTA); senão tudo texto
+        valor_texto: lê VALOR como texto e converte do formato BR; None decide
+                     pela amostra do início do arquivo (vírgula -> BR)
+
+    Yields:
+        pa.RecordBatch (o último é sempre vazio, com o esquema do resultado)
+    """
+    arquivo, fechar = _abrir(arquivo)
+    try:
+        nomes, amostra = _cabecalho(arquivo, pular, sep, encoding)
+        colunas = list(colunas) if colunas is not None else None
+        if colunas is not None:
+            faltando = [c for c in colunas if c not in nomes]
+            if faltando:
+                raise KeyError(f"Colunas ausentes no CSV: {', '.join(faltando)}")
+
+        if not tipado:
+            yield from _ler(arquivo, nomes, _tipos(nomes, True), colunas, sep, encoding, pular)
+            return
+
+        if valor_texto is None:
+            valor_texto = _valor_em_texto(nomes, amostra)
+        for lote in _ler(arquivo, nomes, _tipos(nomes, valor_texto), colunas, sep, encoding, pular):
+            yield _converter(lote)
+    finally:
+        if fechar:
+            arquivo.close()
+
+
+def _coluna_pandas(coluna: pa.ChunkedArray, categorica: bool):
+    """Coluna codificada -> Categorical ou object (nulos como NaN, como em `pd.read_csv`)."""
+    if not pa.types.is_dictionary(coluna.type):
+        return coluna.to_pandas()
+    dicionario = coluna.chunk(0).dictionary if coluna.num_chunks else pa.array([], pa.string())
+    partes = [pc.fill_null(c.indices, -1).to_numpy(zero_copy_only=False) for c in coluna.chunks]
+    codigos = np.concatenate(partes) if partes else np.empty(0, dtype=np.int32)
+    if categorica:
+        return pd.Categorical.from_codes(codigos, categories=pd.Index(dicionario.to_pylist(), dtype=object))
+    valores = np.empty(len(dicionario) + 1, dtype=object)
+    valores[:-1] = dicionario.to_pylist()
+    valores[-1] = np.nan
+    return valores[codigos]
+
+
+def _para_pandas(lotes, categoricas=()) -> pd.DataFrame:
+    lotes = list(lotes)
+    tabela = pa.Table.from_batches(lotes, schema=lotes[-1].schema) if lotes else pa.table({})
+    tabela = tabela.unify_dictionaries()
+    categoricas = frozenset(categoricas)
+    return pd.DataFrame({nome: _coluna_pandas(tabela.column(nome), nome in categoricas)
+                         for nome in tabela.column_names}, copy=False)
+
+
+def ler_msc_csv(arquivo, colunas: Optional[Iterable[str]] = None, categoricas: Iterable[str] = CATEGORICAS,
+                sep: str = ';', encoding: str = 'utf-8', pular: int = 1) -> pd.DataFrame:
+    """
+    Lê a MSC (CSV do SIAFE) com o esquema tipado do módulo.
+
+    Args:
+        arquivo: caminho ou objeto de arquivo binário (ex.: upload do Streamlit)
+        colunas: colunas a ler (padrão: todas)
+        categoricas: colunas lidas como categóricas (padrão: CATEGORICAS)
+        sep, encoding: separador e codificação do arquivo
+        pular: linhas antes do cabeçalho
+
+    Returns:
+        DataFrame (colunas na ordem do arquivo)
+    """
+    try:
+        return _para_pandas(ler_lotes(arquivo, colunas, sep, encoding, pular), categoricas)
+    except pa.ArrowInvalid:
+        # VALOR em formato BR só depois da amostra: lê de novo com VALOR como texto
+        return _para_pandas(ler_lotes(arquivo, colunas, sep, encoding, pular, valor_texto=True),
+                            categoricas)
+
+
+def ler_csv_texto(arquivo, colunas: Optional[Iterable[str]] = None, sep: str = ';', encoding: str = 'utf-8',
+                  pular: int = 0) -> pd.DataFrame:
+    """Lê um CSV em blocos com todas as colunas como texto (equivale a `pd.read_csv(dtype=str)`)."""
+    return _para_pandas(ler_lotes(arquivo, colunas, sep, encoding, pular, tipado=False))
+
+
+# ═══════════════════════════════════════════════════════════════
+# Benchmark
+# ═══════════════════════════════════════════════════════════════
+
+def _ler_pandas(arquivo) -> pd.DataFrame:
+    """Leitura anterior (sondagem do cabeçalho + leitura completa como object), usada como referência."""
+    arquivo.seek(0)
+    colunas = pd.read_csv(arquivo, sep=';', header=1, nrows=0).columns
+    dtype = {c: 'object' for c in colunas}
+    dtype.pop('VALOR', None)
+    arquivo.seek(0)
+    return pd.read_csv(arquivo, sep=';', header=1, dtype=dtype)
+
+
+def _msc_sintetica(n: int, seed: int = 0) -> io.BytesIO:
+    rng = np.random.default_rng(seed)
+    contas = np.array([f"{g}{rng.integers(10**7, 10**8)}" for g in rng.integers(1, 9, 5000)])
+    tipos = np.array(['PO', 'FP', 'FR', 'NR', 'ND', 'FS', 'CO', 'AI', ''])
+    df = pd.DataFrame({'CONTA': contas[rng.integers(0, len(contas), n)]})
+    # informações complementares: códigos de poder/órgão, fonte, natureza... (alguns milhares de valores)
+    codigos = rng.integers(10**5, 10**6, 3000).astype(str)
+    for i in range(1, 7):
+        df[f'IC{i}'] = np.where(rng.random(n) < 0.5, codigos[rng.integers(0, len(codigos), n)], '')
+        df[f'TIPO{i}'] = np.where(df[f'IC{i}'] != '', tipos[rng.integers(0, len(tipos) - 1, n)], '')
+    df['VALOR'] = np.round(rng.normal(0, 1e6, n), 2)
+    df['TIPO_VALOR'] = np.array(['beginning_balance', 'period_change', 'ending_balance'])[rng.integers(0, 3, n)]
+    df['NATUREZA_VALOR'] = np.array(['D', 'C'])[rng.integers(0, 2, n)]
+    buffer = io.BytesIO()
+    buffer.write(b'33;2025-12\n')
+    df.to_csv(buffer, sep=';', index=False)
+    buffer.seek(0)
+    return buffer
+
+
+def benchmark(n: int = 2_000_000) -> None:
+    arquivo = _msc_sintetica(n)
+    mb = len(arquivo.getbuffer()) / 1e6
+
+    t0 = time.perf_counter()
+    ref = _ler_pandas(arquivo)
+    t_pandas = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    novo = ler_msc_csv(arquivo)
+    t_arrow = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    ler_msc_csv(arquivo, colunas=['CONTA', *COLUNAS_TIPO])
+    t_chave = time.perf_counter() - t0
+
+    assert np.allclose(ref['VALOR'].to_numpy(), novo['VALOR'].to_numpy())
+    for coluna in ('CONTA', 'IC1', 'TIPO1', 'NATUREZA_VALOR'):
+        assert ref[coluna].fillna('').equals(novo[coluna].astype(object).fillna(''))
+
+    mem_ref = ref.memory_usage(deep=True).sum() / 1e6
+    mem_novo = novo.memory_usage(deep=True).sum() / 1e6
+    print(f"Linhas: {n:,} ({mb:.0f} MB de CSV)")
+    print(f"  pandas (object)         : {t_pandas:6.2f} s   {mem_ref:7.0f} MB")
+    print(f"  pyarrow em blocos       : {t_arrow:6.2f} s   {mem_novo:7.0f} MB   ({t_pandas / t_arrow:.1f}x)")
+    print(f"  só CONTA + TIPO1..TIPO6 : {t_chave:6.2f} s")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,242 @@
+# ┌───────────────────────────────────────────────────────────────
+# │ core/normalizacao_sinal.py - Inversão de Sinal (Retificadoras / period_change)
+# └───────────────────────────────────────────────────────────────
+#
+# As análises de MSC invertem o sinal de `valor` conforme o grupo de contas
+# (1º dígito da conta), a natureza (D/C) e o tipo de valor. As regras ficam em
+# tabelas (grupo, natureza, tipo) e são compiladas numa matriz booleana de
+# consulta; a máscara é obtida por indexação NumPy sobre os códigos das colunas,
+# sem `DataFrame.apply` linha a linha.
+#
+# Uso:
+#   from core.normalizacao_sinal import inverter_sinal, REGRAS_D1_00018
+#   msc = inverter_sinal(msc, REGRAS_D1_00018)
+#
+# Colunas da MSC vinda de arquivo (CONTA, NATUREZA_VALOR, ...) usam COLUNAS_ARQUIVO:
+#   df = inverter_sinal(df, REGRAS_RETIFICADORAS, **COLUNAS_ARQUIVO)
+#
+# Benchmark (MSC sintética de 2 milhões de linhas):
+#   python -m core.normalizacao_sinal
+
+import time
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# ═══════════════════════════════════════════════════════════════
+# Tabelas de Regras
+# ═══════════════════════════════════════════════════════════════
+
+# Tipo de valor usado nas regras: 'period_change' ou TIPO_SALDO, que
+# representa qualquer tipo diferente de period_change (beginning_balance,
+# ending_balance). `None` em grupo/natureza casa com qualquer valor.
+TIPO_PERIOD_CHANGE = 'period_change'
+TIPO_SALDO = 'saldo'
+
+Regra = Tuple[Optional[str], Optional[str], str]
+
+# Contas retificadoras (saldos; exceto period_change)
+REGRAS_RETIFICADORAS = (
+    ('1', 'C', TIPO_SALDO),
+    ('2', 'D', TIPO_SALDO),
+    ('4', 'D', TIPO_SALDO),
+    ('5', 'C', TIPO_SALDO),
+    ('6', 'D', TIPO_SALDO),
+    ('7', 'C', TIPO_SALDO),
+    ('8', 'D', TIPO_SALDO),
+)
+
+# Movimento (period_change) com natureza contrária à do grupo
+REGRAS_PERIOD_CHANGE = (
+    ('1', 'C', TIPO_PERIOD_CHANGE),
+    ('2', 'D', TIPO_PERIOD_CHANGE),
+    ('3', 'C', TIPO_PERIOD_CHANGE),
+    ('4', 'D', TIPO_PERIOD_CHANGE),
+    ('5', 'C', TIPO_PERIOD_CHANGE),
+    ('6', 'D', TIPO_PERIOD_CHANGE),
+    ('7', 'C', TIPO_PERIOD_CHANGE),
+    ('8', 'D', TIPO_PERIOD_CHANGE),
+)
+
+# D1_00018 (SI + MOV = SF): retificadoras e period_change
+REGRAS_D1_00018 = REGRAS_RETIFICADORAS + REGRAS_PERIOD_CHANGE
+
+COLUNAS_API = dict(col_conta='conta_contabil', col_natureza='natureza_conta',
+                   col_tipo='tipo_valor', col_valor='valor')
+COLUNAS_ARQUIVO = dict(col_conta='CONTA', col_natureza='NATUREZA_VALOR',
+                       col_tipo='TIPO_VALOR', col_valor='VALOR')
+
+# Eixos da matriz de consulta: grupos '0'..'9' + "outro"; D, C + "outra";
+# saldo, period_change
+_GRUPOS = '0123456789'
+_NATUREZAS = 'DC'
+_TIPOS = (TIPO_SALDO, TIPO_PERIOD_CHANGE)
+
+
+# ═══════════════════════════════════════════════════════════════
+# Compilação e Máscara
+# ═══════════════════════════════════════════════════════════════
+
+def compilar_regras(regras: Iterable[Regra]) -> np.ndarray:
+    """
+    Compila uma tabela de regras numa matriz booleana [grupo, natureza, tipo].
+
+    Args:
+        regras: Tuplas (grupo, natureza, tipo); None em grupo/natureza = qualquer
+
+    Returns:
+        np.ndarray bool de formato (11, 3, 2)
+    """
+    tabela = np.zeros((len(_GRUPOS) + 1, len(_NATUREZAS) + 1, len(_TIPOS)), dtype=bool)
+    for grupo, natureza, tipo in regras:
+        if tipo not in _TIPOS:
+            raise ValueError(f"Tipo de valor inválido na regra: {tipo!r}")
+        g = slice(None) if grupo is None else _GRUPOS.index(grupo)
+        n = slice(None) if natureza is None else _NATUREZAS.index(natureza)
+        tabela[g, n, _TIPOS.index(tipo)] = True
+    return tabela
+
+
+def _codificar(serie: pd.Series, traduzir, ausente: int) -> np.ndarray:
+    """
+    Traduz uma coluna para códigos inteiros avaliando `traduzir` apenas uma vez
+    por valor distinto (categorias ou resultado de `pd.factorize`).
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = serie.cat.codes.to_numpy()
+        unicos = serie.cat.categories
+    else:
+        codigos, unicos = pd.factorize(serie)
+    tabela = np.fromiter((traduzir(u) for u in unicos), dtype=np.int8, count=len(unicos))
+    # Código -1 (nulo) indexa a última posição
+    tabela = np.append(tabela, np.int8(ausente))
+    return tabela[codigos]
+
+
+def _grupo(conta) -> int:
+    c = str(conta)[:1]
+    return _GRUPOS.index(c) if c and c in _GRUPOS else len(_GRUPOS)
+
+
+def _natureza(natureza) -> int:
+    n = str(natureza)
+    return _NATUREZAS.index(n) if len(n) == 1 and n in _NATUREZAS else len(_NATUREZAS)
+
+
+def _tipo(tipo) -> int:
+    return 1 if tipo == TIPO_PERIOD_CHANGE else 0
+
+
+def mascara_inversao(
+    df: pd.DataFrame,
+    regras: Iterable[Regra],
+    col_conta: str = 'conta_contabil',
+    col_natureza: str = 'natureza_conta',
+    col_tipo: str = 'tipo_valor',
+) -> np.ndarray:
+    """
+    Calcula a máscara das linhas cujo sinal deve ser invertido.
+
+    Args:
+        df: DataFrame da MSC
+        regras: Tabela de regras (ver REGRAS_*) ou matriz já compilada
+        col_conta, col_natureza, col_tipo: Nomes das colunas
+
+    Returns:
+        np.ndarray bool com uma posição por linha de `df`
+    """
+    tabela = regras if isinstance(regras, np.ndarray) else compilar_regras(regras)
+    g = _codificar(df[col_conta], _grupo, len(_GRUPOS))
+    n = _codificar(df[col_natureza], _natureza, len(_NATUREZAS))
+    t = _codificar(df[col_tipo], _tipo, 0)
+    return tabela[g, n, t]
+
+
+def inverter_sinal(
+    df: pd.DataFrame,
+    regras: Iterable[Regra],
+    col_conta: str = 'conta_contabil',
+    col_natureza: str = 'natureza_conta',
+    col_tipo: str = 'tipo_valor',
+    col_valor: str = 'valor',
+) -> pd.DataFrame:
+    """
+    Inverte o sinal de `col_valor` nas linhas que casam com as regras.
+
+    Args:
+        df: DataFrame da MSC (não é alterado)
+        regras: Tabela de regras (ver REGRAS_*)
+        col_conta, col_natureza, col_tipo, col_valor: Nomes das colunas
+
+    Returns:
+        Cópia do DataFrame com os valores invertidos
+    """
+    mascara = mascara_inversao(df, regras, col_conta, col_natureza, col_tipo)
+    valores = df[col_valor].to_numpy()
+    return df.assign(**{col_valor: np.where(mascara, -valores, valores)})
+
+
+# ═══════════════════════════════════════════════════════════════
+# Benchmark
+# ═══════════════════════════════════════════════════════════════
+
+def _inverter_apply(df: pd.DataFrame) -> pd.Series:
+    """Implementação anterior (apply linha a linha), usada como referência."""
+    df = df.copy()
+    df['Grupo_Contas'] = df['conta_contabil'].str[0]
+    df['valor'] = df.apply(lambda x: x['valor'] * -1
+        if (x['Grupo_Contas'] == '1' and x['natureza_conta'] == 'C' and not x['tipo_valor'] == 'period_change')
+        or (x['Grupo_Contas'] == '2' and x['natureza_conta'] == 'D' and not x['tipo_valor'] == 'period_change')
+        or (x['Grupo_Contas'] == '4' and x['natureza_conta'] == 'D' and not x['tipo_valor'] == 'period_change')
+        or (x['Grupo_Contas'] == '5' and x['natureza_conta'] == 'C' and not x['tipo_valor'] == 'period_change')
+        or (x['Grupo_Contas'] == '6' and x['natureza_conta'] == 'D' and not x['tipo_valor'] == 'period_change')
+        or (x['Grupo_Contas'] == '7' and x['natureza_conta'] == 'C' and not x['tipo_valor'] == 'period_change')
+        or (x['Grupo_Contas'] == '8' and x['natureza_conta'] == 'D' and not x['tipo_valor'] == 'period_change')
+        else x['valor'], axis=1)
+    df['valor'] = df.apply(lambda x: x['valor'] * -1
+        if (x['Grupo_Contas'] in ('1', '3', '5', '7') and x['natureza_conta'] == 'C' and x['tipo_valor'] == 'period_change')
+        or (x['Grupo_Contas'] in ('2', '4', '6', '8') and x['natureza_conta'] == 'D' and x['tipo_valor'] == 'period_change')
+        else x['valor'], axis=1)
+    return df['valor']
+
+
+def _msc_sintetica(linhas: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    contas = np.array([f"{g}{c:08d}" for g in range(1, 9) for c in rng.integers(0, 10**8, 500)])
+    return pd.DataFrame({
+        'conta_contabil': contas[rng.integers(0, len(contas), linhas)],
+        'natureza_conta': np.array(['D', 'C'])[rng.integers(0, 2, linhas)],
+        'tipo_valor': np.array(['beginning_balance', 'ending_balance', 'period_change'])[rng.integers(0, 3, linhas)],
+        'valor': rng.uniform(0, 1e6, linhas).round(2),
+    })
+
+
+def benchmark(linhas: int = 2_000_000, amostra_apply: int = 200_000) -> None:
+    """
+    Compara a versão vetorizada com o apply linha a linha numa MSC sintética.
+
+    O apply é medido numa amostra de `amostra_apply` linhas e extrapolado para
+    `linhas` (é linear no número de linhas).
+    """
+    msc = _msc_sintetica(linhas)
+
+    t0 = time.perf_counter()
+    vetorizado = inverter_sinal(msc, REGRAS_D1_00018)['valor']
+    t_vet = time.perf_counter() - t0
+
+    amostra = msc.iloc[:amostra_apply]
+    t0 = time.perf_counter()
+    referencia = _inverter_apply(amostra)
+    t_apply = (time.perf_counter() - t0) * linhas / len(amostra)
+
+    assert np.array_equal(vetorizado.iloc[:amostra_apply].to_numpy(), referencia.to_numpy())
+    print(f"Linhas: {linhas:,}")
+    print(f"Vetorizado: {t_vet:.3f}s")
+    print(f"Apply (extrapolado de {len(amostra):,} linhas): {t_apply:.1f}s")
+    print(f"Ganho: {t_apply / t_vet:.0f}x")
+
+
+if __name__ == '__main__':
+    benchmark()
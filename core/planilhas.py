@@ -0,0 +1,231 @@
+# ┌───────────────────────────────────────────────────────────────
+# │ core/planilhas.py - Leitura de planilhas enviadas (SIAFE/Flexvision)
+# └───────────────────────────────────────────────────────────────
+#
+# As páginas de conferência leem com `pd.read_excel` (openpyxl) as planilhas
+# enviadas pelo usuário, uma de cada vez, e repetem a leitura a cada rerun do
+# Streamlit quando a página não usa `st.cache_data`.
+#
+# Aqui cada leitura é identificada pelo conteúdo do arquivo (sha256) mais as
+# opções de leitura:
+#
+# - o parser é o calamine (python-calamine, em Rust) quando instalado; sem ele,
+#   o motor padrão do pandas (openpyxl/xlrd). PLANILHAS_MOTOR força um motor;
+# - o resultado fica num cache LRU do processo, limitado em bytes, guardado
+#   como tabela Arrow quando a volta reproduz os tipos (colunas de objetos só
+#   com texto); as demais (ex.: `dtype=object` com números) ficam como
+#   DataFrame. Cada leitura devolve uma cópia nova;
+# - `ler_planilhas` lê em paralelo (threads) as planilhas que não estão no
+#   cache;
+# - cabeçalho e linhas descartadas no início/fim (títulos e rodapés dos
+#   relatórios) são opções da leitura, e não `.iloc` espalhados pelas páginas.
+#
+# Uso:
+#   from core.planilhas import Leitura, ler_planilha, ler_planilhas
+#   pc = ler_planilha(arquivo_pc, cabecalho=3, inicio=1, fim=3, dtype=str)
+#   bases = ler_planilhas({
+#       'deta': Leitura(arquivo_deta, cabecalho=3),
+#       'rec': Leitura(arquivo_rec, cabecalho=3, dtype=object),
+#   })
+
+import hashlib
+import importlib.util
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# calamine é opcional: sem ele, o pandas escolhe o motor (openpyxl/xlrd)
+_CALAMINE = importlib.util.find_spec("python_calamine") is not None
+
+
+# ═══════════════════════════════════════════════════════════════
+# Configuração
+# ═══════════════════════════════════════════════════════════════
+
+# Limite (bytes) das tabelas guardadas no cache do processo
+CACHE_MAX = int(os.environ.get("PLANILHAS_CACHE_MB", "512")) * 1024 * 1024
+# Planilhas lidas ao mesmo tempo por `ler_planilhas`
+WORKERS = int(os.environ.get("PLANILHAS_WORKERS", "4"))
+# Motor do pd.read_excel ('calamine', 'openpyxl', ...); vazio = automático
+MOTOR = os.environ.get("PLANILHAS_MOTOR", "") or ("calamine" if _CALAMINE else None)
+
+
+@dataclass(frozen=True)
+class Leitura:
+    """
+    Uma planilha a ler e como lê-la.
+
+    Attributes:
+        arquivo: upload do Streamlit, bytes, caminho ou objeto de arquivo
+        cabecalho: linha do cabeçalho (`header` do pd.read_excel)
+        inicio: linhas descartadas logo após o cabeçalho
+        fim: linhas descartadas no final (rodapé do relatório)
+        dtype: `dtype` do pd.read_excel (ex.: str, object)
+        aba: aba lida (`sheet_name`)
+    """
+    arquivo: Any
+    cabecalho: Optional[int] = 0
+    inicio: int = 0
+    fim: int = 0
+    dtype: Any = None
+    aba: Any = 0
+
+
+# ═══════════════════════════════════════════════════════════════
+# Cache (LRU limitado em bytes)
+# ═══════════════════════════════════════════════════════════════
+
+_lock = threading.Lock()
+_cache = OrderedDict()
+_bytes_cache = 0
+
+
+def _arrow_preserva(df: pd.DataFrame) -> bool:
+    """
+    Se a volta do Arrow reproduz o DataFrame: cabeçalhos textuais e colunas de
+    objetos só com texto. Números em colunas object (`dtype=object`) voltariam
+    como int64/float64, e cabeçalhos numéricos ou datas, como texto.
+    """
+    if not all(isinstance(coluna, str) for coluna in df.columns):
+        return False
+    return all(pd.api.types.infer_dtype(df[coluna], skipna=True) in ('string', 'empty')
+               for coluna in df.columns[df.dtypes == object])
+
+
+def _para_cache(df: pd.DataFrame):
+    """(objeto guardado, tamanho em bytes): tabela Arrow ou, se não couber no Arrow, o próprio DataFrame."""
+    if _arrow_preserva(df):
+        try:
+            tabela = pa.Table.from_pandas(df, preserve_index=True)
+            return tabela, tabela.nbytes
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            pass
+    return df.copy(), int(df.memory_usage(deep=True).sum())
+
+
+def _do_cache(guardado) -> pd.DataFrame:
+    """DataFrame novo a partir do que está no cache (nulos de texto voltam como NaN, como no read_excel)."""
+    if isinstance(guardado, pd.DataFrame):
+        return guardado.copy()
+    df = guardado.to_pandas()
+    for coluna in df.columns[df.dtypes == object]:
+        serie = df[coluna]
+        if serie.isna().any():
+            df[coluna] = serie.where(serie.notna(), np.nan)
+    return df
+
+
+def _buscar(chave) -> Optional[pd.DataFrame]:
+    with _lock:
+        guardado = _cache.get(chave)
+        if guardado is None:
+            return None
+        _cache.move_to_end(chave)
+    return _do_cache(guardado[0])
+
+
+def _guardar(chave, df: pd.DataFrame) -> None:
+    global _bytes_cache
+    guardado, tamanho = _para_cache(df)
+    if tamanho > CACHE_MAX:
+        return
+    with _lock:
+        if chave in _cache:
+            _bytes_cache -= _cache.pop(chave)[1]
+        _cache[chave] = (guardado, tamanho)
+        _bytes_cache += tamanho
+        while _bytes_cache > CACHE_MAX:
+            _bytes_cache -= _cache.popitem(last=False)[1][1]
+
+
+def limpar_cache() -> None:
+    """Esvazia o cache de planilhas do processo."""
+    global _bytes_cache
+    with _lock:
+        _cache.clear()
+        _bytes_cache = 0
+
+
+# ═══════════════════════════════════════════════════════════════
+# Leitura
+# ═══════════════════════════════════════════════════════════════
+
+def _conteudo(arquivo) -> bytes:
+    """Bytes do arquivo (sem alterar a posição de leitura de uploads e objetos de arquivo)."""
+    if isinstance(arquivo, (bytes, bytearray, memoryview)):
+        return bytes(arquivo)
+    if isinstance(arquivo, (str, os.PathLike)):
+        with open(arquivo, 'rb') as f:
+            return f.read()
+    if hasattr(arquivo, 'getvalue'):
+        return arquivo.getvalue()
+    posicao = arquivo.tell()
+    arquivo.seek(0)
+    try:
+        return arquivo.read()
+    finally:
+        arquivo.seek(posicao)
+
+
+def _chave(conteudo: bytes, leitura: Leitura):
+    opcoes = (leitura.cabecalho, leitura.inicio, leitura.fim, repr(leitura.dtype), repr(leitura.aba), MOTOR)
+    return hashlib.sha256(conteudo).hexdigest(), opcoes
+
+
+def _ler(conteudo: bytes, leitura: Leitura) -> pd.DataFrame:
+    df = pd.read_excel(io.BytesIO(conteudo), sheet_name=leitura.aba, header=leitura.cabecalho,
+                       dtype=leitura.dtype, engine=MOTOR)
+    if leitura.inicio or leitura.fim:
+        df = df.iloc[leitura.inicio:max(len(df) - leitura.fim, leitura.inicio)]
+    return df
+
+
+def _ler_com_cache(conteudo: bytes, leitura: Leitura) -> pd.DataFrame:
+    chave = _chave(conteudo, leitura)
+    df = _buscar(chave)
+    if df is None:
+        df = _ler(conteudo, leitura)
+        _guardar(chave, df)
+    return df
+
+
+def ler_planilha(arquivo, cabecalho: Optional[int] = 0, inicio: int = 0, fim: int = 0,
+                 dtype=None, aba=0) -> pd.DataFrame:
+    """
+    Lê uma planilha Excel (equivalente a `pd.read_excel(...).iloc[inicio:-fim]`).
+
+    O índice é o do `read_excel` fatiado, como no `.iloc`. Ver `Leitura`.
+
+    Returns:
+        DataFrame novo (pode ser alterado sem afetar o cache)
+    """
+    leitura = Leitura(arquivo, cabecalho=cabecalho, inicio=inicio, fim=fim, dtype=dtype, aba=aba)
+    return _ler_com_cache(_conteudo(arquivo), leitura)
+
+
+def ler_planilhas(leituras: Dict[str, Leitura]) -> Dict[str, pd.DataFrame]:
+    """
+    Lê várias planilhas independentes, em paralelo.
+
+    Args:
+        leituras: nome -> Leitura (entradas com arquivo None são ignoradas)
+
+    Returns:
+        nome -> DataFrame, na ordem de `leituras`
+    """
+    leituras = {nome: leitura for nome, leitura in leituras.items() if leitura.arquivo is not None}
+    conteudos = {nome: _conteudo(leitura.arquivo) for nome, leitura in leituras.items()}
+    if len(leituras) <= 1 or WORKERS <= 1:
+        return {nome: _ler_com_cache(conteudos[nome], leitura) for nome, leitura in leituras.items()}
+
+    with ThreadPoolExecutor(max_workers=min(WORKERS, len(leituras)), thread_name_prefix="planilhas") as pool:
+        futuros = {nome: pool.submit(_ler_com_cache, conteudos[nome], leitura) for nome, leitura in leituras.items()}
+        return {nome: futuro.result() for nome, futuro in futuros.items()}
@@ -0,0 +1,326 @@
+# ┌───────────────────────────────────────────────────────────────
+# │ core/regras_lme.py - Leitura e aplicação das regras de LME (TXT)
+# └───────────────────────────────────────────────────────────────
+#
+# O TXT de uma regra de LME é uma disjunção de blocos entre parênteses, cada
+# um com condições ligadas por " E ":
+#
+#   ([GRUPO DE DESPESA].[Código] = '3' E [UNIDADE ORÇAMENTÁRIA].[Código] = '18010'
+#    E [AÇÃO PPA].[Código] TERMINA COM '8021') OU (...) OU ...
+#
+# Leitura: o texto é percorrido uma vez, separado nas aspas; os trechos entre
+# valores (que têm poucas formas distintas) são classificados uma única vez
+# por um padrão pré-compilado, e os valores vão direto para colunas (sem um
+# dict por bloco nem três `re.match` por condição).
+#
+# Aplicação: `IndiceRegras` indexa as regras por (GD, UO, sufixo da ação) em
+# tabelas hash, uma por combinação de campos presentes e comprimento de sufixo.
+# Para um conjunto de linhas (GD, UO, Ação), cada combinação distinta consulta
+# apenas essas poucas tabelas (um merge por tabela), em vez de testar todas as
+# regras linha a linha.
+#
+# Uso:
+#   from core.regras_lme import parsear_regras, IndiceRegras
+#   regras = parsear_regras(conteudo_txt)
+#   ids = IndiceRegras(regras).casar(df['GD'], df['UO'], df['Acao'])   # -1 = sem regra
+#
+# Benchmark (TXT sintético de 50 mil blocos e 200 mil linhas de saldo):
+#   python -m core.regras_lme
+
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+
+# ═══════════════════════════════════════════════════════════════
+# Gramática
+# ═══════════════════════════════════════════════════════════════
+
+COL_GD = 'GRUPO DE DESPESA (=)'
+COL_UO = 'UNIDADE ORÇAMENTÁRIA (=)'
+COL_ACAO = 'AÇÃO PPA (TERMINA COM)'
+
+# Campo -> operador aceito (outros operadores são ignorados, como condições desconhecidas)
+OPERADORES = {
+    'GRUPO DE DESPESA': '=',
+    'UNIDADE ORÇAMENTÁRIA': '=',
+    'AÇÃO PPA': 'TERMINA COM',
+}
+
+# Trecho fora de aspas que precede o valor de uma condição reconhecida
+_PREFIXO = re.compile(r"""
+    \[(?P<campo>GRUPO\ DE\ DESPESA|UNIDADE\ ORÇAMENTÁRIA|AÇÃO\ PPA)\]\.\[Código\]
+    (?: \s*(?P<igual>=)\s* | \ (?P<termina>TERMINA\ COM)\ )$
+""", re.VERBOSE)
+
+SEPARADOR = ' OU '
+
+
+def _classificar_trecho(trecho: str):
+    """(coluna da condição ou None, se o trecho abre um novo bloco)."""
+    m = _PREFIXO.search(trecho)
+    coluna = None
+    if m:
+        operador = m.group('igual') or m.group('termina')
+        if OPERADORES[m.group('campo')] == operador:
+            coluna = f"{m.group('campo')} ({operador})"
+    return coluna, SEPARADOR in trecho
+
+
+# ═══════════════════════════════════════════════════════════════
+# Leitura do TXT
+# ═══════════════════════════════════════════════════════════════
+
+def parsear_regras(conteudo: str) -> pd.DataFrame:
+    """
+    Converte o texto de uma regra de LME em DataFrame (um bloco " OU " por linha).
+
+    Returns:
+        DataFrame com as colunas 'CAMPO (OPERADOR)' encontradas (ex.: COL_GD,
+        COL_UO, COL_ACAO; NaN quando o bloco não tem a condição) e, se as três
+        existirem, 'chave' e 'regra_completa'. Blocos sem condição reconhecida
+        são descartados; condição repetida num bloco vale a última.
+    """
+    # Valores entre aspas nas posições ímpares; o trecho anterior a cada valor
+    # diz a que campo ele pertence e se um " OU " abriu um novo bloco. Os
+    # trechos se repetem (poucas formas distintas), então cada forma é
+    # classificada uma única vez.
+    partes = conteudo.split("'")
+    if len(partes) < 3:
+        return pd.DataFrame()
+    codigos, trechos = pd.factorize(pd.Series(partes[0:-1:2], dtype=object))
+    formas = [_classificar_trecho(t) for t in trechos]
+    nomes = np.array([c for c, _ in formas], dtype=object)[codigos]
+    blocos = np.cumsum(np.array([abre for _, abre in formas], dtype=bool)[codigos])
+
+    condicoes = pd.DataFrame({'bloco': blocos, 'coluna': nomes, 'valor': partes[1::2]})
+    condicoes = condicoes[condicoes['coluna'].notna()]
+    if condicoes.empty:
+        return pd.DataFrame()
+    ordem = condicoes['coluna'].unique()
+    condicoes = condicoes.drop_duplicates(['bloco', 'coluna'], keep='last')
+    df = condicoes.pivot(index='bloco', columns='coluna', values='valor')[ordem]
+    df = df.reset_index(drop=True).rename_axis(columns=None)
+
+    if all(col in df.columns for col in (COL_GD, COL_UO, COL_ACAO)):
+        gd, uo, acao = (df[col].astype(str) for col in (COL_GD, COL_UO, COL_ACAO))
+        df['chave'] = gd + uo + acao
+        # regra_completa no formato canônico (compatível com o banco de dados)
+        df['regra_completa'] = (
+            "[GRUPO DE DESPESA].[Código] = '" + gd + "' E " +
+            "[UNIDADE ORÇAMENTÁRIA].[Código] = '" + uo + "' E " +
+            "[AÇÃO PPA].[Código] TERMINA COM '" + acao + "'"
+        )
+
+    return df
+
+
+# ═══════════════════════════════════════════════════════════════
+# Aplicação das regras
+# ═══════════════════════════════════════════════════════════════
+
+def _texto(valores) -> pd.Series:
+    """Valores como texto sem espaços nas pontas; nulos, vazios e '-' viram NaN."""
+    s = pd.Series(valores, dtype=object).reset_index(drop=True)
+    s = s.where(s.isna(), s.astype(str).str.strip())
+    return s.where(~s.isin(['', '-']))
+
+
+class IndiceRegras:
+    """
+    Regras de LME indexadas para consulta por (GD, UO, Ação).
+
+    Uma regra casa com a linha quando GD e UO são iguais e a ação termina com o
+    sufixo da regra; condição ausente na regra casa com qualquer valor. Cada
+    linha recebe o id (posição em `regras`) da primeira regra que casa.
+    """
+
+    def __init__(self, regras: pd.DataFrame):
+        self.regras = regras.reset_index(drop=True)
+        vazio = pd.Series([np.nan] * len(self.regras), dtype=object)
+        gd = _texto(self.regras[COL_GD]) if COL_GD in self.regras else vazio
+        uo = _texto(self.regras[COL_UO]) if COL_UO in self.regras else vazio
+        acao = (self.regras[COL_ACAO].astype(object) if COL_ACAO in self.regras else vazio).reset_index(drop=True)
+        acao = acao.where(acao.isna(), acao.astype(str).str.strip())
+
+        tabela = pd.DataFrame({'gd': gd, 'uo': uo, 'sufixo': acao, 'regra': np.arange(len(self.regras))})
+        tabela['comprimento'] = tabela['sufixo'].str.len()
+
+        # (usa GD, usa UO, comprimento do sufixo ou -1) -> tabela hash com a primeira regra de cada chave
+        self._tabelas = {}
+        assinatura = pd.DataFrame({
+            'g': tabela['gd'].notna(),
+            'u': tabela['uo'].notna(),
+            'l': tabela['comprimento'].fillna(-1).astype(int),
+        })
+        for (usa_gd, usa_uo, comprimento), grupo in tabela.groupby([assinatura['g'], assinatura['u'], assinatura['l']]):
+            campos = [c for c, usa in (('gd', usa_gd), ('uo', usa_uo), ('sufixo', comprimento >= 0)) if usa]
+            indice = grupo.drop_duplicates(campos, keep='first')[campos + ['regra']]
+            self._tabelas[(bool(usa_gd), bool(usa_uo), int(comprimento))] = (campos, indice)
+
+    def __len__(self):
+        return len(self.regras)
+
+    def casar(self, gd, uo, acao) -> np.ndarray:
+        """
+        Id da primeira regra que casa com cada linha (-1 se nenhuma).
+
+        Args:
+            gd, uo, acao: Sequências alinhadas (uma posição por linha)
+        """
+        linhas = pd.DataFrame({'gd': _texto(gd), 'uo': _texto(uo), 'acao': _texto(acao)})
+        if linhas.empty or not self._tabelas:
+            return np.full(len(linhas), -1, dtype=np.int64)
+
+        # Cada combinação distinta é consultada uma vez
+        codigos = linhas.groupby(['gd', 'uo', 'acao'], dropna=False, sort=False).ngroup().to_numpy()
+        distintas = linhas.drop_duplicates().reset_index(drop=True)
+        nenhuma = len(self.regras)
+        primeira = np.full(len(distintas), nenhuma, dtype=np.int64)
+
+        for (_, _, comprimento), (campos, indice) in self._tabelas.items():
+            chaves = distintas[['gd', 'uo']].copy()
+            if comprimento > 0:
+                chaves['sufixo'] = distintas['acao'].str[-comprimento:]
+            elif comprimento == 0:
+                chaves['sufixo'] = distintas['acao'].where(distintas['acao'].isna(), '')
+            achadas = chaves[campos].merge(indice, on=campos, how='left')['regra']
+            primeira = np.minimum(primeira, achadas.fillna(nenhuma).to_numpy(np.int64))
+
+        primeira[primeira == nenhuma] = -1
+        return primeira[codigos]
+
+
+def cobertura_regras(regras: pd.DataFrame, df: pd.DataFrame, col_gd: str = 'GD', col_uo: str = 'UO',
+                     col_acao: str = 'Acao', col_saldo: str = 'Saldo'):
+    """
+    Confere, numa passada, quais linhas de `df` são cobertas pelas regras.
+
+    Returns:
+        Tuple (linhas, por_regra):
+        - linhas: cópia de `df` com 'regra_lme' (chave da regra ou NaN)
+        - por_regra: uma linha por regra com a quantidade de linhas e o saldo cobertos
+    """
+    indice = IndiceRegras(regras)
+    ids = indice.casar(df[col_gd], df[col_uo], df[col_acao])
+    rotulos = indice.regras['chave'] if 'chave' in indice.regras else pd.Series(indice.regras.index.astype(str))
+
+    linhas = df.copy()
+    linhas['regra_lme'] = np.where(ids >= 0, rotulos.to_numpy(dtype=object)[np.maximum(ids, 0)], np.nan)
+
+    cobertas = ids[ids >= 0]
+    por_regra = indice.regras.copy()
+    por_regra['linhas'] = np.bincount(cobertas, minlength=len(indice))
+    if col_saldo in df.columns:
+        saldo = pd.to_numeric(df[col_saldo], errors='coerce').fillna(0).to_numpy()
+        por_regra[col_saldo] = np.bincount(cobertas, weights=saldo[ids >= 0], minlength=len(indice))
+    return linhas, por_regra
+
+
+# ═══════════════════════════════════════════════════════════════
+# Benchmark
+# ═══════════════════════════════════════════════════════════════
+
+def _parsear_split(conteudo: str) -> pd.DataFrame:
+    """Leitura anterior da página 06 (split + três re.match por condição), usada como referência."""
+    def parse_condition(condition):
+        condition = condition.strip()
+        match_grupo = re.match(r"\[GRUPO DE DESPESA\]\.\[Código\]\s*=\s*'(.*?)'", condition)
+        if match_grupo:
+            return 'GRUPO DE DESPESA', '=', match_grupo.group(1)
+        match_unidade = re.match(r"\[UNIDADE ORÇAMENTÁRIA\]\.\[Código\]\s*=\s*'(.*?)'", condition)
+        if match_unidade:
+            return 'UNIDADE ORÇAMENTÁRIA', '=', match_unidade.group(1)
+        match_acao_termina = re.match(r"\[AÇÃO PPA\]\.\[Código\] TERMINA COM '(.*?)'", condition)
+        if match_acao_termina:
+            return 'AÇÃO PPA', 'TERMINA COM', match_acao_termina.group(1)
+        return None, None, None
+
+    data = []
+    for grupo in [g.strip()[1:-1].strip() for g in conteudo.split(' OU ')]:
+        grupo_data = {}
+        for condicao in [c.strip() for c in grupo.split(' E ')]:
+            coluna, operador, valor = parse_condition(condicao)
+            if coluna:
+                grupo_data[f'{coluna} ({operador})'] = valor
+        if grupo_data:
+            data.append(grupo_data)
+    df = pd.DataFrame(data)
+    if all(col in df.columns for col in (COL_GD, COL_UO, COL_ACAO)):
+        df['chave'] = df[COL_GD].astype(str) + df[COL_UO].astype(str) + df[COL_ACAO].astype(str)
+        df['regra_completa'] = (
+            "[GRUPO DE DESPESA].[Código] = '" + df[COL_GD].astype(str) + "' E " +
+            "[UNIDADE ORÇAMENTÁRIA].[Código] = '" + df[COL_UO].astype(str) + "' E " +
+            "[AÇÃO PPA].[Código] TERMINA COM '" + df[COL_ACAO].astype(str) + "'"
+        )
+    return df
+
+
+def _casar_forca_bruta(regras: pd.DataFrame, gd, uo, acao) -> np.ndarray:
+    """Testa todas as regras para cada linha (referência)."""
+    regras_t = list(zip(regras[COL_GD], regras[COL_UO], regras[COL_ACAO]))
+    resultado = []
+    for g, u, a in zip(gd, uo, acao):
+        resultado.append(next((i for i, (rg, ru, ra) in enumerate(regras_t)
+                               if rg == g and ru == u and a.endswith(ra)), -1))
+    return np.array(resultado, dtype=np.int64)
+
+
+def _sinteticos(blocos: int, linhas: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    gds = rng.integers(1, 5, blocos).astype(str)
+    uos = rng.integers(10000, 10300, blocos).astype(str)
+    acoes = np.char.zfill(rng.integers(0, 10000, blocos).astype(str), 4)
+    # ~10% das regras com sufixo de 2 dígitos
+    acoes = np.where(rng.random(blocos) < 0.1, np.char.ljust(acoes, 4).astype('U2'), acoes)
+    conteudo = ' OU '.join(
+        f"([GRUPO DE DESPESA].[Código] = '{g}' E [UNIDADE ORÇAMENTÁRIA].[Código] = '{u}' E "
+        f"[AÇÃO PPA].[Código] TERMINA COM '{a}')"
+        for g, u, a in zip(gds, uos, acoes)
+    )
+    saldos = pd.DataFrame({
+        'GD': rng.integers(1, 5, linhas).astype(str),
+        'UO': rng.integers(10000, 10300, linhas).astype(str),
+        'Acao': np.char.add(rng.integers(1, 10, linhas).astype(str),
+                            np.char.zfill(rng.integers(0, 10000, linhas).astype(str), 4)),
+        'Saldo': rng.uniform(0, 1e6, linhas).round(2),
+    })
+    return conteudo, saldos
+
+
+def benchmark(blocos: int = 50_000, linhas: int = 200_000, amostra_forca_bruta: int = 500) -> None:
+    """
+    Compara a leitura e a aplicação das regras com as versões anteriores.
+
+    A força bruta é medida em `amostra_forca_bruta` linhas e extrapolada para `linhas`.
+    """
+    conteudo, saldos = _sinteticos(blocos, linhas)
+
+    t0 = time.perf_counter()
+    referencia = _parsear_split(conteudo)
+    t_split = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    regras = parsear_regras(conteudo)
+    t_scanner = time.perf_counter() - t0
+    assert regras.equals(referencia)
+
+    t0 = time.perf_counter()
+    ids = IndiceRegras(regras).casar(saldos['GD'], saldos['UO'], saldos['Acao'])
+    t_indice = time.perf_counter() - t0
+
+    amostra = saldos.iloc[:amostra_forca_bruta]
+    t0 = time.perf_counter()
+    esperado = _casar_forca_bruta(regras, amostra['GD'], amostra['UO'], amostra['Acao'])
+    t_bruta = (time.perf_counter() - t0) * linhas / len(amostra)
+    assert np.array_equal(ids[:amostra_forca_bruta], esperado)
+
+    print(f"Blocos: {blocos:,} ({len(conteudo) / 1e6:.1f} MB) | linhas de saldo: {linhas:,} | cobertas: {(ids >= 0).sum():,}")
+    print(f"Leitura  split + re.match: {t_split:.2f}s | scanner: {t_scanner:.2f}s ({t_split / t_scanner:.1f}x)")
+    print(f"Aplicação força bruta (extrapolado de {len(amostra):,} linhas): {t_bruta:.0f}s | índice: {t_indice:.2f}s")
+
+
+if __name__ == '__main__':
+    benchmark()
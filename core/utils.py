@@ -4,6 +4,8 @@
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from io import BytesIO
 from typing import Dict, Optional
 
@@ -31,6 +33,26 @@ def br_to_float(x: str) -> float:
         return np.nan
 
 
+def serie_br_to_float(serie: pd.Series) -> pd.Series:
+    """
+    Versão vetorizada de `br_to_float` para uma coluna de texto (ou categórica).
+
+    A mesma conversão (sem separador de milhar, vírgula -> ponto) é feita pelo
+    pyarrow, uma vez por valor distinto.
+
+    Returns:
+        Série float64; nulos e valores inválidos viram np.nan
+    """
+    codigos, distintos = pd.factorize(serie)
+    texto = pa.array(pd.Series(distintos, dtype=object).astype(str), type=pa.string())
+    texto = pc.replace_substring(pc.replace_substring(pc.utf8_trim_whitespace(texto), '.', ''), ',', '.')
+    try:
+        valores = pc.cast(texto, pa.float64()).to_numpy(zero_copy_only=False)
+    except pa.ArrowInvalid:
+        valores = pd.to_numeric(texto.to_pandas(), errors='coerce').to_numpy(dtype=float)
+    return pd.Series(np.append(valores, np.nan)[codigos], index=serie.index, name=serie.name)
+
+
 def formatar_reais(valor: float) -> str:
     """
     Formata um valor float para o formato brasileiro de moeda.
@@ -0,0 +1,174 @@
+# ┌───────────────────────────────────────────────────────────────
+# │ core/voo_unico.py - Single-flight entre sessões do Streamlit
+# └───────────────────────────────────────────────────────────────
+#
+# `st.cache_data` só evita recomputar depois que o primeiro cálculo termina:
+# duas sessões que pedem o mesmo ente/ano ao mesmo tempo fazem, cada uma, a
+# carga inteira na API. Com `@voo_unico()` a primeira chamada de uma chave
+# (função + argumentos normalizados) executa a função; as chamadas seguintes
+# com a mesma chave, vindas de qualquer thread/sessão do processo, aguardam o
+# resultado dela.
+#
+# O progresso é compartilhado por chave: a execução "líder" chama
+# `reportar(fracao, texto)` e cada sessão registra, com `acompanhar(callback)`,
+# a função que atualiza a sua barra de progresso — chamada tanto na sessão
+# líder quanto nas que estão aguardando.
+#
+# Uso:
+#   @st.cache_data(ttl=3600)
+#   @voo_unico()
+#   def carregar(ente, ano): ...
+#
+#   with acompanhar(lambda fracao, texto: barra.progress(fracao, text=texto)):
+#       dados = carregar(ente, ano)
+
+import contextvars
+import copy
+import functools
+import inspect
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+# Intervalo (s) entre duas consultas ao progresso enquanto se aguarda o líder
+INTERVALO_ESPERA = 0.25
+
+_lock = threading.Lock()
+_voos = {}
+
+# Voo executado pela thread atual (para `reportar`) e callback da sessão atual
+_voo_atual = contextvars.ContextVar("voo_unico_atual", default=None)
+_observador = contextvars.ContextVar("voo_unico_observador", default=None)
+
+
+# ═══════════════════════════════════════════════════════════════
+# Normalização dos argumentos
+# ═══════════════════════════════════════════════════════════════
+
+def _normalizar(valor):
+    """Forma hashable e canônica: '33' e 33, [1, 2] e (1, 2) geram a mesma chave."""
+    if isinstance(valor, dict):
+        return tuple(sorted((str(k), _normalizar(v)) for k, v in valor.items()))
+    if isinstance(valor, (set, frozenset)):
+        return tuple(sorted((_normalizar(v) for v in valor), key=repr))
+    if isinstance(valor, (list, tuple)):
+        return tuple(_normalizar(v) for v in valor)
+    if valor is None or isinstance(valor, bool):
+        return valor
+    return str(valor)
+
+
+def chave_chamada(funcao: Callable, args: tuple, kwargs: dict) -> tuple:
+    """Chave de uma chamada: nome qualificado da função + argumentos (com defaults) normalizados."""
+    argumentos = inspect.signature(funcao).bind(*args, **kwargs)
+    argumentos.apply_defaults()
+    return (f"{funcao.__module__}.{funcao.__qualname__}",
+            tuple((nome, _normalizar(v)) for nome, v in argumentos.arguments.items()))
+
+
+# ═══════════════════════════════════════════════════════════════
+# Voo em andamento
+# ═══════════════════════════════════════════════════════════════
+
+class _Voo:
+    """Uma execução em andamento: resultado/erro e último progresso reportado."""
+
+    def __init__(self):
+        self.concluido = threading.Event()
+        self.resultado = None
+        self.erro: Optional[BaseException] = None
+        self.progresso = (0.0, None)
+        self.versao = 0
+
+    def reportar(self, fracao: float, texto: Optional[str]):
+        self.progresso = (min(max(float(fracao), 0.0), 1.0), texto)
+        self.versao += 1
+
+
+def reportar(fracao: float, texto: Optional[str] = None):
+    """
+    Atualiza o progresso (0..1) da execução em andamento na thread atual e
+    notifica a sessão líder. Fora de um `@voo_unico`, apenas chama o observador.
+    """
+    voo = _voo_atual.get()
+    if voo is not None:
+        voo.reportar(fracao, texto)
+        fracao, texto = voo.progresso
+    observador = _observador.get()
+    if observador is not None:
+        observador(fracao, texto)
+
+
+@contextmanager
+def acompanhar(callback: Callable[[float, Optional[str]], None]):
+    """Registra `callback(fracao, texto)` para o progresso das chamadas feitas no bloco."""
+    token = _observador.set(callback)
+    try:
+        yield
+    finally:
+        _observador.reset(token)
+
+
+def _aguardar(voo: _Voo):
+    observador = _observador.get()
+    versao = -1
+    while True:
+        concluido = voo.concluido.wait(INTERVALO_ESPERA)
+        if observador is not None and voo.versao != versao:
+            versao = voo.versao
+            observador(*voo.progresso)
+        if concluido:
+            return
+
+
+# ═══════════════════════════════════════════════════════════════
+# Decorador
+# ═══════════════════════════════════════════════════════════════
+
+def voo_unico(copiar: bool = True):
+    """
+    Deduplica chamadas simultâneas com os mesmos argumentos (no processo).
+
+    Args:
+        copiar: entrega às chamadas que aguardaram uma cópia profunda do
+                resultado (o líder recebe o objeto original), de modo que uma
+                sessão não altere os DataFrames de outra.
+
+    Exceções da função são repassadas a todas as chamadas que aguardavam.
+    Se o líder for interrompido por controle de fluxo (rerun/stop do
+    Streamlit, KeyboardInterrupt), quem aguardava tenta de novo.
+    """
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            chave = chave_chamada(funcao, args, kwargs)
+            while True:
+                with _lock:
+                    voo = _voos.get(chave)
+                    lider = voo is None
+                    if lider:
+                        voo = _voos[chave] = _Voo()
+
+                if lider:
+                    token = _voo_atual.set(voo)
+                    try:
+                        voo.resultado = funcao(*args, **kwargs)
+                        return voo.resultado
+                    except BaseException as e:
+                        voo.erro = e
+                        raise
+                    finally:
+                        _voo_atual.reset(token)
+                        with _lock:
+                            del _voos[chave]
+                        voo.concluido.set()
+
+                _aguardar(voo)
+                if voo.erro is None:
+                    return copy.deepcopy(voo.resultado) if copiar else voo.resultado
+                if isinstance(voo.erro, Exception):
+                    raise voo.erro
+                # líder interrompido (não falhou): nova tentativa, como líder ou seguidor
+
+        return envoltorio
+    return decorador
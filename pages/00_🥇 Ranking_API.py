@@ -8,17 +8,15 @@ import numpy as np
 from io import BytesIO
 from core.utils import convert_df_to_excel, convert_df_to_csv
 from core.layout import setup_page, sidebar_menu, get_app_menu
+from core.voo_unico import acompanhar
 
-import api_ranking.analysis.d1 as d1_analysis
-import api_ranking.analysis.d2_antecipada as d2_ant_analysis
-import api_ranking.analysis.d2_dca as d2_dca_analysis
-import api_ranking.analysis.d3 as d3_analysis
-import api_ranking.analysis.d4 as d4_analysis
+from api_ranking.pipeline import executar_pipeline
 
 from api_ranking.services.api_loader import get_extratos, load_all_data_cached, load_base_ranking
 
 from api_ranking.services.check_types import (detectar_tipo_relatorio, 
             verificar_disponibilidade_demonstrativos, verificacao_disponivel,)
+from api_ranking.services import extrato_index
 
 from api_ranking.services.formatting import highlight_resposta
 
@@ -249,7 +247,12 @@ def main():
             status_text.info(f"🔄 Buscando extratos — Ente: {cod} ({ente}) • Ano: {ano}...")
             progress_bar.progress(20)
 
-            extrato = get_extratos(ente, int(ano))
+            # Índice local de todos os entes (se sincronizado há pouco); senão, consulta a API
+            indice = extrato_index.indice_atual(int(ano), sincronizar=True)
+            extrato = indice.extrato(ente) if indice is not None else None
+            if extrato is None:
+                indice = None
+                extrato = get_extratos(ente, int(ano))
             progress_bar.progress(70)
 
             if extrato.empty:
@@ -262,6 +265,7 @@ def main():
                     extrato["dt_homologacao"] = pd.to_datetime(extrato["dt_homologacao"], errors="coerce")
 
                 st.session_state["extrato_df"] = extrato
+                st.session_state["extrato_indice"] = indice
                 # Registrar qual ente/ano foi carregado
                 st.session_state.extrato_ente = ente
                 st.session_state.extrato_ano = ano
@@ -350,7 +354,11 @@ def main():
         # Município: verificar se extrato foi carregado para detectar tipo
         df_extrato = st.session_state.get("extrato_df")
         if df_extrato is not None and not df_extrato.empty:
-            tipo_detectado = detectar_tipo_relatorio(df_extrato)
+            indice = st.session_state.get("extrato_indice")
+            if indice is not None:
+                tipo_detectado = indice.tipo_relatorio(ente)
+            else:
+                tipo_detectado = detectar_tipo_relatorio(df_extrato)
             if tipo_detectado:
                 st.session_state.tipo_relatorio = tipo_detectado
 
@@ -406,7 +414,11 @@ def main():
 
     # Verificar disponibilidade dos demonstrativos
     df_extrato_atual = st.session_state.get("extrato_df")
-    disponibilidade = verificar_disponibilidade_demonstrativos(df_extrato_atual, tipo_ente, tipo_rel)
+    indice = st.session_state.get("extrato_indice")
+    if indice is not None:
+        disponibilidade = indice.disponibilidade(ente, tipo_ente, tipo_rel)
+    else:
+        disponibilidade = verificar_disponibilidade_demonstrativos(df_extrato_atual, tipo_ente, tipo_rel)
 
     # Armazenar disponibilidade no session_state para uso posterior
     st.session_state['disponibilidade_demonstrativos'] = disponibilidade
@@ -651,217 +663,70 @@ def main():
     status_text.text(f"🔄 Carregando dados da API SICONFI... (Tipo: {tipo_relatorio}, Meses: {min(meses)}-{max(meses)})")
     progress_bar.progress(5)
 
-    dados = load_all_data_cached(
-        ente, ano, meses, tipos_balanco,
-        tipo_ente=tipo_ente, tipo_relatorio=tipo_relatorio,
-        carregar_msce=carregar_msce, carregar_dca=carregar_dca,
-        carregar_rreo=carregar_rreo, carregar_rgf=carregar_rgf
-    )
+    def _progresso_carga(fracao, texto):
+        # a carga ocupa a faixa 5-10% da barra; o progresso é o mesmo para todas as
+        # sessões que aguardam este ente/ano (core.voo_unico)
+        progress_bar.progress(5 + int(5 * fracao))
+        if texto:
+            status_text.text(f"🔄 {texto}")
+
+    with acompanhar(_progresso_carga):
+        dados = load_all_data_cached(
+            ente, ano, meses, tipos_balanco,
+            tipo_ente=tipo_ente, tipo_relatorio=tipo_relatorio,
+            carregar_msce=carregar_msce, carregar_dca=carregar_dca,
+            carregar_rreo=carregar_rreo, carregar_rgf=carregar_rgf
+        )
 
     status_text.text("✅ Dados carregados com sucesso!")
     progress_bar.progress(10)
 
-    # Extrair dados do dicionário
-    status_text.text("⏳ Processando MSC Corrente...")
+    # Preparação dos frames e execução de D1-D4 (api_ranking.pipeline)
+    status_text.text("⏳ Processando demonstrativos e executando análises...")
     progress_bar.progress(15)
 
-    msc_patrimonial = dados['msc_patrimonial']
-    msc_orcam = dados['msc_orcam']
-    msc_ctr = dados['msc_ctr']
-    msc_patrimonial_orig = msc_patrimonial.copy()
-    msc_orcam_orig = msc_orcam.copy()
-    msc_ctr_orig = msc_ctr.copy()
-
-    status_text.text("✅ MSC Corrente carregada! Processando ajustes...")
-    progress_bar.progress(35)
-
-    # Ajustes de sinal (iguais ao seu código)
-    mascara_retificadora1 = (
-        ((msc_patrimonial['conta_contabil'].astype(str).str[0] == '1') & (msc_patrimonial['natureza_conta'] == 'C')) |
-        ((msc_patrimonial['conta_contabil'].astype(str).str[0] == '2') & (msc_patrimonial['natureza_conta'] == 'D')) |
-        ((msc_patrimonial['conta_contabil'].astype(str).str[0] == '3') & (msc_patrimonial['natureza_conta'] == 'C')) |
-        ((msc_patrimonial['conta_contabil'].astype(str).str[0] == '4') & (msc_patrimonial['natureza_conta'] == 'D'))
-    )
-    if not (msc_patrimonial.loc[mascara_retificadora1, 'valor'] < 0).any():
-        msc_patrimonial.loc[mascara_retificadora1, 'valor'] *= -1
-
-    mascara_retificadora2 = (
-        ((msc_orcam['conta_contabil'].astype(str).str[0] == '5') & (msc_orcam['natureza_conta'] == 'C') & (~msc_orcam['tipo_valor'].eq('period_change'))) |
-        ((msc_orcam['conta_contabil'].astype(str).str[0] == '6') & (msc_orcam['natureza_conta'] == 'D') & (~msc_orcam['tipo_valor'].eq('period_change')))
+    resultado = executar_pipeline(
+        dados, ano, tipo_ente, disponibilidade, meses,
+        carregar_msce=carregar_msce, carregar_dca=carregar_dca
     )
-    if not (msc_orcam.loc[mascara_retificadora2, 'valor'] < 0).any():
-        msc_orcam.loc[mascara_retificadora2, 'valor'] *= -1
+    frames = resultado.frames
 
-    mascara_retificadora3 = (
-        ((msc_ctr['conta_contabil'].astype(str).str[0] == '7') & (msc_ctr['natureza_conta'] == 'C') & (~msc_ctr['tipo_valor'].eq('period_change'))) |
-        ((msc_ctr['conta_contabil'].astype(str).str[0] == '8') & (msc_ctr['natureza_conta'] == 'D') & (~msc_ctr['tipo_valor'].eq('period_change')))
-    )
-    if not (msc_ctr.loc[mascara_retificadora3, 'valor'] < 0).any():
-        msc_ctr.loc[mascara_retificadora3, 'valor'] *= -1
-
-    msc = pd.concat([msc_patrimonial, msc_orcam, msc_ctr])
-
-    # MSC de Encerramento (MSCE, mês 12) - só processa se disponível
-    msc_orig = pd.concat([msc_patrimonial_orig, msc_orcam_orig, msc_ctr_orig])
-
-    if carregar_msce:
-        status_text.text("⏳ Processando MSC de Encerramento (Dezembro)...")
-        progress_bar.progress(40)
-        msc_patrimonial_encerr = dados['msc_patrimonial_encerr']
-        msc_orcam_encerr = dados['msc_orcam_encerr']
-        msc_ctr_encerr = dados['msc_ctr_encerr']
-        msc_patr_encerr_orig = msc_patrimonial_encerr.copy()
-        msc_orcam_encerr_orig = msc_orcam_encerr.copy()
-        msc_ctr_encerr_orig = msc_ctr_encerr.copy()
-
-        # Só aplica transformações se há dados
-        if not msc_patrimonial_encerr.empty and 'conta_contabil' in msc_patrimonial_encerr.columns:
-            mascara_retificadora7 = (
-                ((msc_patrimonial_encerr['conta_contabil'].astype(str).str[0] == '1') & (msc_patrimonial_encerr['natureza_conta'] == 'C') & (~msc_patrimonial_encerr['tipo_valor'].eq('period_change'))) |
-                ((msc_patrimonial_encerr['conta_contabil'].astype(str).str[0] == '2') & (msc_patrimonial_encerr['natureza_conta'] == 'D') & (~msc_patrimonial_encerr['tipo_valor'].eq('period_change'))) |
-                ((msc_patrimonial_encerr['conta_contabil'].astype(str).str[0] == '3') & (msc_patrimonial_encerr['natureza_conta'] == 'C') & (~msc_patrimonial_encerr['tipo_valor'].eq('period_change'))) |
-                ((msc_patrimonial_encerr['conta_contabil'].astype(str).str[0] == '4') & (msc_patrimonial_encerr['natureza_conta'] == 'D') & (~msc_patrimonial_encerr['tipo_valor'].eq('period_change')))
-            )
-            if not (msc_patrimonial_encerr.loc[mascara_retificadora7, 'valor'] < 0).any():
-                msc_patrimonial_encerr.loc[mascara_retificadora7, 'valor'] *= -1
+    status_text.text("✅ Análises concluídas!")
+    progress_bar.progress(60)
 
-        if not msc_orcam_encerr.empty and 'conta_contabil' in msc_orcam_encerr.columns:
-            mascara_retificadora8 = (
-                ((msc_orcam_encerr['conta_contabil'].astype(str).str[0] == '5') & (msc_orcam_encerr['natureza_conta'] == 'C') & (~msc_orcam_encerr['tipo_valor'].eq('period_change'))) |
-                ((msc_orcam_encerr['conta_contabil'].astype(str).str[0] == '6') & (msc_orcam_encerr['natureza_conta'] == 'D') & (~msc_orcam_encerr['tipo_valor'].eq('period_change')))
-            )
-            if not (msc_orcam_encerr.loc[mascara_retificadora8, 'valor'] < 0).any():
-                msc_orcam_encerr.loc[mascara_retificadora8, 'valor'] *= -1
-
-        if not msc_ctr_encerr.empty and 'conta_contabil' in msc_ctr_encerr.columns:
-            mascara_retificadora9 = (
-                ((msc_ctr_encerr['conta_contabil'].astype(str).str[0] == '7') & (msc_ctr_encerr['natureza_conta'] == 'C') & (~msc_ctr_encerr['tipo_valor'].eq('period_change'))) |
-                ((msc_ctr_encerr['conta_contabil'].astype(str).str[0] == '8') & (msc_ctr_encerr['natureza_conta'] == 'D') & (~msc_ctr_encerr['tipo_valor'].eq('period_change')))
-            )
-            if not (msc_ctr_encerr.loc[mascara_retificadora9, 'valor'] < 0).any():
-                msc_ctr_encerr.loc[mascara_retificadora9, 'valor'] *= -1
-
-        msc_encerr = pd.concat([msc_patrimonial_encerr, msc_orcam_encerr, msc_ctr_encerr])
-        msc_consolidada = pd.concat([msc, msc_encerr])
-
-        msc_orig_encerr = pd.concat([msc_patr_encerr_orig, msc_orcam_encerr_orig, msc_ctr_encerr_orig])
-        msc_orig_consolidada = pd.concat([msc_orig, msc_orig_encerr])
+    # Demonstrativos usados no painel de status e na exportação
+    msc_patrimonial = dados['msc_patrimonial']
+    msc_orcam = dados['msc_orcam']
+    msc_ctr = dados['msc_ctr']
+    msc_patrimonial_encerr = dados['msc_patrimonial_encerr']
+    msc_orcam_encerr = dados['msc_orcam_encerr']
+    msc_ctr_encerr = dados['msc_ctr_encerr']
+    msc_consolidada = pd.concat([frames['msc'], frames['msc_encerr']])
+
+    df_dca_ab = frames['df_dca_ab']
+    df_dca_c = frames['df_dca_c']
+    df_dca_d = frames['df_dca_d']
+    df_dca_e = frames['df_dca_e']
+    df_dca_f = frames['df_dca_f']
+    df_dca_g = frames['df_dca_g']
+    df_dca_hi = frames['df_dca_hi']
+    df_dca_c_orig = frames['df_dca_c_orig']
 
-        status_text.text("✅ MSC Encerramento processada!")
-        progress_bar.progress(55)
-    else:
-        # MSCE não disponível - usar apenas MSC mensal
-        status_text.text("⏳ MSC de Encerramento não disponível, usando apenas MSC mensal...")
-        progress_bar.progress(55)
-        msc_patrimonial_encerr = pd.DataFrame()
-        msc_orcam_encerr = pd.DataFrame()
-        msc_ctr_encerr = pd.DataFrame()
-        msc_encerr = pd.DataFrame()
-        msc_consolidada = msc.copy()
-        msc_orig_encerr = pd.DataFrame()
-        msc_orig_consolidada = msc_orig.copy()
-
-    # DCA - só processa se disponível
-    if carregar_dca:
-        status_text.text("⏳ Processando DCA (Demonstrativo de Contas Anuais)...")
-        progress_bar.progress(60)
-        dca = dados['dca']
-        df_dca_ab = dca.get("ab", pd.DataFrame())
-        df_dca_c = dca.get("c", pd.DataFrame())
-        df_dca_d = dca.get("d", pd.DataFrame())
-        df_dca_e = dca.get("e", pd.DataFrame())
-        df_dca_f = dca.get("f", pd.DataFrame())
-        df_dca_g = dca.get("g", pd.DataFrame())
-        df_dca_hi = dca.get("hi", pd.DataFrame())
-        df_dca_ab_orig = df_dca_ab.copy()
-        df_dca_c_orig = df_dca_c.copy()
-        # Ajustes DCA
-        if not df_dca_c.empty and "coluna" in df_dca_c.columns and "valor" in df_dca_c.columns:
-            df_dca_c['valor'] = df_dca_c.apply(lambda row: -row['valor'] if 'Deduções' in str(row.get('coluna', '')) else row['valor'], axis=1)
-        if not df_dca_ab.empty and "conta" in df_dca_ab.columns and "valor" in df_dca_ab.columns:
-            df_dca_ab['valor'] = df_dca_ab.apply(lambda row: -row['valor'] if '(-)' in str(row.get('conta', '')) else row['valor'], axis=1)
-        status_text.text("✅ DCA processado!")
-        progress_bar.progress(70)
-    else:
-        status_text.text("⏳ DCA não disponível, pulando...")
-        progress_bar.progress(70)
-        dca = dados['dca']
-        df_dca_ab = pd.DataFrame()
-        df_dca_c = pd.DataFrame()
-        df_dca_d = pd.DataFrame()
-        df_dca_e = pd.DataFrame()
-        df_dca_f = pd.DataFrame()
-        df_dca_g = pd.DataFrame()
-        df_dca_hi = pd.DataFrame()
-        df_dca_ab_orig = pd.DataFrame()
-        df_dca_c_orig = pd.DataFrame()
-
-    # RREO
-    status_text.text("⏳ Processando RREO (Relatório Resumido de Execução Orçamentária)...")
-    progress_bar.progress(75)
     rreo = dados['rreo']
-    status_text.text("✅ RREO processado!")
-    progress_bar.progress(80)
-    if isinstance(rreo, dict):
-        df_rreo_1 = rreo.get("1", pd.DataFrame())
-        df_rreo_2 = rreo.get("2", pd.DataFrame())
-        df_rreo_3 = rreo.get("3", pd.DataFrame())
-        df_rreo_6 = rreo.get("6", pd.DataFrame())
-        df_rreo_7 = rreo.get("7", pd.DataFrame())
-        df_rreo_9 = rreo.get("9", pd.DataFrame())
-    else:
-        df_rreo_1 = pd.DataFrame()
-        df_rreo_2 = pd.DataFrame()
-        df_rreo_3 = pd.DataFrame()
-        df_rreo_6 = pd.DataFrame()
-        df_rreo_7 = pd.DataFrame()
-        df_rreo_9 = pd.DataFrame()
-
-    # RGF
-    status_text.text("⏳ Processando RGF (Relatório de Gestão Fiscal)...")
-    progress_bar.progress(85)
-    rgf = dados['rgf']
-    status_text.text("✅ RGF processado! Finalizando análises...")
-    progress_bar.progress(90)
-    if isinstance(rgf, dict):
-        df_rgf_1e = rgf.get("1e", pd.DataFrame())
-        df_rgf_2e = rgf.get("2e", pd.DataFrame())
-        df_rgf_3e = rgf.get("3e", pd.DataFrame())
-        df_rgf_4e = rgf.get("4e", pd.DataFrame())
-        df_rgf_5e = rgf.get("5e", pd.DataFrame())
-    else:
-        df_rgf_1e = pd.DataFrame()
-        df_rgf_2e = pd.DataFrame()
-        df_rgf_3e = pd.DataFrame()
-        df_rgf_4e = pd.DataFrame()
-        df_rgf_5e = pd.DataFrame()
-    
-    # Agregações RGF - diferenciadas por tipo de ente
-    # Estados: todos os poderes (E, L, J, M, D)
-    # Municípios: apenas Executivo e Legislativo (E, L)
-    if tipo_ente == "E":
-        # Estados - todos os poderes
-        rgf_total = pd.concat([
-            rgf.get("5e", pd.DataFrame()),
-            rgf.get("5l", pd.DataFrame()),
-            rgf.get("5j", pd.DataFrame()),
-            rgf.get("5m", pd.DataFrame()),
-            rgf.get("5d", pd.DataFrame())
-        ], ignore_index=True)
-        df_rgf_5 = rgf_total.copy()
-        rgf_o = pd.concat([
-            rgf.get("5l", pd.DataFrame()),
-            rgf.get("5j", pd.DataFrame()),
-            rgf.get("5m", pd.DataFrame()),
-            rgf.get("5d", pd.DataFrame())
-        ], ignore_index=True)
-    else:
-        # Municípios - apenas Executivo e Legislativo
-        rgf_5e = rgf.get("5e", pd.DataFrame())
-        rgf_5l = rgf.get("5l", pd.DataFrame())
-        rgf_total = pd.concat([rgf_5e, rgf_5l], ignore_index=True)
-        df_rgf_5 = rgf_total.copy()
-        rgf_o = rgf_5l.copy() if not rgf_5l.empty else pd.DataFrame(columns=['cod_conta', 'conta', 'anexo', 'valor'])  # Outros poderes = apenas Legislativo
+    df_rreo_1 = frames['df_rreo_1']
+    df_rreo_2 = frames['df_rreo_2']
+    df_rreo_3 = frames['df_rreo_3']
+    df_rreo_6 = frames['df_rreo_6']
+    df_rreo_7 = frames['df_rreo_7']
+    df_rreo_9 = frames['df_rreo_9']
+
+    rgf = frames['rgf']
+    df_rgf_1e = frames['df_rgf_1e']
+    df_rgf_2e = frames['df_rgf_2e']
+    df_rgf_3e = frames['df_rgf_3e']
+    df_rgf_4e = frames['df_rgf_4e']
+    df_rgf_5e = frames['df_rgf_5e']
+    rgf_total = frames['rgf_total']
 
     #############################################################################
     # VALIDAÇÃO DE DEMONSTRATIVOS ENVIADOS AO SICONFI
@@ -1097,1225 +962,10 @@ def main():
             use_container_width=True
         )
 
-    status_text.text("⏳ Executando análises...")
-    progress_bar.progress(85)
-
-    ##############################################################################################################################
-    ##############################################################################################################################
-    # Criando matrizes Específicas para as análises
-    
-    msc_dez = msc.query('mes_referencia == 12')
-
-    msc_consolidada_e = msc_consolidada.query('tipo_valor == "ending_balance"')
-    msc_consolidada_b = msc_consolidada.query('tipo_valor == "beginning_balance"')
-
-    msc_e = msc.query('tipo_valor == "ending_balance"')
-    msc_b = msc.query('tipo_valor == "beginning_balance"')
-    
-    msc_orig_e = msc_orig.query('tipo_valor == "ending_balance"')
-    msc_orig_b = msc_orig.query('tipo_valor == "beginning_balance"')
-    
-    msc_orig_consolidada_e = msc_orig_consolidada.query('tipo_valor == "ending_balance"')
-    msc_orig_consolidada_b = msc_orig_consolidada.query('tipo_valor == "beginning_balance"')
-    
-    
-    ##########################################################################################################
-    # Criando AJUSTES
-    # Função para extrair o terceiro e quarto dígito com verificação de comprimento
-    def extrair_terceiro_quarto_digito(valor):
-        valor_str = str(valor)
-        if len(valor_str) >= 4:
-            return valor_str[2:4]  # Extrai do índice 2 até o índice 3 (terceiro e quarto dígito)
-        else:
-            return None  # Ou qualquer valor padrão que você queira usar
-        
-    # Criando Variáveis da MSC
-    # Variáveis da MSC       
-    # Receita não pegar o Saldo Final da Matriz de Encerramento (por isso não usa a "msc_consolidada_e")
-    receita = msc_e[msc_e['conta_contabil'].str.match(r"^(6212|6213)")]
-    receita['cat_receita'] = receita['natureza_receita'].astype(str).str[0]
-    receita_corr = receita.query('cat_receita == "1"')
-    receita_capi = receita.query('cat_receita == "2"')
-    
-    ## Criando Despesa Corrente e de Capital 
-    despesa = msc_dez[msc_dez['conta_contabil'].str.match(r"^(6221)")]
-    
-    # Aplicando a função ao DataFrame
-    despesa['DIGITO_INTRA'] = despesa['natureza_despesa'].apply(extrair_terceiro_quarto_digito)
-    
-    #Pegando a Depesa Empenhada na Matriz e quebrando a Informação da Modalidade em Não Intra e Intra
-    emp_msc_dez = despesa.query('tipo_valor == "ending_balance" and (conta_contabil == "622130500" or conta_contabil == "622130600" or conta_contabil == "622130700" or conta_contabil == "622130400")')
-    
-    despesa_corr = despesa[despesa['natureza_despesa'].str.match(r"^3", na=False)]
-    despesa_capi = despesa[despesa['natureza_despesa'].str.match(r"^4", na=False)]
-    
-    
-    #################################################################################
-
-    #Pegando a Depesa Empenhada na Matriz e quebrando a Informação da Modalidade em Não Intra e Intra
-    # Só processa se msc_encerr não estiver vazio
-    if not msc_encerr.empty and 'tipo_valor' in msc_encerr.columns:
-        emp_msc_encerr = msc_encerr.query('tipo_valor == "beginning_balance" and (conta_contabil == "622130500" or conta_contabil == "622130600" or conta_contabil == "622130700" or conta_contabil == "622130400")')
-        if not emp_msc_encerr.empty:
-            emp_msc_encerr['DIGITO_INTRA'] = emp_msc_encerr['natureza_despesa'].apply(extrair_terceiro_quarto_digito)
-    else:
-        emp_msc_encerr = pd.DataFrame()
-
-    # Só processa se msc_orig_encerr não estiver vazio
-    if not msc_orig_encerr.empty and 'tipo_valor' in msc_orig_encerr.columns:
-        msc_orig_encerr_b = msc_orig_encerr.query('tipo_valor == "beginning_balance"')
-        msc_orig_encerr_e = msc_orig_encerr.query('tipo_valor == "ending_balance"')
-    else:
-        msc_orig_encerr_b = pd.DataFrame()
-        msc_orig_encerr_e = pd.DataFrame()
-    
-    
-    # Criando uma junção dos Saldos Finais das matrizes de JAN a DEZ e a de Saldo Inicial da matriz de encerramento
-    msc_original_e_b_p_13 = pd.concat([msc_orig_e, msc_orig_encerr_b], ignore_index=True)
-    
-    # Criando Grupo de Contas
-    msc_consolidada["Grupo_Contas"] = msc_consolidada["conta_contabil"].str[0]
-    
-    # Aplicando a fórmula para trocar o sinal do period_change
-    msc_consolidada['valor'] = msc_consolidada.apply(lambda x: x['valor'] * -1
-    if (x['Grupo_Contas'] == '1' and x['natureza_conta'] == 'C' and x['tipo_valor'] == 'period_change')
-    or (x['Grupo_Contas'] == '2' and x['natureza_conta'] == 'D' and x['tipo_valor'] == 'period_change')
-    or (x['Grupo_Contas'] == '3' and x['natureza_conta'] == 'C' and x['tipo_valor'] == 'period_change')
-    or (x['Grupo_Contas'] == '4' and x['natureza_conta'] == 'D' and x['tipo_valor'] == 'period_change')
-    or (x['Grupo_Contas'] == '5' and x['natureza_conta'] == 'C' and x['tipo_valor'] == 'period_change')
-    or (x['Grupo_Contas'] == '6' and x['natureza_conta'] == 'D' and x['tipo_valor'] == 'period_change')
-    or (x['Grupo_Contas'] == '7' and x['natureza_conta'] == 'C' and x['tipo_valor'] == 'period_change')
-    or (x['Grupo_Contas'] == '8' and x['natureza_conta'] == 'D' and x['tipo_valor'] == 'period_change')
-    else x['valor'], axis=1)
-    
-    # Condição para selecionar as linhas onde 'mes_referencia' é 12 e 'tipo_matriz' é 'MSCE'
-    condicao_alt_msc = (msc_consolidada['mes_referencia'] == 12) & (msc_consolidada['tipo_matriz'] == 'MSCE')
-    # Substituir o valor de 'mes_referencia' para 13 nas linhas selecionadas
-    msc_consolidada.loc[condicao_alt_msc, 'mes_referencia'] = 13
-
-    msc_consolidada_sem_msc_encerr = msc_consolidada.query('tipo_matriz != "MSCE"')
-    
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-
-    #############################################################################
-    #                         DIMENSÃO D1 - MSC                                 #
-    #############################################################################
-    #############################################################################
-
-    if ano < 2024:
-        d1_00017, d1_00017_t = d1_analysis.d1_00017(msc_orig_consolidada)
-        d1_00018, d1_00018_t = d1_analysis.d1_00018(msc_orig_consolidada)
-    else:
-        d1_00017 = None
-        d1_00017_t = pd.DataFrame()
-        resposta_d1_00017 = 'N/A'
-        d1_00018 = None
-        d1_00018_t = pd.DataFrame()
-        resposta_d1_00018 = 'N/A'
-    d1_00019, d1_00019_t = d1_analysis.d1_00019(msc_orig_consolidada, ano, tipo_ente)
-    d1_00020, d1_00020_t = d1_analysis.d1_00020(msc_orig_consolidada)
-    d1_00021, d1_00021_t, pc_estendido = d1_analysis.d1_00021(msc_consolidada, ano)
-    d1_00022, d1_00022_t = d1_analysis.d1_00022(msc_consolidada)
-    d1_00023, d1_00023_t = d1_analysis.d1_00023(msc_consolidada, tipo_ente)
-    d1_00024, d1_00024_t = d1_analysis.d1_00024(msc_consolidada, tipo_ente)
-    d1_00025, d1_00025_t, pc_estendido = d1_analysis.d1_00025(msc_consolidada, pc_estendido)
-    d1_00026, d1_00026_t = d1_analysis.d1_00026(msc_consolidada, pc_estendido)
-    d1_00027, d1_00027_t = d1_analysis.d1_00027(msc_consolidada)
-    d1_00028, d1_00028_t = d1_analysis.d1_00028(msc_consolidada)
-    d1_00029, d1_00029_t = d1_analysis.d1_00029(msc_consolidada)
-    d1_00030, d1_00030_t = d1_analysis.d1_00030(msc_consolidada)
-    d1_00031, d1_00031_t = d1_analysis.d1_00031(msc_consolidada)
-    d1_00032, d1_00032_t = d1_analysis.d1_00032(msc_consolidada)
-    d1_00033, d1_00033_t = d1_analysis.d1_00033(msc_consolidada)
-    d1_00034, d1_00034_t = d1_analysis.d1_00034(msc_consolidada_e, pc_estendido)
-    d1_00035, d1_00035_t = d1_analysis.d1_00035(msc_consolidada_e, pc_estendido)
-    d1_00036, d1_00036_t = d1_analysis.d1_00036(msc_encerr, disponibilidade)
-    d1_00037, d1_00037_t = d1_analysis.d1_00037(msc_consolidada_e)
-    d1_00038, d1_00038_ta, d1_00038_det = d1_analysis.d1_00038(msc_orig_e, pc_estendido)
-
-    if d1_00017 is not None:
-        resposta_d1_00017 = d1_00017['Resposta'].iloc[0]
-    if d1_00018 is not None:
-        resposta_d1_00018 = d1_00018['Resposta'].iloc[0]
-    resposta_d1_00019 = d1_00019['Resposta'].iloc[0]
-    resposta_d1_00020 = d1_00020['Resposta'].iloc[0]
-    resposta_d1_00021 = d1_00021['Resposta'].iloc[0]
-    resposta_d1_00022 = d1_00022['Resposta'].iloc[0]
-    resposta_d1_00023 = d1_00023['Resposta'].iloc[0]
-    resposta_d1_00024 = d1_00024['Resposta'].iloc[0]
-    resposta_d1_00025 = d1_00025['Resposta'].iloc[0]
-    resposta_d1_00026 = d1_00026['Resposta'].iloc[0]
-    resposta_d1_00027 = d1_00027['Resposta'].iloc[0]
-    resposta_d1_00028 = d1_00028['Resposta'].iloc[0]
-    resposta_d1_00029 = d1_00029['Resposta'].iloc[0]
-    resposta_d1_00030 = d1_00030['Resposta'].iloc[0]
-    resposta_d1_00031 = d1_00031['Resposta'].iloc[0]
-    resposta_d1_00032 = d1_00032['Resposta'].iloc[0]
-    resposta_d1_00033 = d1_00033['Resposta'].iloc[0]
-    resposta_d1_00034 = d1_00034['Resposta'].iloc[0]
-    resposta_d1_00035 = d1_00035['Resposta'].iloc[0]
-    resposta_d1_00036 = d1_00036['Resposta'].iloc[0]
-    resposta_d1_00037 = d1_00037['Resposta'].iloc[0]
-    resposta_d1_00038 = d1_00038['Resposta'].iloc[0]
-
-
-
-    #############################################################################
-    #      DIMENSÃO D2 ANTECIPADA - ANÁLISE PRÉVIA PELA MATRIZ (MSC)           #
-    #############################################################################
-    #############################################################################
-    d2_antecipada, d2_ant_00002, d2_ant_00002_t, resposta_d2_ant_00002, ultimo_mes_msc, executar_d2_ant = (
-        d2_ant_analysis.run_d2_antecipada(msc_consolidada, meses, disponibilidade)
-    )
-
-
-    #############################################################################
-    #                         DIMENSÃO D2 - DCA                                 #
-    #############################################################################
-    #############################################################################
-
-    # Verificar se DCA está disponível para executar verificações D2
-    dca_disponivel_d2 = disponibilidade.get('dca', {}).get('disponivel', False)
-    executar_d2 = dca_disponivel_d2  # D2 depende principalmente de DCA
-
-    if not executar_d2:
-        # DCA não disponível - criar todas as variáveis D2 com N/A
-        def criar_d2_na(codigo, descricao):
-            return pd.DataFrame([{
-                'Dimensão': codigo,
-                'Resposta': 'N/A',
-                'Descrição da Dimensão': descricao,
-                'Nota': None,
-                'OBS': 'DCA não disponível para este exercício'
-            }])
-
-        d2_00002 = criar_d2_na('D2_00002', 'Valor de VPD do FUNDEB informado')
-        d2_00003 = criar_d2_na('D2_00003', 'Deduções de receita do FUNDEB informadas')
-        d2_00004 = criar_d2_na('D2_00004', 'Receitas do FUNDEB informadas')
-        d2_00005 = criar_d2_na('D2_00005', 'Obrigações Patronais informadas')
-        d2_00006 = criar_d2_na('D2_00006', 'Despesas com Pessoal informadas')
-        d2_00007 = criar_d2_na('D2_00007', 'Passivo Atuarial informado')
-        d2_00008 = criar_d2_na('D2_00008', 'VPD de Depreciação informado')
-        d2_00010 = criar_d2_na('D2_00010', 'Investimentos informados')
-        d2_00011 = criar_d2_na('D2_00011', 'Inversões Financeiras informadas')
-        d2_00012 = criar_d2_na('D2_00012', 'Amortização de Dívida informada')
-        d2_00013 = criar_d2_na('D2_00013', 'Verificação de Ativo x Passivo')
-        d2_00014 = criar_d2_na('D2_00014', 'Verificação de VPA x VPD')
-        d2_00015 = criar_d2_na('D2_00015', 'Verificação DCA I-AB x I-C')
-        d2_00016 = criar_d2_na('D2_00016', 'Verificação DCA I-AB x I-D')
-        d2_00017 = criar_d2_na('D2_00017', 'Verificação DCA I-C x I-D')
-        d2_00018 = criar_d2_na('D2_00018', 'Verificação DCA I-E x I-D')
-        d2_00019 = criar_d2_na('D2_00019', 'Verificação DCA I-F x I-D')
-        d2_00020 = criar_d2_na('D2_00020', 'Verificação DCA I-G x I-D')
-        d2_00021 = criar_d2_na('D2_00021', 'Verificação de Restos a Pagar')
-        d2_00023 = criar_d2_na('D2_00023', 'Verificação MSC x DCA Receita')
-        d2_00024 = criar_d2_na('D2_00024', 'Verificação MSC x DCA Despesa')
-        d2_00028 = criar_d2_na('D2_00028', 'Verificação MSC x DCA Ativo')
-        d2_00029 = criar_d2_na('D2_00029', 'Verificação MSC x DCA Passivo')
-        d2_00030 = criar_d2_na('D2_00030', 'Verificação MSC x DCA VPA')
-        d2_00031 = criar_d2_na('D2_00031', 'Verificação MSC x DCA VPD')
-        d2_00032 = criar_d2_na('D2_00032', 'Verificação MSC x DCA Resultado')
-        d2_00033 = criar_d2_na('D2_00033', 'Caixa e Equivalentes informados')
-        d2_00034 = criar_d2_na('D2_00034', 'Verificação DCA Receita Intra')
-        d2_00035 = criar_d2_na('D2_00035', 'Verificação DCA Despesa Intra')
-        d2_00036 = criar_d2_na('D2_00036', 'Verificação MSCE x DCA')
-        d2_00037 = criar_d2_na('D2_00037', 'Verificação MSCE x DCA Patrimônio')
-        d2_00038 = criar_d2_na('D2_00038', 'Créditos Previdenciários a Receber')
-        d2_00039 = criar_d2_na('D2_00039', 'Verificação DCA x RREO Receita')
-        d2_00040 = criar_d2_na('D2_00040', 'Verificação DCA x RREO Despesa')
-        d2_00044 = criar_d2_na('D2_00044', 'Receita Realizada MSC x DCA')
-        d2_00045 = criar_d2_na('D2_00045', 'Receita de Impostos Estaduais MSC x DCA')
-        d2_00046 = criar_d2_na('D2_00046', 'Receita de Impostos Municipais MSC x DCA')
-        d2_00047 = criar_d2_na('D2_00047', 'Transferências Constitucionais Estaduais MSC x DCA')
-        d2_00048 = criar_d2_na('D2_00048', 'Transferências Constitucionais Municipais MSC x DCA')
-        d2_00049 = criar_d2_na('D2_00049', 'Despesas Orçamentárias MSC x DCA')
-        d2_00050 = criar_d2_na('D2_00050', 'Restos a Pagar MSC x DCA')
-        d2_00051 = criar_d2_na('D2_00051', 'Ajuste para perdas em Estoques (DCA)')
-        d2_00052 = criar_d2_na('D2_00052', 'Equivalência Patrimonial (DCA)')
-        d2_00053 = criar_d2_na('D2_00053', 'Ajuste para perdas em Estoques (MSC Encerramento)')
-        d2_00054 = criar_d2_na('D2_00054', 'Investimentos permanentes (MSC Encerramento)')
-        d2_00055 = criar_d2_na('D2_00055', 'Amortização de ativos intangíveis (MSC Encerramento)')
-        d2_00058 = criar_d2_na('D2_00058', 'VPA FUNDEB (MSC x DCA)')
-        d2_00059 = criar_d2_na('D2_00059', 'Ajuste perdas - Créditos CP/LP (MSC Encerramento)')
-        d2_00060 = criar_d2_na('D2_00060', 'Ajuste perdas - Demais créditos CP/LP (MSC Encerramento)')
-        d2_00061 = criar_d2_na('D2_00061', 'VPA FUNDEB informada (DCA)')
-        d2_00066 = criar_d2_na('D2_00066', 'Amortização de intangíveis (DCA)')
-        d2_00067 = criar_d2_na('D2_00067', 'Depreciação bens móveis (MSC Encerramento)')
-        d2_00068 = criar_d2_na('D2_00068', 'Depreciação bens imóveis (MSC Encerramento)')
-        d2_00069 = criar_d2_na('D2_00069', 'Despesas função 09 (MSC Encerramento x DCA E)')
-        d2_00070 = criar_d2_na('D2_00070', 'Despesas função 10 (MSC Encerramento x DCA E)')
-        d2_00071 = criar_d2_na('D2_00071', 'Despesas função 12 (MSC Encerramento x DCA E)')
-        d2_00072 = criar_d2_na('D2_00072', 'Despesas demais funções (MSC Encerramento x DCA E)')
-        d2_00073 = criar_d2_na('D2_00073', 'Despesas intraorçamentárias (MSC Encerramento x DCA E)')
-        d2_00074 = criar_d2_na('D2_00074', 'RPPP/RPNPP Pagos (MSC Encerramento x DCA F)')
-        d2_00077 = criar_d2_na('D2_00077', 'Comparativo saldo contas 227/228 (MSC Jan/Dez)')
-        d2_00079 = criar_d2_na('D2_00079', 'Comparativo saldo contas 119 (MSC Jan/Dez)')
-        d2_00080 = criar_d2_na('D2_00080', 'Saldo contas 1156 em todos os meses (MSC)')
-        d2_00081 = criar_d2_na('D2_00081', 'Movimento credor contas 2.1.1.1.1.01.02/03 (MSC)')
-        d2_00082 = criar_d2_na('D2_00082', 'Movimento credor contas 1.2.3.8.1.01/03/05 (MSC)')
-
-        # Criar tabelas vazias para os detalhamentos
-        d2_00002_t = pd.DataFrame()
-        d2_00003_t = pd.DataFrame()
-        d2_00004_t = pd.DataFrame()
-        d2_00005_t = pd.DataFrame()
-        d2_00006_t = pd.DataFrame()
-        d2_00007_t = pd.DataFrame()
-        d2_00008_t = pd.DataFrame()
-        d2_00010_t = pd.DataFrame()
-        d2_00011_t = pd.DataFrame()
-        d2_00012_t = pd.DataFrame()
-        d2_00012_ta = pd.DataFrame()  # Tabela auxiliar para D2_00012
-        d2_00013_t = pd.DataFrame()
-        d2_00014_t = pd.DataFrame()
-        d2_00015_t = pd.DataFrame()
-        d2_00016_t = pd.DataFrame()
-        d2_00017_t = pd.DataFrame()
-        d2_00018_t = pd.DataFrame()
-        d2_00019_t = pd.DataFrame()
-        d2_00020_t = pd.DataFrame()
-        d2_00021_t = pd.DataFrame()
-        d2_00023_t = pd.DataFrame()
-        d2_00024_t = pd.DataFrame()
-        d2_00028_t = pd.DataFrame()
-        d2_00029_t = pd.DataFrame()
-        d2_00030_t = pd.DataFrame()
-        d2_00031_t = pd.DataFrame()
-        d2_00032_t = pd.DataFrame()
-        d2_00033_t = pd.DataFrame()
-        d2_00034_t = pd.DataFrame()
-        d2_00035_t = pd.DataFrame()
-        d2_00036_t = pd.DataFrame()
-        d2_00037_t = pd.DataFrame()
-        d2_00039_t = pd.DataFrame()
-        d2_00040_t = pd.DataFrame()
-        d2_00038_t = pd.DataFrame()
-        d2_00044_t = pd.DataFrame()
-        d2_00045_t = pd.DataFrame()
-        d2_00046_t = pd.DataFrame()
-        d2_00047_t = pd.DataFrame()
-        d2_00048_t = pd.DataFrame()
-        d2_00049_t = pd.DataFrame()
-        d2_00050_t = pd.DataFrame()
-        d2_00051_t = pd.DataFrame()
-        d2_00052_t = pd.DataFrame()
-        d2_00053_t = pd.DataFrame()
-        d2_00054_t = pd.DataFrame()
-        d2_00055_t = pd.DataFrame()
-        d2_00058_t = pd.DataFrame()
-        d2_00059_t = pd.DataFrame()
-        d2_00060_t = pd.DataFrame()
-        d2_00061_t = pd.DataFrame()
-        d2_00066_t = pd.DataFrame()
-        d2_00067_t = pd.DataFrame()
-        d2_00068_t = pd.DataFrame()
-        d2_00069_t = pd.DataFrame()
-        d2_00070_t = pd.DataFrame()
-        d2_00071_t = pd.DataFrame()
-        d2_00072_t = pd.DataFrame()
-        d2_00073_t = pd.DataFrame()
-        d2_00074_t = pd.DataFrame()
-        d2_00077_t = pd.DataFrame()
-        d2_00079_t = pd.DataFrame()
-        d2_00080_t = pd.DataFrame()
-        d2_00081_t = pd.DataFrame()
-        d2_00082_t = pd.DataFrame()
-
-        # Respostas N/A
-        resposta_d2_00002 = 'N/A'; resposta_d2_00003 = 'N/A'; resposta_d2_00004 = 'N/A'
-        resposta_d2_00005 = 'N/A'; resposta_d2_00006 = 'N/A'; resposta_d2_00007 = 'N/A'
-        resposta_d2_00008 = 'N/A'; resposta_d2_00010 = 'N/A'; resposta_d2_00011 = 'N/A'
-        resposta_d2_00012 = 'N/A'; resposta_d2_00013 = 'N/A'; resposta_d2_00014 = 'N/A'
-        resposta_d2_00015 = 'N/A'; resposta_d2_00016 = 'N/A'; resposta_d2_00017 = 'N/A'
-        resposta_d2_00018 = 'N/A'; resposta_d2_00019 = 'N/A'; resposta_d2_00020 = 'N/A'
-        resposta_d2_00021 = 'N/A'; resposta_d2_00023 = 'N/A'; resposta_d2_00024 = 'N/A'
-        resposta_d2_00028 = 'N/A'; resposta_d2_00029 = 'N/A'; resposta_d2_00030 = 'N/A'
-        resposta_d2_00031 = 'N/A'; resposta_d2_00032 = 'N/A'; resposta_d2_00033 = 'N/A'
-        resposta_d2_00034 = 'N/A'; resposta_d2_00035 = 'N/A'; resposta_d2_00036 = 'N/A'
-        resposta_d2_00037 = 'N/A'; resposta_d2_00038 = 'N/A'; resposta_d2_00039 = 'N/A'
-        resposta_d2_00040 = 'N/A'; resposta_d2_00044 = 'N/A'; resposta_d2_00045 = 'N/A'
-        resposta_d2_00046 = 'N/A'; resposta_d2_00047 = 'N/A'; resposta_d2_00048 = 'N/A'
-        resposta_d2_00049 = 'N/A'; resposta_d2_00050 = 'N/A'
-        resposta_d2_00051 = 'N/A'; resposta_d2_00052 = 'N/A'; resposta_d2_00053 = 'N/A'
-        resposta_d2_00054 = 'N/A'; resposta_d2_00055 = 'N/A'
-        resposta_d2_00058 = 'N/A'; resposta_d2_00059 = 'N/A'; resposta_d2_00060 = 'N/A'
-        resposta_d2_00061 = 'N/A'; resposta_d2_00066 = 'N/A'
-        resposta_d2_00067 = 'N/A'; resposta_d2_00068 = 'N/A'; resposta_d2_00069 = 'N/A'
-        resposta_d2_00070 = 'N/A'
-        resposta_d2_00071 = 'N/A'; resposta_d2_00072 = 'N/A'; resposta_d2_00073 = 'N/A'
-        resposta_d2_00074 = 'N/A'
-        resposta_d2_00077 = 'N/A'; resposta_d2_00079 = 'N/A'; resposta_d2_00080 = 'N/A'
-        resposta_d2_00081 = 'N/A'; resposta_d2_00082 = 'N/A'
-
-        # Variáveis auxiliares para condições específicas
-        condicao_negativa_cp = False
-        condicao_negativa_lp = False
-        condicao_negativa = False
-        diferencas_cp = []
-        dif_cred_lp = 0
-        diferenca_passivo = 0
-        emprest = pd.DataFrame()
-        vpd_juros = pd.DataFrame()
-
-    ############################################
-    #########  PARTE QUE EXECUTA A D2  #########
-    ############################################
-
-    if executar_d2:
-        # DCA disponível - executar verificações D2 normalmente
-
-        d2_00002, d2_00002_t = d2_dca_analysis.d2_00002(df_dca_hi)
-        d2_00003, d2_00003_t = d2_dca_analysis.d2_00003(df_dca_c)
-        d2_00004, d2_00004_t = d2_dca_analysis.d2_00004(df_dca_c, ano)
-        d2_00005, d2_00005_t = d2_dca_analysis.d2_00005(df_dca_d)
-        d2_00006, d2_00006_t = d2_dca_analysis.d2_00006(df_dca_d)
-        d2_00007, d2_00007_t = d2_dca_analysis.d2_00007(df_dca_d)
-        d2_00008, d2_00008_t = d2_dca_analysis.d2_00008(df_dca_e)
-
-        resposta_d2_00002 = d2_00002['Resposta'].iloc[0]
-        resposta_d2_00003 = d2_00003['Resposta'].iloc[0]
-        resposta_d2_00004 = d2_00004['Resposta'].iloc[0]
-        resposta_d2_00005 = d2_00005['Resposta'].iloc[0]
-        resposta_d2_00006 = d2_00006['Resposta'].iloc[0]
-        resposta_d2_00007 = d2_00007['Resposta'].iloc[0]
-        resposta_d2_00008 = d2_00008['Resposta'].iloc[0]
-
-        d2_00010, d2_00010_t = d2_dca_analysis.d2_00010(df_dca_c)
-        d2_00011, d2_00011_t = d2_dca_analysis.d2_00011(df_dca_c)
-        d2_00012, d2_00012_t, d2_00012_ta = d2_dca_analysis.d2_00012(df_dca_c)
-        d2_00013, d2_00013_t, condicao_negativa_cp, condicao_negativa_lp, diferencas_cp = (
-            d2_dca_analysis.d2_00013(df_dca_ab)
-        )
-        d2_00014, d2_00014_t, condicao_negativa = d2_dca_analysis.d2_00014(df_dca_ab)
-        d2_00015, d2_00015_t = d2_dca_analysis.d2_00015(df_dca_ab)
-        d2_00016, d2_00016_t = d2_dca_analysis.d2_00016(df_dca_ab)
-        d2_00017, d2_00017_t = d2_dca_analysis.d2_00017(df_dca_hi)
-        d2_00018, d2_00018_t = d2_dca_analysis.d2_00018(df_dca_ab)
-        d2_00019, d2_00019_t = d2_dca_analysis.d2_00019(df_dca_ab)
-        d2_00020, d2_00020_t = d2_dca_analysis.d2_00020(df_dca_ab)
-        d2_00021, d2_00021_t = d2_dca_analysis.d2_00021(df_dca_ab)
-
-        resposta_d2_00010 = d2_00010['Resposta'].iloc[0]
-        resposta_d2_00011 = d2_00011['Resposta'].iloc[0]
-        resposta_d2_00012 = d2_00012['Resposta'].iloc[0]
-        resposta_d2_00013 = d2_00013['Resposta'].iloc[0]
-        resposta_d2_00014 = d2_00014['Resposta'].iloc[0]
-        resposta_d2_00015 = d2_00015['Resposta'].iloc[0]
-        resposta_d2_00016 = d2_00016['Resposta'].iloc[0]
-        resposta_d2_00017 = d2_00017['Resposta'].iloc[0]
-        resposta_d2_00018 = d2_00018['Resposta'].iloc[0]
-        resposta_d2_00019 = d2_00019['Resposta'].iloc[0]
-        resposta_d2_00020 = d2_00020['Resposta'].iloc[0]
-        resposta_d2_00021 = d2_00021['Resposta'].iloc[0]
-        d2_00023, d2_00023_t = d2_dca_analysis.d2_00023(df_dca_d)
-        d2_00024, d2_00024_t = d2_dca_analysis.d2_00024(df_dca_d)
-        d2_00028, d2_00028_t, valor_pass_circ, valor_pass_circ_fin, diferenca_passivo = d2_dca_analysis.d2_00028(df_dca_ab)
-        d2_00029, d2_00029_t, vpd_juros, emprest = d2_dca_analysis.d2_00029(df_dca_hi, df_dca_ab)
-        d2_00030, d2_00030_t = d2_dca_analysis.d2_00030(df_dca_ab)
-        d2_00031, d2_00031_t = d2_dca_analysis.d2_00031(df_dca_hi)
-        d2_00032, d2_00032_t = d2_dca_analysis.d2_00032(df_dca_ab)
-        d2_00033, d2_00033_t = d2_dca_analysis.d2_00033(df_dca_c, tipo_ente)
-        d2_00034, d2_00034_t = d2_dca_analysis.d2_00034(df_dca_hi)
-        d2_00035, d2_00035_t = d2_dca_analysis.d2_00035(df_dca_c_orig)
-        d2_00036, d2_00036_t = d2_dca_analysis.d2_00036(df_dca_ab, df_dca_hi)
-        d2_00037, d2_00037_t = d2_dca_analysis.d2_00037(df_dca_hi)
-        d2_00039, d2_00039_t = d2_dca_analysis.d2_00039(df_dca_ab, df_dca_hi)
-        d2_00040, d2_00040_t = d2_dca_analysis.d2_00040(df_dca_ab_orig)
-        d2_00044, d2_00044_t = d2_dca_analysis.d2_00044(msc_encerr, df_dca_c)
-
-        if ano == 2023:
-            d2_00038, d2_00038_t = d2_dca_analysis.d2_00038(df_dca_ab, ano)
-            resposta_d2_00038 = d2_00038['Resposta'].iloc[0]
-
-        resposta_d2_00023 = d2_00023['Resposta'].iloc[0]
-        resposta_d2_00024 = d2_00024['Resposta'].iloc[0]
-        resposta_d2_00028 = d2_00028['Resposta'].iloc[0]
-        resposta_d2_00029 = d2_00029['Resposta'].iloc[0]
-        resposta_d2_00030 = d2_00030['Resposta'].iloc[0]
-        resposta_d2_00031 = d2_00031['Resposta'].iloc[0]
-        resposta_d2_00032 = d2_00032['Resposta'].iloc[0]
-        resposta_d2_00033 = d2_00033['Resposta'].iloc[0]
-        resposta_d2_00034 = d2_00034['Resposta'].iloc[0]
-        resposta_d2_00035 = d2_00035['Resposta'].iloc[0]
-        resposta_d2_00036 = d2_00036['Resposta'].iloc[0]
-        resposta_d2_00037 = d2_00037['Resposta'].iloc[0]
-        resposta_d2_00039 = d2_00039['Resposta'].iloc[0]
-        resposta_d2_00040 = d2_00040['Resposta'].iloc[0]
-        resposta_d2_00044 = d2_00044['Resposta'].iloc[0]
-        if tipo_ente == "E":
-            d2_00045, d2_00045_t = d2_dca_analysis.d2_00045(msc_encerr, df_dca_c)
-            resposta_d2_00045 = d2_00045['Resposta'].iloc[0]
-        else:
-            d2_00045 = pd.DataFrame()
-
-        if tipo_ente == "M":
-            d2_00046, d2_00046_t = d2_dca_analysis.d2_00046(msc_encerr, df_dca_c)
-            resposta_d2_00046 = d2_00046['Resposta'].iloc[0]
-        else:
-            d2_00046 = pd.DataFrame()
-            d2_00046_t = pd.DataFrame()
-            resposta_d2_00046 = 'N/A'
-
-        if tipo_ente == "E":
-            d2_00047, d2_00047_t = d2_dca_analysis.d2_00047(msc_encerr, df_dca_c)
-            resposta_d2_00047 = d2_00047['Resposta'].iloc[0]
-        else:
-            d2_00047 = pd.DataFrame()
-            d2_00047_t = pd.DataFrame()
-            resposta_d2_00047 = 'N/A'
-
-        if tipo_ente == "M":
-            d2_00048, d2_00048_t = d2_dca_analysis.d2_00048(msc_encerr, df_dca_c)
-            resposta_d2_00048 = d2_00048['Resposta'].iloc[0]
-        else:
-            d2_00048 = pd.DataFrame()
-            d2_00048_t = pd.DataFrame()
-            resposta_d2_00048 = 'N/A'
-
-        # D2_00049 - Despesas Orçamentárias (MSC Encerramento x DCA)
-        d2_00049, d2_00049_t = d2_dca_analysis.d2_00049(msc_encerr, df_dca_d)
-        resposta_d2_00049 = d2_00049['Resposta'].iloc[0]
-
-        # D2_00050 - Restos a Pagar (MSC Encerramento x DCA)
-        d2_00050, d2_00050_t = d2_dca_analysis.d2_00050(msc_encerr, df_dca_d)
-        resposta_d2_00050 = d2_00050['Resposta'].iloc[0]
-
-        # D2_00051 - Ajuste para perdas em Estoques (DCA)
-        d2_00051, d2_00051_t = d2_dca_analysis.d2_00051(df_dca_ab)
-        resposta_d2_00051 = d2_00051['Resposta'].iloc[0]
-
-        # D2_00052 - Equivalência Patrimonial (DCA)
-        d2_00052, d2_00052_t = d2_dca_analysis.d2_00052(df_dca_ab, df_dca_hi)
-        resposta_d2_00052 = d2_00052['Resposta'].iloc[0]
-
-        # D2_00053 - Ajuste para perdas em Estoques (MSC Encerramento)
-        d2_00053, d2_00053_t = d2_dca_analysis.d2_00053(msc_encerr)
-        resposta_d2_00053 = d2_00053['Resposta'].iloc[0]
-
-        # D2_00054 - Investimentos permanentes (MSC Encerramento)
-        d2_00054, d2_00054_t = d2_dca_analysis.d2_00054(msc_encerr)
-        resposta_d2_00054 = d2_00054['Resposta'].iloc[0]
-
-        # D2_00055 - Amortização de ativos intangíveis (MSC Encerramento)
-        d2_00055, d2_00055_t = d2_dca_analysis.d2_00055(msc_encerr)
-        resposta_d2_00055 = d2_00055['Resposta'].iloc[0]
-
-        # D2_00058 - VPA FUNDEB (MSC x DCA)
-        d2_00058, d2_00058_t = d2_dca_analysis.d2_00058(msc_encerr, df_dca_hi)
-        resposta_d2_00058 = d2_00058['Resposta'].iloc[0]
-
-        # D2_00059 - Ajuste perdas Créditos CP/LP (MSC Encerramento)
-        d2_00059, d2_00059_t = d2_dca_analysis.d2_00059(msc_encerr)
-        resposta_d2_00059 = d2_00059['Resposta'].iloc[0]
-
-        # D2_00060 - Ajuste perdas Demais créditos CP/LP (MSC Encerramento)
-        d2_00060, d2_00060_t = d2_dca_analysis.d2_00060(msc_encerr)
-        resposta_d2_00060 = d2_00060['Resposta'].iloc[0]
-
-        # D2_00061 - VPA FUNDEB (DCA)
-        d2_00061, d2_00061_t = d2_dca_analysis.d2_00061(df_dca_hi)
-        resposta_d2_00061 = d2_00061['Resposta'].iloc[0]
-
-        # D2_00066 - Amortização de intangíveis (DCA)
-        d2_00066, d2_00066_t = d2_dca_analysis.d2_00066(df_dca_ab)
-        resposta_d2_00066 = d2_00066['Resposta'].iloc[0]
-
-        # D2_00067 - Depreciação de bens móveis (MSC Encerramento)
-        d2_00067, d2_00067_t = d2_dca_analysis.d2_00067(msc_encerr)
-        resposta_d2_00067 = d2_00067['Resposta'].iloc[0]
-
-        # D2_00068 - Depreciação de bens imóveis (MSC Encerramento)
-        d2_00068, d2_00068_t = d2_dca_analysis.d2_00068(msc_encerr)
-        resposta_d2_00068 = d2_00068['Resposta'].iloc[0]
-
-        # D2_00069 - Despesas função 09 (MSC Encerramento x DCA E)
-        d2_00069, d2_00069_t = d2_dca_analysis.d2_00069(emp_msc_encerr, df_dca_e)
-        resposta_d2_00069 = d2_00069['Resposta'].iloc[0]
-
-        # D2_00070 - Despesas função 10 (MSC Encerramento x DCA E)
-        d2_00070, d2_00070_t = d2_dca_analysis.d2_00070(emp_msc_encerr, df_dca_e)
-        resposta_d2_00070 = d2_00070['Resposta'].iloc[0]
-
-        # D2_00071 - Despesas função 12 (MSC Encerramento x DCA E)
-        d2_00071, d2_00071_t = d2_dca_analysis.d2_00071(emp_msc_encerr, df_dca_e)
-        resposta_d2_00071 = d2_00071['Resposta'].iloc[0]
-
-        # D2_00072 - Despesas demais funções (MSC Encerramento x DCA E)
-        d2_00072, d2_00072_t = d2_dca_analysis.d2_00072(emp_msc_encerr, df_dca_e)
-        resposta_d2_00072 = d2_00072['Resposta'].iloc[0]
-
-        # D2_00073 - Despesas intraorçamentárias (MSC Encerramento x DCA E)
-        d2_00073, d2_00073_t = d2_dca_analysis.d2_00073(emp_msc_encerr, df_dca_e)
-        resposta_d2_00073 = d2_00073['Resposta'].iloc[0]
-
-        # D2_00074 - RPPP/RPNPP Pagos (MSC Encerramento x DCA F)
-        d2_00074, d2_00074_t = d2_dca_analysis.d2_00074(msc_encerr, df_dca_f)
-        resposta_d2_00074 = d2_00074['Resposta'].iloc[0]
-
-        # D2_00077 - Comparativo 227/228 (MSC Jan/Dez) - somente ate 2023
-        if ano < 2024:
-            d2_00077, d2_00077_t = d2_dca_analysis.d2_00077(msc_consolidada)
-            resposta_d2_00077 = d2_00077['Resposta'].iloc[0]
-        else:
-            d2_00077 = pd.DataFrame([{
-                'Dimensão': 'D2_00077',
-                'Resposta': 'N/A',
-                'Descrição da Dimensão': 'Comparativo do saldo das contas começadas por 227 e 228',
-                'Nota': None,
-                'OBS': 'Aplicável somente ate 2023'
-            }])
-            d2_00077_t = pd.DataFrame()
-            resposta_d2_00077 = 'N/A'
-
-        # D2_00079 - Comparativo 119 (MSC Jan/Dez)
-        d2_00079, d2_00079_t = d2_dca_analysis.d2_00079(msc_consolidada)
-        resposta_d2_00079 = d2_00079['Resposta'].iloc[0]
-
-        # D2_00080 - Contas 1156 em todos os meses (MSC) - somente ate 2023
-        if ano < 2024:
-            d2_00080, d2_00080_t = d2_dca_analysis.d2_00080(msc_consolidada)
-            resposta_d2_00080 = d2_00080['Resposta'].iloc[0]
-        else:
-            d2_00080 = pd.DataFrame([{
-                'Dimensão': 'D2_00080',
-                'Resposta': 'N/A',
-                'Descrição da Dimensão': 'Avaliação do saldo das contas contábeis começadas por 1156',
-                'Nota': None,
-                'OBS': 'Aplicável somente ate 2023'
-            }])
-            d2_00080_t = pd.DataFrame()
-            resposta_d2_00080 = 'N/A'
-
-        # D2_00081 - Movimento credor 2.1.1.1.1.01.02/03 (MSC)
-        d2_00081, d2_00081_t = d2_dca_analysis.d2_00081(msc_consolidada)
-        resposta_d2_00081 = d2_00081['Resposta'].iloc[0]
-
-        # D2_00082 - Movimento credor 1.2.3.8.1.01/03/05 (MSC)
-        d2_00082, d2_00082_t = d2_dca_analysis.d2_00082(msc_consolidada)
-        resposta_d2_00082 = d2_00082['Resposta'].iloc[0]
-
-
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-    #################################################################################
-
-
-
-
-    #############################################################################
-    #                         DIMENSÃO D3 - RREO / RGF                          #
-    #############################################################################
-
-    # Verificar se RREO está disponível para executar verificações D3
-    rreo_disponivel_d3 = disponibilidade.get('rreo', {}).get('completo', False)
-    executar_d3 = rreo_disponivel_d3  # D3 depende principalmente de RREO completo (6º bimestre)
-
-    if not executar_d3:
-        # RREO não completo - criar todas as variáveis D3 com N/A
-        def criar_d3_na(codigo, descricao):
-            return pd.DataFrame([{
-                'Dimensão': codigo,
-                'Resposta': 'N/A',
-                'Descrição da Dimensão': descricao,
-                'Nota': None,
-                'OBS': 'RREO 6º bimestre não disponível para este exercício'
-            }])
-
-        d3_00001 = criar_d3_na('D3_00001', 'Resultado Orçamentário RREO')
-        d3_00002 = criar_d3_na('D3_00002', 'RREO Anexo 1 x Anexo 2')
-        d3_00005 = criar_d3_na('D3_00005', 'RCL RREO x RGF')
-        d3_00006 = criar_d3_na('D3_00006', 'Despesa com Pessoal RREO x RGF')
-        d3_00008 = criar_d3_na('D3_00008', 'Disponibilidade de Caixa RREO x RGF')
-        d3_00009 = criar_d3_na('D3_00009', 'RP RREO x RGF')
-        d3_00010 = criar_d3_na('D3_00010', 'Dívida Consolidada RREO x RGF')
-        d3_00011 = criar_d3_na('D3_00011', 'Dedução inativos/pensionistas recursos vinculados')
-        d3_00014 = criar_d3_na('D3_00014', 'Emendas individuais entre anexos RGF')
-        d3_00015 = criar_d3_na('D3_00015', 'Emendas individuais RREO x RGF')
-        d3_00016 = criar_d3_na('D3_00016', 'Emendas de bancada RREO x RGF')
-        d3_00017 = criar_d3_na('D3_00017', 'RP pagos RREO 6 x RREO 7')
-
-        # Tabelas vazias
-        d3_00001_t = pd.DataFrame()
-        d3_00002_t = pd.DataFrame()
-        d3_00005_t = pd.DataFrame()
-        d3_00006_t = pd.DataFrame()
-        d3_00008_t = pd.DataFrame()
-        d3_00009_t = pd.DataFrame()
-        d3_00010_t = pd.DataFrame()
-        d3_00011_t = pd.DataFrame()
-        d3_00014_t = pd.DataFrame()
-        d3_00015_t = pd.DataFrame()
-        d3_00016_t = pd.DataFrame()
-        d3_00017_t = pd.DataFrame()
-
-        # Respostas N/A
-        resposta_d3_00001 = 'N/A'; resposta_d3_00002 = 'N/A'; resposta_d3_00005 = 'N/A'
-        resposta_d3_00006 = 'N/A'; resposta_d3_00008 = 'N/A'; resposta_d3_00009 = 'N/A'
-        resposta_d3_00010 = 'N/A'; resposta_d3_00011 = 'N/A'; resposta_d3_00014 = 'N/A'; resposta_d3_00015 = 'N/A'; resposta_d3_00016 = 'N/A'; resposta_d3_00017 = 'N/A'
-
-    ############################################
-    #########  PARTE QUE EXECUTA A D3  #########
-    ############################################
-
-    if executar_d3:
-        d3_00001, d3_00001_t = d3_analysis.d3_00001(df_rreo_1)
-        d3_00002, d3_00002_t = d3_analysis.d3_00002(df_rreo_1, df_rreo_2)
-        d3_00005, d3_00005_t = d3_analysis.d3_00005(df_rreo_3, df_rgf_1e, df_rgf_2e, df_rgf_3e, df_rgf_4e)
-        d3_00006, d3_00006_t = d3_analysis.d3_00006(df_rgf_2e, df_rreo_6, ano)
-        d3_00008, d3_00008_t = d3_analysis.d3_00008(df_rgf_5e, rgf_o, df_rreo_1, tipo_ente)
-        d3_00009, d3_00009_t = d3_analysis.d3_00009(df_rgf_5e, rgf_o, df_rreo_7, tipo_ente)
-        d3_00010, d3_00010_t = d3_analysis.d3_00010(df_rgf_1e, rgf, tipo_ente)
-        d3_00011, d3_00011_t = d3_analysis.d3_00011(rgf, tipo_ente)
-        d3_00014, d3_00014_t = d3_analysis.d3_00014(df_rgf_1e, df_rgf_2e, df_rgf_3e, df_rgf_4e)
-        d3_00015, d3_00015_t = d3_analysis.d3_00015(df_rgf_1e, df_rreo_3)
-        d3_00016, d3_00016_t = d3_analysis.d3_00016(df_rgf_1e, df_rreo_3)
-        d3_00017, d3_00017_t = d3_analysis.d3_00017(df_rreo_6, df_rreo_7)
-
-        resposta_d3_00001 = d3_00001['Resposta'].iloc[0]
-        resposta_d3_00002 = d3_00002['Resposta'].iloc[0]
-        resposta_d3_00005 = d3_00005['Resposta'].iloc[0]
-        resposta_d3_00006 = d3_00006['Resposta'].iloc[0]
-        resposta_d3_00008 = d3_00008['Resposta'].iloc[0]
-        resposta_d3_00009 = d3_00009['Resposta'].iloc[0]
-        resposta_d3_00010 = d3_00010['Resposta'].iloc[0]
-        resposta_d3_00011 = d3_00011['Resposta'].iloc[0]
-        resposta_d3_00014 = d3_00014['Resposta'].iloc[0]
-        resposta_d3_00015 = d3_00015['Resposta'].iloc[0]
-        resposta_d3_00016 = d3_00016['Resposta'].iloc[0]
-        resposta_d3_00017 = d3_00017['Resposta'].iloc[0]
-
-
-
-
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-    #############################################################################
-
-
-
-
-
-    #############################################################################
-    # DIMENSÃO 4 - CRUZAMENTO DCA x RREO
-    #############################################################################
-
-    # Verificar se DCA e RREO estão disponíveis para executar verificações D4
-    #############################################################################
-    #                         DIMENSÃO D4 - DCA x RREO                          #
-    #############################################################################
-
-    # Verificar se DCA e RREO estão disponíveis para executar verificações D4
-    dca_disponivel_d4 = disponibilidade.get('dca', {}).get('disponivel', False)
-    rreo_disponivel_d4 = disponibilidade.get('rreo', {}).get('completo', False)
-    executar_d4 = dca_disponivel_d4 and rreo_disponivel_d4  # D4 depende de DCA e RREO completo
-
-    if not executar_d4:
-        # DCA ou RREO não disponível - criar todas as variáveis D4 com N/A
-        def criar_d4_na(codigo, descricao):
-            return pd.DataFrame([{
-                'Dimensão': codigo,
-                'Resposta': 'N/A',
-                'Descrição da Dimensão': descricao,
-                'Nota': None,
-                'OBS': 'DCA ou RREO 6º bimestre não disponível para este exercício'
-            }])
-
-        d4_00001 = criar_d4_na('D4_00001', 'Receita Realizada RREO x DCA')
-        d4_00002 = criar_d4_na('D4_00002', 'Execução da Despesa RREO x DCA')
-        d4_00003 = criar_d4_na('D4_00003', 'Despesa por Função RREO x DCA')
-        d4_00004 = criar_d4_na('D4_00004', 'Despesa por Função Intra RREO x DCA')
-        d4_00005 = criar_d4_na('D4_00005', 'Restos a Pagar RREO x DCA')
-        d4_00006 = criar_d4_na('D4_00006', 'Restos a Pagar NP RREO x DCA')
-        d4_00007 = criar_d4_na('D4_00007', 'Dívida Consolidada RREO x DCA')
-        d4_00009 = criar_d4_na('D4_00009', 'Receita de Impostos RREO x DCA')
-        d4_00010 = criar_d4_na('D4_00010', 'Receita de Impostos RREO x DCA')
-        d4_00011 = criar_d4_na('D4_00011', 'Transferências estaduais RREO x DCA')
-        d4_00012 = criar_d4_na('D4_00012', 'Transferências municipais RREO x DCA')
-        d4_00017 = criar_d4_na('D4_00017', 'Contribuições e compensações previdenciárias RREO x DCA')
-        d4_00019 = criar_d4_na('D4_00019', 'Despesas de capital RREO x DCA')
-        d4_00020 = criar_d4_na('D4_00020', 'Receita arrecadada MSC x RREO')
-        d4_00021 = criar_d4_na('D4_00021', 'Receita de impostos estaduais MSC x RREO')
-        d4_00022 = criar_d4_na('D4_00022', 'Receita de impostos municipais MSC x RREO')
-        d4_00023 = criar_d4_na('D4_00023', 'Transferências constitucionais estaduais MSC x RREO')
-        d4_00024 = criar_d4_na('D4_00024', 'Transferências constitucionais municipais MSC x RREO')
-        d4_00025 = criar_d4_na('D4_00025', 'Despesas empenhadas, liquidadas e pagas MSC x RREO')
-        d4_00026 = criar_d4_na('D4_00026', 'Inscrição de RPNP MSC x RREO')
-        d4_00027 = criar_d4_na('D4_00027', 'Disponibilidade de Caixa Bruta RGF 2 x DCA AB')
-        d4_00028 = criar_d4_na('D4_00028', 'Disponibilidade de Caixa Bruta RGF 5 x DCA AB')
-        d4_00029 = criar_d4_na('D4_00029', 'Previdência Social RREO 02 x MSC Dez')
-        d4_00030 = criar_d4_na('D4_00030', 'Saúde RREO 02 x MSC Dez')
-        d4_00031 = criar_d4_na('D4_00031', 'Educação RREO 02 x MSC Dez')
-        d4_00032 = criar_d4_na('D4_00032', 'Demais Funções RREO 02 x MSC Dez')
-        d4_00033 = criar_d4_na('D4_00033', 'Despesas intraorçamentárias RREO 02 x MSC Dez')
-        d4_00034 = criar_d4_na('D4_00034', 'RPP/RPNP pagos MSC Dez x RREO 07')
-        d4_00035 = criar_d4_na('D4_00035', 'Disponibilidade de Caixa Bruta RGF 5 x MSC Encerramento')
-        d4_00036 = criar_d4_na('D4_00036', 'Disponibilidade de Caixa Bruta RGF 2 x MSC Encerramento')
-        d4_00037 = criar_d4_na('D4_00037', 'Receitas com tributos estaduais MSC x RREO 06')
-        d4_00038 = criar_d4_na('D4_00038', 'Receitas com tributos municipais MSC x RREO 06')
-        d4_00039 = criar_d4_na('D4_00039', 'Transferências constitucionais estaduais MSC x RREO 06')
-        d4_00040 = criar_d4_na('D4_00040', 'Transferências constitucionais municipais MSC x RREO 06')
-
-        # Tabelas vazias
-        d4_00001_t = pd.DataFrame()
-        d4_00002_t = pd.DataFrame()
-        d4_00003_t = pd.DataFrame()
-        d4_00004_t = pd.DataFrame()
-        d4_00005_t = pd.DataFrame()
-        d4_00006_t = pd.DataFrame()
-        d4_00007_t = pd.DataFrame()
-        d4_00009_t = pd.DataFrame()
-        d4_00010_t = pd.DataFrame()
-        d4_00011_t = pd.DataFrame()
-        d4_00012_t = pd.DataFrame()
-        d4_00017_t = pd.DataFrame()
-        d4_00019_t = pd.DataFrame()
-        d4_00020_t = pd.DataFrame()
-        d4_00021_t = pd.DataFrame()
-        d4_00022_t = pd.DataFrame()
-        d4_00023_t = pd.DataFrame()
-        d4_00024_t = pd.DataFrame()
-        d4_00025_t = pd.DataFrame()
-        d4_00026_t = pd.DataFrame()
-        d4_00027_t = pd.DataFrame()
-        d4_00028_t = pd.DataFrame()
-        d4_00029_t = pd.DataFrame()
-        d4_00030_t = pd.DataFrame()
-        d4_00031_t = pd.DataFrame()
-        d4_00032_t = pd.DataFrame()
-        d4_00033_t = pd.DataFrame()
-        d4_00034_t = pd.DataFrame()
-        d4_00035_t = pd.DataFrame()
-        d4_00036_t = pd.DataFrame()
-        d4_00037_t = pd.DataFrame()
-        d4_00038_t = pd.DataFrame()
-        d4_00039_t = pd.DataFrame()
-        d4_00040_t = pd.DataFrame()
-
-        # Respostas N/A
-        resposta_d4_00001 = 'N/A'
-        resposta_d4_00002 = 'N/A'
-        resposta_d4_00003 = 'N/A'
-        resposta_d4_00004 = 'N/A'
-        resposta_d4_00005 = 'N/A'
-        resposta_d4_00006 = 'N/A'
-        resposta_d4_00007 = 'N/A'
-        resposta_d4_00009 = 'N/A'
-        resposta_d4_00010 = 'N/A'
-        resposta_d4_00011 = 'N/A'
-        resposta_d4_00012 = 'N/A'
-        resposta_d4_00017 = 'N/A'
-        resposta_d4_00019 = 'N/A'
-        resposta_d4_00020 = 'N/A'
-        resposta_d4_00021 = 'N/A'
-        resposta_d4_00022 = 'N/A'
-        resposta_d4_00023 = 'N/A'
-        resposta_d4_00024 = 'N/A'
-        resposta_d4_00025 = 'N/A'
-        resposta_d4_00026 = 'N/A'
-        resposta_d4_00027 = 'N/A'
-        resposta_d4_00028 = 'N/A'
-        resposta_d4_00029 = 'N/A'
-        resposta_d4_00030 = 'N/A'
-        resposta_d4_00031 = 'N/A'
-        resposta_d4_00032 = 'N/A'
-        resposta_d4_00033 = 'N/A'
-        resposta_d4_00034 = 'N/A'
-        resposta_d4_00035 = 'N/A'
-        resposta_d4_00036 = 'N/A'
-        resposta_d4_00037 = 'N/A'
-        resposta_d4_00038 = 'N/A'
-        resposta_d4_00039 = 'N/A'
-        resposta_d4_00040 = 'N/A'
-
-    ############################################
-    #########  PARTE QUE EXECUTA A D4  #########
-    ############################################
-
-    if executar_d4:
-        d4_00001, d4_00001_t = d4_analysis.d4_00001(df_rreo_1, df_dca_c)
-        d4_00002, d4_00002_t = d4_analysis.d4_00002(df_rreo_1, df_dca_d)
-        d4_00003, d4_00003_t = d4_analysis.d4_00003(df_rreo_2, df_dca_e)
-        d4_00004, d4_00004_t = d4_analysis.d4_00004(df_rreo_2, df_dca_e)
-        d4_00005, d4_00005_t = d4_analysis.d4_00005(df_rreo_7, df_dca_f)
-        d4_00006, d4_00006_t = d4_analysis.d4_00006(df_rreo_7, df_dca_g)
-        d4_00007, d4_00007_t = d4_analysis.d4_00007(df_rreo_7, df_dca_g)
-        d4_00009, d4_00009_t = d4_analysis.d4_00009(df_rreo_3, df_dca_c, tipo_ente)
-        d4_00010, d4_00010_t = d4_analysis.d4_00010(df_rreo_3, df_dca_c, tipo_ente)
-        d4_00011, d4_00011_t = d4_analysis.d4_00011(df_rreo_3, df_dca_c, tipo_ente)
-        d4_00012, d4_00012_t = d4_analysis.d4_00012(df_rreo_3, df_dca_c, tipo_ente)
-        d4_00017, d4_00017_t = d4_analysis.d4_00017(df_rreo_3, df_dca_c)
-        d4_00019, d4_00019_t = d4_analysis.d4_00019(df_rreo_9, df_dca_d)
-        d4_00020, d4_00020_t = d4_analysis.d4_00020(msc_dez, df_rreo_1)
-        d4_00025, d4_00025_t = d4_analysis.d4_00025(msc_dez, df_rreo_1)
-        d4_00026, d4_00026_t = d4_analysis.d4_00026(msc_dez, df_rreo_1)
-        d4_00027, d4_00027_t = d4_analysis.d4_00027(df_dca_ab, df_rgf_2e)
-        d4_00028, d4_00028_t = d4_analysis.d4_00028(df_dca_ab, rgf_total)
-        d4_00029, d4_00029_t = d4_analysis.d4_00029(df_rreo_2, emp_msc_dez)
-        d4_00030, d4_00030_t = d4_analysis.d4_00030(df_rreo_2, emp_msc_dez)
-        d4_00031, d4_00031_t = d4_analysis.d4_00031(df_rreo_2, emp_msc_dez)
-        d4_00032, d4_00032_t = d4_analysis.d4_00032(df_rreo_2, emp_msc_dez)
-        d4_00033, d4_00033_t = d4_analysis.d4_00033(df_rreo_2, emp_msc_dez)
-        d4_00034, d4_00034_t = d4_analysis.d4_00034(msc_dez, df_rreo_7)
-        d4_00035, d4_00035_t = d4_analysis.d4_00035(msc_encerr, rgf_total)
-        d4_00036, d4_00036_t = d4_analysis.d4_00036(msc_encerr, df_rgf_2e)
-        if tipo_ente == "E":
-            d4_00037, d4_00037_t = d4_analysis.d4_00037(receita, df_rreo_6)
-            d4_00038 = pd.DataFrame([{
-                'Dimensão': 'D4_00038',
-                'Resposta': 'N/A',
-                'Descrição da Dimensão': 'Igualdade das receitas com tributos municipais',
-                'Nota': None,
-                'OBS': 'Aplicável apenas para municípios'
-            }])
-            d4_00038_t = pd.DataFrame()
-            d4_00039, d4_00039_t = d4_analysis.d4_00039(receita, df_rreo_6)
-            d4_00040 = pd.DataFrame([{
-                'Dimensão': 'D4_00040',
-                'Resposta': 'N/A',
-                'Descrição da Dimensão': 'Igualdade nas transferências constitucionais municipais',
-                'Nota': None,
-                'OBS': 'Aplicável apenas para municípios'
-            }])
-            d4_00040_t = pd.DataFrame()
-        else:
-            d4_00038, d4_00038_t = d4_analysis.d4_00038(msc_dez, df_rreo_6)
-            d4_00037 = pd.DataFrame([{
-                'Dimensão': 'D4_00037',
-                'Resposta': 'N/A',
-                'Descrição da Dimensão': 'Igualdade das receitas com tributos estaduais',
-                'Nota': None,
-                'OBS': 'Aplicável apenas para estados'
-            }])
-            d4_00037_t = pd.DataFrame()
-            d4_00040, d4_00040_t = d4_analysis.d4_00040(msc_dez, df_rreo_6)
-            d4_00039 = pd.DataFrame([{
-                'Dimensão': 'D4_00039',
-                'Resposta': 'N/A',
-                'Descrição da Dimensão': 'Igualdade nas transferências constitucionais estaduais',
-                'Nota': None,
-                'OBS': 'Aplicável apenas para estados'
-            }])
-            d4_00039_t = pd.DataFrame()
-        if tipo_ente == "E":
-            d4_00021, d4_00021_t = d4_analysis.d4_00021(msc_dez, df_rreo_3)
-            d4_00022 = pd.DataFrame([{
-                'Dimensão': 'D4_00022',
-                'Resposta': 'N/A',
-                'Descrição da Dimensão': 'Igualdade nas receitas com tributos municipais',
-                'Nota': None,
-                'OBS': 'Aplicável apenas para municípios'
-            }])
-            d4_00022_t = pd.DataFrame()
-            d4_00023, d4_00023_t = d4_analysis.d4_00023(msc_dez, df_rreo_3)
-            d4_00024 = pd.DataFrame([{
-                'Dimensão': 'D4_00024',
-                'Resposta': 'N/A',
-                'Descrição da Dimensão': 'Igualdade nas transferências constitucionais municipais',
-                'Nota': None,
-                'OBS': 'Aplicável apenas para municípios'
-            }])
-            d4_00024_t = pd.DataFrame()
-        else:
-            d4_00022, d4_00022_t = d4_analysis.d4_00022(msc_dez, df_rreo_3)
-            d4_00021 = pd.DataFrame([{
-                'Dimensão': 'D4_00021',
-                'Resposta': 'N/A',
-                'Descrição da Dimensão': 'Igualdade nas receitas com tributos estaduais',
-                'Nota': None,
-                'OBS': 'Aplicável apenas para estados'
-            }])
-            d4_00021_t = pd.DataFrame()
-            d4_00024, d4_00024_t = d4_analysis.d4_00024(msc_dez, df_rreo_3)
-            d4_00023 = pd.DataFrame([{
-                'Dimensão': 'D4_00023',
-                'Resposta': 'N/A',
-                'Descrição da Dimensão': 'Igualdade nas transferências constitucionais estaduais',
-                'Nota': None,
-                'OBS': 'Aplicável apenas para estados'
-            }])
-            d4_00023_t = pd.DataFrame()
-
-        resposta_d4_00001 = d4_00001['Resposta'].iloc[0]
-        resposta_d4_00002 = d4_00002['Resposta'].iloc[0]
-        resposta_d4_00003 = d4_00003['Resposta'].iloc[0]
-        resposta_d4_00004 = d4_00004['Resposta'].iloc[0]
-        resposta_d4_00005 = d4_00005['Resposta'].iloc[0]
-        resposta_d4_00006 = d4_00006['Resposta'].iloc[0]
-        resposta_d4_00007 = d4_00007['Resposta'].iloc[0]
-        resposta_d4_00009 = d4_00009['Resposta'].iloc[0]
-        resposta_d4_00010 = d4_00010['Resposta'].iloc[0]
-        resposta_d4_00011 = d4_00011['Resposta'].iloc[0]
-        resposta_d4_00012 = d4_00012['Resposta'].iloc[0]
-        resposta_d4_00017 = d4_00017['Resposta'].iloc[0]
-        resposta_d4_00019 = d4_00019['Resposta'].iloc[0]
-        resposta_d4_00020 = d4_00020['Resposta'].iloc[0]
-        resposta_d4_00021 = d4_00021['Resposta'].iloc[0]
-        resposta_d4_00022 = d4_00022['Resposta'].iloc[0]
-        resposta_d4_00023 = d4_00023['Resposta'].iloc[0]
-        resposta_d4_00024 = d4_00024['Resposta'].iloc[0]
-        resposta_d4_00025 = d4_00025['Resposta'].iloc[0]
-        resposta_d4_00026 = d4_00026['Resposta'].iloc[0]
-        resposta_d4_00027 = d4_00027['Resposta'].iloc[0]
-        resposta_d4_00028 = d4_00028['Resposta'].iloc[0]
-        resposta_d4_00029 = d4_00029['Resposta'].iloc[0]
-        resposta_d4_00030 = d4_00030['Resposta'].iloc[0]
-        resposta_d4_00031 = d4_00031['Resposta'].iloc[0]
-        resposta_d4_00032 = d4_00032['Resposta'].iloc[0]
-        resposta_d4_00033 = d4_00033['Resposta'].iloc[0]
-        resposta_d4_00034 = d4_00034['Resposta'].iloc[0]
-        resposta_d4_00035 = d4_00035['Resposta'].iloc[0]
-        resposta_d4_00036 = d4_00036['Resposta'].iloc[0]
-        resposta_d4_00037 = d4_00037['Resposta'].iloc[0]
-        resposta_d4_00038 = d4_00038['Resposta'].iloc[0]
-        resposta_d4_00039 = d4_00039['Resposta'].iloc[0]
-        resposta_d4_00040 = d4_00040['Resposta'].iloc[0]
-
-
-    #############################################################################
-    #############################################################################
-    #############################################################################
-
-    # Limpar mensagens de progresso após alguns segundos (opcional)
-    st.markdown("---")
-    st.subheader("Resultados da Análise")
-
-    # Consolidando a D1
-    # D1_00017 e D1_00018: vigentes até 2023 (não aparecem em 2024+)
-    # D1_00037 e D1_00038: vigentes a partir de 2024 (não aparecem em 2023 e anteriores)
-    if ano < 2024:
-        d1 = pd.concat([d1_00017, d1_00018, d1_00019, d1_00020, d1_00021, d1_00022, d1_00023, d1_00024,
-                       d1_00025, d1_00026, d1_00027, d1_00028, d1_00029, d1_00030, d1_00031, d1_00032,
-                       d1_00033, d1_00034, d1_00035, d1_00036], ignore_index=True)
-    else:
-        d1 = pd.concat([d1_00019, d1_00020, d1_00021, d1_00022, d1_00023, d1_00024,
-                       d1_00025, d1_00026, d1_00027, d1_00028, d1_00029, d1_00030, d1_00031, d1_00032,
-                       d1_00033, d1_00034, d1_00035, d1_00036, d1_00037, d1_00038], ignore_index=True)
-
-    # Consolidando a D2
-    if executar_d2:
-        # DCA disponível - consolidar verificações D2 normalmente
-        if ano < 2024:
-            d2_lista = [d2_00002, d2_00003, d2_00004, d2_00005, d2_00006, d2_00007, d2_00008, d2_00010,
-                       d2_00011, d2_00012, d2_00013, d2_00014, d2_00015, d2_00016, d2_00017, d2_00018,
-                       d2_00019, d2_00020, d2_00021, d2_00023, d2_00024, d2_00028, d2_00029, d2_00030,
-                       d2_00031, d2_00032, d2_00033, d2_00034, d2_00035, d2_00036, d2_00037, d2_00038,
-                       d2_00039, d2_00040, d2_00044]
-            if tipo_ente == "E":
-                d2_lista.append(d2_00045)
-                d2_lista.append(d2_00047)
-            else:
-                d2_lista.append(d2_00046)
-                d2_lista.append(d2_00048)
-            d2_lista.append(d2_00049)
-            d2_lista.append(d2_00050)
-            d2_lista.append(d2_00051)
-            d2_lista.append(d2_00052)
-            d2_lista.append(d2_00053)
-            d2_lista.append(d2_00054)
-            d2_lista.append(d2_00055)
-            d2_lista.append(d2_00058)
-            d2_lista.append(d2_00059)
-            d2_lista.append(d2_00060)
-            d2_lista.append(d2_00061)
-            d2_lista.append(d2_00066)
-            d2_lista.append(d2_00067)
-            d2_lista.append(d2_00068)
-            d2_lista.append(d2_00069)
-            d2_lista.append(d2_00070)
-            d2_lista.append(d2_00071)
-            d2_lista.append(d2_00072)
-            d2_lista.append(d2_00073)
-            d2_lista.append(d2_00074)
-            d2_lista.append(d2_00077)
-            d2_lista.append(d2_00079)
-            d2_lista.append(d2_00080)
-            d2_lista.append(d2_00081)
-            d2_lista.append(d2_00082)
-            d2 = pd.concat(d2_lista, ignore_index=True)
-        else:
-            d2_lista = [d2_00002, d2_00003, d2_00004, d2_00005, d2_00006, d2_00007, d2_00008, d2_00010,
-                       d2_00011, d2_00012, d2_00013, d2_00014, d2_00015, d2_00016, d2_00017, d2_00018,
-                       d2_00019, d2_00020, d2_00021, d2_00023, d2_00024, d2_00028, d2_00029, d2_00030,
-                       d2_00031, d2_00032, d2_00033, d2_00034, d2_00035, d2_00036, d2_00037,
-                       d2_00039, d2_00040, d2_00044]
-            if tipo_ente == "E":
-                d2_lista.append(d2_00045)
-                d2_lista.append(d2_00047)
-            else:
-                d2_lista.append(d2_00046)
-                d2_lista.append(d2_00048)
-            d2_lista.append(d2_00049)
-            d2_lista.append(d2_00050)
-            d2_lista.append(d2_00051)
-            d2_lista.append(d2_00052)
-            d2_lista.append(d2_00053)
-            d2_lista.append(d2_00054)
-            d2_lista.append(d2_00055)
-            d2_lista.append(d2_00058)
-            d2_lista.append(d2_00059)
-            d2_lista.append(d2_00060)
-            d2_lista.append(d2_00061)
-            d2_lista.append(d2_00066)
-            d2_lista.append(d2_00067)
-            d2_lista.append(d2_00068)
-            d2_lista.append(d2_00069)
-            d2_lista.append(d2_00070)
-            d2_lista.append(d2_00071)
-            d2_lista.append(d2_00072)
-            d2_lista.append(d2_00073)
-            d2_lista.append(d2_00074)
-            d2_lista.append(d2_00079)
-            d2_lista.append(d2_00081)
-            d2_lista.append(d2_00082)
-            d2 = pd.concat(d2_lista, ignore_index=True)
-    else:
-        # DCA não disponível - criar DataFrame N/A para D2
-        d2 = pd.DataFrame([{
-            'Dimensão': 'D2_NA',
-            'Resposta': 'N/A',
-            'Descrição da Dimensão': 'Dimensão D2 não disponível - Requer DCA (Balanço Anual)',
-            'Nota': 0,
-            'OBS': 'DCA não enviada para este exercício'
-        }])
-
-    # Consolidando D1 + D2
-    d1 = pd.concat([d1, d2], ignore_index=True)
-
-    # Consolidando a D3
-    if executar_d3:
-        # RREO completo disponível - consolidar verificações D3 normalmente
-        d3 = pd.concat([d3_00001, d3_00002, d3_00005, d3_00006, d3_00008, d3_00009, d3_00010, d3_00011, d3_00014, d3_00015, d3_00016, d3_00017], ignore_index=True)
-    else:
-        # RREO não completo - criar DataFrame N/A para D3
-        d3 = pd.DataFrame([{
-            'Dimensão': 'D3_NA',
-            'Resposta': 'N/A',
-            'Descrição da Dimensão': 'Dimensão D3 não disponível - Requer RREO completo (6º bimestre)',
-            'Nota': 0,
-            'OBS': 'RREO 6º bimestre não enviado para este exercício'
-        }])
-
-    # Consolidando D1 + D2 + D3
-    d1 = pd.concat([d1, d3], ignore_index=True)
-
-    # Consolidando a D4 (lista base)
-    if executar_d4:
-        # DCA e RREO disponíveis - consolidar verificações D4 normalmente
-        d4_lista = [d4_00001, d4_00002, d4_00003, d4_00004, d4_00005, d4_00006, d4_00007, d4_00017, d4_00019, d4_00020,
-                    d4_00025, d4_00026, d4_00027, d4_00028, d4_00029, d4_00030, d4_00031, d4_00032,
-                    d4_00033, d4_00034, d4_00035, d4_00036]
-        # Adicionar D4_00009 apenas para Estados
-        if tipo_ente == "E":
-            d4_lista.append(d4_00009)
-            d4_lista.append(d4_00011)
-            d4_lista.append(d4_00021)
-            d4_lista.append(d4_00023)
-            d4_lista.append(d4_00037)
-            d4_lista.append(d4_00039)
-        else:
-            d4_lista.append(d4_00010)
-            d4_lista.append(d4_00012)
-            d4_lista.append(d4_00022)
-            d4_lista.append(d4_00024)
-            d4_lista.append(d4_00038)
-            d4_lista.append(d4_00040)
-        d4 = pd.concat(d4_lista, ignore_index=True)
-    else:
-        # DCA ou RREO não disponíveis - criar DataFrame N/A para D4
-        d4 = pd.DataFrame([{
-            'Dimensão': 'D4_NA',
-            'Resposta': 'N/A',
-            'Descrição da Dimensão': 'Dimensão D4 não disponível - Requer DCA e RREO completos',
-            'Nota': 0,
-            'OBS': 'DCA ou RREO 6º bimestre não enviados para este exercício'
-        }])
-
-    # Consolidando TODAS (D1 + D2 + D3 + D4)
-    final = pd.concat([d1, d4], ignore_index=True)
+    # Resultados do pipeline (memoizado: reruns com os mesmos dados não recalculam)
+    final = resultado.final
+    d2_antecipada = resultado.d2_antecipada['d2_antecipada']
+    contexto = resultado.contexto()
 
     # Exportar tabela consolidada (Excel)
     st.markdown("#### 📥 Exportar resultados")
@@ -2441,7 +1091,7 @@ def main():
     # Configurar larguras das colunas (usar pixels para maior controle)
     # Ajustar altura da tabela automaticamente conforme quantidade de linhas
     # Fórmula: altura do cabeçalho (38px) + (número de linhas × altura da linha (35px)) + margem (10px)
-    num_linhas = len(d1)
+    num_linhas = len(final[~final['Dimensão'].str.startswith('D4_')])
     altura_tabela = 38 + (num_linhas * 35) + 10
 
     # Definir altura mínima de 100px e máxima de 500px
@@ -2526,25 +1176,25 @@ def main():
     # TAB D1 - QUALIDADE DOS DADOS MSC
     # =========================================================================
     with tab_d1:
-        render_tab_d1(tab_d1, locals())
+        render_tab_d1(tab_d1, contexto)
 
     # =========================================================================
     # TAB D2 - QUALIDADE DOS DADOS DCA E MSC
     # =========================================================================
     with tab_d2:
-        render_tab_d2(tab_d2, locals())
+        render_tab_d2(tab_d2, contexto)
 
     # =========================================================================
     # TAB D3 - CRUZAMENTO RREO/RGF
     # =========================================================================
     with tab_d3:
-        render_tab_d3(tab_d3, locals())
+        render_tab_d3(tab_d3, contexto)
 
     # =========================================================================
     # TAB D4 - CRUZAMENTO DCA x RREO
     # =========================================================================
     with tab_d4:
-        render_tab_d4(tab_d4, locals())
+        render_tab_d4(tab_d4, contexto)
 
 
 
@@ -7,7 +7,10 @@ import pandas as pd
 import numpy as np
 import io
 from core.utils import convert_df_to_excel, convert_df_to_csv
+from core.normalizacao_sinal import inverter_sinal, REGRAS_RETIFICADORAS, REGRAS_D1_00018, COLUNAS_ARQUIVO
+from core.msc_csv import ler_msc_csv, COLUNAS_TIPO
 from core.layout import setup_page, sidebar_menu, get_app_menu
+from api_ranking.services.layout_stn import LayoutSTN
 
 # Configuração da página
 setup_page(page_title="Análise MSC Mensal", layout="wide", hide_default_nav=True)
@@ -35,18 +38,10 @@ def processar_msc_csv(csv_file, mes_analise):
         DataFrame processado
     """
     try:
-        # Lê apenas a linha de cabeçalho real para obter os nomes das colunas
-        df_temp = pd.read_csv(csv_file, sep=';', header=1, nrows=0)
-
-        # Cria um dicionário com todos os tipos como 'object', exceto a coluna 'VALOR'
-        dtype_dict = {col: 'object' for col in df_temp.columns}
-        dtype_dict.pop('VALOR', None)
-
-        # Reseta o ponteiro do arquivo para o início
-        csv_file.seek(0)
-
-        # Importa o arquivo completo com os dtypes especificados
-        df = pd.read_csv(csv_file, sep=';', header=1, dtype=dtype_dict)
+        # Leitura em blocos com esquema tipado (VALOR numérico, TIPO1..TIPO6 categóricas).
+        # TIPO_VALOR e NATUREZA_VALOR ficam como texto: as análises abaixo agrupam
+        # por essas colunas (sem observed=True) e as concatenam com outras.
+        df = ler_msc_csv(csv_file, categoricas=COLUNAS_TIPO)
 
         # Adiciona a coluna 'mes' ao DataFrame
         df['mes'] = mes_analise
@@ -68,18 +63,10 @@ def processar_template_stn(excel_file, ano):
         Tuple (PCASP Estendido, Poderes e Órgãos)
     """
     try:
-        # Leitura do PCASP ESTENDIDO
-        df_temp = pd.read_excel(excel_file, nrows=0, sheet_name=f'PcaspEstendido{ano}', header=3)
-        dtype_dict = {col: 'object' for col in df_temp.columns}
-        pc_estendido = pd.read_excel(excel_file, sheet_name=f'PcaspEstendido{ano}', header=3, dtype=dtype_dict)
-        pc_estendido['CONTA'] = pc_estendido['CONTA'].astype(str)
-
-        # Leitura da tabela de Poderes e Órgãos
-        df_temp_po = pd.read_excel(excel_file, nrows=0, sheet_name='PO', header=4)
-        dtype_dict_po = {col: 'object' for col in df_temp_po.columns}
-        po_stn = pd.read_excel(excel_file, sheet_name='PO', header=4, dtype=dtype_dict_po)
-        po_stn['Código'] = po_stn['Código'].astype(int)
-        po_stn = po_stn.rename(columns={'Código': 'poder_orgao'})
+        # Abas já processadas (em cache por hash do arquivo)
+        layout = LayoutSTN.do_upload(excel_file, ano)
+        pc_estendido = layout.pcasp()
+        po_stn = layout.po()
 
         return pc_estendido, po_stn, None
     except Exception as e:
@@ -102,15 +89,7 @@ def inverter_saldo_retificadoras(df):
     df_copia["Grupo_Contas"] = df_copia["CONTA"].str[0]
 
     # Trocar o sinal das contas retificadoras (exceto period_change)
-    df_copia['VALOR'] = df_copia.apply(lambda x: x['VALOR'] * -1
-        if (x['Grupo_Contas'] == '1' and x['NATUREZA_VALOR'] == 'C' and x['TIPO_VALOR'] != 'period_change')
-        or (x['Grupo_Contas'] == '2' and x['NATUREZA_VALOR'] == 'D' and x['TIPO_VALOR'] != 'period_change')
-        or (x['Grupo_Contas'] == '4' and x['NATUREZA_VALOR'] == 'D' and x['TIPO_VALOR'] != 'period_change')
-        or (x['Grupo_Contas'] == '5' and x['NATUREZA_VALOR'] == 'C' and x['TIPO_VALOR'] != 'period_change')
-        or (x['Grupo_Contas'] == '6' and x['NATUREZA_VALOR'] == 'D' and x['TIPO_VALOR'] != 'period_change')
-        or (x['Grupo_Contas'] == '7' and x['NATUREZA_VALOR'] == 'C' and x['TIPO_VALOR'] != 'period_change')
-        or (x['Grupo_Contas'] == '8' and x['NATUREZA_VALOR'] == 'D' and x['TIPO_VALOR'] != 'period_change')
-        else x['VALOR'], axis=1)
+    df_copia = inverter_sinal(df_copia, REGRAS_RETIFICADORAS, **COLUNAS_ARQUIVO)
 
     return df_copia
 
@@ -160,28 +139,8 @@ def dimensao_d1_00018(df_original):
     analise = df_original.groupby(['CONTA', 'mes', 'TIPO_VALOR', 'NATUREZA_VALOR'])['VALOR'].sum().reset_index()
     analise["Grupo_Contas"] = analise["CONTA"].str[0]
 
-    # Aplicar inversão para contas retificadoras (exceto period_change)
-    analise['VALOR'] = analise.apply(lambda x: x['VALOR'] * -1
-        if (x['Grupo_Contas'] == '1' and x['NATUREZA_VALOR'] == 'C' and x['TIPO_VALOR'] != 'period_change')
-        or (x['Grupo_Contas'] == '2' and x['NATUREZA_VALOR'] == 'D' and x['TIPO_VALOR'] != 'period_change')
-        or (x['Grupo_Contas'] == '4' and x['NATUREZA_VALOR'] == 'D' and x['TIPO_VALOR'] != 'period_change')
-        or (x['Grupo_Contas'] == '5' and x['NATUREZA_VALOR'] == 'C' and x['TIPO_VALOR'] != 'period_change')
-        or (x['Grupo_Contas'] == '6' and x['NATUREZA_VALOR'] == 'D' and x['TIPO_VALOR'] != 'period_change')
-        or (x['Grupo_Contas'] == '7' and x['NATUREZA_VALOR'] == 'C' and x['TIPO_VALOR'] != 'period_change')
-        or (x['Grupo_Contas'] == '8' and x['NATUREZA_VALOR'] == 'D' and x['TIPO_VALOR'] != 'period_change')
-        else x['VALOR'], axis=1)
-
-    # Aplicar inversão para period_change
-    analise['VALOR'] = analise.apply(lambda x: x['VALOR'] * -1
-        if (x['Grupo_Contas'] == '1' and x['NATUREZA_VALOR'] == 'C' and x['TIPO_VALOR'] == 'period_change')
-        or (x['Grupo_Contas'] == '2' and x['NATUREZA_VALOR'] == 'D' and x['TIPO_VALOR'] == 'period_change')
-        or (x['Grupo_Contas'] == '3' and x['NATUREZA_VALOR'] == 'C' and x['TIPO_VALOR'] == 'period_change')
-        or (x['Grupo_Contas'] == '4' and x['NATUREZA_VALOR'] == 'D' and x['TIPO_VALOR'] == 'period_change')
-        or (x['Grupo_Contas'] == '5' and x['NATUREZA_VALOR'] == 'C' and x['TIPO_VALOR'] == 'period_change')
-        or (x['Grupo_Contas'] == '6' and x['NATUREZA_VALOR'] == 'D' and x['TIPO_VALOR'] == 'period_change')
-        or (x['Grupo_Contas'] == '7' and x['NATUREZA_VALOR'] == 'C' and x['TIPO_VALOR'] == 'period_change')
-        or (x['Grupo_Contas'] == '8' and x['NATUREZA_VALOR'] == 'D' and x['TIPO_VALOR'] == 'period_change')
-        else x['VALOR'], axis=1)
+    # Trocar o sinal das contas retificadoras e do period_change
+    analise = inverter_sinal(analise, REGRAS_D1_00018, **COLUNAS_ARQUIVO)
 
     # Separa beginning_balance + period_change vs ending_balance
     analise_b = analise[analise['TIPO_VALOR'] != 'ending_balance'].copy()
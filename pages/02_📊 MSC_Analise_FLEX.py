@@ -10,6 +10,9 @@ import numpy as np
 from datetime import date
 from core.layout import setup_page, sidebar_menu, get_app_menu
 from core.utils import convert_df_to_excel
+from core.planilhas import Leitura, ler_planilhas
+from core.normalizacao_sinal import (inverter_sinal, REGRAS_RETIFICADORAS, REGRAS_D1_00018,
+                                     TIPO_SALDO, COLUNAS_ARQUIVO)
 
 # Configuração da página
 setup_page(page_title="Análise MSC x FLEX", layout="wide", hide_default_nav=True)
@@ -157,16 +160,25 @@ if st.button("🚀 Executar Análises", type="primary"):
             try:
                 pd.set_option('display.float_format', '{:.2f}'.format)
 
-                # Carregar os arquivos obrigatórios
-                msc_base = pd.read_excel(uploaded_msc, header=1)
-                deta_ant = pd.read_excel(uploaded_deta_ant, header=3)
-                deta = pd.read_excel(uploaded_deta, header=3)
-
-                # Carregar FLEX somente se não for mês 13
+                # Carregar os arquivos obrigatórios (e o FLEX somente se não for mês 13)
+                leituras = {
+                    'msc_base': Leitura(uploaded_msc, cabecalho=1),
+                    'deta_ant': Leitura(uploaded_deta_ant, cabecalho=3),
+                    'deta': Leitura(uploaded_deta, cabecalho=3),
+                }
+                if not is_mes13:
+                    leituras.update({
+                        'rec': Leitura(uploaded_rec, cabecalho=3, dtype=object),
+                        'dps': Leitura(uploaded_dps, cabecalho=3, dtype=object),
+                        'rp': Leitura(uploaded_rp, cabecalho=3, dtype=object),
+                    })
+                planilhas = ler_planilhas(leituras)
+
+                msc_base = planilhas['msc_base']
+                deta_ant = planilhas['deta_ant']
+                deta = planilhas['deta']
                 if not is_mes13:
-                    rec = pd.read_excel(uploaded_rec, header=3, dtype=object)
-                    dps = pd.read_excel(uploaded_dps, header=3, dtype=object)
-                    rp = pd.read_excel(uploaded_rp, header=3, dtype=object)
+                    rec, dps, rp = planilhas['rec'], planilhas['dps'], planilhas['rp']
 
                 tolerancia = 0.01
 
@@ -185,18 +197,7 @@ if st.button("🚀 Executar Análises", type="primary"):
                 msc["Grupo de Contas"] = msc["CONTA"].str[0]
 
                 # Trocar o sinal das contas retificadoras (exceto period_change)
-                msc['VALOR'] = msc.apply(
-                    lambda x: x['VALOR'] * -1
-                    if (x['Grupo de Contas'] == '1' and x['NATUREZA_VALOR'] == 'C' and not x['TIPO_VALOR'] == 'period_change')
-                    or (x['Grupo de Contas'] == '2' and x['NATUREZA_VALOR'] == 'D' and not x['TIPO_VALOR'] == 'period_change')
-                    or (x['Grupo de Contas'] == '4' and x['NATUREZA_VALOR'] == 'D' and not x['TIPO_VALOR'] == 'period_change')
-                    or (x['Grupo de Contas'] == '5' and x['NATUREZA_VALOR'] == 'C' and not x['TIPO_VALOR'] == 'period_change')
-                    or (x['Grupo de Contas'] == '6' and x['NATUREZA_VALOR'] == 'D' and not x['TIPO_VALOR'] == 'period_change')
-                    or (x['Grupo de Contas'] == '7' and x['NATUREZA_VALOR'] == 'C' and not x['TIPO_VALOR'] == 'period_change')
-                    or (x['Grupo de Contas'] == '8' and x['NATUREZA_VALOR'] == 'D' and not x['TIPO_VALOR'] == 'period_change')
-                    else x['VALOR'],
-                    axis=1
-                )
+                msc = inverter_sinal(msc, REGRAS_RETIFICADORAS, **COLUNAS_ARQUIVO)
 
                 msc = msc.groupby(['Grupo de Contas', 'TIPO_VALOR'])['VALOR'].sum().reset_index()
                 msc = msc.loc[msc['TIPO_VALOR'] == 'beginning_balance']
@@ -238,34 +239,8 @@ if st.button("🚀 Executar Análises", type="primary"):
                 msc2['CONTA'] = msc2['CONTA'].apply(str)
                 msc2["Grupo de Contas"] = msc2["CONTA"].str[0]
 
-                # Trocar sinal das retificadoras (exceto period_change)
-                msc2['VALOR'] = msc2.apply(
-                    lambda x: x['VALOR'] * -1
-                    if (x['Grupo de Contas'] == '1' and x['NATUREZA_VALOR'] == 'C' and not x['TIPO_VALOR'] == 'period_change')
-                    or (x['Grupo de Contas'] == '2' and x['NATUREZA_VALOR'] == 'D' and not x['TIPO_VALOR'] == 'period_change')
-                    or (x['Grupo de Contas'] == '4' and x['NATUREZA_VALOR'] == 'D' and not x['TIPO_VALOR'] == 'period_change')
-                    or (x['Grupo de Contas'] == '5' and x['NATUREZA_VALOR'] == 'C' and not x['TIPO_VALOR'] == 'period_change')
-                    or (x['Grupo de Contas'] == '6' and x['NATUREZA_VALOR'] == 'D' and not x['TIPO_VALOR'] == 'period_change')
-                    or (x['Grupo de Contas'] == '7' and x['NATUREZA_VALOR'] == 'C' and not x['TIPO_VALOR'] == 'period_change')
-                    or (x['Grupo de Contas'] == '8' and x['NATUREZA_VALOR'] == 'D' and not x['TIPO_VALOR'] == 'period_change')
-                    else x['VALOR'],
-                    axis=1
-                )
-
-                # Trocar sinal do period_change
-                msc2['VALOR'] = msc2.apply(
-                    lambda x: x['VALOR'] * -1
-                    if (x['Grupo de Contas'] == '1' and x['NATUREZA_VALOR'] == 'C' and x['TIPO_VALOR'] == 'period_change')
-                    or (x['Grupo de Contas'] == '2' and x['NATUREZA_VALOR'] == 'D' and x['TIPO_VALOR'] == 'period_change')
-                    or (x['Grupo de Contas'] == '3' and x['NATUREZA_VALOR'] == 'C' and x['TIPO_VALOR'] == 'period_change')
-                    or (x['Grupo de Contas'] == '4' and x['NATUREZA_VALOR'] == 'D' and x['TIPO_VALOR'] == 'period_change')
-                    or (x['Grupo de Contas'] == '5' and x['NATUREZA_VALOR'] == 'C' and x['TIPO_VALOR'] == 'period_change')
-                    or (x['Grupo de Contas'] == '6' and x['NATUREZA_VALOR'] == 'D' and x['TIPO_VALOR'] == 'period_change')
-                    or (x['Grupo de Contas'] == '7' and x['NATUREZA_VALOR'] == 'C' and x['TIPO_VALOR'] == 'period_change')
-                    or (x['Grupo de Contas'] == '8' and x['NATUREZA_VALOR'] == 'D' and x['TIPO_VALOR'] == 'period_change')
-                    else x['VALOR'],
-                    axis=1
-                )
+                # Trocar o sinal das contas retificadoras e do period_change
+                msc2 = inverter_sinal(msc2, REGRAS_D1_00018, **COLUNAS_ARQUIVO)
 
                 msc2 = msc2.groupby(['Grupo de Contas', 'TIPO_VALOR'])['VALOR'].sum().reset_index()
                 msc2 = msc2.pivot_table(index=['Grupo de Contas'], columns='TIPO_VALOR', values='VALOR').reset_index()
@@ -436,12 +411,7 @@ if st.button("🚀 Executar Análises", type="primary"):
                     for col in ['CONTA', 'IC1', 'IC2', 'IC3', 'IC4', 'IC5', 'IC6']:
                         msc_rp[col] = msc_rp[col].apply(str)
 
-                    msc_rp['VALOR'] = msc_rp.apply(
-                        lambda x: x['VALOR'] * -1
-                        if (x['NATUREZA_VALOR'] == 'D' and not x['TIPO_VALOR'] == 'period_change')
-                        else x['VALOR'],
-                        axis=1
-                    )
+                    msc_rp = inverter_sinal(msc_rp, [(None, 'D', TIPO_SALDO)], **COLUNAS_ARQUIVO)
 
                     msc_rp = msc_rp[msc_rp['CONTA'].str.contains("632100000", case=False, regex=True)]
 
@@ -4,9 +4,11 @@
 # └───────────────────────────────────────────────────────────────
 
 import streamlit as st
+import httpx
 import pandas as pd
-import requests
+from core import http_siconfi
 from core.layout import setup_page, sidebar_menu, get_app_menu
+from api_ranking.services import extrato_index
 
 # Configuração da página
 setup_page(page_title="Extratos de Homologações", layout="wide", hide_default_nav=True)
@@ -54,6 +56,18 @@ with c2:
 
 st.caption(f"Ente: **{nome_ente}** — ID: `{ente}` — Ano: **{ano}**")
 
+# Feed do índice local: o ente tem homologações novas desde a sincronização anterior?
+situacao_indice = extrato_index.situacao(ano)
+if situacao_indice["sincronizado_em"] is not None:
+    alteracoes = extrato_index.mudancas(ano)
+    alteracoes = alteracoes[alteracoes["id_ente"] == ente]
+    if not alteracoes.empty:
+        st.info(f"🆕 Novas homologações desde a última sincronização: {alteracoes['entregaveis'].iloc[0]}")
+    st.caption(f"Índice local sincronizado em {situacao_indice['sincronizado_em']:%d/%m/%Y %H:%M} (UTC)")
+elif situacao_indice["em_andamento"]:
+    feitos, total = situacao_indice["progresso"]
+    st.caption(f"Sincronizando o índice local de extratos… ({feitos}/{total} entes)")
+
 # ═══════════════════════════════════════════════════════════════
 # Funções de Consulta à API
 # ═══════════════════════════════════════════════════════════════
@@ -64,12 +78,12 @@ def get_extratos(ente: str, ano: int, page_size: int = 5000) -> pd.DataFrame:
     Busca todos os registros de extrato na API SICONFI usando paginação.
     O resultado é cacheado por (ente, ano, page_size).
     """
-    url = "https://apidatalake.tesouro.gov.br/ords/siconfi/tt/extrato_entregas"
+    url = f"{http_siconfi.API_ROOT}/extrato_entregas"
     frames = []
     offset = 0
     while True:
         params = {"id_ente": ente, "an_referencia": ano, "limit": page_size, "offset": offset}
-        r = requests.get(url, params=params, timeout=60)
+        r = http_siconfi.get(url, params=params, timeout=60)
         r.raise_for_status()
         items = r.json().get("items", [])
         if not items:
@@ -93,7 +107,10 @@ if clicked:
         status_text.info(f"Buscando extratos — Ente: {ente} • Ano: {ano}…")
         progress_bar.progress(20)
 
-        extrato = get_extratos(ente, int(ano))
+        # Índice local de todos os entes (se sincronizado há pouco); senão, consulta a API
+        extrato = extrato_index.extrato_do_ente(ente, int(ano))
+        if extrato is None:
+            extrato = get_extratos(ente, int(ano))
         progress_bar.progress(70)
 
         if extrato.empty:
@@ -104,7 +121,7 @@ if clicked:
             st.session_state["extrato_df"] = extrato
             status_text.success("Processamento concluído.")
             progress_bar.progress(100)
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         st.error(f"Erro ao acessar a API: {e}")
     except Exception as e:
         st.error(f"Erro ao processar os dados: {e}")
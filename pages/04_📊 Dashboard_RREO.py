@@ -5,12 +5,12 @@
 
 import streamlit as st
 import pandas as pd
-import requests
 import plotly.graph_objects as go
 import plotly.express as px
 import math
 import unicodedata
 from io import BytesIO
+from core import http_siconfi
 from core.layout import setup_page, sidebar_menu, get_app_menu
 
 # Configuração da página
@@ -65,8 +65,9 @@ def auto_ticks(ymax: float, max_ticks: int = 8):
 def buscar_rreo(ano: str, periodo: str, anexo: str, id_ente: str) -> pd.DataFrame:
     """Busca dados do RREO na API do SICONFI."""
     try:
-        link = f'https://apidatalake.tesouro.gov.br/ords/siconfi/tt/rreo?an_exercicio={ano}&nr_periodo={periodo}&co_tipo_demonstrativo=RREO&no_anexo=RREO-Anexo%20{anexo}&id_ente={id_ente}'
-        response = requests.get(link, timeout=30)
+        params = {"an_exercicio": ano, "nr_periodo": periodo, "co_tipo_demonstrativo": "RREO",
+                  "no_anexo": f"RREO-Anexo {anexo}", "id_ente": id_ente}
+        response = http_siconfi.get(f"{http_siconfi.API_ROOT}/rreo", params=params, timeout=30)
         response.raise_for_status()
         data = response.json()
         df = pd.DataFrame(data.get("items", []))
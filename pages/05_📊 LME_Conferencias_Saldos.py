@@ -12,6 +12,7 @@ from core.layout import setup_page, sidebar_menu, get_app_menu
 from core.lme_analises import (
     processar_csv_principal,
     processar_csv_cota_trimestral,
+    conciliar,
     analise_72313_82313,
     analise_72311_82312,
     analise_contas_5_6,
@@ -19,7 +20,8 @@ from core.lme_analises import (
     analise_ctr_lme_823_e_6,
     analise_publicadas_liberadas,
     analise_publicadas_a_liberar,
-    verificacoes_por_tipo
+    verificacoes_por_tipo,
+    analise_cobertura_regras
 )
 
 # Configuração da página
@@ -87,6 +89,9 @@ with abas[0]:
 
             st.markdown("---")
 
+            # Todas as conciliações saem de uma única agregação do arquivo
+            conciliacoes = conciliar(df)
+
             # ══════════════════════════════════════════════════════════
             # SEÇÃO 1: ANÁLISES CTR (em 2 colunas)
             # ══════════════════════════════════════════════════════════
@@ -97,7 +102,7 @@ with abas[0]:
 
             with col_ctr1:
                 st.subheader("Contas 72313 x 622")
-                merge_ctr_5, diferenca_ctr_5, check_ctr_5 = analise_ctr_lme_723_e_6(df)
+                merge_ctr_5, diferenca_ctr_5, check_ctr_5 = analise_ctr_lme_723_e_6(df, conciliacoes)
 
                 st.markdown("**Comparativo LME X Orçamento:**")
                 st.caption("Chave: UO (5 dígitos) + LME (2 dígitos) + FONTE (7 dígitos) + GD (1 dígito)")
@@ -130,7 +135,7 @@ with abas[0]:
 
             with col_ctr2:
                 st.subheader("Contas 82313 x 622")
-                merge_ctr_4, diferenca_ctr_4, check_ctr_4 = analise_ctr_lme_823_e_6(df)
+                merge_ctr_4, diferenca_ctr_4, check_ctr_4 = analise_ctr_lme_823_e_6(df, conciliacoes)
 
                 st.markdown("**Comparativo LME X Orçamento:**")
                 st.caption("Chave: UO (5 dígitos) + LME (2 dígitos) + FONTE (7 dígitos) + GD (1 dígito)")
@@ -168,7 +173,7 @@ with abas[0]:
             # ══════════════════════════════════════════════════════════
             st.header("🔍 Verificações por Grupo de análise de LME")
 
-            merge_emp, merge_cont, merge_desc, merge_emp_pend = verificacoes_por_tipo(df)
+            merge_emp, merge_cont, merge_desc, merge_emp_pend = verificacoes_por_tipo(df, conciliacoes)
 
             tab_verif = st.tabs(["💰 Empenhado", "🔒 Contingenciado", "🔄 Descentralizado", "⏳ A Empenhar"])
 
@@ -257,7 +262,7 @@ with abas[0]:
             with col_pub1:
                 st.subheader("Publicadas Liberadas x Liberadas")
                 st.caption("823120501 vs 8231302, 8231305, 8231306")
-                merge_liberadas = analise_publicadas_liberadas(df)
+                merge_liberadas = analise_publicadas_liberadas(df, conciliacoes)
 
                 st.dataframe(
                     merge_liberadas.style.format({
@@ -280,7 +285,7 @@ with abas[0]:
             with col_pub2:
                 st.subheader("Publicadas A Liberar x A Liberar")
                 st.caption("823120101 vs 823130101")
-                merge_a_liberar = analise_publicadas_a_liberar(df)
+                merge_a_liberar = analise_publicadas_a_liberar(df, conciliacoes)
 
                 st.dataframe(
                     merge_a_liberar.style.format({
@@ -312,7 +317,7 @@ with abas[0]:
 
             with tab_conf[0]:
                 st.markdown("**Conferência entre Saldos 72313 x 82313**")
-                tabela_723_823, detalhes_723_823 = analise_72313_82313(df)
+                tabela_723_823, detalhes_723_823 = analise_72313_82313(df, conciliacoes)
 
                 col1, col2 = st.columns([1, 2])
                 with col1:
@@ -346,7 +351,7 @@ with abas[0]:
 
             with tab_conf[1]:
                 st.markdown("**Conferência entre Contas Orçamentárias 5 x 6**")
-                tabela_5_6, detalhes_5_6 = analise_contas_5_6(df)
+                tabela_5_6, detalhes_5_6 = analise_contas_5_6(df, conciliacoes)
 
                 col1, col2 = st.columns([1, 2])
                 with col1:
@@ -380,7 +385,7 @@ with abas[0]:
 
             with tab_conf[2]:
                 st.markdown("**Conferência Cotas Publicadas: 72311 x 82312**")
-                tabela_723_823_pub, detalhes_723_823_pub = analise_72311_82312(df)
+                tabela_723_823_pub, detalhes_723_823_pub = analise_72311_82312(df, conciliacoes)
 
                 col1, col2 = st.columns([1, 2])
                 with col1:
@@ -495,6 +500,51 @@ with abas[0]:
                 )
 
 
+            st.markdown("---")
+
+            # ══════════════════════════════════════════════════════════
+            # SEÇÃO 6: COBERTURA DAS REGRAS DE LME
+            # ══════════════════════════════════════════════════════════
+            st.header("🧮 Cobertura das Regras de LME")
+            st.caption("Confere quais linhas (GD + UO + Ação) do saldo são atendidas por um TXT de regra de LME")
+
+            col_r1, col_r2 = st.columns(2)
+            with col_r1:
+                txt_regra = st.file_uploader("📁 TXT da regra de LME", type=['txt'], key="txt_regra_cobertura")
+            with col_r2:
+                lme_cobertura = st.multiselect("Conferir apenas as linhas do(s) LME:", lmes_disponiveis, key="lme_cobertura")
+
+            if txt_regra is not None:
+                df_cobertura = df[df['LME'].isin(lme_cobertura)] if lme_cobertura else df
+                try:
+                    tabela_cob, sem_regra, por_regra = analise_cobertura_regras(
+                        df_cobertura, txt_regra.getvalue().decode("utf-8", errors="ignore")
+                    )
+                except ValueError as e:
+                    st.error(f"❌ {e}")
+                else:
+                    col1, col2 = st.columns([1, 2])
+                    with col1:
+                        st.dataframe(tabela_cob.style.format({'Saldo': '{:,.2f}'}), hide_index=True)
+                    with col2:
+                        if len(sem_regra) == 0:
+                            st.success("✅ Todas as linhas do saldo são cobertas pela regra!")
+                        else:
+                            st.warning(f"⚠️ {len(sem_regra):,} linha(s) sem regra correspondente")
+
+                    with st.expander("Ver linhas sem regra"):
+                        st.dataframe(sem_regra.style.format({'Saldo': '{:,.2f}'}), hide_index=True, use_container_width=True)
+                    with st.expander("Ver cobertura por regra"):
+                        st.dataframe(por_regra.style.format({'Saldo': '{:,.2f}'}), hide_index=True, use_container_width=True)
+
+                    st.download_button(
+                        "📥 Exportar Linhas sem Regra",
+                        convert_df_to_excel(sem_regra),
+                        "linhas_sem_regra_lme.xlsx",
+                        key="download_sem_regra"
+                    )
+
+
 # ═══════════════════════════════════════════════════════════════
 # ABA 2: ANÁLISE TRIMESTRAL
 # ═══════════════════════════════════════════════════════════════
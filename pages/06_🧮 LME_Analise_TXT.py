@@ -4,19 +4,26 @@
 
 import streamlit as st
 import pandas as pd
-import re
 from core.utils import convert_df_to_excel
 from core.layout import setup_page, sidebar_menu, get_app_menu
+from core.regras_lme import parsear_regras
 from core.db_simple import (
     ensure_schema_simple,
     upsert_regras_vigentes,
     listar_regras_vigentes,
-    listar_historico,
+    pagina_historico,
     get_estatisticas,
     deletar_todas_regras_lme,
-    get_engine
+    get_engine,
+    regras_em,
+    diff_regras,
+    atualizar_snapshots_mensais,
+    snapshots_mensais
 )
 
+# Linhas por página no histórico do banco
+TAMANHO_PAGINA_HIST = 500
+
 # Configuração da página
 setup_page(page_title="Análise de LME", layout="wide", hide_default_nav=True)
 
@@ -31,40 +38,10 @@ st.markdown("---")
 # Funções de Processamento
 # ═══════════════════════════════════════════════════════════════
 
-def parse_condition(condition):
-    """
-    Extrai coluna, operador e valor de uma condição.
-
-    Args:
-        condition: String com condição
-
-    Returns:
-        Tuple (campo, operador, valor)
-    """
-    condition = condition.strip()
-
-    # GRUPO DE DESPESA
-    match_grupo = re.match(r"\[GRUPO DE DESPESA\]\.\[Código\]\s*=\s*'(.*?)'", condition)
-    if match_grupo:
-        return 'GRUPO DE DESPESA', '=', match_grupo.group(1)
-
-    # UNIDADE ORÇAMENTÁRIA
-    match_unidade = re.match(r"\[UNIDADE ORÇAMENTÁRIA\]\.\[Código\]\s*=\s*'(.*?)'", condition)
-    if match_unidade:
-        return 'UNIDADE ORÇAMENTÁRIA', '=', match_unidade.group(1)
-
-    # AÇÃO PPA TERMINA COM
-    match_acao_termina = re.match(r"\[AÇÃO PPA\]\.\[Código\] TERMINA COM '(.*?)'", condition)
-    if match_acao_termina:
-        return 'AÇÃO PPA', 'TERMINA COM', match_acao_termina.group(1)
-
-    return None, None, None
-
-
 def processar_txt_lme(conteudo, nome_arquivo=""):
     """
     Processa arquivo TXT de regra LME.
-    Divide por " OU " e cria um DataFrame com cada bloco.
+    Cada bloco " OU " vira uma linha do DataFrame (ver core.regras_lme).
 
     Args:
         conteudo: String com conteúdo do arquivo TXT
@@ -73,43 +50,7 @@ def processar_txt_lme(conteudo, nome_arquivo=""):
     Returns:
         DataFrame com colunas: GRUPO DE DESPESA (=), UNIDADE ORÇAMENTÁRIA (=), AÇÃO PPA (TERMINA COM), chave, regra_completa
     """
-    # Dividir o conteúdo por " OU " e remover parênteses e espaços extras
-    grupos_condicoes = [grupo.strip()[1:-1].strip() for grupo in conteudo.split(' OU ')]
-
-    data = []
-    for grupo in grupos_condicoes:
-        # Dividir cada grupo por " E "
-        condicoes = [c.strip() for c in grupo.split(' E ')]
-        grupo_data = {}
-
-        for condicao in condicoes:
-            coluna, operador, valor = parse_condition(condicao)
-            if coluna:
-                chave = f'{coluna} ({operador})'
-                grupo_data[chave] = valor
-
-        if grupo_data:
-            data.append(grupo_data)
-
-    # Criar DataFrame
-    df = pd.DataFrame(data)
-
-    # Criar coluna 'chave' se todas as colunas necessárias existirem
-    if all(col in df.columns for col in ['GRUPO DE DESPESA (=)', 'UNIDADE ORÇAMENTÁRIA (=)', 'AÇÃO PPA (TERMINA COM)']):
-        df['chave'] = (
-            df['GRUPO DE DESPESA (=)'].astype(str) +
-            df['UNIDADE ORÇAMENTÁRIA (=)'].astype(str) +
-            df['AÇÃO PPA (TERMINA COM)'].astype(str)
-        )
-
-        # Criar coluna regra_completa para compatibilidade com banco de dados
-        df['regra_completa'] = (
-            "[GRUPO DE DESPESA].[Código] = '" + df['GRUPO DE DESPESA (=)'].astype(str) + "' E " +
-            "[UNIDADE ORÇAMENTÁRIA].[Código] = '" + df['UNIDADE ORÇAMENTÁRIA (=)'].astype(str) + "' E " +
-            "[AÇÃO PPA].[Código] TERMINA COM '" + df['AÇÃO PPA (TERMINA COM)'].astype(str) + "'"
-        )
-
-    return df
+    return parsear_regras(conteudo)
 
 
 def comparar_lme_antes_depois(df_antes, df_depois, lme_nome="LME"):
@@ -385,7 +326,7 @@ with abas_principais[1]:
         - Histórico completo de todas as mudanças
         - Consulta rápida das regras vigentes
         - Rastreabilidade de quando cada regra entrou/saiu de vigor
-        - Uma única tabela simples (sem snapshots)
+        - Uma única tabela simples (snapshots mensais opcionais, em view materializada)
 
         **Tabela única:** `lme_regras_hist`
         - `vigente_ate IS NULL` = regra ainda vigente
@@ -399,6 +340,7 @@ with abas_principais[1]:
         "📤 Sincronizar Regras",
         "📊 Regras Vigentes",
         "📜 Histórico Completo",
+        "🕰️ Linha do Tempo",
         "📈 Estatísticas",
         "🗑️ Gerenciar Dados"
     ])
@@ -547,10 +489,10 @@ with abas_principais[1]:
 
     with abas_db[2]:
         st.subheader("📜 Histórico Completo de Regras")
-        st.info("Visualize todas as regras (vigentes e encerradas) com suas datas de vigência")
+        st.info("Visualize todas as regras (vigentes e encerradas) com suas datas de vigência, página a página")
 
         # Filtros
-        col1, col2 = st.columns(2)
+        col1, col2, col3 = st.columns(3)
         with col1:
             filtro_lme_hist = st.selectbox(
                 "Filtrar por LME",
@@ -559,38 +501,152 @@ with abas_principais[1]:
             )
         with col2:
             filtro_uo = st.text_input("Filtrar por UO (opcional)", key="filtro_hist_uo")
+        with col3:
+            filtro_gd = st.text_input("Filtrar por GD (opcional)", key="filtro_hist_gd")
+
+        col4, col5 = st.columns(2)
+        with col4:
+            filtro_desde = st.date_input("Vigente a partir de (opcional)", value=None, key="filtro_hist_desde")
+        with col5:
+            filtro_ate = st.date_input("Vigente até (opcional)", value=None, key="filtro_hist_ate")
 
         lme_hist = None if filtro_lme_hist == "Todos" else filtro_lme_hist
         uo_hist = None if filtro_uo.strip() == "" else filtro_uo.strip()
+        gd_hist = None if filtro_gd.strip() == "" else filtro_gd.strip()
+
+        # Cursores das páginas já visitadas (o último é o da página atual)
+        filtros_hist = (lme_hist, uo_hist, gd_hist, filtro_desde, filtro_ate)
+        if st.session_state.get("hist_filtros") != filtros_hist:
+            st.session_state["hist_filtros"] = filtros_hist
+            st.session_state["hist_cursores"] = [None]
 
         if st.button("🔍 Consultar Histórico", type="primary"):
+            st.session_state["hist_ativo"] = True
+            st.session_state["hist_cursores"] = [None]
+
+        if st.session_state.get("hist_ativo"):
+            cursores = st.session_state["hist_cursores"]
             with st.spinner("Consultando histórico..."):
-                df_hist = listar_historico(lme_hist, uo_hist)
+                df_hist, proximo = pagina_historico(
+                    lme_hist, uo_hist, gd_hist, filtro_desde, filtro_ate,
+                    apos=cursores[-1], limite=TAMANHO_PAGINA_HIST
+                )
 
-                if len(df_hist) == 0:
-                    st.warning("⚠️ Nenhum registro encontrado")
-                else:
-                    st.success(f"✅ {len(df_hist)} registros encontrados")
+            if len(df_hist) == 0:
+                st.warning("⚠️ Nenhum registro encontrado")
+            else:
+                inicio = (len(cursores) - 1) * TAMANHO_PAGINA_HIST
+                st.success(f"✅ Página {len(cursores)}: registros {inicio + 1:,} a {inicio + len(df_hist):,}")
+
+                # Adicionar coluna de status
+                df_hist['Status'] = df_hist['vigente_ate'].isna().map({True: '🟢 VIGENTE', False: '🔴 ENCERRADA'})
+
+                st.dataframe(df_hist.drop(columns=['id']), use_container_width=True, height=500)
+
+                col_p1, col_p2, col_p3 = st.columns(3)
+                with col_p1:
+                    if st.button("⏮️ Início", disabled=len(cursores) == 1, use_container_width=True):
+                        st.session_state["hist_cursores"] = [None]
+                        st.rerun()
+                with col_p2:
+                    if st.button("◀️ Página anterior", disabled=len(cursores) == 1, use_container_width=True):
+                        cursores.pop()
+                        st.rerun()
+                with col_p3:
+                    if st.button("Próxima página ▶️", disabled=proximo is None, use_container_width=True):
+                        cursores.append(proximo)
+                        st.rerun()
+
+                st.download_button(
+                    "📥 Baixar Excel - Histórico (página atual)",
+                    convert_df_to_excel(df_hist.drop(columns=['id'])),
+                    f"historico_lme_{filtro_lme_hist.replace(' ', '_').lower()}_p{len(cursores)}.xlsx",
+                    key="btn_hist"
+                )
 
-                    # Adicionar coluna de status
-                    df_hist['Status'] = df_hist['vigente_ate'].apply(
-                        lambda x: '🟢 VIGENTE' if pd.isna(x) else '🔴 ENCERRADA'
-                    )
+    # ═══════════════════════════════════════════════════════════════
+    # SUB-ABA 4: Linha do Tempo (regras vigentes em uma data)
+    # ═══════════════════════════════════════════════════════════════
 
-                    st.dataframe(df_hist, use_container_width=True, height=500)
+    with abas_db[3]:
+        st.subheader("🕰️ Regras Vigentes em uma Data")
+        st.info("Consulte as regras em vigor numa data (situação ao fim do dia) ou compare duas datas")
 
-                    st.download_button(
-                        "📥 Baixar Excel - Histórico",
-                        convert_df_to_excel(df_hist),
-                        f"historico_lme_{filtro_lme_hist.replace(' ', '_').lower()}.xlsx",
-                        key="btn_hist"
-                    )
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            filtro_lme_tempo = st.selectbox(
+                "Filtrar por LME",
+                ["Todos", "LME 1", "LME 2", "LME 6"],
+                key="filtro_tempo_lme"
+            )
+        with col2:
+            data_antes = st.date_input("Data inicial", key="tempo_data_antes")
+        with col3:
+            data_depois = st.date_input("Data final (para comparar)", key="tempo_data_depois")
+
+        lme_tempo = None if filtro_lme_tempo == "Todos" else filtro_lme_tempo
+
+        col_b1, col_b2 = st.columns(2)
+        with col_b1:
+            consultar_data = st.button("🔍 Regras vigentes na data inicial", type="primary", use_container_width=True)
+        with col_b2:
+            comparar_datas = st.button("🔀 Comparar as duas datas", use_container_width=True)
+
+        if consultar_data:
+            with st.spinner("Consultando banco de dados..."):
+                df_data = regras_em(data_antes, lme_tempo)
+            if len(df_data) == 0:
+                st.warning("⚠️ Nenhuma regra vigente nessa data")
+            else:
+                st.success(f"✅ {len(df_data)} regras vigentes em {data_antes:%d/%m/%Y}")
+                st.dataframe(df_data, use_container_width=True, height=500)
+                st.download_button(
+                    "📥 Baixar Excel - Regras na Data",
+                    convert_df_to_excel(df_data),
+                    f"regras_em_{data_antes:%Y_%m_%d}.xlsx",
+                    key="btn_regras_em"
+                )
+
+        if comparar_datas:
+            with st.spinner("Comparando datas..."):
+                df_diff = diff_regras(data_antes, data_depois, lme_tempo)
+            if len(df_diff) == 0:
+                st.info("✅ Nenhuma diferença entre as regras vigentes nas duas datas")
+            else:
+                contagem = df_diff['status'].value_counts()
+                col_a, col_b, col_c = st.columns(3)
+                col_a.metric("🟢 Entraram", int(contagem.get('ENTROU', 0)))
+                col_b.metric("🔴 Saíram", int(contagem.get('SAIU', 0)))
+                col_c.metric("🟡 Alteradas", int(contagem.get('ALTERADA', 0)))
+                st.dataframe(df_diff, use_container_width=True, height=500)
+                st.download_button(
+                    "📥 Baixar Excel - Diferenças entre Datas",
+                    convert_df_to_excel(df_diff),
+                    f"diff_regras_{data_antes:%Y_%m_%d}_{data_depois:%Y_%m_%d}.xlsx",
+                    key="btn_diff_datas"
+                )
+
+        st.markdown("---")
+        st.subheader("📅 Evolução Mensal (snapshots)")
+        st.caption("Regras vigentes no fim de cada mês, abertas e encerradas no mês (view materializada `lme_regras_mensal`)")
+
+        if st.button("🔄 Atualizar Snapshots Mensais"):
+            with st.spinner("Atualizando snapshots..."):
+                if atualizar_snapshots_mensais():
+                    st.success("✅ Snapshots atualizados!")
+
+        df_mensal = snapshots_mensais(lme_tempo)
+        if len(df_mensal) == 0:
+            st.info("Nenhum snapshot mensal disponível. Clique em **Atualizar Snapshots Mensais** para gerá-los.")
+        else:
+            st.line_chart(df_mensal.pivot(index='mes', columns='lme', values='vigentes'))
+            st.dataframe(df_mensal, use_container_width=True, hide_index=True)
 
     # ═══════════════════════════════════════════════════════════════
-    # SUB-ABA 4: Estatísticas
+    # SUB-ABA 5: Estatísticas
     # ═══════════════════════════════════════════════════════════════
 
-    with abas_db[3]:
+    with abas_db[4]:
         st.subheader("📈 Estatísticas do Banco de Dados")
 
         if st.button("🔄 Atualizar Estatísticas", type="primary"):
@@ -618,10 +674,10 @@ with abas_principais[1]:
                     st.info("Nenhuma regra vigente no banco de dados")
 
     # ═══════════════════════════════════════════════════════════════
-    # SUB-ABA 5: Gerenciar Dados
+    # SUB-ABA 6: Gerenciar Dados
     # ═══════════════════════════════════════════════════════════════
 
-    with abas_db[4]:
+    with abas_db[5]:
         st.subheader("🗑️ Gerenciar Dados do Banco")
         st.warning("⚠️ **CUIDADO:** As operações abaixo são irreversíveis!")
 
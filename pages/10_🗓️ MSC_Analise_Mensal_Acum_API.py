@@ -1,11 +1,11 @@
 ﻿import asyncio
-from io import BytesIO
-import httpx
 import numpy as np
 import pandas as pd
 import re
 import streamlit as st
 from core.layout import setup_page, sidebar_menu, get_app_menu
+from core.normalizacao_sinal import inverter_sinal, REGRAS_D1_00018
+from api_ranking.services.layout_stn import LayoutSTN
 
 # Configuração da página
 setup_page(page_title="Análise MSC API Acumulado Mensal", layout="wide", hide_default_nav=True)
@@ -22,167 +22,16 @@ sidebar_menu(get_app_menu(), use_expanders=True, expanded=False)
 ##############################################################################
 
 import asyncio
-import random
-import httpx
 import pandas as pd
-
-API_ROOT = "https://apidatalake.tesouro.gov.br/ords/siconfi/tt"
+from api_ranking.services.msc_mensal import agregado_por_mes, carregar_msc, versoes_por_mes
+from core.voo_unico import acompanhar, reportar, voo_unico
 
 # ---------------------------------------------------------
-# HTTP robusto: retry + backoff + jitter + limites
+# A MSC é obtida por partição (mês, classe, tipo de valor) do armazém
+# incremental `api_ranking.services.msc_mensal`: meses já gravados não são
+# baixados de novo. HTTP (pool, retry, limite adaptativo) em core.http_siconfi.
 # ---------------------------------------------------------
 
-TRANSIENT_STATUS = {429, 500, 502, 503, 504}
-
-def _retry_sleep(attempt: int, base: float = 0.6, cap: float = 10.0) -> float:
-    # Exponencial com jitter (evita rajada sincronizada)
-    wait = min(cap, base * (2 ** attempt))
-    return wait + random.uniform(0, 0.35)
-
-async def _request_json(
-    client: httpx.AsyncClient,
-    url: str,
-    params: dict,
-    sem: asyncio.Semaphore | None,
-    retries: int = 6,
-    timeout: float = 90.0,
-):
-    last_exc: Exception | None = None
-
-    for attempt in range(retries):
-        try:
-            if sem is None:
-                resp = await client.get(url, params=params, timeout=timeout)
-            else:
-                async with sem:
-                    resp = await client.get(url, params=params, timeout=timeout)
-
-            # rate-limit/erros transitórios do servidor
-            if resp.status_code in TRANSIENT_STATUS:
-                # respeitar Retry-After quando existir
-                ra = resp.headers.get("Retry-After")
-                if ra and ra.isdigit():
-                    await asyncio.sleep(min(float(ra), 15.0))
-                else:
-                    await asyncio.sleep(_retry_sleep(attempt))
-                continue
-
-            resp.raise_for_status()
-            data = resp.json()
-            return data.get("items", [])
-
-        except (httpx.RemoteProtocolError, httpx.ReadTimeout, httpx.ConnectTimeout, httpx.NetworkError) as e:
-            last_exc = e
-            await asyncio.sleep(_retry_sleep(attempt))
-            continue
-
-        except httpx.HTTPStatusError as e:
-            # erros "definitivos" (ex: 400/404) normalmente não adianta tentar muito
-            last_exc = e
-            # mas se cair aqui por algum motivo com status transitório, já tratamos acima
-            break
-
-    # se chegou aqui, falhou tudo
-    if last_exc:
-        raise last_exc
-    raise RuntimeError("Falha inesperada em _request_json sem exceção registrada.")
-
-async def fetch_paginated(
-    client: httpx.AsyncClient,
-    path: str,
-    params: dict,
-    sem: asyncio.Semaphore | None = None,
-    page_size: int = 5000,
-    delay: float = 0.15,  # pequeno espaçamento ajuda MUITO
-):
-    frames, offset = [], 0
-
-    while True:
-        q = dict(params)
-        q.update({"offset": offset, "limit": page_size})
-
-        items = await _request_json(client, f"{API_ROOT}/{path}", q, sem)
-
-        if not items:
-            break
-
-        frames.append(pd.DataFrame(items))
-        offset += page_size
-
-        if delay:
-            await asyncio.sleep(delay)
-
-    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
-
-async def load_msc_group(
-    client: httpx.AsyncClient,
-    path: str,
-    classes: list,
-    co_tipo_matriz: str,
-    tipos_balanco: list,
-    meses: list,
-    ente: str,
-    ano: str,
-    sem: asyncio.Semaphore,
-    delay: float = 0.15,
-):
-    tasks = []
-    for classe in map(str, classes):
-        for tipo in tipos_balanco:
-            for mes in meses:
-                params = {
-                    "id_ente": ente,
-                    "an_referencia": ano,
-                    "me_referencia": mes,
-                    "co_tipo_matriz": co_tipo_matriz,
-                    "classe_conta": classe,
-                    "id_tv": tipo,
-                }
-                tasks.append(fetch_paginated(client, path, params, sem=sem, delay=delay))
-
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-
-    dfs = []
-    errs = []
-    for r in results:
-        if isinstance(r, Exception):
-            errs.append(r)
-        elif r is not None and not r.empty:
-            dfs.append(r)
-
-    # se deu erro em tudo, explodimos com a primeira (mas pelo menos não mata à toa quando só 1 falha)
-    if not dfs and errs:
-        raise errs[0]
-
-    return pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
-
-async def load_msc_all(
-    ente: str,
-    ano: str,
-    meses: list,
-    tipos_balanco: list,
-    co_tipo_matriz: str = "MSCC",
-    concurrency: int = 3,   # <- BAIXE ISSO (2..4)
-    delay: float = 0.15,    # <- AUMENTE ISSO (0.10..0.25)
-):
-    sem = asyncio.Semaphore(concurrency)
-
-    limits = httpx.Limits(max_connections=10, max_keepalive_connections=5)
-    timeout = httpx.Timeout(90.0, connect=10.0)
-
-    headers = {
-        "User-Agent": "streamlit-app/msc-analise (httpx)"
-    }
-
-    # IMPORTANTE: forçar HTTP/1.1
-    async with httpx.AsyncClient(http2=False, limits=limits, timeout=timeout, headers=headers) as client:
-        msc_patrimonial = await load_msc_group(client, "msc_patrimonial", [1,2,3,4], co_tipo_matriz, tipos_balanco, meses, ente, ano, sem, delay)
-        msc_orcam       = await load_msc_group(client, "msc_orcamentaria", [5,6],   co_tipo_matriz, tipos_balanco, meses, ente, ano, sem, delay)
-        msc_ctr         = await load_msc_group(client, "msc_controle",     [7,8],   co_tipo_matriz, tipos_balanco, meses, ente, ano, sem, delay)
-
-    return msc_patrimonial, msc_orcam, msc_ctr
-
-
 def run_async(coro):
     try:
         return asyncio.run(coro)
@@ -193,12 +42,15 @@ def run_async(coro):
         finally:
             loop.close()
 
+# Sessões que pedem o mesmo ente/ano/mês ao mesmo tempo aguardam a mesma carga
+@voo_unico()
 def fetch_and_prepare(ente: str, ano: str, mes_selecionado: int):
     meses = list(range(1, mes_selecionado + 1))
     tipos_balanco = ["ending_balance", "beginning_balance", "period_change"]
 
-    msc_patrimonial, msc_orcam, msc_ctr = run_async(
-        load_msc_all(ente, ano, meses, tipos_balanco, co_tipo_matriz="MSCC", concurrency=3, delay=0.15)
+    reportar(0.05, f"Carregando MSC (meses 1 a {mes_selecionado})…")
+    msc_patrimonial, msc_orcam, msc_ctr, versoes, _ = run_async(
+        carregar_msc(ente, ano, meses, tipos_balanco, co_tipo_matriz="MSCC", concurrency=3, delay=0.15)
     )
 
     msc_patrimonial_orig = msc_patrimonial.copy()
@@ -214,6 +66,8 @@ def fetch_and_prepare(ente: str, ano: str, mes_selecionado: int):
         meses_disponiveis = []
         max_mes_disponivel = 0
 
+    invertidos = []  # inversões aplicadas (entram na versão dos dados ajustados)
+
     def _ajusta_retificadoras(msc, prefixos, considerar_period_change=True):
         msc = msc.copy()
         msc["conta_contabil"] = msc["conta_contabil"].astype(str)
@@ -232,10 +86,13 @@ def fetch_and_prepare(ente: str, ano: str, mes_selecionado: int):
             mascara = masks[0]
             for m in masks[1:]:
                 mascara = mascara | m
-            if not (msc.loc[mascara, "valor"] < 0).any():
+            inverter = not (msc.loc[mascara, "valor"] < 0).any()
+            if inverter:
                 msc.loc[mascara, "valor"] *= -1
+            invertidos.append(inverter)
         return msc
 
+    reportar(0.7 if mes_selecionado > 12 else 0.9, "Ajustando contas retificadoras…")
     msc_patrimonial = _ajusta_retificadoras(msc_patrimonial, ["1", "2", "3", "4"], considerar_period_change=True)
     msc_orcam = _ajusta_retificadoras(msc_orcam, ["5", "6"], considerar_period_change=False)
     msc_ctr = _ajusta_retificadoras(msc_ctr, ["7", "8"], considerar_period_change=False)
@@ -256,12 +113,17 @@ def fetch_and_prepare(ente: str, ano: str, mes_selecionado: int):
             "msc_consolidada_b": msc_consolidada_b,
             "msc_orig_consolidada_e": msc_orig_consolidada_e,
             "msc_orig_consolidada_b": msc_orig_consolidada_b,
+            "versoes_orig": versoes_por_mes(versoes),
+            "versoes_ajustada": versoes_por_mes(versoes, extra=repr(invertidos)),
         }
+        reportar(1.0, "MSC carregada.")
         return context, max_mes_disponivel, meses_disponiveis
     else:
-        msc_patr_encerr, msc_orcam_encerr, msc_ctr_encerr = run_async(
-            load_msc_all(ente, ano, [12], tipos_balanco, co_tipo_matriz="MSCE", concurrency=3, delay=0.15)
+        reportar(0.75, "Carregando MSC de encerramento…")
+        msc_patr_encerr, msc_orcam_encerr, msc_ctr_encerr, versoes_encerr, _ = run_async(
+            carregar_msc(ente, ano, [12], tipos_balanco, co_tipo_matriz="MSCE", concurrency=3, delay=0.15)
         )
+        versoes.update(versoes_encerr)
         msc_patr_encerr_orig = msc_patr_encerr.copy()
         msc_orcam_encerr_orig = msc_orcam_encerr.copy()
         msc_ctr_encerr_orig = msc_ctr_encerr.copy()
@@ -296,33 +158,19 @@ def fetch_and_prepare(ente: str, ano: str, mes_selecionado: int):
             "msc_orig_consolidada_b": msc_orig_consolidada_b,
             "msc_encerr": msc_encerr,
             "msc_original_e_b_p_13": msc_original_e_b_p_13,
+            "versoes_orig": versoes_por_mes(versoes),
+            "versoes_ajustada": versoes_por_mes(versoes, extra=repr(invertidos)),
         }
 
+    reportar(1.0, "MSC carregada.")
     return context, max_mes_disponivel, meses_disponiveis
 
 def load_layout_from_upload(uploaded_xlsx, ano: str):
     if uploaded_xlsx is None:
         return None, None
-    data = uploaded_xlsx.getvalue() if hasattr(uploaded_xlsx, "getvalue") else uploaded_xlsx.read()
-    b1 = BytesIO(data)
-    b2 = BytesIO(data)
-    po_stn = pd.read_excel(b1, sheet_name="PO", header=4)
-    if "Código" in po_stn.columns:
-        po_stn = po_stn.rename(columns={"Código": "poder_orgao"})
-        po_stn["poder_orgao"] = pd.to_numeric(po_stn["poder_orgao"], errors='coerce').astype('Int64')
-    elif "C�digo" in po_stn.columns:
-        po_stn = po_stn.rename(columns={"C�digo": "poder_orgao"})
-        po_stn["poder_orgao"] = pd.to_numeric(po_stn["poder_orgao"], errors='coerce').astype('Int64')
-    else:
-        if "poder_orgao" not in po_stn.columns and len(po_stn.columns):
-            po_stn = po_stn.rename(columns={po_stn.columns[0]: "poder_orgao"})
-            po_stn["poder_orgao"] = pd.to_numeric(po_stn["poder_orgao"], errors='coerce').astype('Int64')
-
-    sheet_pcasp = f"PcaspEstendido{ano}"
-    pc_estendido = pd.read_excel(b2, sheet_name=sheet_pcasp, header=3)
-    if 'T�?TULO.1' in pc_estendido.columns and 'TÍTULO.1' not in pc_estendido.columns:
-        pc_estendido = pc_estendido.rename(columns={'T�?TULO.1': 'TÍTULO.1'})
-    pc_estendido["CONTA"] = pc_estendido["CONTA"].astype(str)
+    layout = LayoutSTN.do_upload(uploaded_xlsx, ano)
+    po_stn = layout.po()
+    pc_estendido = layout.pcasp()
     return po_stn, pc_estendido
 
 
@@ -339,6 +187,9 @@ def compute_d1(ano: str, mes_selecionado: int, ente: str, po_stn: pd.DataFrame,
     msc_consolidada = ctx["msc_consolidada"].copy()
     msc_orig_consolidada = ctx["msc_orig_consolidada"].copy()
     msc_consolidada_e = ctx["msc_consolidada_e"].copy()
+    # versão de cada mês: agregações por mês de meses já analisados são reaproveitadas
+    versoes_orig = ctx["versoes_orig"]
+    versoes_ajustada = ctx["versoes_ajustada"]
 
     # D1_00017
     d1_00017_t = msc_orig_consolidada.query('valor < 0')
@@ -353,21 +204,13 @@ def compute_d1(ano: str, mes_selecionado: int, ente: str, po_stn: pd.DataFrame,
     d1_00017.insert(3, 'OBS', f'Cada MSC vale 1/13 - Erros: {erros} - Pontos: {nota}')
 
     # D1_00018
-    msc_base = msc_orig_consolidada.groupby(['tipo_matriz','conta_contabil', 'mes_referencia', 'tipo_valor', 'natureza_conta'])['valor'].sum().reset_index()
-    msc_base['conta_contabil'] = msc_base['conta_contabil'].astype(str)
-    msc_base['Grupo_Contas'] = msc_base['conta_contabil'].str[0]
-    def _ajusta_valor(x):
-        v, g, n, tv = x['valor'], x['Grupo_Contas'], x['natureza_conta'], x['tipo_valor']
-        if tv != 'period_change' and ((g=='1' and n=='C') or (g=='2' and n=='D') or (g=='4' and n=='D') or (g=='5' and n=='C') or (g=='6' and n=='D') or (g=='7' and n=='C') or (g=='8' and n=='D')):
-            v *= -1
-        return v
-    msc_base['valor'] = msc_base.apply(_ajusta_valor, axis=1)
-    def _ajusta_pc(x):
-        v, g, n, tv = x['valor'], x['Grupo_Contas'], x['natureza_conta'], x['tipo_valor']
-        if tv == 'period_change' and ((g=='1' and n=='C') or (g=='2' and n=='D') or (g=='3' and n=='C') or (g=='4' and n=='D') or (g=='5' and n=='C') or (g=='6' and n=='D') or (g=='7' and n=='C') or (g=='8' and n=='D')):
-            v *= -1
-        return v
-    msc_base['valor'] = msc_base.apply(_ajusta_pc, axis=1)
+    def _msc_base(msc):
+        base = msc.groupby(['tipo_matriz','conta_contabil', 'mes_referencia', 'tipo_valor', 'natureza_conta'])['valor'].sum().reset_index()
+        base['conta_contabil'] = base['conta_contabil'].astype(str)
+        base['Grupo_Contas'] = base['conta_contabil'].str[0]
+        return inverter_sinal(base, REGRAS_D1_00018)
+    msc_base = agregado_por_mes('d1_msc_base', msc_orig_consolidada, versoes_orig, _msc_base,
+                                ['tipo_matriz','conta_contabil', 'mes_referencia', 'tipo_valor', 'natureza_conta'])
 
     analise_b = msc_base.query('tipo_valor != "ending_balance"')
     analise_b = analise_b.groupby(['tipo_matriz', 'mes_referencia','conta_contabil'])['valor'].sum().reset_index()
@@ -398,7 +241,10 @@ def compute_d1(ano: str, mes_selecionado: int, ente: str, po_stn: pd.DataFrame,
     codigos_na_msc = msc_orig_consolidada.groupby(['poder_orgao'])['valor'].sum().reset_index()
     codigos_na_msc['poder_orgao'] = pd.to_numeric(codigos_na_msc['poder_orgao'], errors='coerce').astype('Int64')
     d1_00019_t = codigos_na_msc.merge(po_stn, how="left", on="poder_orgao")
-    d1_00019_ta = msc_orig_consolidada.groupby(['mes_referencia', 'poder_orgao'])['valor'].sum().reset_index()
+    d1_00019_ta = agregado_por_mes(
+        'd1_00019_ta', msc_orig_consolidada, versoes_orig,
+        lambda msc: msc.groupby(['mes_referencia', 'poder_orgao'])['valor'].sum().reset_index(),
+        ['mes_referencia', 'poder_orgao'])
     lista_poderes = ['10111', '10112', '20211', '20212', '20213', '30390', '50511', '60611']
     set_poderes_referencia = set(lista_poderes)
     meses_unicos = d1_00019_ta['mes_referencia'].unique()
@@ -419,13 +265,16 @@ def compute_d1(ano: str, mes_selecionado: int, ente: str, po_stn: pd.DataFrame,
     d1_00019.insert(3, 'OBS', f'Cada MSC vale 1/13 - Erros: {erros} - Pontos: {nota}')
 
     # D1_00020
-    msc_consolidada_dif = (
-        msc_orig_consolidada
-        .sort_values(by=["conta_contabil", "mes_referencia", "tipo_valor"])  # ordena
-        .groupby(["conta_contabil", "mes_referencia", "tipo_valor"])["valor"]
-        .sum()
-        .reset_index()
-    )
+    msc_consolidada_dif = agregado_por_mes(
+        'd1_00020_dif', msc_orig_consolidada, versoes_orig,
+        lambda msc: (
+            msc
+            .sort_values(by=["conta_contabil", "mes_referencia", "tipo_valor"])  # ordena
+            .groupby(["conta_contabil", "mes_referencia", "tipo_valor"])["valor"]
+            .sum()
+            .reset_index()
+        ),
+        ["conta_contabil", "mes_referencia", "tipo_valor"])
     msc_dif = msc_consolidada_dif[msc_consolidada_dif["tipo_valor"] != "period_change"].copy()
     msc_dif["diferenca_valor"] = msc_dif.groupby(["conta_contabil"])["valor"].diff()
     msc_dif = msc_dif[msc_dif["tipo_valor"] == "beginning_balance"].copy()
@@ -456,10 +305,13 @@ def compute_d1(ano: str, mes_selecionado: int, ente: str, po_stn: pd.DataFrame,
     ativo_pcasp = ativo_pcasp.groupby(['conta_4', 'CONTA', 'TÍTULO.1', 'NATUREZA DO SALDO', 'STATUS']).sum().reset_index()
     ativo_pcasp = ativo_pcasp.rename(columns={"CONTA": "conta_contabil"})
     msc_consolidada['conta_contabil'] = msc_consolidada['conta_contabil'].astype(str)
-    ativo_msc = msc_consolidada[msc_consolidada['tipo_valor'] != 'period_change']
-    ativo_msc = ativo_msc[(ativo_msc['conta_contabil'].str.startswith('1111')) | (ativo_msc['conta_contabil'].str.startswith('1121')) | (ativo_msc['conta_contabil'].str.startswith('1125')) \
-                          | (ativo_msc['conta_contabil'].str.startswith('1231')) | (ativo_msc['conta_contabil'].str.startswith('1232'))]
-    ativo_msc = ativo_msc.groupby(['mes_referencia', 'tipo_matriz', 'conta_contabil'], as_index=False)['valor'].sum()
+    def _ativo_msc(msc):
+        ativo = msc[msc['tipo_valor'] != 'period_change']
+        ativo = ativo[(ativo['conta_contabil'].str.startswith('1111')) | (ativo['conta_contabil'].str.startswith('1121')) | (ativo['conta_contabil'].str.startswith('1125')) \
+                      | (ativo['conta_contabil'].str.startswith('1231')) | (ativo['conta_contabil'].str.startswith('1232'))]
+        return ativo.groupby(['mes_referencia', 'tipo_matriz', 'conta_contabil'], as_index=False)['valor'].sum()
+    ativo_msc = agregado_por_mes('d1_00021_ativo', msc_consolidada, versoes_ajustada, _ativo_msc,
+                                 ['mes_referencia', 'tipo_matriz', 'conta_contabil'])
     ativo_msc['natureza_conta'] = ativo_msc['valor'].apply(lambda x: 'D' if x >= 0 else 'C')
     erro_ativo = ativo_msc.merge(ativo_pcasp, on='conta_contabil', how="left")
     if 'NATUREZA DO SALDO' in erro_ativo.columns:
@@ -485,7 +337,10 @@ def compute_d1(ano: str, mes_selecionado: int, ente: str, po_stn: pd.DataFrame,
     msc_consolidada['msc_consolidada_null_or_empty'] = msc_consolidada['poder_orgao'].isna() | (msc_consolidada['poder_orgao'] == '')
     d1_00022_t = msc_consolidada.query('msc_consolidada_null_or_empty == True')
     d1_00022_t = d1_00022_t.drop(columns=['msc_consolidada_null_or_empty'])
-    d1_00022_ta = msc_consolidada.groupby(['mes_referencia', 'tipo_matriz'])['valor'].sum().reset_index()
+    d1_00022_ta = agregado_por_mes(
+        'd1_00022_ta', msc_consolidada, versoes_ajustada,
+        lambda msc: msc.groupby(['mes_referencia', 'tipo_matriz'])['valor'].sum().reset_index(),
+        ['mes_referencia', 'tipo_matriz'])
     contagem = d1_00022_t.mes_referencia.unique() if not d1_00022_t.empty else []
     erros = len(contagem)
     nota = (100/13) * (13-erros)
@@ -698,8 +553,11 @@ def compute_d1(ano: str, mes_selecionado: int, ente: str, po_stn: pd.DataFrame,
     # D1_00034
     filtro_1 = pc_estendido[pc_estendido['CONTA'].str.match(r"^(311|312|313|321|322|323|331|332|333|351|352|353|361|362|363)")]
     vpd_pcasp = filtro_1.groupby(['CONTA', 'TÍTULO.1', 'NATUREZA DO SALDO', 'STATUS']).sum().reset_index()
-    vpd_msc = msc_consolidada_e[msc_consolidada_e['conta_contabil'].str.match(r"^(311|312|313|321|322|323|331|332|333|351|352|353|361|362|363)")]
-    vpd_msc = vpd_msc.groupby(['conta_contabil', 'natureza_conta', 'mes_referencia'])['valor'].sum().reset_index()
+    vpd_msc = agregado_por_mes(
+        'd1_00034_vpd', msc_consolidada_e, versoes_ajustada,
+        lambda msc: msc[msc['conta_contabil'].str.match(r"^(311|312|313|321|322|323|331|332|333|351|352|353|361|362|363)")]
+        .groupby(['conta_contabil', 'natureza_conta', 'mes_referencia'])['valor'].sum().reset_index(),
+        ['conta_contabil', 'natureza_conta', 'mes_referencia'])
     vpd_msc.rename(columns={'conta_contabil': 'CONTA', 'natureza_conta': 'NATUREZA_VALOR', 'valor': 'VALOR'}, inplace=True)
     erro_vpd = vpd_msc.merge(vpd_pcasp, on='CONTA', how="left")
     erro_vpd = erro_vpd[(erro_vpd['VALOR'] != 0)]
@@ -721,8 +579,11 @@ def compute_d1(ano: str, mes_selecionado: int, ente: str, po_stn: pd.DataFrame,
     # D1_00035
     filtro_1 = pc_estendido[pc_estendido['CONTA'].str.match(r"^(411|412|413|421|422|423|424)")]
     vpa_pcasp = filtro_1.groupby(['CONTA', 'TÍTULO.1', 'NATUREZA DO SALDO', 'STATUS']).sum().reset_index()
-    vpa_msc = msc_consolidada_e[msc_consolidada_e['conta_contabil'].str.match(r"^(411|412|413|421|422|423|424)")]
-    vpa_msc = vpa_msc.groupby(['conta_contabil', 'natureza_conta', 'mes_referencia'])['valor'].sum().reset_index()
+    vpa_msc = agregado_por_mes(
+        'd1_00035_vpa', msc_consolidada_e, versoes_ajustada,
+        lambda msc: msc[msc['conta_contabil'].str.match(r"^(411|412|413|421|422|423|424)")]
+        .groupby(['conta_contabil', 'natureza_conta', 'mes_referencia'])['valor'].sum().reset_index(),
+        ['conta_contabil', 'natureza_conta', 'mes_referencia'])
     vpa_msc.rename(columns={'conta_contabil': 'CONTA', 'natureza_conta': 'NATUREZA_VALOR', 'valor': 'VALOR'}, inplace=True)
     erro_vpa = vpa_msc.merge(vpa_pcasp, on='CONTA', how="left")
     erro_vpa = erro_vpa[(erro_vpa['VALOR'] != 0)]
@@ -874,11 +735,16 @@ if executar:
             st.error('Nao foi possivel ler o leiaute enviado. Verifique o arquivo e tente novamente.')
             st.stop()
 
+        # progresso da carga (compartilhado com outras sessões que pedem o mesmo ente/ano/mês)
+        barra_carga = st.progress(0.0)
         try:
-            d1, detalhes, max_mes_disponivel, meses_disponiveis = compute_d1(ano=ano, mes_selecionado=int(mes), ente=ENTE_FIXO, po_stn=po_stn, pc_estendido=pc_estendido)
+            with acompanhar(lambda fracao, texto: barra_carga.progress(fracao, text=texto)):
+                d1, detalhes, max_mes_disponivel, meses_disponiveis = compute_d1(ano=ano, mes_selecionado=int(mes), ente=ENTE_FIXO, po_stn=po_stn, pc_estendido=pc_estendido)
         except Exception as e:
             st.exception(e)
             st.stop()
+        finally:
+            barra_carga.empty()
 
     # Verificar se o mês selecionado tem dados na API
     if max_mes_disponivel < int(mes):
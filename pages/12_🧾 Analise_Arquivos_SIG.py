@@ -6,7 +6,11 @@ Comparação entre arquivo TXT do SIG003 e exportação CSV do Flexvision
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 from core.layout import setup_page, sidebar_menu, get_app_menu
+from core.largura_fixa import ler_largura_fixa
+from core.msc_csv import ler_csv_texto
+from core.comparacao import comparar
 
 # ============================================================================
 # CONFIGURAÇÃO DA PÁGINA
@@ -91,6 +95,8 @@ COLUMNS_TXT = [
     'RECEITA_PREVISTA', 'ALTERACAO_PREVISAO_RECEITA', 'RECEITA_ARRECADADA', 'RECEITA_A_ARRECADAR'
 ]
 
+CAMPOS_TXT = dict(zip(COLUMNS_TXT, COLSPECS_TXT))
+
 # ============================================================================
 # FUNÇÕES AUXILIARES
 # ============================================================================
@@ -136,53 +142,76 @@ def aggregate_by_key(df: pd.DataFrame) -> pd.DataFrame:
     if "chave" not in df.columns:
         return df
 
-    agg_dict = {}
+    # Equivale a groupby("chave", dropna=False).agg(sum / first): chaves em
+    # ordem (nula por último), soma por bincount e, nas demais colunas, o
+    # primeiro valor não nulo de cada chave
+    codigos, chaves = pd.factorize(df["chave"], use_na_sentinel=False)
+    chaves = np.asarray(chaves, dtype=object)
+    nulas = pd.isna(chaves)
+    ordem = np.concatenate([
+        np.flatnonzero(~nulas)[np.argsort(chaves[~nulas].astype(str), kind='stable')],
+        np.flatnonzero(nulas),
+    ])
+    posicao = np.empty(len(ordem), dtype=np.int64)
+    posicao[ordem] = np.arange(len(ordem))
+    codigos = posicao[codigos]
+
+    aggregated = {"chave": chaves[ordem]}
     for col in df.columns:
         if col == "chave":
             continue
         if col in COLS_VAL:
-            agg_dict[col] = "sum"
+            aggregated[col] = np.bincount(codigos, weights=df[col].fillna(0).to_numpy(dtype=float),
+                                          minlength=len(ordem))
         else:
-            agg_dict[col] = "first"
+            # atribuição com índices repetidos fica com o último valor: em ordem
+            # reversa, é a primeira linha não nula de cada chave
+            linhas = np.flatnonzero(df[col].notna().to_numpy())[::-1]
+            primeira = np.full(len(ordem), -1)
+            primeira[codigos[linhas]] = linhas
+            valores = np.full(len(ordem), np.nan, dtype=object)
+            valores[primeira >= 0] = df[col].to_numpy()[primeira[primeira >= 0]]
+            aggregated[col] = valores
+    return pd.DataFrame(aggregated)
+
 
-    aggregated = df.groupby("chave", dropna=False).agg(agg_dict).reset_index()
-    cols_ordered = ["chave"] + [c for c in df.columns if c != "chave"]
-    aggregated = aggregated[[c for c in cols_ordered if c in aggregated.columns]]
-    return aggregated
+def texto_por_valor(serie: pd.Series, funcao=None) -> pd.Series:
+    """Categórica -> texto como em `astype(str)` (nulo -> 'nan'), aplicando `funcao` uma vez por categoria."""
+    valores = [str(c) for c in serie.cat.categories] + ['nan']
+    if funcao is not None:
+        valores = [funcao(v) for v in valores]
+    return pd.Series(np.array(valores, dtype=object)[serie.cat.codes.to_numpy()], index=serie.index)
 
 
 def process_txt(uploaded_file):
     """Processa o arquivo TXT do SIG003."""
-    df = pd.read_fwf(
-        uploaded_file,
-        colspecs=COLSPECS_TXT,
-        names=COLUMNS_TXT,
-        encoding='latin1',
-        header=None,
-        dtype=str
-    )
+    # Códigos como categóricas e valores já numéricos (formato PT-BR)
+    df = ler_largura_fixa(uploaded_file, CAMPOS_TXT, numericos=COLS_VAL_TXT)
+    df['RECEITA_ARRECADADA'] = df['RECEITA_ARRECADADA'].abs()
+
+    # Soma as linhas repetidas ainda sobre os códigos
+    cols_codigo = [c for c in COLUMNS_TXT if c not in COLS_VAL_TXT]
+    df = df.groupby(cols_codigo, observed=True, dropna=False, sort=False)[COLS_VAL_TXT].sum().reset_index()
 
-    # Monta colunas derivadas
-    df['FONTE'] = df['COD_GRUPO_FONTE'].astype(str).str.zfill(1) + df['COD_FONTE'].astype(str).str.zfill(2)
+    # Monta colunas derivadas (texto calculado uma vez por categoria)
+    df['FONTE'] = (texto_por_valor(df['COD_GRUPO_FONTE'], lambda v: v.zfill(1)) +
+                   texto_por_valor(df['COD_FONTE'], lambda v: v.zfill(2)))
     df.drop(columns=['COD_GRUPO_FONTE', 'COD_FONTE'], inplace=True)
     df.insert(4, 'FONTE', df.pop('FONTE'))
 
     df['FONTE_COMPLETA'] = (
-        df['COD_IDENT_EXERCICIO_FONTE'].astype(str) +
-        df['FONTE'].astype(str) +
-        df['COD_MARCADOR_FONTE'].astype(str)
+        texto_por_valor(df['COD_IDENT_EXERCICIO_FONTE']) +
+        df['FONTE'] +
+        texto_por_valor(df['COD_MARCADOR_FONTE'])
     )
     df.insert(3, 'FONTE_COMPLETA', df.pop('FONTE_COMPLETA'))
 
-    df['chave'] = df['POSICAO'] + df['COD_UG'] + df['COD_NAT_RECEITA'] + df['FONTE_COMPLETA'] 
+    for col in ['POSICAO', 'COD_UG', 'COD_NAT_RECEITA', 'COD_IDENT_EXERCICIO_FONTE', 'COD_MARCADOR_FONTE']:
+        df[col] = df[col].astype(object)
 
-    ensure_columns(df, COLS_VAL)
+    df['chave'] = df['POSICAO'] + df['COD_UG'] + df['COD_NAT_RECEITA'] + df['FONTE_COMPLETA']
 
-    # Conversão das colunas de valores para float
-    for col in COLS_VAL_TXT:
-        df[col] = to_float_ptbr(df[col])
-        if col == "RECEITA_ARRECADADA":
-            df[col] = df[col].abs()
+    ensure_columns(df, COLS_VAL)
 
     # Agrega por chave para evitar duplicidades
     df = aggregate_by_key(df)
@@ -202,12 +231,7 @@ def process_txt(uploaded_file):
 
 def process_flex(uploaded_file):
     """Processa o arquivo CSV do Flexvision."""
-    flex = pd.read_csv(
-        uploaded_file,
-        sep=';',
-        dtype=str,
-        encoding='latin1',
-    )
+    flex = ler_csv_texto(uploaded_file, sep=';', encoding='latin1')
 
     # Ajustes de colunas
     flex['COD_NAT_RECEITA'] = flex['COD_NAT_RECEITA'].astype(str).str.slice(0, 8)
@@ -276,45 +300,35 @@ def compare_dataframes(txt_df: pd.DataFrame, flex_df: pd.DataFrame, nome: str) -
     Returns:
         DataFrame com as diferenças
     """
-    # Remove linhas de TOTAL antes do merge
+    # Remove linhas de TOTAL antes da comparação
     txt_clean = txt_df[txt_df.iloc[:, 0] != 'TOTAL'].copy()
     flex_clean = flex_df[flex_df.iloc[:, 0] != 'TOTAL'].copy()
 
-    # Verifica se as colunas de merge existem
+    # Verifica se as colunas da chave existem
     merge_cols = [c for c in COLS_MERGE if c in txt_clean.columns and c in flex_clean.columns]
 
     if not merge_cols:
         st.warning(f"⚠️ Não foi possível realizar a comparação de {nome} - colunas de merge ausentes")
         return pd.DataFrame()
 
-    # Faz o merge
-    merged = pd.merge(
+    # Soma e diferença por chave (colunas da chave fatoradas, sem concatenar),
+    # levando as demais colunas de cada lado com os sufixos _TXT/_FLEX
+    descritivas = [
+        c for c in dict.fromkeys([*txt_clean.columns, *flex_clean.columns])
+        if c not in merge_cols and c not in COLS_VAL
+    ]
+    merged = comparar(
         txt_clean,
         flex_clean,
-        on="chave",
-        how='outer',
-        suffixes=('_TXT', '_FLEX'),
-        indicator=True
+        merge_cols,
+        COLS_VAL,
+        sufixos=('_TXT', '_FLEX'),
+        todas=True,
+        descritivas=descritivas
     )
-
-    # Calcula as diferenças
-    for col in COLS_VAL:
-        txt_col = f'{col}_TXT'
-        flex_col = f'{col}_FLEX'
-
-        # Preenche valores ausentes com 0
-        if txt_col in merged.columns:
-            merged[txt_col] = merged[txt_col].fillna(0)
-        else:
-            merged[txt_col] = 0
-
-        if flex_col in merged.columns:
-            merged[flex_col] = merged[flex_col].fillna(0)
-        else:
-            merged[flex_col] = 0
-
-        # Calcula diferença
-        merged[f'DIF_{col}'] = merged[txt_col] - merged[flex_col]
+    if 'chave' in descritivas:
+        chave_txt, chave_flex = merged.pop('chave_TXT'), merged.pop('chave_FLEX')
+        merged.insert(0, 'chave', chave_txt.where(chave_txt.notna(), chave_flex))
 
     # Adiciona linha de totais
     total_row = {}
@@ -1,6 +1,8 @@
 import streamlit as st
-import pandas as pd
 from core.layout import setup_page, sidebar_menu, get_app_menu
+from api_ranking.services.layout_stn import LayoutSTN
+from core.msc_csv import ler_msc_csv, COLUNAS_TIPO
+from core.conformidade_leiaute import conferir_leiaute
 
 # ============================================================================
 # CONFIGURAÇÃO DA PÁGINA
@@ -39,48 +41,14 @@ st.divider() # Linha divisória visual
 # --- FUNÇÃO DE PROCESSAMENTO ---
 @st.cache_data(show_spinner=False)
 def processar_dados(file_layout, file_msc):
-    colunas_para_chave = ['TIPO1', 'TIPO2', 'TIPO3', 'TIPO4', 'TIPO5', 'TIPO6']
-
     # 1. Carregar Layout
-    df_portaria = pd.read_excel(file_layout, sheet_name='Leiaute MSC', header=3, dtype=str)
-    df_portaria = df_portaria[['CONTA', 'TIPO1', 'TIPO2', 'TIPO3', 'TIPO4', 'TIPO5', 'TIPO6']]
-    df_portaria['chave'] = df_portaria[colunas_para_chave].fillna('').apply(lambda x: ''.join(x), axis=1)
-    df_portaria = df_portaria[['CONTA', 'chave']]
-
-    # 2. Carregar MSC
-    df_msc_siafe = pd.read_csv(file_msc, sep=';', header=1, dtype=str)
-    df_msc_siafe = df_msc_siafe[['CONTA', 'TIPO1', 'TIPO2', 'TIPO3', 'TIPO4', 'TIPO5', 'TIPO6']]
-    df_msc_siafe['chave'] = df_msc_siafe[colunas_para_chave].fillna('').apply(lambda x: ''.join(x), axis=1)
-    df_msc_siafe = df_msc_siafe[['CONTA', 'chave']]
-
-    # 3. Comparação
-    df_diff = pd.merge(df_portaria, df_msc_siafe, on=['CONTA'], how='inner', suffixes=('_portaria', '_msc'))
-    df_diff['diferenca'] = df_diff['chave_portaria'] != df_diff['chave_msc']
-
-    def categorizar_diferenca(row):
-        if not row['diferenca']:
-            return 'OK'
-        
-        portaria = str(row['chave_portaria'])
-        msc = str(row['chave_msc'])
-        
-        if portaria.startswith(msc):
-            return 'MSCFaltandoComponente'
-        elif msc.startswith(portaria):
-            return 'PortariaFaltandoComponente'
-        else:
-            return 'MismatchTotal'
-
-    df_diff['status_comparacao'] = df_diff.apply(categorizar_diferenca, axis=1)
-
-    # 4. Agrupamento para análise
-    df_analise = df_diff.groupby(['CONTA','diferenca','status_comparacao','chave_portaria','chave_msc']).size().reset_index(name='quantidade')
-    
-    # 5. Filtrar apenas erros
-    df_analise_erro = df_analise.query("status_comparacao != 'OK'")
-    df_analise_erro = df_analise_erro[['CONTA', 'status_comparacao','chave_portaria','chave_msc']]
-    
-    return df_analise_erro
+    df_portaria = LayoutSTN.do_upload(file_layout).leiaute()
+
+    # 2. Carregar MSC (só a conta e as informações complementares)
+    df_msc_siafe = ler_msc_csv(file_msc, colunas=['CONTA', *COLUNAS_TIPO])
+
+    # 3. Comparação por (CONTA, chave) distintos; retorna apenas as divergências
+    return conferir_leiaute(df_portaria, df_msc_siafe)
 
 # --- EXIBIÇÃO DOS RESULTADOS ---
 
@@ -1,6 +1,6 @@
 import streamlit as st
-import pandas as pd
 from core.layout import setup_page, sidebar_menu, get_app_menu
+from core.planilhas import ler_planilha
 
 # ============================================================================
 # CONFIGURAÇÃO DA PÁGINA
@@ -57,7 +57,7 @@ st.divider()
 @st.cache_data(show_spinner=False)
 def processar_analises(arquivo_pc, arquivo_flex):
     # 1. Carregar e tratar Plano de Contas
-    pc = pd.read_excel(arquivo_pc, header=3, dtype=str)
+    pc = ler_planilha(arquivo_pc, cabecalho=3, dtype=str)
     
     # Tratamento conforme script original
     # Remove primeira linha (cabeçalho extra?) e as 3 últimas (rodapé)
@@ -86,7 +86,7 @@ def processar_analises(arquivo_pc, arquivo_flex):
     df_analise3 = pc[condicao_transf_sim & condicao_g5_g6]
 
     # 2. Carregar e tratar Flexvision
-    flex = pd.read_excel(arquivo_flex, header=3, dtype=str)
+    flex = ler_planilha(arquivo_flex, cabecalho=3, dtype=str)
     flex = flex.iloc[:-5] # Remove rodapé
     flex = flex.rename(columns={'Conta contábil': 'Conta'})
 
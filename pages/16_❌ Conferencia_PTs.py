@@ -3,6 +3,7 @@ import pandas as pd
 import io
 import re
 from core.layout import setup_page, sidebar_menu, get_app_menu
+from core.planilhas import ler_planilha
 
 # ============================================================================
 # CONFIGURAÇÃO DA PÁGINA
@@ -54,8 +55,7 @@ def extrair_campos_orcamentarios_rp_pago(conta_corrente):
 @st.cache_data(show_spinner=False)
 def processar_base_acoes(arquivo_acoes, filtrar_apenas_ativas=False):
     """Processa a base de ações do SIAFERIO"""
-    base_acoes = pd.read_excel(arquivo_acoes, header=3, dtype="object")
-    base_acoes = base_acoes.drop(base_acoes.tail(3).index)
+    base_acoes = ler_planilha(arquivo_acoes, cabecalho=3, fim=3, dtype="object")
     
     # Split da UO e Esfera
     q1 = base_acoes['Unidade Orçamentária'].str.split('-', expand=True)
@@ -91,8 +91,7 @@ def processar_base_acoes(arquivo_acoes, filtrar_apenas_ativas=False):
 @st.cache_data(show_spinner=False)
 def processar_rp_a_pagar(arquivo_rp, base_acoes):
     """Processa RP a Pagar (conta 632110101) - MÉTODO ORIGINAL"""
-    rp_saldo = pd.read_excel(arquivo_rp, header=3, dtype="object")
-    rp_saldo = rp_saldo.drop(rp_saldo.tail(7).index)
+    rp_saldo = ler_planilha(arquivo_rp, cabecalho=3, fim=7, dtype="object")
     rp_saldo = rp_saldo.query('Saldo != 0')
     
     # Split da Conta Corrente (método original)
@@ -172,8 +171,7 @@ def processar_rp_a_pagar(arquivo_rp, base_acoes):
 @st.cache_data(show_spinner=False)
 def processar_rp_pagos_cancelados(arquivo_rp, base_acoes):
     """Processa RP Pagos/Cancelados (contas 631x e 632x) - MÉTODO COM REGEX"""
-    rp_saldo = pd.read_excel(arquivo_rp, header=3, dtype="object")
-    rp_saldo = rp_saldo.drop(rp_saldo.tail(7).index)
+    rp_saldo = ler_planilha(arquivo_rp, cabecalho=3, fim=7, dtype="object")
     
     # Converter Saldo para numérico e filtrar
     rp_saldo['Saldo'] = pd.to_numeric(rp_saldo['Saldo'], errors='coerce')
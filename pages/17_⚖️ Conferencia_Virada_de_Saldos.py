@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import io
 from core.layout import setup_page, sidebar_menu, get_app_menu
+from core.planilhas import Leitura, ler_planilhas
 
 # ============================================================================
 # CONFIGURAÇÃO DA PÁGINA
@@ -42,13 +43,19 @@ def processar_virada_exercicio(arq_ant, arq_prox, arq_pc, origem):
     # --- 1. Leitura e Limpeza Dinâmica baseada na Origem ---
     if "SIAFERIO" in origem:
         h_val = 8 # Header específico para SIAFERIO
-        f_cut = -3 # Corte de rodapé para SIAFERIO
+        f_cut = 3 # Corte de rodapé para SIAFERIO
     else:
         h_val = 3 # Header para FLEXVISION
-        f_cut = -7 # Corte de rodapé para FLEXVISION
-
-    df_ant = pd.read_excel(arq_ant, header=h_val).iloc[1:f_cut]
-    df_prox = pd.read_excel(arq_prox, header=h_val).iloc[1:f_cut]
+        f_cut = 7 # Corte de rodapé para FLEXVISION
+
+    # Balancetes e Plano de Contas lidos em paralelo
+    planilhas = ler_planilhas({
+        'ant': Leitura(arq_ant, cabecalho=h_val, inicio=1, fim=f_cut),
+        'prox': Leitura(arq_prox, cabecalho=h_val, inicio=1, fim=f_cut),
+        'pc': Leitura(arq_pc, cabecalho=3, inicio=1, fim=3),
+    })
+    df_ant = planilhas['ant']
+    df_prox = planilhas['prox']
     
     # Limpeza de espaços nos nomes das colunas para evitar erros de busca
     df_ant.columns = df_ant.columns.str.strip()
@@ -60,7 +67,7 @@ def processar_virada_exercicio(arq_ant, arq_prox, arq_pc, origem):
         df_prox = df_prox[~df_prox['Conta Contábil'].astype(str).str.contains(r'^[-\s]+$')]
 
     # Leitura do Plano de Contas
-    pc_data = pd.read_excel(arq_pc, header=3).iloc[1:-3]
+    pc_data = planilhas['pc']
     pc_data.columns = pc_data.columns.str.strip()
     pc_data = pc_data.query('`A/S` == "A"')
 
@@ -2,6 +2,9 @@ import streamlit as st
 import pandas as pd
 import io
 from core.layout import setup_page, sidebar_menu, get_app_menu
+from core.largura_fixa import ler_largura_fixa
+from core.comparacao import comparar
+from core.planilhas import Leitura, ler_planilhas
 
 # ============================================================================
 # CONFIGURAÇÃO DA PÁGINA
@@ -13,38 +16,33 @@ st.title("✔️ Conferência da Carga da Receita da LOA no Siaferio")
 
 
 ### Funções ###
-def processar_extracao(file, nome_origem):
-    """Processa os arquivos Excel de extração"""
-    df = pd.read_excel(file, dtype=str)
+def processar_extracao(df, nome_origem):
+    """Processa os arquivos Excel de extração (já lidos)"""
     cols_remover = ['COD_UO', 'COD_AREA_GEOGRAFICA', 'COD_REGRA_LME']
     df = df.drop(columns=cols_remover, errors='ignore')
     
     df['VAL_MOVIMENTO'] = pd.to_numeric(df['VAL_MOVIMENTO'], errors='coerce').fillna(0)
     df['COD_FONTE_RJ'] = df['COD_GRUPO_FONTE'].fillna('') + df['COD_FONTE'].fillna('')
-    
-    # Chave: UG + Ano + STN + RJ + Natureza
-    cols_chave = ['COD_UG', 'COD_ANO_FONTE', 'COD_FONTE_STN', 'COD_FONTE_RJ', 'NATUREZA_RECEITA']
-    df['Chave'] = df[cols_chave].astype(str).agg(''.join, axis=1)
     df['ORIGEM'] = nome_origem
     return df
 
+# Posições nos últimos 54 caracteres de cada linha do TXT de carga
+CAMPOS_TXT = {
+    'COD_UG': (0, 6),
+    'NATUREZA_RECEITA': (6, 16),
+    'COD_ANO_FONTE': (16, 17),
+    'COD_FONTE_STN': (17, 20),
+    'COD_FONTE_RJ': (20, 23),
+    'VAL_MOVIMENTO': (31, 48),
+}
+
+# Chave do cruzamento: UG + Ano + STN + RJ + Natureza
+COLS_CHAVE = ['COD_UG', 'COD_ANO_FONTE', 'COD_FONTE_STN', 'COD_FONTE_RJ', 'NATUREZA_RECEITA']
+
 def processar_txt(file):
     """Processa o arquivo TXT baseado nas posições fixas"""
-    conteudo = file.getvalue().decode("latin-1")
-    df_txt = pd.DataFrame(conteudo.splitlines(), columns=['linha'])
-    
-    # Extração dos últimos 54 caracteres
-    dados = df_txt['linha'].str.strip().str[-54:]
-    
-    df_txt['COD_UG'] = dados.str.slice(0, 6)
-    df_txt['NATUREZA_RECEITA'] = dados.str.slice(6, 16)
-    df_txt['COD_ANO_FONTE'] = dados.str.slice(16, 17)
-    df_txt['COD_FONTE_STN'] = dados.str.slice(17, 20)
-    df_txt['COD_FONTE_RJ'] = dados.str.slice(20, 23)
-    df_txt['VAL_MOVIMENTO'] = pd.to_numeric(dados.str.slice(31, 48), errors='coerce').fillna(0) / 100
-    
-    cols_chave = ['COD_UG', 'COD_ANO_FONTE', 'COD_FONTE_STN', 'COD_FONTE_RJ', 'NATUREZA_RECEITA']
-    df_txt['Chave'] = df_txt[cols_chave].astype(str).agg(''.join, axis=1)
+    df_txt = ler_largura_fixa(file, CAMPOS_TXT, numericos=['VAL_MOVIMENTO'], aparar=False, ultimos=54)
+    df_txt['VAL_MOVIMENTO'] = df_txt['VAL_MOVIMENTO'].fillna(0) / 100
     return df_txt
 
 # --- INTERFACE PRINCIPAL ---
@@ -70,35 +68,28 @@ if file_bruta and file_fundeb and file_txt:
     if st.button("🚀 Iniciar Análise"):
         with st.spinner("Comparando dados..."):
             # Processamento
-            df_rec = processar_extracao(file_bruta, 'RECEITA_BRUTA')
-            df_fun = processar_extracao(file_fundeb, 'DEDUCAO_FUNDEB')
+            planilhas = ler_planilhas({
+                'bruta': Leitura(file_bruta, dtype=str),
+                'fundeb': Leitura(file_fundeb, dtype=str),
+            })
+            df_rec = processar_extracao(planilhas['bruta'], 'RECEITA_BRUTA')
+            df_fun = processar_extracao(planilhas['fundeb'], 'DEDUCAO_FUNDEB')
             df_excel_total = pd.concat([df_rec, df_fun], ignore_index=True)
             
             df_txt_total = processar_txt(file_txt)
             
-            # Cruzamento
-            df_relatorio = pd.merge(
-                df_excel_total.groupby('Chave')['VAL_MOVIMENTO'].sum().reset_index(),
-                df_txt_total.groupby('Chave')['VAL_MOVIMENTO'].sum().reset_index(),
-                on='Chave', how='outer', suffixes=('_EXTRACAO', '_TXT')
-            ).fillna(0)
-            
-            df_relatorio['DIFERENCA'] = df_relatorio['VAL_MOVIMENTO_EXTRACAO'] - df_relatorio['VAL_MOVIMENTO_TXT']
-            
-            # Filtro de divergências (ignora diferenças menores que 1 centavo)
-            df_final = df_relatorio[df_relatorio['DIFERENCA'].abs() > 0.01].copy()
+            # Cruzamento por chave (ignora diferenças menores que 1 centavo)
+            df_final = comparar(
+                df_excel_total, df_txt_total, COLS_CHAVE, ['VAL_MOVIMENTO'],
+                sufixos=('_EXTRACAO', '_TXT'), tolerancia=0.01, exclusivas=False
+            ).rename(columns={'DIF_VAL_MOVIMENTO': 'DIFERENCA'})
             
             if len(df_final) > 0:
-                # Explodir Chave para colunas legíveis
-                fatias = {
-                    'COD_UG': (0, 6), 'COD_ANO_FONTE': (6, 7), 'COD_FONTE_STN': (7, 10),
-                    'COD_GRUPO_FONTE': (10, 11), 'COD_FONTE': (11, 13), 'NATUREZA_RECEITA': (13, 23)
-                }
-                for col, (ini, fim) in fatias.items():
-                    df_final[col] = df_final['Chave'].str.slice(ini, fim)
-                
-                cols_ordem = list(fatias.keys()) + ['VAL_MOVIMENTO_EXTRACAO', 'VAL_MOVIMENTO_TXT', 'DIFERENCA']
-                df_final = df_final[cols_ordem]
+                # Separa a fonte RJ em grupo + fonte
+                fonte_rj = df_final.pop('COD_FONTE_RJ').astype(str)
+                df_final.insert(3, 'COD_GRUPO_FONTE', fonte_rj.str.slice(0, 1))
+                df_final.insert(4, 'COD_FONTE', fonte_rj.str.slice(1, 3))
+                df_final = df_final.drop(columns='_merge')
 
                 st.warning(f"Foram encontradas {len(df_final)} divergências.")
                 st.dataframe(df_final, use_container_width=True)
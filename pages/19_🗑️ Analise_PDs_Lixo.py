@@ -4,6 +4,7 @@ import io
 import re
 from datetime import datetime
 from core.layout import setup_page, sidebar_menu, get_app_menu
+from core.planilhas import Leitura, ler_planilhas
 
 # =============================================================================
 # CONFIGURAÇÃO DA PÁGINA
@@ -48,8 +49,16 @@ def is_status_paga(status: str) -> bool:
 # =============================================================================
 # LEITURAS DOS RELATÓRIOS
 # =============================================================================
-def ler_doc_pds(file_obj) -> pd.DataFrame:
-    df = pd.read_excel(file_obj, header=3)
+# Relatórios com cabeçalho na linha 3 e 7 linhas de rodapé
+def leituras_relatorios(up_docs, up_saldos, up_obs) -> dict:
+    return {
+        "docs": Leitura(up_docs, cabecalho=3, fim=7),
+        "saldos": Leitura(up_saldos, cabecalho=3, fim=7, dtype=str),
+        "obs": Leitura(up_obs, cabecalho=3, fim=7, dtype=str),
+    }
+
+
+def tratar_doc_pds(df: pd.DataFrame) -> pd.DataFrame:
 
     obrigatorias = {"Valor", "Unidade Gestora", "PD"}
     if not obrigatorias.issubset(set(df.columns)):
@@ -57,7 +66,7 @@ def ler_doc_pds(file_obj) -> pd.DataFrame:
         raise ValueError(f"Arquivo de DOCs não contém as colunas obrigatórias: {faltando}.")
 
     df["Valor"] = pd.to_numeric(df["Valor"], errors="coerce").astype("float64")
-    df = df.iloc[:-7].reset_index(drop=True)
+    df = df.reset_index(drop=True)
 
     df["Unidade Gestora"] = df["Unidade Gestora"].apply(normalizar_ug)
     df["PD"] = df["PD"].apply(normalizar_pd)
@@ -70,8 +79,7 @@ def ler_doc_pds(file_obj) -> pd.DataFrame:
     return df
 
 
-def ler_saldo_pds(file_obj) -> pd.DataFrame:
-    df = pd.read_excel(file_obj, header=3, dtype=str)
+def tratar_saldo_pds(df: pd.DataFrame) -> pd.DataFrame:
 
     obrigatorias = {"Valor", "Unidade Gestora", "Conta Corrente"}
     if not obrigatorias.issubset(set(df.columns)):
@@ -79,7 +87,7 @@ def ler_saldo_pds(file_obj) -> pd.DataFrame:
         raise ValueError(f"Arquivo de Saldos não contém as colunas obrigatórias: {faltando}.")
 
     df["Valor"] = pd.to_numeric(df["Valor"], errors="coerce").astype("float64")
-    df = df.iloc[:-7].reset_index(drop=True)
+    df = df.reset_index(drop=True)
 
     df["Unidade Gestora"] = df["Unidade Gestora"].apply(normalizar_ug)
     df["Conta Corrente"] = df["Conta Corrente"].astype(str)
@@ -94,14 +102,13 @@ def ler_saldo_pds(file_obj) -> pd.DataFrame:
     return df
 
 
-def ler_obs_pagamentos(file_obj) -> pd.DataFrame:
+def tratar_obs_pagamentos(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Lê a consulta 079491 (OBs).
+    Trata a consulta 079491 (OBs).
     Esperado: colunas com Unidade Gestora, PD e OB.
-    Mantém o mesmo padrão: header=3 e remove as últimas 7 linhas.
+    Lida no mesmo padrão dos demais relatórios (ver `leituras_relatorios`).
     """
-    df = pd.read_excel(file_obj, header=3, dtype=str)
-    df = df.iloc[:-7].reset_index(drop=True)
+    df = df.reset_index(drop=True)
 
     # tenta achar colunas equivalentes
     col_ug = None
@@ -411,9 +418,10 @@ if btn:
 
     try:
         with st.spinner("Lendo e processando arquivos..."):
-            doc_pds = ler_doc_pds(up_docs)
-            saldo_pds = ler_saldo_pds(up_saldos)
-            obs_agr = ler_obs_pagamentos(up_obs)
+            planilhas = ler_planilhas(leituras_relatorios(up_docs, up_saldos, up_obs))
+            doc_pds = tratar_doc_pds(planilhas["docs"])
+            saldo_pds = tratar_saldo_pds(planilhas["saldos"])
+            obs_agr = tratar_obs_pagamentos(planilhas["obs"])
             res = processar(doc_pds, saldo_pds, obs_agr)
 
         st.session_state["resultado"] = res
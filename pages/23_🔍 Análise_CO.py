@@ -7,6 +7,7 @@ import pandas as pd
 import streamlit as st
 
 from core.layout import setup_page, sidebar_menu, get_app_menu
+from core.planilhas import ler_planilha
 
 
 # ============================================================================
@@ -160,7 +161,7 @@ def ler_csv_robusto(uploaded_file, sep: str = ";", skiprows: int = 0) -> pd.Data
 
 
 def ler_excel_robusto(uploaded_file) -> pd.DataFrame:
-    return pd.read_excel(uploaded_file, dtype=str)
+    return ler_planilha(uploaded_file, dtype=str)
 
 
 def comparar_nivel(
@@ -0,0 +1,156 @@
+# ┌───────────────────────────────────────────────────────────────
+# │ scripts/bench_lme_upsert.py
+# │ Benchmark do upsert de regras LME (COPY + staging x pandas)
+# └───────────────────────────────────────────────────────────────
+#
+# Compara `core.db_simple.upsert_regras_vigentes` (COPY para a staging e diff
+# no PostgreSQL) com a implementação anterior (diff em pandas + ANY(:keys) +
+# executemany), mantida aqui apenas como referência.
+#
+# O benchmark grava e apaga 2 x `n` regras (LME "LME BENCH"), por isso só roda
+# num banco de teste informado explicitamente em LME_BENCH_DB_URL (ou
+# --db-url); nunca usa o DB_URL da aplicação, e recusa uma URL igual a ele.
+#
+# Uso (a partir da raiz do projeto):
+#   LME_BENCH_DB_URL=postgresql+psycopg2://.../lme_teste python -m scripts.bench_lme_upsert
+#   python -m scripts.bench_lme_upsert --db-url postgresql+psycopg2://.../lme_teste --regras 20000
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+LME = "LME BENCH"
+
+
+def _upsert_regras_pandas(db, df_regras: pd.DataFrame, lme_tipo: str) -> dict:
+    """Implementação anterior (diff em pandas + ANY(:keys) + executemany), usada como referência."""
+    eng = db.get_engine()
+    df = db._preparar_regras(df_regras)
+    df["lme"] = lme_tipo
+    df["chave"] = df["lme"] + "|" + df["gd"] + "|" + df["uo"] + "|" + df["acao"]
+    chaves_atuais = set(df["chave"])
+    colunas = ["lme", "gd", "uo", "acao", "regra_completa", "regra_hash"]
+    inserir_sql = text("""
+        INSERT INTO lme_regras_hist (lme, gd, uo, acao, regra_completa, regra_hash)
+        VALUES (:lme, :gd, :uo, :acao, :regra_completa, :regra_hash)
+    """)
+    fechar_sql = text("""
+        UPDATE lme_regras_hist
+        SET vigente_ate = NOW()
+        WHERE vigente_ate IS NULL
+          AND (lme || '|' || gd || '|' || uo || '|' || acao) = ANY(:keys)
+    """)
+
+    with eng.begin() as con:
+        atuais = pd.read_sql(text("""
+            SELECT lme, gd, uo, acao, regra_hash, regra_completa
+            FROM lme_regras_hist
+            WHERE lme = :lme AND vigente_ate IS NULL
+        """), con, params={"lme": lme_tipo})
+        atuais["chave"] = atuais["lme"] + "|" + atuais["gd"] + "|" + atuais["uo"] + "|" + atuais["acao"]
+        chaves_abertas = set(atuais["chave"])
+
+        chaves_novas = chaves_atuais - chaves_abertas
+        chaves_removidas = chaves_abertas - chaves_atuais
+        chaves_comuns = chaves_atuais & chaves_abertas
+        alteradas = []
+
+        if chaves_removidas:
+            con.execute(fechar_sql, {"keys": list(chaves_removidas)})
+        if chaves_novas:
+            con.execute(inserir_sql, df[df["chave"].isin(chaves_novas)][colunas].to_dict("records"))
+        if chaves_comuns:
+            base = df[df["chave"].isin(chaves_comuns)][["chave", "regra_hash"]].merge(
+                atuais[["chave", "regra_hash"]].rename(columns={"regra_hash": "hash_antigo"}),
+                on="chave", how="left",
+            )
+            alteradas = base[base["regra_hash"] != base["hash_antigo"]]["chave"].tolist()
+            if alteradas:
+                con.execute(fechar_sql, {"keys": alteradas})
+                con.execute(inserir_sql, df[df["chave"].isin(alteradas)][colunas].to_dict("records"))
+
+    return {
+        "novas": len(chaves_novas),
+        "removidas": len(chaves_removidas),
+        "alteradas": len(alteradas),
+        "mantidas": len(chaves_comuns) - len(alteradas),
+    }
+
+
+def _regras_sinteticas(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    chaves = pd.DataFrame({
+        "GRUPO DE DESPESA (=)": rng.integers(1, 10, n * 2).astype(str),
+        "UNIDADE ORÇAMENTÁRIA (=)": rng.integers(10000, 99999, n * 2).astype(str),
+        "AÇÃO PPA (TERMINA COM)": rng.integers(1000, 9999, n * 2).astype(str),
+    }).drop_duplicates().head(n).reset_index(drop=True)
+    chaves["regra_completa"] = (
+        "[GRUPO DE DESPESA].[Código] = '" + chaves["GRUPO DE DESPESA (=)"] + "' E " +
+        "[UNIDADE ORÇAMENTÁRIA].[Código] = '" + chaves["UNIDADE ORÇAMENTÁRIA (=)"] + "' E " +
+        "[AÇÃO PPA].[Código] TERMINA COM '" + chaves["AÇÃO PPA (TERMINA COM)"] + "'"
+    )
+    return chaves
+
+
+def benchmark(db, n: int = 100_000) -> None:
+    """
+    Carga inicial de `n` regras e uma nova versão do TXT com 5% de regras
+    removidas, 5% alteradas e 5% novas, nas duas implementações.
+    """
+    if not db.get_engine() or not db.ensure_schema_simple():
+        raise SystemExit("Não foi possível conectar ao banco de teste.")
+
+    v1 = _regras_sinteticas(n)
+    extras = _regras_sinteticas(n + n // 20, seed=1).tail(n // 20)
+    v2 = pd.concat([v1.iloc[n // 20:], extras], ignore_index=True)
+    alterar = v2.index[: n // 20]
+    # texto (hash) muda, chave não
+    v2.loc[alterar, "regra_completa"] = v2.loc[alterar, "regra_completa"].str.replace(" E ", "  E ", n=1)
+
+    implementacoes = (
+        ("pandas + ANY(:keys)", lambda df, lme: _upsert_regras_pandas(db, df, lme)),
+        ("COPY + staging", db.upsert_regras_vigentes),
+    )
+    resultados = {}
+    for nome, funcao in implementacoes:
+        db.deletar_todas_regras_lme(LME)
+        t0 = time.perf_counter()
+        carga = funcao(v1, LME)
+        t_carga = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        sync = funcao(v2, LME)
+        t_sync = time.perf_counter() - t0
+        resultados[nome] = (carga, sync)
+        print(f"{nome:22s} carga inicial: {t_carga:6.2f}s | nova versão: {t_sync:6.2f}s | {sync}")
+    db.deletar_todas_regras_lme(LME)
+
+    assert len({str(r) for r in resultados.values()}) == 1, resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do upsert de regras LME (somente banco de teste)")
+    parser.add_argument("--db-url", default=os.environ.get("LME_BENCH_DB_URL"),
+                        help="URL do banco de teste (padrão: LME_BENCH_DB_URL)")
+    parser.add_argument("--regras", type=int, default=100_000, help="Regras na carga inicial")
+    args = parser.parse_args(argv)
+
+    if not args.db_url:
+        parser.error("informe o banco de teste em LME_BENCH_DB_URL ou --db-url (o DB_URL da aplicação não é usado)")
+    if args.db_url == os.environ.get("DB_URL"):
+        parser.error("a URL do banco de teste é igual ao DB_URL da aplicação")
+
+    # get_engine lê DB_URL: aponta-o para o banco de teste antes de importar o módulo
+    os.environ["DB_URL"] = args.db_url
+    from core import db_simple
+
+    benchmark(db_simple, args.regras)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())